@@ -0,0 +1 @@
+"""Benchmark suite of pyipmi, run with `python -m benchmarks`."""
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Encoding and decoding of representative messages."""
+
+from pyipmi.msgs import (create_request_by_name, create_response_by_name,
+                         decode_message, encode_message)
+
+SDR_RECORD = bytes([
+    0x17, 0x00, 0x51, 0x01, 0x35, 0x17, 0x00, 0x51,
+    0x01, 0x35, 0x17, 0x00, 0x51, 0x01, 0x35, 0x32,
+    0x85, 0x32, 0x1b, 0x1b, 0x00, 0x04, 0x00, 0x00,
+    0x3b, 0x01, 0x00, 0x01, 0x00, 0xd0, 0x07, 0xcc])
+
+# response name: response data
+RESPONSES = {
+    'GetDeviceId': b'\x00\x0c\x89\x00\x00\x02\x3d\x98'
+                   b'\x3a\x00\xbe\x14\x04\x00\x02\x00',
+    'GetSensorReading': b'\x00\x12\x01\xaa\xbb',
+    'GetSdr': b'\x00\x18\x00' + SDR_RECORD,
+    'ReadFruData': b'\x00\x20' + bytes(range(32)),
+    'GetSelEntry': b'\x00\x02\x00\x01\x00\x02\x01\x02\x03\x04\x20'
+                   b'\x00\x04\x01\x6f\x81\x02\x03\x04',
+    'GetFruLedState': b'\x00\x00\x03\xff\x00\x02\xff\x00\x01',
+}
+
+
+def _request(name, **fields):
+    req = create_request_by_name(name)
+    for (key, value) in fields.items():
+        obj = req
+        path = key.split('__')
+        for attr in path[:-1]:
+            obj = getattr(obj, attr)
+        setattr(obj, path[-1], value)
+    return req
+
+
+def bench_encode():
+    requests = {
+        'GetDeviceId': _request('GetDeviceId'),
+        'GetSensorReading': _request('GetSensorReading', sensor_number=0x12),
+        'GetSdr': _request('GetSdr', reservation_id=0x1234, record_id=0x17,
+                           offset=0, bytes_to_read=32),
+        'ReadFruData': _request('ReadFruData', fru_id=0, offset=0x100,
+                                count=32),
+        'SetFruLedState': _request('SetFruLedState', fru_id=0, led_id=1,
+                                   color=2, led_function=0xff,
+                                   on_duration=0),
+    }
+    return dict((name, lambda req=req: encode_message(req))
+                for (name, req) in requests.items())
+
+
+def bench_decode():
+    cases = {}
+    for (name, data) in RESPONSES.items():
+        # make sure the vector is valid
+        decode_message(create_response_by_name(name), data)
+
+        def decode(name=name, data=data):
+            decode_message(create_response_by_name(name), data)
+        cases[name] = decode
+    return cases
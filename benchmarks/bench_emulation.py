@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Transactions against a local `pyipmi.emulation` server over RMCP."""
+
+import logging
+import os
+import socket
+import tempfile
+import threading
+
+import pyipmi
+import pyipmi.interfaces
+from pyipmi import emulation
+from pyipmi.interfaces.rmcp import AsfPing, RmcpMsg, RMCP_CLASS_ASF
+from pyipmi.logger import set_log_level
+from pyipmi.msgs import create_request_by_name
+
+HOST = emulation.UDP_IP
+
+CONFIG = """
+sensors:
+  1:
+    waveform: sine
+sel:
+  initial: 64
+"""
+
+_connection = None
+_config_file = None
+
+
+def _free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((HOST, 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _wait_for_server(port, timeout=5.0):
+    ping = RmcpMsg(RMCP_CLASS_ASF).pack(AsfPing().pack(), 0xff)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.05)
+    try:
+        for _ in range(int(timeout / 0.05)):
+            sock.sendto(ping, (HOST, port))
+            try:
+                sock.recvfrom(1024)
+                return
+            except socket.timeout:
+                pass
+    finally:
+        sock.close()
+    raise RuntimeError('emulation server did not start')
+
+
+def setup_module():
+    global _connection, _config_file
+
+    (fd, _config_file) = tempfile.mkstemp(suffix='.yaml')
+    with os.fdopen(fd, 'w') as f:
+        f.write(CONFIG)
+
+    port = _free_port()
+    thread = threading.Thread(target=emulation.main,
+                              args=(['-p', str(port), '-c', _config_file],),
+                              daemon=True)
+    thread.start()
+    _wait_for_server(port)
+    # the server enables debug logging, which is not what is measured here
+    set_log_level(logging.WARNING)
+
+    interface = pyipmi.interfaces.create_interface(
+        'rmcp', keep_alive_interval=0, max_in_flight=8)
+    _connection = pyipmi.create_connection(interface)
+    _connection.session.set_session_type_rmcp(HOST, port)
+    _connection.session.set_auth_type_user('admin', 'admin')
+    _connection.target = pyipmi.Target(ipmb_address=0x20)
+    _connection.open()
+
+
+def teardown_module():
+    global _connection
+
+    _connection.close()
+    _connection = None
+    os.unlink(_config_file)
+
+
+def bench_get_device_id():
+    return lambda: _connection.get_device_id()
+
+
+def bench_raw_command():
+    return lambda: _connection.raw_command(0, 6, b'\x01')
+
+
+def bench_send_messages():
+    def send():
+        reqs = [create_request_by_name('GetDeviceId') for _ in range(8)]
+        return _connection.send_messages(reqs)
+    return send
+
+
+def bench_get_sensor_reading():
+    return lambda: _connection.get_sensor_reading(1)
+
+
+def bench_get_sel_entries():
+    return lambda: _connection.get_sel_entries()
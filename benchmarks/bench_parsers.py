@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Parsing of SDR records, FRU inventories and HPM upgrade images."""
+
+import os
+from array import array
+
+from pyipmi.fru import FruInventory
+from pyipmi.hpm import UpgradeImage
+from pyipmi.sdr import SdrCommon
+
+TESTS = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tests')
+
+# one record of each type, as in a repository dump
+SDR_RECORDS = {
+    'full_sensor': bytes([
+        0x17, 0x00, 0x51, 0x01, 0x35, 0x17, 0x00, 0x51,
+        0x01, 0x35, 0x17, 0x00, 0x51, 0x01, 0x35, 0x32,
+        0x85, 0x32, 0x1b, 0x1b, 0x00, 0x04, 0x00, 0x00,
+        0x3b, 0x01, 0x00, 0x01, 0x00, 0xd0, 0x07, 0xcc,
+        0xf4, 0xa6, 0xff, 0x00, 0x00, 0xfe, 0xf5, 0x00,
+        0x8e, 0xa5, 0x04, 0x04, 0x00, 0x00, 0x00, 0xca,
+        0x41, 0x32, 0x3a, 0x56, 0x63, 0x63, 0x20, 0x31,
+        0x32, 0x56]),
+    'compact_sensor': bytes([
+        0xd3, 0x00, 0x51, 0x02, 0x28, 0x82, 0x00, 0xd3,
+        0xc1, 0x64, 0x03, 0x40, 0x21, 0x6f, 0x00, 0x00,
+        0x00, 0x00, 0x03, 0x00, 0xc0, 0x00, 0x00, 0x01,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xcd,
+        0x41, 0x34, 0x3a, 0x50, 0x72, 0x65, 0x73, 0x20,
+        0x53, 0x46, 0x50, 0x2d, 0x31]),
+    'fru_device_locator': bytes([
+        0x02, 0x00, 0x51, 0x11, 0x17, 0x82, 0x03, 0x80,
+        0x00, 0x00, 0x10, 0x02, 0xc2, 0x61, 0x00, 0xcc,
+        0x4b, 0x6f, 0x6e, 0x74, 0x72, 0x6f, 0x6e, 0x20,
+        0x4d, 0x43, 0x4d, 0x43]),
+    'mc_confirmation': bytes([
+        0x45, 0x00, 0x51, 0x13, 0x1b, 0x20, 0x00, 0x01,
+        0x02, 0x01, 0x51, 0x4a, 0xc1, 0x62, 0x06, 0x80,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]),
+}
+
+
+def _read(*path):
+    with open(os.path.join(TESTS, *path), 'rb') as f:
+        return f.read()
+
+
+def _parse_sdr_dump(dump):
+    records = []
+    offset = 0
+    while offset < len(dump):
+        length = 5 + dump[offset + 4]
+        records.append(SdrCommon.from_data(
+            array('B', dump[offset:offset + length])))
+        offset += length
+    return records
+
+
+def bench_sdr_from_data():
+    cases = dict((name, lambda data=array('B', data):
+                  SdrCommon.from_data(data))
+                 for (name, data) in SDR_RECORDS.items())
+    # a repository of 64 records
+    dump = b''.join(SDR_RECORDS.values()) * 16
+    cases['dump'] = lambda: _parse_sdr_dump(dump)
+    return cases
+
+
+def bench_fru_inventory():
+    cases = {}
+    for filename in sorted(os.listdir(os.path.join(TESTS, 'fru_bin'))):
+        data = _read('fru_bin', filename)
+        # make sure the file is valid
+        FruInventory(data)
+        cases[os.path.splitext(filename)[0]] = \
+            lambda data=data: FruInventory(data)
+    return cases
+
+
+def bench_hpm_upgrade_image():
+    cases = {}
+    for filename in sorted(os.listdir(os.path.join(TESTS, 'hpm_bin'))):
+        path = os.path.join(TESTS, 'hpm_bin', filename)
+        cases[os.path.splitext(filename)[0]] = \
+            lambda path=path: UpgradeImage(path)
+    return cases
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""RMCP session framing and IPMB header handling."""
+
+from pyipmi import Target
+from pyipmi.interfaces.ipmb import (IpmbHeaderReq, IpmbHeaderRsp,
+                                    encode_bridged_message, encode_ipmb_msg,
+                                    rx_filter)
+from pyipmi.interfaces.rmcp import IpmiMsg
+from pyipmi.session import Session
+
+# a Get Device ID request
+SDU = b'\x20\x18\xc8\x81\x04\x01\x7a'
+
+
+def _session(auth_type):
+    session = Session()
+    session.set_auth_type_user('admin', 'admin')
+    session.auth_type = auth_type
+    session.sequence_number = 0x14131211
+    session.sid = 0x02f99b85
+    return session
+
+
+def bench_ipmi_msg_pack():
+    cases = {}
+    for (name, auth_type) in (('none', Session.AUTH_TYPE_NONE),
+                              ('password', Session.AUTH_TYPE_PASSWORD),
+                              ('md5', Session.AUTH_TYPE_MD5)):
+        msg = IpmiMsg(_session(auth_type))
+        cases[name] = lambda msg=msg: msg.pack(SDU)
+    return cases
+
+
+def bench_ipmi_msg_unpack():
+    cases = {}
+    for (name, auth_type) in (('none', Session.AUTH_TYPE_NONE),
+                              ('md5', Session.AUTH_TYPE_MD5)):
+        pdu = IpmiMsg(_session(auth_type)).pack(SDU)
+        cases[name] = lambda pdu=pdu: IpmiMsg().unpack(pdu)
+    return cases
+
+
+def _request_header():
+    header = IpmbHeaderReq()
+    header.netfn = 6
+    header.rs_lun = 0
+    header.rs_sa = 0x72
+    header.rq_seq = 0x11
+    header.rq_lun = 0
+    header.rq_sa = 0x81
+    header.cmdid = 0x01
+    return header
+
+
+def bench_rx_filter():
+    header = _request_header()
+    rsp_header = IpmbHeaderRsp()
+    rsp_header.from_req_header(header)
+    rsp_header.netfn = header.netfn | 1
+    rx_data = encode_ipmb_msg(rsp_header, b'\x00\x0c\x89\x00\x00\x02')
+    return lambda: rx_filter(header, rx_data)
+
+
+def bench_encode_bridged_message():
+    payload = b'\xaa\xbb'
+    cases = {}
+    for (name, routing) in (
+            ('single', [(0x81, 0x20, 0), (0x20, 0x82, None)]),
+            ('double', [(0x81, 0x20, 0), (0x20, 0x82, 7),
+                        (0x20, 0x72, None)])):
+        target = Target(routing=routing)
+        header = _request_header()
+        cases[name] = (lambda target=target, header=header:
+                       encode_bridged_message(target.routing, header,
+                                              payload, 0x22))
+    return cases
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Measure the time a fresh interpreter needs to import pyipmi.
+
+Every sample starts a new interpreter and times the statement in it, so
+the numbers are what a short lived CLI invocation pays on top of the
+interpreter startup.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 50 --json
+    python benchmarks/import_time.py --statement \
+        'import pyipmi; pyipmi.create_connection(None)'
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = (
+    'import pyipmi',
+    'import pyipmi; pyipmi.msgs.create_request_by_name("GetDeviceId")',
+    'import pyipmi; pyipmi.create_connection(None)',
+    'import pyipmi.interfaces',
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_TIMER = '''
+import time
+_start = time.perf_counter()
+%s
+print(time.perf_counter() - _start)
+'''
+
+
+def measure(statement: str, runs: int) -> list[float]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [p for p in [env.get('PYTHONPATH')] if p])
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _TIMER % statement], env=env, cwd=ROOT)
+        samples.append(float(output.decode().strip().splitlines()[-1]))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=20,
+                        help='number of interpreters per statement')
+    parser.add_argument('-s', '--statement', action='append',
+                        help='statement to measure (default: a set of '
+                        'common startup paths)')
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as JSON')
+    args = parser.parse_args()
+
+    # make sure the samples do not include byte compiling
+    subprocess.check_call([sys.executable, '-m', 'compileall', '-q',
+                           os.path.join(ROOT, 'pyipmi')],
+                          stdout=subprocess.DEVNULL)
+
+    results = []
+    for statement in args.statement or STATEMENTS:
+        samples = measure(statement, args.runs)
+        results.append({
+            'name': statement,
+            'runs': args.runs,
+            'min_ms': min(samples) * 1e3,
+            'median_ms': statistics.median(samples) * 1e3,
+            'max_ms': max(samples) * 1e3,
+        })
+
+    if args.json:
+        json.dump({'benchmark': 'import_time', 'python': sys.version,
+                   'results': results}, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+
+    for result in results:
+        print('%8.2f ms (min %.2f ms, max %.2f ms)  %s'
+              % (result['median_ms'], result['min_ms'], result['max_ms'],
+                 result['name']))
+
+
+if __name__ == '__main__':
+    main()
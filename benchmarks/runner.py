@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Runner of the benchmark suite.
+
+A benchmark module is a `bench_*.py` file in this package. Each of its
+`bench_*` functions does the setup and returns the callable to time, or a
+dict of case name to callable. An optional `setup_module()` and
+`teardown_module()` run once before and after the benchmarks of the module.
+
+    python -m benchmarks
+    python -m benchmarks -k codec --json results.json
+    python -m benchmarks --compare baseline.json --max-regression 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from typing import Any, Callable
+
+FORMAT_VERSION = 1
+
+STATS = ('min', 'median', 'mean')
+
+
+class BenchmarkResult(object):
+    def __init__(self, name: str, group: str, times: list[float],
+                 iterations: int) -> None:
+        self.name = name
+        self.group = group
+        self.iterations = iterations
+        self.rounds = len(times)
+        self.min = min(times)
+        self.max = max(times)
+        self.mean = statistics.mean(times)
+        self.median = statistics.median(times)
+        self.stddev = statistics.stdev(times) if len(times) > 1 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'name': self.name,
+            'group': self.group,
+            'unit': 's',
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'median': self.median,
+            'stddev': self.stddev,
+            'rounds': self.rounds,
+            'iterations': self.iterations,
+            'ops': 1 / self.mean if self.mean else 0.0,
+        }
+
+
+def discover() -> list[str]:
+    """Return the names of the benchmark modules."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    modules = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.startswith('bench_') and filename.endswith('.py'):
+            modules.append('%s.%s' % (__package__, filename[:-3]))
+    return modules
+
+
+def _cases(module: Any) -> list[tuple[str, Callable[[], Any]]]:
+    cases = []
+    for name in sorted(dir(module)):
+        if not name.startswith('bench_'):
+            continue
+        func = getattr(module, name)
+        if not callable(func):
+            continue
+        case = func()
+        if isinstance(case, dict):
+            for (key, value) in case.items():
+                cases.append(('%s[%s]' % (name[6:], key), value))
+        else:
+            cases.append((name[6:], case))
+    return cases
+
+
+def measure(func: Callable[[], Any], rounds: int = 5,
+            min_time: float = 0.2) -> tuple[list[float], int]:
+    """Time `func` in `rounds` rounds of at least `min_time` seconds.
+
+    Returns the time per call of each round and the number of calls per
+    round.
+    """
+    timer = timeit.Timer(func)
+    if min_time > 0:
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= min_time:
+                break
+            estimate = int(number * min_time / max(elapsed, 1e-9))
+            number = min(max(number * 2, estimate), number * 100)
+    else:
+        number = 1
+    times = [timer.timeit(number) / number for _ in range(rounds)]
+    return (times, number)
+
+
+def run(modules: list[str], keyword: str | None = None, rounds: int = 5,
+        min_time: float = 0.2,
+        progress: Callable[[BenchmarkResult], None] | None = None
+        ) -> list[BenchmarkResult]:
+    results = []
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        group = module_name.rsplit('.', 1)[-1][6:]
+
+        if hasattr(module, 'setup_module'):
+            module.setup_module()
+        try:
+            for (name, func) in _cases(module):
+                name = '%s.%s' % (group, name)
+                if keyword and keyword not in name:
+                    continue
+                (times, number) = measure(func, rounds, min_time)
+                result = BenchmarkResult(name, group, times, number)
+                results.append(result)
+                if progress:
+                    progress(result)
+        finally:
+            if hasattr(module, 'teardown_module'):
+                module.teardown_module()
+    return results
+
+
+def _commit() -> str | None:
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode().strip()
+
+
+def to_dict(results: list[BenchmarkResult]) -> dict[str, Any]:
+    return {
+        'version': FORMAT_VERSION,
+        'commit': _commit(),
+        'machine': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+        },
+        'benchmarks': [result.to_dict() for result in results],
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any],
+            stat: str = 'min',
+            max_regression: float = 0.2) -> list[tuple[str, float, float, bool]]:
+    """Compare two result sets.
+
+    Returns (name, baseline, current, regressed) for each benchmark in
+    both sets, where `regressed` is True if the current `stat` is more than
+    `max_regression` (relative) slower than the baseline.
+    """
+    old = dict((b['name'], b[stat]) for b in baseline['benchmarks'])
+    rows = []
+    for bench in current['benchmarks']:
+        if bench['name'] not in old:
+            continue
+        (before, after) = (old[bench['name']], bench[stat])
+        regressed = after > before * (1 + max_regression)
+        rows.append((bench['name'], before, after, regressed))
+    return rows
+
+
+def _format_time(seconds: float) -> str:
+    for (unit, factor) in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds * factor >= 1:
+            return '%8.3f %-2s' % (seconds * factor, unit)
+    return '%8.3f ns' % (seconds * 1e9)
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Run the pyipmi benchmark suite.')
+    parser.add_argument('-k', dest='keyword',
+                        help='only run benchmarks containing KEYWORD')
+    parser.add_argument('-r', '--rounds', type=int, default=5,
+                        help='number of timed rounds (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimal duration of a round in seconds')
+    parser.add_argument('--quick', action='store_true',
+                        help='one round with one call, to check the '
+                        'benchmarks only')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write the results as JSON to FILE '
+                        '("-" for stdout)')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare with the JSON results in FILE')
+    parser.add_argument('--compare-stat', choices=STATS, default='min',
+                        help='statistic to compare (default: min)')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='relative slowdown that fails the comparison '
+                        '(default: 0.2)')
+    args = parser.parse_args(args)
+
+    if args.quick:
+        (args.rounds, args.min_time) = (1, 0)
+
+    quiet = args.json == '-'
+
+    def progress(result: BenchmarkResult) -> None:
+        if not quiet:
+            print('%-50s %s  (+- %s, %d x %d)'
+                  % (result.name, _format_time(result.median),
+                     _format_time(result.stddev).strip(), result.rounds,
+                     result.iterations))
+
+    results = run(discover(), args.keyword, args.rounds, args.min_time,
+                  progress)
+    data = to_dict(results)
+
+    if args.json == '-':
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    failed = False
+    for (name, before, after, regressed) in compare(
+            baseline, data, args.compare_stat, args.max_regression):
+        failed |= regressed
+        if not quiet:
+            print('%-50s %s -> %s  %+6.1f%%%s'
+                  % (name, _format_time(before), _format_time(after),
+                     (after / before - 1) * 100,
+                     '  REGRESSION' if regressed else ''))
+    return 1 if failed else 0
@@ -45,17 +45,21 @@ def get_command_list():
     data = list()
     Command = namedtuple('Command', ['netfn', 'cmdid', 'grpext', 'name'])
 
-    od = OrderedDict(sorted(DEFAULT_REGISTRY.registry.items()))
+    # the message modules are imported on first use only
+    DEFAULT_REGISTRY.load_all()
+    # the messages are registered by name and by (netfn, cmdid, grpext)
+    commands = [(key, val) for key, val in DEFAULT_REGISTRY.registry.items()
+                if isinstance(key, tuple)]
+    od = OrderedDict(sorted(commands, key=lambda item: (
+        item[0][0], item[0][1], -1 if item[0][2] is None else item[0][2])))
 
     for key, val in od.items():
-        if isinstance(key, tuple):
+        # skip response messages
+        if key[0] & 1:
+            continue
 
-            # skip response messages
-            if key[0] & 1:
-                continue
-
-            data.append(Command(str(hex(key[0])), str(hex(key[1])),
-                        str(key[2]), val.__name__[:-3]))
+        data.append(Command(str(hex(key[0])), str(hex(key[1])),
+                    str(key[2]), val.__name__[:-3]))
 
     return data
 
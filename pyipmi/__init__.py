@@ -18,29 +18,65 @@
 from __future__ import absolute_import
 from __future__ import annotations
 
-import time
-import ast
-from typing import Any
-
-from . import bmc
-from . import chassis
-from . import dcmi
-from . import event
-from . import fru
-from . import hpm
-from . import lan
-from . import messaging
-from . import picmg
-from . import sdr
-from . import sel
-from . import sensor
-from . import msgs
-
-from .errors import IpmiTimeoutError, CompletionCodeError, RetryError
-from .msgs import Message
-from .msgs.registry import create_request_by_name
+import importlib
+from typing import Any, TYPE_CHECKING
+
+from . import msgs  # noqa:F401
+
 from .session import Session
-from .utils import check_rsp_completion_code, is_string
+from .utils import is_string
+
+if TYPE_CHECKING:
+    from .ipmi import Ipmi
+
+# The subsystems and the `Ipmi` class, which is composed of them, are
+# imported on first access.
+_SUBMODULES = frozenset((
+    'bmc',
+    'chassis',
+    'constants',
+    'dcmi',
+    'event',
+    'fields',
+    'fru',
+    'helper',
+    'hpm',
+    'lan',
+    'messaging',
+    'picmg',
+    'sdr',
+    'sel',
+    'sensor',
+    'state',
+))
+
+
+# names of other modules, which used to be imported here
+_ATTRIBUTES = {
+    'Ipmi': '.ipmi',
+    'CompletionCodeError': '.errors',
+    'IpmiTimeoutError': '.errors',
+    'RetryError': '.errors',
+    'Message': '.msgs',
+    'create_request_by_name': '.msgs.registry',
+    'check_rsp_completion_code': '.utils',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    if name in _ATTRIBUTES:
+        module = importlib.import_module(_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _SUBMODULES | set(_ATTRIBUTES))
+
 
 try:
     from version import __version__
@@ -49,6 +85,8 @@ except ImportError:
 
 
 def create_connection(interface: Any) -> Ipmi:
+    from .ipmi import Ipmi
+
     session = Session()
     session.interface = interface
     return Ipmi(interface=interface, session=session)
@@ -149,6 +187,7 @@ class Target(object):
         """
         if is_string(routing):
             # if type(routing) in [unicode, str]:
+            import ast
             routing = ast.literal_eval(routing)
         self.routing = [Routing(*route) for route in routing]
 
@@ -158,131 +197,3 @@ class Target(object):
             for route in self.routing:
                 string += ' %s\n' % route
         return string
-
-
-class Ipmi(bmc.Bmc, chassis.Chassis, dcmi.Dcmi, fru.Fru, picmg.Picmg, hpm.Hpm,
-           sdr.Sdr, sensor.Sensor, event.Event, sel.Sel, lan.Lan,
-           messaging.Messaging):
-
-    def __init__(self, interface: Any = None, target: Target | None = None,
-                 session: Session = Session(),
-                 requester: Any = NullRequester()) -> None:
-        self._interface = interface
-
-        # we need a session, set if not passed
-        if session is None:
-            session = Session()
-        self._session = session
-        # session needs an interface
-        self._session.interface = interface
-
-        self._target = target
-        self.requester = requester
-
-        for base in Ipmi.__bases__:
-            base.__init__(self)
-
-    def __enter__(self) -> Ipmi:
-        self.open()
-        return self
-
-    def __exit__(self, exception_type: Any, exception_value: Any,
-                 traceback: Any) -> bool:
-        self.close()
-        return False
-
-    def open(self) -> None:
-        self.interface.open()
-        if self.session is not None:
-            self.session.establish()
-
-    def close(self) -> None:
-        if self.session is not None:
-            self.session.close()
-        self.interface.close()
-
-    def is_ipmc_accessible(self) -> bool:
-        return self.interface.is_ipmc_accessible(self.target)
-
-    def wait_until_ipmb_is_accessible(self, timeout: float,
-                                      interval: float = 0.25) -> None:
-        start_time = time.time()
-        while time.time() < start_time + (timeout):
-            try:
-                self.is_ipmc_accessible()
-            except IpmiTimeoutError:
-                time.sleep(interval)
-
-        self.is_ipmc_accessible()
-
-    def send_message(self, req: Message, retry: int = 3) -> Message:
-        req.target = self.target
-        req.requester = self.requester
-        rsp = None
-
-        while retry > 0:
-            retry -= 1
-            try:
-                rsp = self.interface.send_and_receive(req)
-                break
-            except CompletionCodeError as e:
-                if e.cc == msgs.constants.CC_NODE_BUSY:
-                    continue
-        else:
-            raise RetryError()
-
-        return rsp
-
-    def send_message_with_name(self, name: str, *args: Any,
-                               **kwargs: Any) -> Message:
-        req = create_request_by_name(name)
-
-        for key, value in kwargs.items():
-            setattr(req, key, value)
-
-        rsp = self.send_message(req)
-        check_rsp_completion_code(rsp)
-        return rsp
-
-    def raw_command(self, lun: int, netfn: int, raw_bytes: bytes) -> bytes:
-        """Send the raw command data and return the raw response.
-
-        lun: the logical unit number
-        netfn: the network function
-        raw_bytes: the raw message as bytestring
-
-        Returns the response as bytestring.
-        """
-        return self.interface.send_and_receive_raw(self.target, lun, netfn,
-                                                   raw_bytes)
-
-    def _get_interface(self) -> Any:
-        try:
-            return self._interface
-        except AttributeError:
-            raise RuntimeError('No interface has been set')
-
-    def _get_session(self) -> Session:
-        try:
-            return self._session
-        except AttributeError:
-            raise RuntimeError('No IPMI session has been set')
-
-    def _get_target(self) -> Target:
-        try:
-            return self._target
-        except AttributeError:
-            raise RuntimeError('No IPMI target has been set')
-
-    def _set_interface(self, interface: Any) -> None:
-        self._interface = interface
-
-    def _set_session(self, session: Session) -> None:
-        self._session = session
-
-    def _set_target(self, target: Target) -> None:
-        self._target = target
-
-    target = property(_get_target, _set_target)
-    interface = property(_get_interface, _set_interface)
-    session = property(_get_session, _set_session)
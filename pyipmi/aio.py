@@ -0,0 +1,340 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""asyncio counterpart of the `pyipmi.Ipmi` connection.
+
+Example:
+
+    interface = pyipmi.interfaces.create_interface('aiormcp')
+    ipmi = pyipmi.aio.create_connection(interface)
+    ipmi.session.set_session_type_rmcp('10.0.0.1', port=623)
+    ipmi.session.set_auth_type_user('admin', 'admin')
+    ipmi.target = pyipmi.Target(0x20)
+
+    async with ipmi:
+        async for sdr in ipmi.sdr_repository_entries():
+            ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+from array import array
+from typing import Any, AsyncGenerator, Generator
+
+from . import NullRequester, Target
+from .errors import CompletionCodeError, RetryError
+from .fru import fru_data_reads, FruInventory, FRU_MAX_READ_LENGTH
+from .helper import ReadLength, SdrReadLength, sdr_data_reads
+from .metrics import Metrics
+from .msgs import create_request_by_name, constants, Message
+from .sdr import SdrCommon
+from .sel import (new_sel_entry_reads, sel_cursor_at_end_reads,
+                  sel_entry_reads, SelCursor, SelEntry, SelInfo,
+                  START_SEL_RECORD_ID, END_SEL_RECORD_ID, SEL_RECORD_LENGTH)
+from .sensor import sensor_reading_from_response
+from .session import Session
+from .utils import check_completion_code, check_rsp_completion_code
+
+
+def create_connection(interface: Any) -> AsyncIpmi:
+    session = Session()
+    session.interface = interface
+    return AsyncIpmi(interface=interface, session=session)
+
+
+class AsyncIpmi(object):
+    """The asyncio IPMI connection.
+
+    The interface has to provide awaitable `send_and_receive` methods, e.g.
+    `pyipmi.interfaces.aiormcp.AsyncRmcp`.
+    """
+
+    # see pyipmi.metrics
+    metrics = None
+
+    def __init__(self, interface: Any = None, target: Target | None = None,
+                 session: Session | None = None,
+                 requester: Any = NullRequester()) -> None:
+        self.interface = interface
+        if session is None:
+            session = Session()
+        self.session = session
+        self.session.interface = interface
+        self.target = target
+        self.requester = requester
+        # negotiated read lengths, see pyipmi.helper.ReadLength
+        self._sdr_read_length = SdrReadLength()
+        self._sel_read_length = ReadLength(SEL_RECORD_LENGTH)
+        self._fru_read_length = ReadLength(FRU_MAX_READ_LENGTH)
+
+    async def __aenter__(self) -> AsyncIpmi:
+        await self.open()
+        return self
+
+    async def __aexit__(self, exception_type: Any, exception_value: Any,
+                        traceback: Any) -> bool:
+        await self.close()
+        return False
+
+    async def open(self) -> None:
+        await self.interface.open()
+        if hasattr(self.interface, 'establish_session'):
+            await self.interface.establish_session(self.session)
+
+    async def close(self) -> None:
+        if hasattr(self.interface, 'close_session'):
+            await self.interface.close_session()
+        await self.interface.close()
+
+    async def send_message(self, req: Message, retry: int = 3) -> Message:
+        req.target = self.target
+        req.requester = self.requester
+
+        while retry > 0:
+            retry -= 1
+            try:
+                return await self.interface.send_and_receive(req)
+            except CompletionCodeError as e:
+                if e.cc == constants.CC_NODE_BUSY:
+                    if self.metrics is not None and retry > 0:
+                        self.metrics.count_retry(req.netfn, req.cmdid)
+                    continue
+                raise
+
+        raise RetryError()
+
+    async def _run_reads(self, reads: Generator) -> Any:
+        """Drive planned reads, see `pyipmi.helper.run_reads`."""
+        try:
+            req = next(reads)
+            while True:
+                req = reads.send(await self.send_message(req))
+        except StopIteration as e:
+            return e.value
+
+    async def _iter_reads(self, reads: Generator) -> AsyncGenerator:
+        """Drive planned reads, see `pyipmi.helper.iter_reads`."""
+        try:
+            item = next(reads)
+            while True:
+                if isinstance(item, Message):
+                    item = reads.send(await self.send_message(item))
+                else:
+                    yield item
+                    item = next(reads)
+        except StopIteration:
+            return
+
+    def enable_metrics(self, metrics: Any = None) -> Any:
+        """Record the metrics of the transactions of this connection.
+
+        See `pyipmi.Ipmi.enable_metrics`.
+        """
+        if metrics is None:
+            metrics = Metrics()
+        self.metrics = metrics
+        self.interface.metrics = metrics
+        return metrics
+
+    def disable_metrics(self) -> None:
+        self.metrics = None
+        self.interface.metrics = None
+
+    async def send_messages(self, reqs: list[Message]) -> list[Message]:
+        """Send multiple requests concurrently.
+
+        The interface bounds how many of them are in flight at the same time.
+        Returns the responses in request order.
+        """
+        return list(await asyncio.gather(
+            *[self.send_message(req) for req in reqs]))
+
+    async def send_message_with_name(self, name: str, *args: Any,
+                                     **kwargs: Any) -> Message:
+        req = create_request_by_name(name)
+
+        for key, value in kwargs.items():
+            setattr(req, key, value)
+
+        rsp = await self.send_message(req)
+        check_rsp_completion_code(rsp)
+        return rsp
+
+    async def raw_command(self, lun: int, netfn: int,
+                          raw_bytes: bytes) -> bytes:
+        return await self.interface.send_and_receive_raw(self.target, lun,
+                                                         netfn, raw_bytes)
+
+    ###
+    # Sensor
+    ##################################################
+    async def get_sensor_reading(self, sensor_number: int,
+                                 lun: int = 0) -> tuple[int | None, int | None]:
+        """Return a tuple with `raw reading` and `assertion states`."""
+        rsp = await self.send_message_with_name('GetSensorReading',
+                                                sensor_number=sensor_number,
+                                                lun=lun)
+        return sensor_reading_from_response(rsp)
+
+    ###
+    # SDR repository
+    ##################################################
+    async def reserve_sdr_repository(self) -> int:
+        rsp = await self.send_message_with_name('ReserveSdrRepository')
+        return rsp.reservation_id
+
+    async def _get_sdr_chunk(self, reservation_id: int, record_id: int,
+                             offset: int, length: int,
+                             retry: int = 5) -> tuple[int, int, array]:
+        req = create_request_by_name('GetSdr')
+        req.record_id = record_id
+        req.offset = offset
+        req.bytes_to_read = length
+
+        while True:
+            retry -= 1
+            if retry == 0:
+                raise RetryError()
+            req.reservation_id = reservation_id
+            rsp = await self.send_message(req)
+            if rsp.completion_code == constants.CC_RES_CANCELED:
+                await asyncio.sleep(1)
+                reservation_id = await self.reserve_sdr_repository()
+                continue
+            elif rsp.completion_code in (constants.CC_TIMEOUT,
+                                         constants.CC_RESP_COULD_NOT_BE_PRV):
+                await asyncio.sleep(0.1)
+                continue
+            check_completion_code(rsp.completion_code)
+            return (reservation_id, rsp.next_record_id, rsp.record_data)
+
+    async def get_repository_sdr(self, record_id: int,
+                                 reservation_id: int | None = None) -> SdrCommon:
+        """Return the SDR `record_id` of the SDR repository.
+
+        The reads are planned by `pyipmi.helper.sdr_data_reads` with the
+        read length negotiated for this connection.
+        """
+        if reservation_id is None:
+            reservation_id = await self.reserve_sdr_repository()
+
+        reads = sdr_data_reads(record_id, self._sdr_read_length)
+        try:
+            read = next(reads)
+            while True:
+                try:
+                    (reservation_id, next_id, data) = await self._get_sdr_chunk(
+                            reservation_id, *read)
+                except CompletionCodeError as e:
+                    read = reads.throw(e)
+                else:
+                    read = reads.send((next_id, data))
+        except StopIteration as e:
+            (next_id, record_data) = e.value
+
+        return SdrCommon.from_data(record_data, next_id)
+
+    async def sdr_repository_entries(self) -> AsyncGenerator[SdrCommon, None]:
+        """An async generator that returns the SDR list."""
+        reservation_id = await self.reserve_sdr_repository()
+        record_id = 0
+
+        while True:
+            s = await self.get_repository_sdr(record_id, reservation_id)
+            yield s
+            if s.next_id == 0xffff:
+                break
+            record_id = s.next_id
+
+    ###
+    # SEL
+    ##################################################
+    async def get_sel_info(self) -> SelInfo:
+        return SelInfo(await self.send_message_with_name('GetSelInfo'))
+
+    async def get_sel_reservation_id(self) -> int:
+        rsp = await self.send_message_with_name('ReserveSel')
+        return rsp.reservation_id
+
+    async def get_sel_entry(self, record_id: int,
+                            reservation: int = 0) -> tuple[SelEntry, int]:
+        """Return the SEL entry and the next record ID, see
+        `pyipmi.sel.Sel.get_sel_entry`.
+        """
+        return await self._run_reads(
+                sel_entry_reads(record_id, reservation, self._sel_read_length))
+
+    async def sel_entries(self) -> AsyncGenerator[SelEntry, None]:
+        """An async generator that returns all SEL entries."""
+        info = await self.get_sel_info()
+        if info.entries == 0:
+            return
+
+        reservation_id = await self.get_sel_reservation_id()
+        next_record_id = START_SEL_RECORD_ID
+        while True:
+            (sel_entry, next_record_id) = await self.get_sel_entry(
+                    next_record_id, reservation_id)
+            yield sel_entry
+            if next_record_id == END_SEL_RECORD_ID:
+                break
+
+    async def get_sel_cursor_at_end(self) -> SelCursor:
+        """Return a cursor positioned after the last SEL entry."""
+        return await self._run_reads(
+                sel_cursor_at_end_reads(self._sel_read_length))
+
+    async def new_sel_entries(self, cursor: SelCursor) -> AsyncGenerator[SelEntry, None]:
+        """An async generator that returns the SEL entries added after
+        `cursor`, see `pyipmi.sel.Sel.new_sel_entries`.
+        """
+        async for sel_entry in self._iter_reads(
+                new_sel_entry_reads(cursor, self._sel_read_length)):
+            yield sel_entry
+
+    async def follow_sel(self, cursor: SelCursor | None = None,
+                         interval: float = 1.0) -> AsyncGenerator[SelEntry, None]:
+        """An async generator that returns new SEL entries as they are
+        added, see `pyipmi.sel.Sel.follow_sel`.
+        """
+        if cursor is None:
+            cursor = await self.get_sel_cursor_at_end()
+
+        while True:
+            async for sel_entry in self.new_sel_entries(cursor):
+                yield sel_entry
+            await asyncio.sleep(interval)
+
+    ###
+    # FRU
+    ##################################################
+    async def get_fru_inventory_area_info(self, fru_id: int = 0) -> int:
+        rsp = await self.send_message_with_name('GetFruInventoryAreaInfo',
+                                                fru_id=fru_id)
+        return rsp.area_size
+
+    async def read_fru_data(self, offset: int = 0, count: int | None = None,
+                            fru_id: int = 0) -> bytes:
+        """Read FRU data, see `pyipmi.fru.Fru.read_fru_data`."""
+        return await self._run_reads(
+                fru_data_reads(offset, count, fru_id, self._fru_read_length))
+
+    async def get_fru_inventory(self, fru_id: int = 0,
+                                ignore_checksum: bool = False) -> FruInventory:
+        """Get the full parsed FRU inventory data."""
+        data = await self.read_fru_data(fru_id=fru_id)
+        return FruInventory(array('B', data), ignore_checksum=ignore_checksum)
@@ -0,0 +1,550 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Compact representations of SDR, SEL and FRU records.
+
+The compact classes store the attributes of the decoded record in
+`__slots__` instead of an instance dict and keep the raw data as `bytes`.
+They have the same public attributes as the record class they are created
+from and the methods listed in each compact class. They are meant for
+keeping many records in memory, e.g. the SDR lists and SEL histories of a
+large number of BMCs.
+
+The compact records are read-only: lists are stored as tuples, dicts as
+read-only mappings and equal lists of strings are shared between records.
+SEL entries only keep the raw data, the fields are decoded on access.
+
+Example:
+
+    sdrs = [pyipmi.compact.compact(s) for s in ipmi.get_repository_sdr_list()]
+    entry = pyipmi.compact.CompactSelEntry.from_bytes(raw)
+
+Other record types can be made compact by subclassing `CompactRecord` with
+the attribute names as `__slots__`, the record class as `_record_class` and
+the methods of the record class which work on these attributes assigned as
+class attributes. `State` subclasses are made compact by subclassing
+`CompactState`.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+from .bmc import DeviceGuid, DeviceId, Watchdog
+from .chassis import ChassisStatus
+from .event import EVENT_ASSERTION, EVENT_DEASSERTION
+from .fields import FruTypeLengthString, TypeLengthString, VersionField
+from .fru import (FruDataMultiRecord, FruDataUnknown, FruInventory,
+                  FruPicmgRecord,
+                  FruPicmgPowerModuleCapabilityRecord, InventoryBoardInfoArea,
+                  InventoryChassisInfoArea, InventoryCommonHeader,
+                  InventoryMultiRecordArea, InventoryProductInfoArea)
+from .msgs import create_response_by_name, decode_message
+from .sdr import (SdrCommon, SdrCompactSensorRecord, SdrEventOnlySensorRecord,
+                  SdrFruDeviceLocator, SdrFullSensorRecord,
+                  SdrManagementControllerConfirmationRecord,
+                  SdrManagementControllerDeviceLocator, SdrOEMSensorRecord,
+                  SdrRepositoryAllocationInfo, SdrRepositoryInfo,
+                  SdrUnknownSensorRecord)
+from .sel import SelEntry, SelInfo
+from .utils import check_completion_code
+
+# record class -> compact class
+_COMPACT_CLASSES: dict[type, type[CompactRecord]] = {}
+
+# shared tuples of strings, e.g. the SDR capabilities
+_SHARED: dict[tuple, tuple] = {}
+
+
+class CompactMapping(Mapping):
+    """Read-only mapping with the keys shared between instances."""
+
+    __slots__ = ('_keys', '_values')
+
+    def __init__(self, d: dict) -> None:
+        keys = tuple(d)
+        self._keys = _SHARED.setdefault(keys, keys)
+        self._values = tuple(d.values())
+
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+def _compact_value(value: Any) -> Any:
+    if type(value) in _COMPACT_CLASSES:
+        return compact(value)
+    if isinstance(value, array) and value.typecode == 'B':
+        value = bytes(value)
+    elif isinstance(value, list):
+        value = tuple(_compact_value(v) for v in value)
+        if all(isinstance(v, str) for v in value):
+            value = _SHARED.setdefault(value, value)
+    elif isinstance(value, dict):
+        value = CompactMapping(value)
+    return value
+
+
+def _plain_value(value: Any) -> Any:
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain_value(v) for v in value]
+    if isinstance(value, CompactMapping):
+        return dict(value)
+    return value
+
+
+def compact(record: Any) -> CompactRecord:
+    """Return the compact representation of the record."""
+    if isinstance(record, CompactRecord):
+        return record
+    try:
+        cls = _COMPACT_CLASSES[type(record)]
+    except KeyError:
+        raise TypeError('no compact representation of %s' %
+                        type(record).__name__)
+    return cls.from_record(record)
+
+
+class CompactRecord(object):
+    """Base class of the compact records.
+
+    The attributes of the record are the `__slots__` of the subclass.
+    Attributes which are not set on the record are not set on the compact
+    record either. The methods of `_record_class` are not inherited, a
+    subclass assigns the ones which work on its attributes.
+    """
+
+    __slots__ = ()
+
+    _record_class: type = object
+    # attribute holding the raw data of the record
+    _data_attribute = 'data'
+    # attributes returned by `to_dict`, the public slots by default
+    _attributes: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if '_record_class' not in cls.__dict__:
+            # intermediate base class
+            return
+        if '_attributes' not in cls.__dict__:
+            cls._attributes = tuple(name for name in cls.__slots__
+                                    if not name.startswith('_'))
+        _COMPACT_CLASSES[cls._record_class] = cls
+
+    @classmethod
+    def from_record(cls, record: Any) -> CompactRecord:
+        """Create the compact record from a decoded record."""
+        obj = cls.__new__(cls)
+        for name in cls.__slots__:
+            try:
+                value = getattr(record, name)
+            except AttributeError:
+                continue
+            if name == cls._data_attribute and value is not None:
+                value = bytes(value)
+            else:
+                value = _compact_value(value)
+            setattr(obj, name, value)
+        return obj
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CompactRecord:
+        """Decode the raw data of a record."""
+        return cls.from_record(cls._record_class(array('B', data)))
+
+    def to_bytes(self) -> bytes:
+        """Return the raw data of the record."""
+        return getattr(self, self._data_attribute)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the attributes of the record."""
+        d = {}
+        for name in self._attributes:
+            if hasattr(self, name):
+                d[name] = _plain_value(getattr(self, name))
+        return d
+
+
+class CompactSdrRecord(CompactRecord):
+    """Base class of the compact SDR records."""
+
+    __slots__ = ()
+
+    __str__ = SdrCommon.__str__
+
+    @classmethod
+    def from_bytes(cls, data: bytes,
+                   next_id: int | None = None) -> CompactRecord:
+        """Decode the raw SDR, the class is selected by the record type."""
+        return compact(SdrCommon.from_data(array('B', data), next_id))
+
+
+_SDR_HEADER = ('data', 'next_id', 'id', 'version', 'type', 'length')
+_SDR_RECORD_KEY = ('owner_id', 'owner_lun', 'number')
+_SDR_ENTITY = ('entity_id', 'entity_instance')
+_SDR_DEVICE_ID_STRING = ('device_id_string_type', 'device_id_string_length',
+                         'device_id_string')
+
+
+class CompactSdrFullSensorRecord(CompactSdrRecord):
+    __slots__ = _SDR_HEADER + _SDR_RECORD_KEY + _SDR_ENTITY + (
+        'initialization', 'capabilities', 'sensor_type_code',
+        'event_reading_type_code', 'assertion_mask', 'deassertion_mask',
+        'discrete_reading_mask', 'units_1', 'units_2', 'units_3',
+        'analog_data_format', 'rate_unit', 'modifier_unit', 'percentage',
+        'linearization', 'm', 'tolerance', 'b', 'accuracy', 'accuracy_exp',
+        'k1', 'k2', 'analog_characteristic', 'nominal_reading',
+        'normal_maximum', 'normal_minimum', 'sensor_maximum_reading',
+        'sensor_minimum_reading', 'threshold', 'hysteresis', 'reserved',
+        'oem') + _SDR_DEVICE_ID_STRING + (
+        '_conversion_table', '_conversion_table_key')
+
+    _record_class = SdrFullSensorRecord
+
+    DATA_FMT_UNSIGNED = SdrFullSensorRecord.DATA_FMT_UNSIGNED
+    DATA_FMT_1S_COMPLEMENT = SdrFullSensorRecord.DATA_FMT_1S_COMPLEMENT
+    DATA_FMT_2S_COMPLEMENT = SdrFullSensorRecord.DATA_FMT_2S_COMPLEMENT
+    DATA_FMT_NONE = SdrFullSensorRecord.DATA_FMT_NONE
+
+    __str__ = SdrFullSensorRecord.__str__
+    convert_sensor_raw_to_value = \
+        SdrFullSensorRecord.convert_sensor_raw_to_value
+    conversion_table = SdrFullSensorRecord.conversion_table
+    convert_many = SdrFullSensorRecord.convert_many
+    convert_sensor_value_to_raw = \
+        SdrFullSensorRecord.convert_sensor_value_to_raw
+    lin = SdrFullSensorRecord.lin
+
+    @classmethod
+    def from_record(cls, record: Any) -> CompactRecord:
+        obj = super().from_record(record)
+        obj._conversion_table = None
+        obj._conversion_table_key = None
+        return obj
+
+
+class CompactSdrCompactSensorRecord(CompactSdrRecord):
+    __slots__ = _SDR_HEADER + _SDR_RECORD_KEY + _SDR_ENTITY + (
+        'sensor_initialization', 'capabilities', 'sensor_type_code',
+        'event_reading_type_code', 'assertion_mask', 'deassertion_mask',
+        'discrete_reading_mask', 'units_1', 'units_2', 'units_3',
+        'record_sharing', 'positive_going_hysteresis',
+        'negative_going_hysteresis', 'reserved',
+        'oem') + _SDR_DEVICE_ID_STRING
+
+    _record_class = SdrCompactSensorRecord
+
+    __str__ = SdrCompactSensorRecord.__str__
+
+
+class CompactSdrEventOnlySensorRecord(CompactSdrRecord):
+    __slots__ = _SDR_HEADER + _SDR_RECORD_KEY + _SDR_ENTITY + (
+        'sensor_type', 'event_reading_type_code', 'record_sharing',
+        'reserved', 'oem') + _SDR_DEVICE_ID_STRING
+
+    _record_class = SdrEventOnlySensorRecord
+
+    __str__ = SdrEventOnlySensorRecord.__str__
+
+
+class CompactSdrFruDeviceLocator(CompactSdrRecord):
+    __slots__ = _SDR_HEADER + (
+        'device_access_address', 'fru_device_id', 'logical_physical',
+        'channel_number', 'reserved', 'device_type', 'device_type_modifier',
+        'oem') + _SDR_ENTITY + _SDR_DEVICE_ID_STRING
+
+    _record_class = SdrFruDeviceLocator
+
+    __str__ = SdrFruDeviceLocator.__str__
+
+
+class CompactSdrManagementControllerDeviceLocator(CompactSdrRecord):
+    __slots__ = _SDR_HEADER + (
+        'device_slave_address', 'channel_number', 'power_state_notification',
+        'global_initialization', 'device_capabilities', 'reserved',
+        'oem') + _SDR_ENTITY + _SDR_DEVICE_ID_STRING
+
+    _record_class = SdrManagementControllerDeviceLocator
+
+    __str__ = SdrManagementControllerDeviceLocator.__str__
+
+
+class CompactSdrManagementControllerConfirmationRecord(CompactSdrRecord):
+    __slots__ = _SDR_HEADER + (
+        'device_slave_address', 'device_id', 'channel_number',
+        'firmware_revision_1', 'firmware_revision_2', 'ipmi_version',
+        'manufacturer_id', 'product_id', 'device_guid')
+
+    _record_class = SdrManagementControllerConfirmationRecord
+
+
+class CompactSdrOEMSensorRecord(CompactSdrRecord):
+    __slots__ = _SDR_HEADER + _SDR_RECORD_KEY
+
+    _record_class = SdrOEMSensorRecord
+
+    __str__ = SdrOEMSensorRecord.__str__
+
+
+class CompactSdrUnknownSensorRecord(CompactSdrRecord):
+    __slots__ = _SDR_HEADER
+
+    _record_class = SdrUnknownSensorRecord
+
+    __str__ = SdrUnknownSensorRecord.__str__
+
+
+class CompactSelEntry(CompactRecord):
+    """SEL entry which only keeps the raw record data."""
+
+    __slots__ = ('data',)
+
+    _record_class = SelEntry
+    _attributes = ('data', 'record_id', 'type', 'timestamp', 'generator_id',
+                   'evm_rev', 'sensor_type', 'sensor_number',
+                   'event_direction', 'event_type', 'event_data')
+
+    record_id = property(lambda s: s.data[0] | s.data[1] << 8)
+    type = property(lambda s: s.data[2])
+    timestamp = property(lambda s: int.from_bytes(s.data[3:7], 'little'))
+    generator_id = property(lambda s: s.data[7] | s.data[8] << 8)
+    evm_rev = property(lambda s: s.data[9])
+    sensor_type = property(lambda s: s.data[10])
+    sensor_number = property(lambda s: s.data[11])
+    event_type = property(lambda s: s.data[12] & 0x7f)
+    event_data = property(lambda s: list(s.data[13:16]))
+
+    @property
+    def event_direction(self) -> int:
+        if self.data[12] & 0x80:
+            return EVENT_DEASSERTION
+        return EVENT_ASSERTION
+
+    __str__ = SelEntry.__str__
+    type_to_string = staticmethod(SelEntry.type_to_string)
+
+
+class CompactFruTypeLengthString(CompactRecord):
+    __slots__ = ('offset', 'field_type', 'length', 'raw', 'string')
+
+    _record_class = FruTypeLengthString
+    _data_attribute = 'raw'
+
+    TYPE_FRU_BINARY = TypeLengthString.TYPE_FRU_BINARY
+
+    __str__ = TypeLengthString.__str__
+
+
+class CompactInventoryCommonHeader(CompactRecord):
+    __slots__ = ('data', 'format_version', 'internal_use_area_offset',
+                 'chassis_info_area_offset', 'board_info_area_offset',
+                 'product_info_area_offset', 'multirecord_area_offset')
+
+    _record_class = InventoryCommonHeader
+
+
+class _CompactInfoArea(CompactRecord):
+    __slots__ = ()
+
+    @classmethod
+    def from_record(cls, record: Any) -> CompactRecord:
+        obj = super().from_record(record)
+        # the data of the area runs up to the end of the inventory
+        obj.data = obj.data[:record.length]
+        return obj
+
+
+class CompactInventoryChassisInfoArea(_CompactInfoArea):
+    __slots__ = ('data', 'format_version', 'length', 'type', 'part_number',
+                 'serial_number', 'custom_chassis_info')
+
+    _record_class = InventoryChassisInfoArea
+
+
+class CompactInventoryBoardInfoArea(_CompactInfoArea):
+    __slots__ = ('data', 'format_version', 'length', 'language_code',
+                 'mfg_date', 'manufacturer', 'product_name', 'serial_number',
+                 'part_number', 'fru_file_id', 'custom_mfg_info')
+
+    _record_class = InventoryBoardInfoArea
+
+
+class CompactInventoryProductInfoArea(_CompactInfoArea):
+    __slots__ = ('data', 'format_version', 'length', 'language_code',
+                 'manufacturer', 'name', 'part_number', 'version',
+                 'serial_number', 'asset_tag', 'fru_file_id',
+                 'custom_mfg_info')
+
+    _record_class = InventoryProductInfoArea
+
+
+_FRU_MULTIRECORD = ('data', 'record_type_id', 'format_version',
+                    'end_of_list', 'length', 'raw')
+
+
+class _CompactFruDataMultiRecord(CompactRecord):
+    __slots__ = ()
+
+    __str__ = FruDataMultiRecord.__str__
+
+
+class CompactFruDataUnknown(_CompactFruDataMultiRecord):
+    __slots__ = _FRU_MULTIRECORD
+
+    _record_class = FruDataUnknown
+
+
+class CompactFruPicmgRecord(_CompactFruDataMultiRecord):
+    __slots__ = _FRU_MULTIRECORD + ('manufacturer_id', 'picmg_record_type_id')
+
+    _record_class = FruPicmgRecord
+
+
+class CompactFruPicmgPowerModuleCapabilityRecord(_CompactFruDataMultiRecord):
+    __slots__ = _FRU_MULTIRECORD + ('manufacturer_id', 'picmg_record_type_id',
+                                    'maximum_current_output')
+
+    _record_class = FruPicmgPowerModuleCapabilityRecord
+
+
+class CompactInventoryMultiRecordArea(CompactRecord):
+    __slots__ = ('records',)
+
+    _record_class = InventoryMultiRecordArea
+
+
+class CompactFruInventory(CompactRecord):
+    __slots__ = ('raw', 'common_header', 'chassis_info_area',
+                 'board_info_area', 'product_info_area', 'multirecord_area')
+
+    _record_class = FruInventory
+    _data_attribute = 'raw'
+
+
+class CompactVersionField(CompactRecord):
+    __slots__ = ('major', 'minor', 'version', 'auxiliary')
+
+    _record_class = VersionField
+
+    __str__ = VersionField.__str__
+    version_to_string = VersionField.version_to_string
+
+
+class CompactState(CompactRecord):
+    """Base class of the compact `State` records.
+
+    `from_bytes` decodes the data of the `_response_name` response, which is
+    kept as `data`. Compact states created from a record have no data.
+    """
+
+    __slots__ = ()
+
+    _response_name = ''
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CompactRecord:
+        """Decode the raw response data, including the completion code."""
+        rsp = create_response_by_name(cls._response_name)
+        decode_message(rsp, bytes(data))
+        check_completion_code(rsp.completion_code)
+        obj = cls.from_record(cls._record_class(rsp))
+        obj.data = bytes(data)
+        return obj
+
+
+class CompactDeviceId(CompactState):
+    __slots__ = ('data', 'device_id', 'revision', 'provides_sdrs',
+                 'available', 'fw_revision', 'ipmi_version',
+                 'manufacturer_id', 'product_id', 'supported_functions',
+                 'aux')
+
+    _record_class = DeviceId
+    _response_name = 'GetDeviceId'
+
+    __str__ = DeviceId.__str__
+    supports_function = DeviceId.supports_function
+
+
+class CompactDeviceGuid(CompactState):
+    __slots__ = ('data', 'device_guid', 'device_guid_string')
+
+    _record_class = DeviceGuid
+    _response_name = 'GetDeviceGuid'
+
+    __str__ = DeviceGuid.__str__
+
+
+class CompactWatchdog(CompactState):
+    __slots__ = ('data',) + tuple(name for (name, _)
+                                  in Watchdog.__properties__)
+
+    _record_class = Watchdog
+    _response_name = 'GetWatchdogTimer'
+
+
+class CompactChassisStatus(CompactState):
+    __slots__ = ('data', 'power_on', 'overload', 'interlock', 'fault',
+                 'control_fault', 'restore_policy',
+                 'id_cmd_state_info_support', 'chassis_id_state',
+                 'front_panel_button_capabilities', 'last_event',
+                 'chassis_state')
+
+    _record_class = ChassisStatus
+    _response_name = 'GetChassisStatus'
+
+
+class CompactSelInfo(CompactState):
+    __slots__ = ('data', 'version', 'entries', 'free_bytes',
+                 'most_recent_addition', 'most_recent_erase',
+                 'operation_support')
+
+    _record_class = SelInfo
+    _response_name = 'GetSelInfo'
+
+
+class CompactSdrRepositoryInfo(CompactState):
+    __slots__ = ('data', 'sdr_version', 'record_count', 'free_space',
+                 'most_recent_addition', 'most_recent_erase',
+                 'support_get_allocation_info', 'support_reserve',
+                 'support_partial_add', 'support_delete',
+                 'support_update_type', 'support_overflow_flag')
+
+    _record_class = SdrRepositoryInfo
+    _response_name = 'GetSdrRepositoryInfo'
+
+
+class CompactSdrRepositoryAllocationInfo(CompactState):
+    __slots__ = ('data', 'number_of_units', 'unit_size', 'free_units',
+                 'largest_free_block', 'maximum_record_size')
+
+    _record_class = SdrRepositoryAllocationInfo
+    _response_name = 'GetSdrRepositoryAllocationInfo'
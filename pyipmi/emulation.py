@@ -1,19 +1,21 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import logging
+import math
 import os
 import random
-import socket
-import threading
+import struct
+import time
 import yaml
 
-from array import array
 from collections import OrderedDict
+from typing import Any
 
 import pyipmi
 
-from pyipmi.logger import log
+from pyipmi.logger import log, HexDump
 
 from pyipmi.interfaces import rmcp
 from pyipmi.interfaces import ipmb
@@ -82,6 +84,9 @@ def handle_set_session_priv_level(context: ConnectionContext, req: Message) -> M
 @register_message_handler("GetDeviceId")
 def handle_get_device_id(context: ConnectionContext, req: Message) -> Message:
     rsp = create_response_message(req)
+    # e.g. {'device_id': 1, 'manufacturer_id': 0x3a98, 'product_id': 2}
+    for (name, value) in ((context.config or {}).get('device_id') or {}).items():
+        setattr(rsp, name, value)
     return rsp
 
 
@@ -142,7 +147,7 @@ def handle_fru_read(context: ConnectionContext, req: Message) -> Message:
 @register_message_handler("GetSdrRepositoryInfo")
 def handle_sdr_repository_info(context: ConnectionContext, req: Message) -> Message:
     rsp = create_response_message(req)
-    rsp.count = 0
+    rsp.count = len(context.bmc.sdr_list)
     return rsp
 
 
@@ -162,20 +167,24 @@ def handle_clear_sdr_repositry(context: ConnectionContext, req: Message) -> Mess
 @register_message_handler("GetSdr")
 def handle_get_sdr(context: ConnectionContext, req: Message) -> Message:
     rsp = create_response_message(req)
+    bmc = context.bmc
 
-    if len(sdr_list) == 0:
+    if len(bmc.sdr_list) == 0:
         log().warning('no SDR present')
         rsp.completion_code = constants.CC_REQ_DATA_NOT_PRESENT
         return rsp
 
-    next_index = list(sdr_list.keys()).index(req.record_id) + 1
+    record_id = req.record_id
+    if record_id == 0 and record_id not in bmc.sdr_list:
+        # 0 is the first record
+        record_id = next(iter(bmc.sdr_list))
     try:
-        next_record_id = list(sdr_list)[next_index]
-    except IndexError:
-        next_record_id = 0xffff
-    rsp.next_record_id = next_record_id
+        sdr = bmc.sdr_list[record_id]
+    except KeyError:
+        rsp.completion_code = constants.CC_REQ_DATA_NOT_PRESENT
+        return rsp
 
-    sdr = sdr_list[req.record_id]
+    rsp.next_record_id = bmc.next_sdr_id(record_id)
     rsp.record_data = sdr.data[req.offset:req.offset+req.bytes_to_read]
     return rsp
 
@@ -193,6 +202,70 @@ def handle_reserve_device_sdr_repository(context: ConnectionContext, req: Messag
     return rsp
 
 
+@register_message_handler("GetSensorReading")
+def handle_get_sensor_reading(context: ConnectionContext, req: Message) -> Message:
+    rsp = create_response_message(req)
+    try:
+        (reading, states) = context.bmc.sensor_reading(req.sensor_number)
+    except KeyError:
+        rsp.completion_code = constants.CC_REQ_DATA_NOT_PRESENT
+        return rsp
+
+    rsp.sensor_reading = reading
+    # 1b = enabled
+    rsp.config.event_message_disabled = 1
+    rsp.config.sensor_scanning_disabled = 1
+    rsp.states1 = states & 0xff
+    if states > 0xff:
+        rsp.states2 = states >> 8
+    return rsp
+
+
+@register_message_handler("GetSelInfo")
+def handle_get_sel_info(context: ConnectionContext, req: Message) -> Message:
+    rsp = create_response_message(req)
+    bmc = context.bmc
+    bmc.update_sel()
+    rsp.entries = len(bmc.sel)
+    rsp.free_bytes = min(0xffff, (bmc.sel_max_entries - len(bmc.sel)) * 16)
+    rsp.most_recent_addition = bmc.sel_most_recent_addition
+    rsp.most_recent_erase = bmc.sel_most_recent_erase
+    rsp.operation_support.reserve_sel = 1
+    return rsp
+
+
+@register_message_handler("ReserveSel")
+def handle_reserve_sel(context: ConnectionContext, req: Message) -> Message:
+    rsp = create_response_message(req)
+    rsp.reservation_id = context.bmc.reserve_sel()
+    return rsp
+
+
+@register_message_handler("GetSelEntry")
+def handle_get_sel_entry(context: ConnectionContext, req: Message) -> Message:
+    rsp = create_response_message(req)
+    bmc = context.bmc
+    bmc.update_sel()
+
+    # a reservation is only needed for partial reads
+    if req.offset and req.reservation_id != bmc.sel_reservation_id:
+        rsp.completion_code = constants.CC_RES_CANCELED
+        return rsp
+
+    try:
+        (data, next_record_id) = bmc.sel_entry(req.record_id)
+    except KeyError:
+        rsp.completion_code = constants.CC_REQ_DATA_NOT_PRESENT
+        return rsp
+
+    rsp.next_record_id = next_record_id
+    if req.length == 0xff:
+        rsp.record_data = data[req.offset:]
+    else:
+        rsp.record_data = data[req.offset:req.offset + req.length]
+    return rsp
+
+
 @register_message_handler("SendMessage")
 def handle_send_message(context: ConnectionContext, req: Message) -> Message:
     rsp = create_response_message(req)
@@ -218,10 +291,11 @@ def handle_rmcp_asf_msg(context: ConnectionContext, sdu: bytes) -> bytes:
     asf.unpack(sdu)
     # t = rmcp.AsfMsg().from_data(sdu)
     if asf.asf_type == rmcp.AsfMsg.ASF_TYPE_PRESENCE_PING:
-        log().debug(f'ASF RX: ping: {asf}')
+        log().debug('ASF RX: ping: %s', asf)
     pong = rmcp.AsfPong()
+    pong.tag = asf.tag
     pdu = pong.pack()
-    log().debug(f'ASF TX: pong: {asf}')
+    log().debug('ASF TX: pong: %s', asf)
     return pdu
 
 
@@ -238,8 +312,7 @@ def handle_rmcp_ipmi_msg(context: ConnectionContext, sdu: bytes) -> bytes:
         group_id = _get_group_id(ipmi_sdu)
 
         log().warning('Cant create message: netfn 0x{:x} cmd: 0x{:x} group: {}'.format(req_header.netfn, req_header.cmdid, group_id))
-        log().debug('IPMI RX: {:s}'.format(
-            ' '.join('%02x' % b for b in array('B', ipmi_sdu))))
+        log().debug('IPMI RX: %s', HexDump(ipmi_sdu))
 
         # bytes are immutable ... so convert to change
         a = bytearray(ipmi_sdu)
@@ -271,8 +344,7 @@ def handle_rmcp_ipmi_msg(context: ConnectionContext, sdu: bytes) -> bytes:
     except KeyError:
         return _create_invalid_response(ipmi_sdu)
 
-    log().debug('IPMI RX: {}: {:s}'.format(req,
-                ' '.join('%02x' % b for b in array('B', ipmi_sdu))))
+    log().debug('IPMI RX: %s: %s', req, HexDump(ipmi_sdu))
     decode_message(req, ipmi_sdu[6:-1])
 
     rsp = handle_ipmi_request_msg(context, req)
@@ -280,10 +352,10 @@ def handle_rmcp_ipmi_msg(context: ConnectionContext, sdu: bytes) -> bytes:
 
     rsp_header = ipmb.IpmbHeaderRsp()
     rsp_header.from_req_header(req_header)
+    rsp_header.netfn = rsp.netfn
 
     tx_data = ipmb.encode_ipmb_msg(rsp_header, data)
-    log().debug('IPMI TX: {}: {:s}'.format(rsp,
-                ' '.join('%02x' % b for b in array('B', tx_data))))
+    log().debug('IPMI TX: %s: %s', rsp, HexDump(tx_data))
 
     # rmcp ipmi rsp msg
     ipmi_tx = rmcp.IpmiMsg(context.session)
@@ -299,7 +371,11 @@ def handle_rmcp_ipmi_msg(context: ConnectionContext, sdu: bytes) -> bytes:
     return pdu
 
 
-def load_sdr_dump(dump_file: str) -> None:
+def load_sdr_dump(dump_file: str, sdrs: OrderedDict | None = None) -> None:
+    """Load the SDRs of an SDR dump file into `sdrs`, by default the
+    module wide `sdr_list`."""
+    if sdrs is None:
+        sdrs = sdr_list
     with open(dump_file, 'rb') as f:
         while True:
             h = f.read(5)
@@ -308,7 +384,284 @@ def load_sdr_dump(dump_file: str) -> None:
             t = pyipmi.sdr.SdrCommon(h)
             b = f.read(t.length)
             sdr = pyipmi.sdr.SdrCommon().from_data(h + b)
-            sdr_list[sdr.id] = sdr
+            sdrs[sdr.id] = sdr
+
+
+class SensorWaveform(object):
+    """The raw readings of an emulated sensor over time.
+
+    `kind` is one of 'constant' (`value`), 'sine', 'ramp', 'square' or
+    'random' between `minimum` and `maximum` with a period of `period`
+    seconds. `noise` adds a random value in [-noise, noise].
+    """
+
+    KINDS = ('constant', 'sine', 'ramp', 'square', 'random')
+
+    def __init__(self, kind: str = 'sine', minimum: float = 0,
+                 maximum: float = 255, period: float = 60.0,
+                 phase: float = 0.0, value: float | None = None,
+                 noise: float = 0.0, states: int = 0,
+                 rng: random.Random | None = None) -> None:
+        if kind not in self.KINDS:
+            raise ValueError('unknown waveform %s' % kind)
+        self.kind = kind
+        self.minimum = minimum
+        self.maximum = maximum
+        self.period = period
+        self.phase = phase
+        self.value = minimum if value is None else value
+        self.noise = noise
+        self.states = states
+        self.rng = rng or random.Random()
+
+    def raw(self, t: float) -> int:
+        """Return the raw reading at `t` seconds."""
+        kind = self.kind
+        if kind == 'constant':
+            value = self.value
+        elif kind == 'random':
+            value = self.rng.uniform(self.minimum, self.maximum)
+        else:
+            x = (t / self.period + self.phase) % 1.0
+            if kind == 'sine':
+                x = (1 - math.cos(2 * math.pi * x)) / 2
+            elif kind == 'square':
+                x = 1.0 if x >= 0.5 else 0.0
+            value = self.minimum + (self.maximum - self.minimum) * x
+        if self.noise:
+            value += self.rng.uniform(-self.noise, self.noise)
+        return min(0xff, max(0, int(round(value))))
+
+
+# bit of the threshold comparison status, the readable threshold mask of
+# the SDR uses the same bits
+_THRESHOLD_BITS = (('lnc', 0, False), ('lcr', 1, False), ('lnr', 2, False),
+                   ('unc', 3, True), ('ucr', 4, True), ('unr', 5, True))
+
+
+def _sensor_waveform(sdr: Any, cfg: dict, rng: random.Random) -> SensorWaveform:
+    """Return the waveform of a sensor, with defaults from its SDR."""
+    (minimum, maximum) = (0, 255)
+    if 'normal_max' in getattr(sdr, 'analog_characteristic', ()) and \
+            'normal_min' in sdr.analog_characteristic and \
+            sdr.normal_minimum < sdr.normal_maximum:
+        (minimum, maximum) = (sdr.normal_minimum, sdr.normal_maximum)
+    elif getattr(sdr, 'event_reading_type_code', 1) != 1:
+        # discrete sensors have their state in `states`
+        (minimum, maximum) = (0, 0)
+    return SensorWaveform(
+        kind=cfg.get('waveform', 'sine'),
+        minimum=cfg.get('min', minimum),
+        maximum=cfg.get('max', maximum),
+        period=float(cfg.get('period', 60.0)),
+        # do not let all sensors run in step
+        phase=float(cfg.get('phase', (sdr.number if sdr else 0) / 256.0)),
+        value=cfg.get('value'),
+        noise=float(cfg.get('noise', 0.0)),
+        states=int(cfg.get('states', 0)),
+        rng=rng)
+
+
+class EmulatedBmc(object):
+    """The state of one emulated BMC.
+
+    `config` is the configuration of the BMC, e.g. the 'fru' files and the
+    'device_id' fields. `sdr_list` is the SDR repository, by default the
+    one of the 'sdr' dump file of the config.
+
+    `latency` and `jitter` delay each response by `latency` plus a random
+    value in [-jitter, jitter] seconds, `loss` is the probability of a
+    request to be dropped.
+
+    The sensors of the full and compact sensor records of the SDRs have
+    readings following a `SensorWaveform`, configured by sensor number
+    in 'sensors' (with 'default' for all others):
+
+        sensors:
+          default:
+            waveform: sine    # between the normal min and max of the SDR
+            period: 60
+          3:
+            waveform: constant
+            value: 200        # raw
+            noise: 2
+          9:
+            states: 0x0004    # of a discrete sensor
+
+    The threshold states are derived from the readable thresholds of the
+    SDR.
+
+    'sel' configures the generated SEL entries:
+
+        sel:
+          rate: 0.5           # entries per second
+          initial: 10         # entries at start
+          max_entries: 1024   # the oldest are dropped
+
+    'seed' makes the generated values reproducible.
+    """
+
+    def __init__(self, config: dict | None = None,
+                 sdr_list: OrderedDict | None = None,
+                 name: str | None = None, latency: float = 0.0,
+                 jitter: float = 0.0, loss: float = 0.0) -> None:
+        self.config = config
+        self.name = name
+        if sdr_list is None:
+            sdr_list = OrderedDict()
+            if config and config.get('sdr'):
+                load_sdr_dump(config['sdr'], sdr_list)
+        self.sdr_list = sdr_list
+        self._next_sdr_ids = None
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+
+        config = config or {}
+        self.rng = random.Random(config.get('seed'))
+        self.start = time.monotonic()
+
+        sensor_cfg = config.get('sensors') or {}
+        default = sensor_cfg.get('default') or {}
+        self.sensors = {}
+        for sdr in self.sdr_list.values():
+            if isinstance(sdr, (pyipmi.sdr.SdrFullSensorRecord,
+                                pyipmi.sdr.SdrCompactSensorRecord)):
+                cfg = _merge(default, sensor_cfg.get(sdr.number) or {})
+                self.sensors[sdr.number] = (
+                    sdr, _sensor_waveform(sdr, cfg, self.rng))
+        for (number, cfg) in sensor_cfg.items():
+            if number != 'default' and number not in self.sensors:
+                self.sensors[number] = (
+                    None, _sensor_waveform(None, _merge(default, cfg),
+                                           self.rng))
+
+        sel_cfg = config.get('sel') or {}
+        self.sel = OrderedDict()
+        self.sel_rate = float(sel_cfg.get('rate', 0.0))
+        self.sel_max_entries = int(sel_cfg.get('max_entries', 1024))
+        self.sel_reservation_id = 0
+        self.sel_most_recent_addition = 0
+        self.sel_most_recent_erase = 0
+        self._sel_next_id = 1
+        self._sel_generated = 0
+        for _ in range(int(sel_cfg.get('initial', 0))):
+            self.add_generated_sel_entry()
+
+    def sensor_reading(self, number: int,
+                       now: float | None = None) -> tuple[int, int]:
+        """Return the raw reading and the states of a sensor.
+
+        Raises KeyError for an unknown sensor.
+        """
+        (sdr, waveform) = self.sensors[number]
+        if now is None:
+            now = time.monotonic()
+        raw = waveform.raw(now - self.start)
+        states = waveform.states
+        if getattr(sdr, 'event_reading_type_code', None) == 1 and \
+                hasattr(sdr, 'threshold'):
+            readable = sdr.discrete_reading_mask & 0x3f
+            states = 0
+            for (name, bit, upper) in _THRESHOLD_BITS:
+                if not readable & (1 << bit):
+                    continue
+                threshold = sdr.threshold[name]
+                if (raw >= threshold) if upper else (raw <= threshold):
+                    states |= 1 << bit
+        return (raw, states)
+
+    def add_sel_entry(self, sensor_type: int, sensor_number: int,
+                      event_type: int, event_data: tuple[int, int, int],
+                      deassertion: bool = False,
+                      timestamp: int | None = None) -> int:
+        """Add a system event SEL entry and return its record id."""
+        if timestamp is None:
+            timestamp = int(time.time())
+        record_id = self._sel_next_id
+        self._sel_next_id = record_id + 1
+        if self._sel_next_id >= 0xffff:
+            self._sel_next_id = 1
+        event_desc = (0x80 if deassertion else 0) | (event_type & 0x7f)
+        self.sel[record_id] = struct.pack(
+            '<HBIHBBBB3B', record_id, 0x02, timestamp, 0x0020, 0x04,
+            sensor_type, sensor_number, event_desc, *event_data)
+        while len(self.sel) > self.sel_max_entries:
+            self.sel.popitem(last=False)
+        self.sel_most_recent_addition = timestamp
+        return record_id
+
+    def add_generated_sel_entry(self) -> int:
+        """Add a SEL entry of a random sensor."""
+        if self.sensors:
+            number = self.rng.choice(list(self.sensors))
+            sdr = self.sensors[number][0]
+        else:
+            (number, sdr) = (0, None)
+        sensor_type = getattr(sdr, 'sensor_type_code', 0x01)
+        event_type = getattr(sdr, 'event_reading_type_code', 0x01)
+        offset = self.rng.randrange(6 if event_type == 1 else 8)
+        return self.add_sel_entry(sensor_type, number, event_type,
+                                  (offset, 0xff, 0xff),
+                                  deassertion=self.rng.random() < 0.5)
+
+    def update_sel(self, now: float | None = None) -> None:
+        """Add the entries generated since the start at `sel_rate`."""
+        if not self.sel_rate:
+            return
+        if now is None:
+            now = time.monotonic()
+        due = int((now - self.start) * self.sel_rate)
+        # do not generate more than the SEL holds after a long pause
+        self._sel_generated = max(self._sel_generated,
+                                  due - self.sel_max_entries)
+        while self._sel_generated < due:
+            self.add_generated_sel_entry()
+            self._sel_generated += 1
+
+    def reserve_sel(self) -> int:
+        self.sel_reservation_id = self.sel_reservation_id % 0xffff + 1
+        return self.sel_reservation_id
+
+    def sel_entry(self, record_id: int) -> tuple[bytes, int]:
+        """Return the data and the next record id of a SEL entry.
+
+        0x0000 is the first and 0xffff the last entry. Raises KeyError if
+        there is no such entry.
+        """
+        if not self.sel:
+            raise KeyError(record_id)
+        if record_id == 0x0000:
+            record_id = next(iter(self.sel))
+        elif record_id == 0xffff:
+            record_id = next(reversed(self.sel))
+        data = self.sel[record_id]
+        next_record_id = 0xffff
+        if record_id != next(reversed(self.sel)):
+            # record ids are increasing, apart from the wrap around
+            candidate = record_id + 1
+            while candidate not in self.sel:
+                candidate = candidate % 0xfffe + 1
+            next_record_id = candidate
+        return (data, next_record_id)
+
+    def next_sdr_id(self, record_id: int) -> int:
+        if self._next_sdr_ids is None or \
+                len(self._next_sdr_ids) != len(self.sdr_list):
+            ids = list(self.sdr_list)
+            self._next_sdr_ids = dict(zip(ids, ids[1:] + [0xffff]))
+        return self._next_sdr_ids[record_id]
+
+    def delay(self) -> float:
+        """Return the delay of the next response."""
+        if self.jitter:
+            return max(0.0, self.latency + random.uniform(-self.jitter,
+                                                          self.jitter))
+        return self.latency
+
+    def drop(self) -> bool:
+        """Return if the next request is lost."""
+        return self.loss > 0 and random.random() < self.loss
 
 
 class ConnectionContext():
@@ -317,38 +670,255 @@ class ConnectionContext():
     STATE_CLOSED = 2
     state = STATE_IDLE
 
-    def __init__(self, config: dict, sock: socket.socket, addr: tuple) -> None:
-        self.config = config
+    def __init__(self, config: dict, sock: Any, addr: tuple,
+                 bmc: EmulatedBmc | None = None) -> None:
+        if bmc is None:
+            bmc = EmulatedBmc(config, sdr_list)
+        self.bmc = bmc
+        self.config = bmc.config
+        # a socket or an asyncio transport
         self.sock = sock
         self.addr = addr
         self.session = Session()
-        self.lock = threading.Lock()
-
+        self.last_seen = time.monotonic()
 
-def handle_thread(context: ConnectionContext, pdu: bytes) -> None:
 
+def handle_datagram(context: ConnectionContext, pdu: bytes) -> bytes | None:
+    """Handle a received RMCP message and return the response."""
     msg = rmcp.RmcpMsg()
     sdu = msg.unpack(pdu)
 
-    with context.lock:
+    try:
+        handler = {
+                    rmcp.RMCP_CLASS_ASF: handle_rmcp_asf_msg,
+                    rmcp.RMCP_CLASS_IPMI: handle_rmcp_ipmi_msg,
+                  }[msg.class_of_msg]
+    except KeyError:
+        log().warning('unknown class_of_msg {}'.format(msg.class_of_msg))
+        return None
+
+    tx_data = handler(context, sdu)
+    rmcp_msg = rmcp.RmcpMsg(msg.class_of_msg)
+    return rmcp_msg.pack(tx_data, context.session.sequence_number)
+
+
+class EmulatorProtocol(asyncio.DatagramProtocol):
+    """The RMCP server of the emulation.
+
+    The datagrams are handled one after another in the event loop, the
+    handlers do not block. There is one `ConnectionContext` per client
+    address. At most `max_connections` are kept, the least recently used
+    one is dropped to make room for a new one. Contexts without a message
+    for `connection_timeout` seconds are dropped by `expire`.
+
+    `bmc` is the `EmulatedBmc` served, by default one with `config` and
+    the module wide `sdr_list`.
+    """
+
+    def __init__(self, config: dict | None,
+                 max_connections: int = 4096,
+                 connection_timeout: float | None = 60.0,
+                 bmc: EmulatedBmc | None = None) -> None:
+        if bmc is None:
+            bmc = EmulatedBmc(config, sdr_list)
+        self.bmc = bmc
+        self.config = bmc.config
+        self.max_connections = max_connections
+        self.connection_timeout = connection_timeout
+        self.connections = OrderedDict()
+        self.transport = None
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def connection_made(self, transport: Any) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self.received += 1
+        bmc = self.bmc
+        if bmc.drop():
+            self.dropped += 1
+            return
+
+        connections = self.connections
+        context = connections.get(addr)
+        if context is None:
+            context = ConnectionContext(self.config, self.transport, addr,
+                                        bmc)
+            connections[addr] = context
+            if len(connections) > self.max_connections:
+                connections.popitem(last=False)
+        else:
+            connections.move_to_end(addr)
+        context.last_seen = time.monotonic()
+
         try:
-            handler = {
-                        rmcp.RMCP_CLASS_ASF: handle_rmcp_asf_msg,
-                        rmcp.RMCP_CLASS_IPMI: handle_rmcp_ipmi_msg,
-                      }[msg.class_of_msg]
+            pdu = handle_datagram(context, data)
+        except Exception as e:
+            log().warning('cannot handle message from %s: %s', addr, e)
+            return
+
+        if pdu is not None:
+            self.sent += 1
+            delay = bmc.delay()
+            if delay > 0:
+                asyncio.get_running_loop().call_later(
+                    delay, self.transport.sendto, pdu, addr)
+            else:
+                self.transport.sendto(pdu, addr)
+        if context.state == ConnectionContext.STATE_CLOSED:
+            connections.pop(addr, None)
+
+    def error_received(self, exc: Exception) -> None:
+        log().debug('emulation socket error: %s', exc)
+
+    def expire(self, now: float | None = None) -> int:
+        """Drop the idle contexts and return their number."""
+        if self.connection_timeout is None:
+            return 0
+        if now is None:
+            now = time.monotonic()
+        limit = now - self.connection_timeout
+        expired = 0
+        connections = self.connections
+        # ordered by the last message
+        while connections:
+            addr = next(iter(connections))
+            if connections[addr].last_seen > limit:
+                break
+            del connections[addr]
+            expired += 1
+        return expired
+
 
-            tx_data = handler(context, sdu)
-            rmcp_msg = rmcp.RmcpMsg(msg.class_of_msg)
-            pdu = rmcp_msg.pack(tx_data, context.session.sequence_number)
-            context.sock.sendto(pdu, context.addr)
-        except IndexError:
-            print('unknown class_of_msg {}'.format(msg.class_of_msg))
+async def _expire(protocols: list[EmulatorProtocol],
+                  connection_timeout: float | None) -> None:
+    while True:
+        await asyncio.sleep(connection_timeout / 2
+                            if connection_timeout else 3600)
+        for protocol in protocols:
+            protocol.expire()
+
+
+async def serve(config: dict | None, host: str = UDP_IP,
+                port: int = UDP_PORT, max_connections: int = 4096,
+                connection_timeout: float | None = 60.0) -> None:
+    """Run the emulation server until cancelled."""
+    loop = asyncio.get_running_loop()
+    (transport, protocol) = await loop.create_datagram_endpoint(
+        lambda: EmulatorProtocol(config, max_connections,
+                                 connection_timeout),
+        local_addr=(host, port))
+    try:
+        await _expire([protocol], connection_timeout)
+    finally:
+        transport.close()
+
+
+def _merge(base: dict, override: dict) -> dict:
+    result = dict(base)
+    for (key, value) in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            value = _merge(result[key], value)
+        result[key] = value
+    return result
+
+
+def load_farm_config(config: dict) -> list[tuple[str, int, EmulatedBmc]]:
+    """Return the (host, port, bmc) of each BMC of a farm config.
+
+    Example:
+
+        template:             # config of all BMCs
+          sdr: sdr.bin
+          fru:
+            0: fru.bin
+          latency: 0.002      # seconds
+          jitter: 0.001       # seconds
+          loss: 0.01          # probability
+        count: 100
+        host: 127.0.0.1       # formatted with {index} and {number}
+        port: 16230           # of the first BMC
+        port_step: 1          # 0 with a host per BMC, e.g. 127.0.1.{number}
+        instances:            # overrides by index
+          3:
+            loss: 0.5
+            device_id:
+              device_id: 3
+
+    The instances with the same 'sdr' file share the loaded SDRs.
+    """
+    template = config.get('template') or {}
+    overrides = config.get('instances') or {}
+    count = config.get('count', len(overrides))
+    host = str(config.get('host', UDP_IP))
+    port = int(config.get('port', UDP_PORT))
+    port_step = int(config.get('port_step', 1))
+
+    sdr_cache = {}
+    bmcs = []
+    for index in range(count):
+        cfg = _merge(template, overrides.get(index) or {})
+        sdr_file = cfg.get('sdr')
+        sdrs = None
+        if sdr_file:
+            if sdr_file not in sdr_cache:
+                sdr_cache[sdr_file] = OrderedDict()
+                load_sdr_dump(sdr_file, sdr_cache[sdr_file])
+            sdrs = sdr_cache[sdr_file]
+        bmc = EmulatedBmc(cfg, sdrs, name=cfg.get('name', 'bmc%d' % index),
+                          latency=float(cfg.get('latency', 0.0)),
+                          jitter=float(cfg.get('jitter', 0.0)),
+                          loss=float(cfg.get('loss', 0.0)))
+        bmcs.append((str(cfg.get('host', host)).format(index=index,
+                                                       number=index + 1),
+                     int(cfg.get('port', port + index * port_step)), bmc))
+    return bmcs
+
+
+async def serve_farm(bmcs: list[tuple[str, int, EmulatedBmc]],
+                     max_connections: int = 4096,
+                     connection_timeout: float | None = 60.0,
+                     started: Any = None) -> None:
+    """Serve each (host, port, bmc) until cancelled.
+
+    `started` is called with the list of protocols once all are bound.
+    """
+    loop = asyncio.get_running_loop()
+    transports = []
+    protocols = []
+    try:
+        for (host, port, bmc) in bmcs:
+            (transport, protocol) = await loop.create_datagram_endpoint(
+                lambda bmc=bmc: EmulatorProtocol(
+                    bmc.config, max_connections, connection_timeout, bmc),
+                local_addr=(host, port))
+            transports.append(transport)
+            protocols.append(protocol)
+        log().info('serving %d BMCs', len(protocols))
+        if started is not None:
+            started(protocols)
+        await _expire(protocols, connection_timeout)
+    finally:
+        for transport in transports:
+            transport.close()
 
 
 def main(args: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description="IPMI server emulation.")
     parser.add_argument("-p", "--port", type=int, dest="port", help="RMCP port", default=623)
     parser.add_argument("-c", "--config", type=str, dest="config", help="Config file")
+    parser.add_argument("--farm", type=str,
+                        help="config file of a farm of BMCs, see "
+                             "load_farm_config()")
+    parser.add_argument(
+        "--max-connections", type=int, default=4096,
+        help="maximal number of client connections (default: 4096)")
+    parser.add_argument(
+        "--connection-timeout", type=float, default=60.0,
+        help="seconds after which an idle connection is dropped "
+             "(default: 60)")
     parser.add_argument(
         "-v", action="store_true", dest="verbose", help="be more verbose"
     )
@@ -358,10 +928,18 @@ def main(args: list[str] | None = None) -> None:
     handler = logging.StreamHandler()
     if args.verbose:
         handler.setLevel(logging.DEBUG)
+        pyipmi.logger.set_log_level(logging.DEBUG)
     else:
         handler.setLevel(logging.INFO)
+        pyipmi.logger.set_log_level(logging.INFO)
     pyipmi.logger.add_log_handler(handler)
-    pyipmi.logger.set_log_level(logging.DEBUG)
+
+    if args.farm:
+        with open(args.farm, 'r') as stream:
+            bmcs = load_farm_config(yaml.safe_load(stream))
+        asyncio.run(serve_farm(bmcs, args.max_connections,
+                               args.connection_timeout or None))
+        return
 
     config = None
     if args.config:
@@ -371,29 +949,8 @@ def main(args: list[str] | None = None) -> None:
         if 'sdr' in config:
             load_sdr_dump(config['sdr'])
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((UDP_IP, args.port))
-
-    connections = {}
-
-    while True:
-        pdu, addr = sock.recvfrom(1024)  # buffer size is 1024 bytes
-
-        # create new connection
-        if addr not in connections:
-            connections[addr] = ConnectionContext(config, sock, addr)
-
-        # remove for closed connections from dict
-        connections = {
-            key: value
-            for key, value in connections.items()
-            if value.state != value.STATE_CLOSED
-        }
-
-        thread = threading.Thread(target=handle_thread,
-                                  args=(connections[addr], pdu))
-        thread.daemon = True
-        thread.start()
+    asyncio.run(serve(config, UDP_IP, args.port, args.max_connections,
+                      args.connection_timeout or None))
 
 
 if __name__ == '__main__':
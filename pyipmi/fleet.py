@@ -0,0 +1,266 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Run IPMI operations on many BMCs at once.
+
+Example:
+
+    hosts = [pyipmi.fleet.Host('10.0.0.%d' % i, username='admin',
+                               password='admin') for i in range(1, 255)]
+    for result in pyipmi.fleet.poll(hosts, ['chassis_status', 'sel_tail'],
+                                    max_workers=64, timeout=60):
+        print(result)
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Generator
+
+from . import Ipmi, Target, create_connection
+from .errors import IpmiTimeoutError
+from .interfaces import create_interface
+from .logger import log
+from .sensor import SensorSnapshot
+
+
+class Host(object):
+    """A BMC in the host inventory.
+
+    `min_interval` is the minimum time in seconds between two operations on
+    this host. `deadline` is an absolute `time.monotonic()` value after which
+    no further operation is started for this host.
+    """
+
+    def __init__(self, host: str, port: int = 623,
+                 username: str | None = None, password: str | None = None,
+                 target_address: int = 0x20, min_interval: float = 0.0,
+                 deadline: float | None = None) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.target_address = target_address
+        self.min_interval = min_interval
+        self.deadline = deadline
+
+    def __str__(self) -> str:
+        return '%s:%d' % (self.host, self.port)
+
+
+class FleetResult(object):
+    """The result of one operation on one host.
+
+    Either `value` or `error` is set.
+    """
+
+    def __init__(self, host: Host, operation: str, value: Any = None,
+                 error: Exception | None = None, elapsed: float = 0.0) -> None:
+        self.host = host
+        self.operation = operation
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self) -> str:
+        if self.error is not None:
+            return '%s %s: error: %s' % (self.host, self.operation, self.error)
+        return '%s %s: %s' % (self.host, self.operation, self.value)
+
+
+def read_sensors(ipmi: Ipmi) -> dict[int, tuple[int | None, int | None]]:
+    """Return the raw reading and states for each sensor of the SDR list.
+
+    The SDR list is taken from the `sdr_cache` of the connection if set.
+    """
+    snapshot = SensorSnapshot(ipmi.get_repository_sdr_list())
+    readings = snapshot.read(ipmi)
+    return {number: (raw, states) for (number, raw, states)
+            in zip(readings.numbers, readings.raw, readings.states)
+            if raw is not None or states is not None}
+
+
+def sel_tail(ipmi: Ipmi, count: int = 10) -> list:
+    """Return the last `count` SEL entries."""
+    return ipmi.get_sel_tail(count)
+
+
+def chassis_status(ipmi: Ipmi) -> Any:
+    return ipmi.get_chassis_status()
+
+
+OPERATIONS = {
+    'sensor_readings': read_sensors,
+    'sel_tail': sel_tail,
+    'chassis_status': chassis_status,
+}
+
+
+def connect_rmcp(host: Host) -> Ipmi:
+    """Open a native RMCP connection to the host."""
+    interface = create_interface('rmcp', keep_alive_interval=0)
+    ipmi = create_connection(interface)
+    ipmi.session.set_session_type_rmcp(host.host, port=host.port)
+    if host.username is not None:
+        ipmi.session.set_auth_type_user(host.username, host.password)
+    ipmi.target = Target(host.target_address)
+    ipmi.open()
+    return ipmi
+
+
+def _acquire(pool: Any, host: Host) -> Ipmi:
+    return pool.acquire(host.host, host.port, host.username, host.password,
+                        target=Target(host.target_address))
+
+
+def _close(ipmi: Ipmi) -> None:
+    ipmi.close()
+
+
+def _run_host(host: Host, deadline: float,
+              operations: list[tuple[str, Callable]],
+              connect: Callable[[Host], Ipmi],
+              release: Callable[[Ipmi], None],
+              emit: Callable[[FleetResult], None],
+              stop: threading.Event, sdr_cache: Any = None) -> None:
+    remaining = deque(operations)
+
+    def expired() -> bool:
+        return time.monotonic() > deadline
+
+    try:
+        if expired():
+            raise IpmiTimeoutError('deadline exceeded')
+        ipmi = connect(host)
+    except Exception as e:
+        for (name, _) in remaining:
+            emit(FleetResult(host, name, error=e))
+        return
+
+    if sdr_cache is not None:
+        ipmi.sdr_cache = sdr_cache
+
+    try:
+        last_start = None
+        while remaining and not stop.is_set():
+            (name, fn) = remaining.popleft()
+            if last_start is not None and host.min_interval:
+                delay = last_start + host.min_interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if expired():
+                emit(FleetResult(host, name,
+                                 error=IpmiTimeoutError('deadline exceeded')))
+                continue
+            last_start = time.monotonic()
+            try:
+                value = fn(ipmi)
+                emit(FleetResult(host, name, value=value,
+                                 elapsed=time.monotonic() - last_start))
+            except Exception as e:
+                emit(FleetResult(host, name, error=e,
+                                 elapsed=time.monotonic() - last_start))
+    finally:
+        try:
+            release(ipmi)
+        except Exception as e:
+            log().debug('closing %s failed: %s', host, e)
+
+
+def poll(hosts: list[Host], operations: list[str | tuple[str, Callable]],
+         max_workers: int = 32, timeout: float | None = None,
+         connect: Callable[[Host], Ipmi] = connect_rmcp,
+         pool: Any = None,
+         sdr_cache: Any = None) -> Generator[FleetResult, None, None]:
+    """Run the operations on all hosts and yield the results as they complete.
+
+    `operations` are names from `OPERATIONS` or (name, callable) tuples. The
+    callable gets the opened `Ipmi` connection of a host.
+
+    At most `max_workers` hosts are served at the same time and each host
+    is served by one worker only, i.e. a BMC sees its operations one after
+    another, at most one every `Host.min_interval` seconds. Hosts are
+    scheduled earliest deadline first. `timeout` sets the deadline of all
+    hosts without one, relative to now. Operations which cannot be started
+    before the deadline of their host fail with `IpmiTimeoutError`.
+
+    With a `pyipmi.pool.SessionPool` as `pool`, the sessions are taken
+    from and given back to the pool instead of using `connect`. A
+    `pyipmi.sdrcache.SdrCache` as `sdr_cache` is set on all connections.
+
+    If the generator is closed early, no further operations are started
+    and the workers are waited for.
+    """
+    ops = [(op, OPERATIONS[op]) if isinstance(op, str) else op
+           for op in operations]
+
+    default_deadline = float('inf')
+    if timeout is not None:
+        default_deadline = time.monotonic() + timeout
+
+    jobs = queue.PriorityQueue()
+    counter = itertools.count()
+    for host in hosts:
+        deadline = host.deadline
+        if deadline is None:
+            deadline = default_deadline
+        jobs.put((deadline, next(counter), host))
+
+    release = _close
+    if pool is not None:
+        connect = functools.partial(_acquire, pool)
+        release = pool.release
+
+    results = queue.Queue()
+    done = object()
+    stop = threading.Event()
+
+    def worker() -> None:
+        while not stop.is_set():
+            try:
+                (deadline, _, host) = jobs.get_nowait()
+            except queue.Empty:
+                break
+            _run_host(host, deadline, ops, connect, release, results.put,
+                      stop, sdr_cache)
+        results.put(done)
+
+    workers = [threading.Thread(target=worker, daemon=True)
+               for _ in range(min(max_workers, len(hosts)))]
+    for t in workers:
+        t.start()
+
+    try:
+        running = len(workers)
+        while running:
+            result = results.get()
+            if result is done:
+                running -= 1
+                continue
+            yield result
+    finally:
+        stop.set()
+        for t in workers:
+            t.join()
@@ -20,18 +20,25 @@ import array
 import codecs
 import datetime
 import os
+from typing import Generator
 
-from .errors import DecodingError, CompletionCodeError
-from .msgs import constants
-from .utils import bcd_search, chunks, py3_array_tobytes
+from .errors import DecodingError, RetryError
+from .helper import message_with_name, run_reads, ReadLength
+from .msgs import constants, create_request_by_name
+from .utils import (bcd_search, check_rsp_completion_code, chunks,
+                    py3_array_tobytes)
 from .fields import FruTypeLengthString
 
 codecs.register(bcd_search)
 
 
+FRU_MAX_READ_LENGTH = 0xff
+
+
 class Fru(object):
-    def __init__(self):
+    def __init__(self) -> None:
         self.write_length = 16
+        self._fru_read_length = ReadLength(FRU_MAX_READ_LENGTH)
 
     def get_fru_inventory_area_info(self, fru_id: int = 0) -> int:
         rsp = self.send_message_with_name('GetFruInventoryAreaInfo',
@@ -55,39 +62,16 @@ class Fru(object):
 
     def read_fru_data(self, offset: int | None = None,
                       count: int | None = None, fru_id: int = 0) -> bytes:
-        req_size = 32
-        data = array.array('B')
+        """Read FRU data.
 
-        # first check for maximum area size
+        The largest working read length is negotiated with the first reads
+        and kept for the following reads of the connection.
+        """
         if offset is None:
-            area_size = self.get_fru_inventory_area_info(fru_id)
-            off = 0
-        else:
-            area_size = offset + count
-            off = offset
-
-        while off < area_size:
-            if (off + req_size) > area_size:
-                req_size = area_size - off
-
-            try:
-                rsp = self.send_message_with_name('ReadFruData', fru_id=fru_id,
-                                                  offset=off, count=req_size)
-            except CompletionCodeError as ex:
-                if ex.cc in (constants.CC_CANT_RET_NUM_REQ_BYTES,
-                             constants.CC_REQ_DATA_FIELD_EXCEED,
-                             constants.CC_PARAM_OUT_OF_RANGE):
-                    req_size -= 2
-                    if req_size <= 0:
-                        raise
-                    continue
-                else:
-                    raise
-
-            data.extend(rsp.data)
-            off += rsp.count
-
-        return py3_array_tobytes(data)
+            (offset, count) = (0, None)
+        return run_reads(self.send_message,
+                         fru_data_reads(offset, count, fru_id,
+                                        self._fru_read_length))
 
     def read_fru_data_full(self, fru_id: int = 0) -> bytes:
         return self.read_fru_data(fru_id=fru_id)
@@ -98,11 +82,9 @@ class Fru(object):
         return InventoryCommonHeader(data, ignore_checksum=ignore_checksum)
 
     def _read_fru_area(self, offset: int, fru_id: int = 0) -> bytes:
-        # read the area header
-        data = self.read_fru_data(offset=offset, count=5, fru_id=fru_id)
-        # get the whole area data
-        count = data[1] * 8
-        return self.read_fru_data(offset=offset, count=count, fru_id=fru_id)
+        reader = FruReader(self, fru_id)
+        end = reader.area_end(offset)
+        return reader.read(offset, end)
 
     def get_fru_chassis_area(self, fru_id: int = 0,
                              ignore_checksum: bool = False) -> InventoryChassisInfoArea:
@@ -132,63 +114,149 @@ class Fru(object):
                                  ignore_checksum: bool = False) -> InventoryMultiRecordArea:
         header = self.get_fru_inventory_header(fru_id=fru_id,
                                                ignore_checksum=ignore_checksum)
-
-        # we have to determine the length of the area first
-        offset = header.multirecord_area_offset
-        count = 0
-
-        while True:
-            # read the header
-            data = self.read_fru_data(offset=offset, count=5)
-            end_of_list = bool(data[1] & 0x80)
-            length = data[2]
-            count += length + 5
-            offset += length + 5
-            if end_of_list:
-                break
-
-        # now read the full area
+        reader = FruReader(self, fru_id)
         offset = header.multirecord_area_offset
-        data = self.read_fru_data(offset=offset, count=count)
+        end = reader.multirecord_area_end(offset)
+        data = reader.read(offset, end)
         return InventoryMultiRecordArea(data, ignore_checksum=ignore_checksum)
 
     def get_fru_inventory(self, fru_id: int = 0,
                           ignore_checksum: bool = False) -> FruInventory:
         """
         Get the full parsed FRU inventory data.
-        """
-        fru = FruInventory()
-
-        header = self.get_fru_inventory_header(
-            fru_id=fru_id,
-            ignore_checksum=ignore_checksum
-        )
-
-        if header.chassis_info_area_offset:
-            fru.chassis_info_area = self.get_fru_chassis_area(
-                fru_id=fru_id,
-                ignore_checksum=ignore_checksum
-            )
-
-        if header.board_info_area_offset:
-            fru.board_info_area = self.get_fru_board_area(
-                fru_id=fru_id,
-                ignore_checksum=ignore_checksum
-            )
-
-        if header.product_info_area_offset:
-            fru.product_info_area = self.get_fru_product_area(
-                fru_id=fru_id,
-                ignore_checksum=ignore_checksum
-            )
 
+        The common header is read once and all areas are read into one
+        buffer, see `FruReader`.
+        """
+        reader = FruReader(self, fru_id)
+        data = reader.read_inventory(ignore_checksum=ignore_checksum)
+        return FruInventory(data, ignore_checksum=ignore_checksum)
+
+
+def fru_data_reads(offset: int, count: int | None, fru_id: int,
+                   read_length: ReadLength) -> Generator:
+    """Plan the reads of `count` bytes of FRU data from `offset`.
+
+    A generator that yields the requests to send, the caller sends the
+    responses back, see `pyipmi.helper.run_reads`. If `count` is None, the
+    data up to the end of the inventory area is read. Returns the data.
+
+    The reads use the length negotiated in `read_length`.
+    """
+    if count is None:
+        rsp = yield from message_with_name('GetFruInventoryAreaInfo',
+                                           fru_id=fru_id)
+        count = rsp.area_size - offset
+    end = offset + count
+    data = array.array('B')
+
+    while offset < end:
+        req_size = min(read_length.length, end - offset)
+        if req_size <= 0:
+            raise RetryError()
+
+        req = create_request_by_name('ReadFruData')
+        req.fru_id = fru_id
+        req.offset = offset
+        req.count = req_size
+        rsp = yield req
+        if rsp.completion_code in (constants.CC_CANT_RET_NUM_REQ_BYTES,
+                                   constants.CC_REQ_DATA_FIELD_EXCEED,
+                                   constants.CC_PARAM_OUT_OF_RANGE):
+            read_length.failed(req_size)
+            continue
+        check_rsp_completion_code(rsp)
+
+        read_length.succeeded(rsp.count)
+        if rsp.count < req_size:
+            # the BMC silently returns less than requested
+            read_length.failed(req_size)
+        data.extend(rsp.data)
+        offset += rsp.count
+
+    return py3_array_tobytes(data)
+
+
+class FruReader(object):
+    """Read the FRU inventory areas with as few requests as possible.
+
+    All reads go to one buffer covering the FRU device. Each request reads
+    as many bytes as the negotiated read length of the connection allows,
+    bytes read ahead are used by the following reads.
+    """
+
+    def __init__(self, fru: Fru, fru_id: int = 0,
+                 area_size: int | None = None) -> None:
+        self._fru = fru
+        self.fru_id = fru_id
+        if area_size is None:
+            area_size = fru.get_fru_inventory_area_info(fru_id)
+        self.area_size = area_size
+        self.buffer = array.array('B', bytes(area_size))
+        self._valid = bytearray(area_size)
+
+    def read(self, start: int, end: int) -> array.array:
+        """Return the data from `start` to `end`, reading missing bytes."""
+        if end > self.area_size:
+            raise DecodingError('FRU data exceeds the inventory area '
+                                '(%d > %d)' % (end, self.area_size))
+        offset = start
+        while offset < end:
+            if self._valid[offset]:
+                offset += 1
+                continue
+            count = min(self._fru._fru_read_length.length,
+                        self.area_size - offset)
+            data = self._fru.read_fru_data(offset=offset, count=count,
+                                           fru_id=self.fru_id)
+            if not data:
+                raise DecodingError('no FRU data at offset %d' % offset)
+            data = data[:self.area_size - offset]
+            self.buffer[offset:offset + len(data)] = array.array('B', data)
+            self._valid[offset:offset + len(data)] = b'\x01' * len(data)
+            offset += len(data)
+        return self.buffer[start:end]
+
+    def area_end(self, offset: int) -> int:
+        """Return the end of the info area at `offset`."""
+        data = self.read(offset, offset + 2)
+        return offset + data[1] * 8
+
+    def multirecord_area_end(self, offset: int) -> int:
+        """Return the end of the multirecord area at `offset`.
+
+        The records are read while walking the list.
+        """
+        while True:
+            data = self.read(offset, offset + 5)
+            end = offset + data[2] + 5
+            self.read(offset, end)
+            offset = end
+            if data[1] & 0x80:
+                return offset
+
+    def read_inventory(self, ignore_checksum: bool = False) -> array.array:
+        """Read the common header and all areas.
+
+        Returns the buffer up to the end of the last area, with the unread
+        parts set to zero.
+        """
+        header = InventoryCommonHeader(self.read(0, 8),
+                                       ignore_checksum=ignore_checksum)
+        end = 8
+        for offset in (header.chassis_info_area_offset,
+                       header.board_info_area_offset,
+                       header.product_info_area_offset):
+            if offset:
+                area_end = self.area_end(offset)
+                self.read(offset, area_end)
+                end = max(end, area_end)
         if header.multirecord_area_offset:
-            fru.multirecord_area = self.get_fru_multirecord_area(
-                fru_id=fru_id,
-                ignore_checksum=ignore_checksum
-            )
-
-        return fru
+            offset = header.multirecord_area_offset
+            area_end = self.multirecord_area_end(offset)
+            self.read(offset, area_end)
+            end = max(end, area_end)
+        return self.buffer[:end]
 
 
 def get_fru_inventory_from_file(filename: str,
@@ -447,7 +515,9 @@ class InventoryMultiRecordArea(object):
         self.records = list()
         offset = 0
         while True:
-            record = FruDataMultiRecord.create_from_record_id(data[offset:])
+            # only pass the record itself, not the rest of the area
+            end = offset + 5 + data[offset + 2]
+            record = FruDataMultiRecord.create_from_record_id(data[offset:end])
             self.records.append(record)
             offset += record.length + 5
             if record.end_of_list:
@@ -17,11 +17,11 @@
 from __future__ import annotations
 
 import time
-from typing import Callable
+from typing import Any, Callable, Generator, Iterator
 
-from .errors import CompletionCodeError, RetryError
-from .utils import check_completion_code, ByteBuffer
-from .msgs import constants, Message
+from .errors import CompletionCodeError, DecodingError, RetryError
+from .utils import check_completion_code, check_rsp_completion_code, ByteBuffer
+from .msgs import constants, create_request_by_name, Message
 
 
 def get_sdr_chunk_helper(send_fn: Callable[[Message], Message], req: Message,
@@ -51,60 +51,209 @@ def get_sdr_chunk_helper(send_fn: Callable[[Message], Message], req: Message,
     return rsp
 
 
-def get_sdr_data_helper(reserve_fn: Callable[[], int], get_fn: Callable,
-                        record_id: int,
-                        reservation_id: int | None = None) -> tuple[int, ByteBuffer]:
-    """Helper function to retrieve the sdr data.
+def run_reads(send_fn: Callable[[Message], Message],
+              reads: Generator) -> Any:
+    """Drive the planned reads of `reads` with `send_fn`.
 
-    A specified helper function is used to retrieve the chunks.
+    `reads` is a generator that yields the requests and gets the responses
+    sent back, e.g. `pyipmi.sel.sel_entry_reads`. This keeps the read logic
+    free of I/O, so it is shared by `pyipmi.Ipmi` and `pyipmi.aio`.
 
-    This can be used for SDRs from the Sensor Device or form the SDR
-    repository.
+    Returns the return value of `reads`.
     """
-    if reservation_id is None:
-        reservation_id = reserve_fn()
+    try:
+        req = next(reads)
+        while True:
+            req = reads.send(send_fn(req))
+    except StopIteration as e:
+        return e.value
+
+
+def iter_reads(send_fn: Callable[[Message], Message],
+               reads: Generator) -> Iterator:
+    """Like `run_reads`, but yield the items of `reads` which are not
+    requests, e.g. the entries of `pyipmi.sel.new_sel_entry_reads`.
+    """
+    try:
+        item = next(reads)
+        while True:
+            if isinstance(item, Message):
+                item = reads.send(send_fn(item))
+            else:
+                yield item
+                item = next(reads)
+    except StopIteration:
+        return
+
+
+def message_with_name(name: str, **kwargs: Any) -> Generator:
+    """Yield the request `name` and return the response after checking its
+    completion code, to be used with `yield from` in planned reads.
+    """
+    req = create_request_by_name(name)
+    for (key, value) in kwargs.items():
+        setattr(req, key, value)
+    rsp = yield req
+    check_rsp_completion_code(rsp)
+    return rsp
+
 
-    (next_id, data) = get_fn(reservation_id, record_id, 0, 5)
+SDR_HEADER_LENGTH = 5
+# bytes to read value for reading the entire record with one request
+SDR_ENTIRE_RECORD = 0xff
 
-    header = ByteBuffer(data)
+
+class ReadLength(object):
+    """The negotiated length of the partial reads of one connection.
+
+    First the entire record is requested with one read. If the BMC does not
+    support this, the largest partial read length up to `limit` is searched
+    for with the following reads. The result is kept for all following
+    records.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.entire_record = True
+        # largest length known to work and smallest length known to fail
+        self.good = 0
+        self.bad = limit + 1
+
+    @property
+    def length(self) -> int:
+        """Return the length of the next partial read."""
+        if self.bad - self.good <= 1:
+            return self.good
+        return (self.good + self.bad) // 2
+
+    def succeeded(self, length: int) -> None:
+        self.good = max(self.good, length)
+
+    def failed(self, length: int) -> None:
+        self.bad = min(self.bad, length)
+        self.good = min(self.good, self.bad - 1)
+
+
+class SdrReadLength(ReadLength):
+    """The negotiated length of the SDR read requests of one connection."""
+
+    def __init__(self) -> None:
+        super(SdrReadLength, self).__init__(SDR_ENTIRE_RECORD - 1)
+        # read the header together with the first chunk of the body
+        self.with_header = True
+
+
+# completion codes used by BMCs to reject a read beyond the record or
+# beyond their buffer size
+_SDR_READ_LENGTH_CCS = (constants.CC_CANT_RET_NUM_REQ_BYTES,
+                        constants.CC_REQ_DATA_FIELD_EXCEED,
+                        constants.CC_PARAM_OUT_OF_RANGE)
+
+
+def sdr_data_reads(record_id: int, read_length: SdrReadLength) -> Generator:
+    """Plan the reads of one SDR record.
+
+    A generator that yields the (record_id, offset, length) of the next read.
+    The caller sends the (next_id, data) of the response back or throws the
+    CompletionCodeError of the read into the generator. The generator
+    returns the (next_id, record_data) of the record.
+
+    This is shared by the synchronous and the asyncio SDR readers.
+    """
+    record_data = None
+
+    if read_length.entire_record:
+        try:
+            (next_id, data) = yield (record_id, 0, SDR_ENTIRE_RECORD)
+            record_data = ByteBuffer(data)
+        except CompletionCodeError as e:
+            if e.cc not in _SDR_READ_LENGTH_CCS:
+                raise
+            read_length.entire_record = False
+
+    if (record_data is None and read_length.with_header
+            and read_length.good > SDR_HEADER_LENGTH):
+        try:
+            (next_id, data) = yield (record_id, 0, read_length.good)
+            record_data = ByteBuffer(data)
+        except CompletionCodeError as e:
+            if e.cc not in _SDR_READ_LENGTH_CCS:
+                raise
+            # the length is known to work, so the BMC does not allow
+            # reading beyond the end of the record
+            read_length.with_header = False
+
+    if record_data is None:
+        (next_id, data) = yield (record_id, 0, SDR_HEADER_LENGTH)
+        record_data = ByteBuffer(data)
+
+    if len(record_data) < SDR_HEADER_LENGTH:
+        raise DecodingError('invalid SDR header length (%d)'
+                            % len(record_data))
+
+    header = ByteBuffer(record_data[:SDR_HEADER_LENGTH])
     record_id = header.pop_unsigned_int(2)
     record_version = header.pop_unsigned_int(1)  # noqa:F841
     record_type = header.pop_unsigned_int(1)  # noqa:F841
     record_payload_length = header.pop_unsigned_int(1)
-    record_length = record_payload_length + 5
-    record_data = ByteBuffer(data)
-
-    offset = len(record_data)
-    max_req_len = 20
+    record_length = record_payload_length + SDR_HEADER_LENGTH
     retry = 20
 
     # now get the other record data
-    while True:
+    while len(record_data) < record_length:
         retry -= 1
         if retry == 0:
             raise RetryError()
 
-        length = max_req_len
-        if (offset + length) > record_length:
-            length = record_length - offset
+        offset = len(record_data)
+        length = min(read_length.length, record_length - offset)
+        if length <= 0:
+            raise RetryError()
 
         try:
-            (next_id, data) = get_fn(reservation_id, record_id, offset, length)
+            (next_id, data) = yield (record_id, offset, length)
         except CompletionCodeError as e:
             if e.cc == constants.CC_CANT_RET_NUM_REQ_BYTES:
-                # reduce max length
-                max_req_len -= 4
-                if max_req_len <= 0:
-                    retry = 0
-            else:
-                raise CompletionCodeError(e.cc)
+                read_length.failed(length)
+                continue
+            raise CompletionCodeError(e.cc)
 
+        read_length.succeeded(length)
         record_data.extend(data[:])
-        offset = len(record_data)
-        if len(record_data) >= record_length:
-            break
 
-    return (next_id, record_data)
+    return (next_id, ByteBuffer(record_data[:record_length]))
+
+
+def get_sdr_data_helper(reserve_fn: Callable[[], int], get_fn: Callable,
+                        record_id: int,
+                        reservation_id: int | None = None,
+                        read_length: SdrReadLength | None = None) -> tuple[int, ByteBuffer]:
+    """Helper function to retrieve the sdr data.
+
+    A specified helper function is used to retrieve the chunks.
+
+    This can be used for SDRs from the Sensor Device or form the SDR
+    repository.
+
+    `read_length` holds the negotiated read length of the connection. If
+    None, the read length is negotiated for this record only.
+    """
+    if reservation_id is None:
+        reservation_id = reserve_fn()
+    if read_length is None:
+        read_length = SdrReadLength()
+
+    reads = sdr_data_reads(record_id, read_length)
+    try:
+        read = next(reads)
+        while True:
+            try:
+                rsp = get_fn(reservation_id, *read)
+            except CompletionCodeError as e:
+                read = reads.throw(e)
+            else:
+                read = reads.send(rsp)
+    except StopIteration as e:
+        return e.value
 
 
 def _clear_repository(reserve_fn: Callable[[], int], clear_fn: Callable,
@@ -25,11 +25,14 @@ import hashlib
 import time
 
 from array import array
+from typing import Callable
 
-from .errors import CompletionCodeError, HpmError, IpmiTimeoutError
+from .errors import CompletionCodeError, HpmError, IpmiTimeoutError, RetryError
+from .helper import ReadLength
+from .interfaces.ipmb import IPMB_MAX_DATA_LENGTH, max_bridged_data_length
 from .msgs import create_request_by_name, Message
 from .msgs import constants
-from .utils import check_completion_code, bcd_search, chunks
+from .utils import check_completion_code, bcd_search
 from .utils import py3dec_unic_bytes_fix, py3_array_tobytes
 from .state import State
 from .fields import VersionField
@@ -64,6 +67,45 @@ CC_QUERY_SELFTEST_NO_RESULTS_AVAILABLE = 0xD5
 CC_ABORT_UPGRADE_CANNOT_ABORT = 0x80
 CC_ABORT_UPGRADE_CANNOT_RESUME_OPERATION = 0x81
 
+# the PICMG identifier and the block number of an upload firmware block
+# request
+UPLOAD_FIRMWARE_BLOCK_OVERHEAD = 2
+
+
+class UploadProgress(object):
+    """The progress of a firmware upload, see `Hpm.upload_binary`."""
+
+    def __init__(self, total_bytes: int) -> None:
+        self.total_bytes = total_bytes
+        self.bytes_sent = 0
+        self.blocks_sent = 0
+        self.block_size = 0
+        self.elapsed = 0.0
+        self._start = time.monotonic()
+
+    def update(self, length: int) -> None:
+        self.bytes_sent += length
+        self.blocks_sent += 1
+        self.elapsed = time.monotonic() - self._start
+
+    @property
+    def throughput(self) -> float:
+        """Return the uploaded bytes per second."""
+        if not self.elapsed:
+            return 0.0
+        return self.bytes_sent / self.elapsed
+
+    @property
+    def percent(self) -> float:
+        if not self.total_bytes:
+            return 100.0
+        return 100.0 * self.bytes_sent / self.total_bytes
+
+    def __str__(self) -> str:
+        return '%d/%d bytes (%.1f%%) in %d blocks, %.0f bytes/s' % (
+            self.bytes_sent, self.total_bytes, self.percent,
+            self.blocks_sent, self.throughput)
+
 
 class Hpm(object):
 
@@ -149,34 +191,109 @@ class Hpm(object):
         self.send_message_with_name('UploadFirmwareBlock', number=block_number,
                                     data=data)
 
-    @staticmethod
-    def _determine_max_block_size() -> int:
-        return 22
+    def _determine_max_block_size(self) -> int:
+        """Return the largest firmware block of one request to the target.
+
+        The request data length is limited by the interface, see its
+        `max_request_data_length`, and by the bridging to the target.
+        """
+        max_length = getattr(self.interface, 'max_request_data_length',
+                             IPMB_MAX_DATA_LENGTH)
+        routing = getattr(self.target, 'routing', None)
+        return (max_bridged_data_length(max_length, routing)
+                - UPLOAD_FIRMWARE_BLOCK_OVERHEAD)
 
     def upload_binary(self, binary: bytes, timeout: float = 2,
-                      interval: float = 0.1, retry: int = 3) -> None:
-        """Upload all firmware blocks from a binary."""
+                      interval: float = 0.1, retry: int = 3,
+                      window: int = 1, block_size: int | None = None,
+                      progress: Callable[[UploadProgress], None] | None = None
+                      ) -> None:
+        """Upload all firmware blocks from a binary.
+
+        The blocks are `block_size` bytes long, by default the largest the
+        interface and the bridging allow. If the target rejects the length,
+        the largest accepted one is searched for.
+
+        With a `window` larger than 1, that many consecutive blocks are sent
+        with `send_messages`, i.e. pipelined if the interface supports it.
+        If the target rejects or drops one of them, the upload continues
+        with one block at a time after the last block the target confirmed.
+
+        `progress` is called with the `UploadProgress` after each window.
+        """
+        if isinstance(binary, str):
+            binary = [ord(c) for c in binary]
+        if block_size is None:
+            block_size = self._determine_max_block_size()
+        if block_size < 1 or window < 1:
+            raise HpmError('invalid block size %d or window %d'
+                           % (block_size, window))
+
+        status = UploadProgress(len(binary))
+        # set once the target rejected the block length
+        read_length = None
+        offset = 0
         block_number = 0
-        block_size = self._determine_max_block_size()
 
-        for chunk in chunks(binary, block_size):
-            try:
-                self.upload_firmware_block(block_number, chunk)
-            except CompletionCodeError as e:
-                if e.cc == CC_LONG_DURATION_CMD_IN_PROGRESS:
+        while offset < len(binary):
+            length = read_length.length if read_length else block_size
+            status.block_size = length
+            reqs = []
+            for i in range(window):
+                start = offset + i * length
+                if start >= len(binary):
+                    break
+                req = create_request_by_name('UploadFirmwareBlock')
+                req.number = (block_number + i) & 0xff
+                req.data = binary[start:start + length]
+                reqs.append(req)
 
-                    self.wait_for_long_duration_command(
-                            constants.CMDID_HPM_UPLOAD_FIRMWARE_BLOCK,
-                            timeout, interval)
+            try:
+                if len(reqs) == 1:
+                    rsps = [self.send_message(reqs[0])]
                 else:
-                    raise HpmError('upload_firmware_block CC=0x%02x' % e.cc)
-            except IpmiTimeoutError:
+                    rsps = self.send_messages(reqs)
+            except (IpmiTimeoutError, RetryError) as e:
                 retry -= 1
                 if retry == 0:
                     raise IpmiTimeoutError()
-
-            block_number += 1
-            block_number &= 0xff
+                # continue one block at a time after the blocks which were
+                # confirmed before, see `Ipmi.send_messages`
+                window = 1
+                rsps = []
+                for rsp in getattr(e, 'responses', None) or []:
+                    if rsp is None:
+                        break
+                    rsps.append(rsp)
+
+            for (req, rsp) in zip(reqs, rsps):
+                cc = rsp.completion_code
+                if cc in (constants.CC_REQ_DATA_INV_LENGTH,
+                          constants.CC_REQ_DATA_FIELD_EXCEED) \
+                        and len(req.data) > 1:
+                    if read_length is None:
+                        read_length = ReadLength(block_size)
+                    read_length.failed(len(req.data))
+                    break
+                if cc == CC_LONG_DURATION_CMD_IN_PROGRESS:
+                    self.wait_for_long_duration_command(
+                            constants.CMDID_HPM_UPLOAD_FIRMWARE_BLOCK,
+                            timeout, interval)
+                elif cc != constants.CC_OK:
+                    if len(reqs) > 1:
+                        # the target does not keep up with the pipelining
+                        window = 1
+                        break
+                    raise HpmError('upload_firmware_block CC=0x%02x' % cc)
+                elif read_length is not None:
+                    read_length.succeeded(len(req.data))
+
+                offset += len(req.data)
+                block_number = (block_number + 1) & 0xff
+                status.update(len(req.data))
+
+            if progress is not None:
+                progress(status)
 
     def finish_firmware_upload(self, component: int, length: int) -> Message:
         return self.send_message_with_name('FinishFirmwareUpload',
@@ -337,14 +454,18 @@ class Hpm(object):
         if support is not True:
             raise HpmError('no supported component in image')
 
-    def upgrade_stage(self, image: UpgradeImage, component: int) -> None:
+    def upgrade_stage(self, image: UpgradeImage, component: int,
+                      window: int = 1,
+                      progress: Callable[[UploadProgress], None] | None = None
+                      ) -> None:
         for action in image.actions:
             if action.components & (1 << component) == 0:
                 continue
             self.initiate_upgrade_action_and_wait(1 << component,
                                                   action.action_type)
             if isinstance(action, UpgradeActionRecordUploadForUpgrade):
-                self.upload_binary(action.firmware_image_data)
+                self.upload_binary(action.firmware_image_data, window=window,
+                                   progress=progress)
                 self.finish_upload_and_wait(component, action.firmware_length)
 
     def _activation_state_do_self_testing(self) -> None:
@@ -370,18 +491,23 @@ class Hpm(object):
             image.header.inaccessibility_timeout, 1)
         self._activation_state_do_self_testing()
 
-    def install_component_from_image(self, image: UpgradeImage,
-                                     component: int) -> None:
+    def install_component_from_image(
+            self, image: UpgradeImage, component: int, window: int = 1,
+            progress: Callable[[UploadProgress], None] | None = None) -> None:
+        """Install a component, see `upload_binary` for `window` and
+        `progress`."""
         self.abort_firmware_upgrade()
         if component not in image.header.components:
             raise HpmError('component=%d not in image' % component)
         self.preparation_stage(image)
-        self.upgrade_stage(image, component)
+        self.upgrade_stage(image, component, window, progress)
         self.activation_stage(image, component)
 
-    def install_component_from_file(self, filename: str, component: int) -> None:
+    def install_component_from_file(
+            self, filename: str, component: int, window: int = 1,
+            progress: Callable[[UploadProgress], None] | None = None) -> None:
         image = UpgradeImage(filename)
-        self.install_component_from_image(image, component)
+        self.install_component_from_image(image, component, window, progress)
 
 
 class UpgradeStatus(State):
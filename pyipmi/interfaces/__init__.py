@@ -16,27 +16,35 @@
 
 from __future__ import annotations
 
+import importlib
 from typing import Any
 
-from .ipmitool import Ipmitool
-from .aardvark import Aardvark
-from .ipmbdev import IpmbDev
-from .mock import Mock
-from .rmcp import Rmcp
+# interface name: (module, class), the module is imported on first use
+_INTERFACES = {
+    'ipmitool': ('ipmitool', 'Ipmitool'),
+    'aardvark': ('aardvark', 'Aardvark'),
+    'ipmbdev': ('ipmbdev', 'IpmbDev'),
+    'mock': ('mock', 'Mock'),
+    'rmcp': ('rmcp', 'Rmcp'),
+    'aiormcp': ('aiormcp', 'AsyncRmcp'),
+}
 
-INTERFACES = [
-    Ipmitool,
-    Aardvark,
-    IpmbDev,
-    Mock,
-    Rmcp,
-]
 
+def _interface_class(module: str, name: str) -> type:
+    return getattr(importlib.import_module('.' + module, __name__), name)
 
-def create_interface(interface: str, *args: Any, **kwargs: Any) -> Any:
-    for intf in INTERFACES:
-        if intf.NAME == interface:
-            intf = intf(*args, **kwargs)
-            return intf
 
-    raise RuntimeError('unknown interface with name %s' % interface)
+def __getattr__(name: str) -> Any:
+    if name == 'INTERFACES':
+        return [_interface_class(*intf) for intf in _INTERFACES.values()]
+    for (module, cls_name) in _INTERFACES.values():
+        if cls_name == name:
+            return _interface_class(module, cls_name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def create_interface(interface: str, *args: Any, **kwargs: Any) -> Any:
+    if interface not in _INTERFACES:
+        raise RuntimeError('unknown interface with name %s' % interface)
+    intf = _interface_class(*_INTERFACES[interface])
+    return intf(*args, **kwargs)
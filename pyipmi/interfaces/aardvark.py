@@ -22,8 +22,9 @@ from array import array
 from .. import Target
 from ..msgs import create_message, encode_message, decode_message, Message
 from ..errors import IpmiTimeoutError
-from ..logger import log
-from ..interfaces.ipmb import IpmbHeaderReq, checksum, rx_filter, encode_ipmb_msg
+from ..logger import log, HexDump
+from ..interfaces.ipmb import (IpmbHeaderReq, checksum, rx_filter,
+                               encode_ipmb_msg, IPMB_MAX_DATA_LENGTH)
 from ..session import Session
 from ..utils import py3_array_tobytes
 
@@ -39,6 +40,10 @@ class Aardvark(object):
     """This interface uses an I2C USB adapter."""
 
     NAME = 'aardvark'
+    # see pyipmi.metrics
+    metrics = None
+    # see pyipmi.hpm
+    max_request_data_length = IPMB_MAX_DATA_LENGTH
 
     def __init__(self, slave_address: int = 0x20, port: int = 0,
                  serial_number: str | None = None,
@@ -127,8 +132,7 @@ class Aardvark(object):
         i2c_addr = header.rs_sa >> 1
 
         raw_bytes = array('B', raw_bytes)
-        log().debug('I2C TX to %02Xh [%s]', i2c_addr,
-                    ' '.join(['%02x' % b for b in raw_bytes]))
+        log().debug('I2C TX to %02Xh [%s]', i2c_addr, HexDump(raw_bytes))
         self._dev.i2c_master_write(i2c_addr, raw_bytes[1:])
 
     def _receive_raw(self, header: IpmbHeaderReq) -> array:
@@ -151,7 +155,7 @@ class Aardvark(object):
             (i2c_addr, rx_data) = self._dev.i2c_slave_read()
             rx_data = array('B', rx_data)
             log().debug('I2C RX from %02Xh [%s]', i2c_addr << 1,
-                        ' '.join(['%02x' % c for c in rx_data]))
+                        HexDump(rx_data))
 
             rq_sa = array('B', [i2c_addr << 1, ])
             rsp_received = rx_filter(header, rq_sa + rx_data)
@@ -182,14 +186,21 @@ class Aardvark(object):
         header.rq_sa = self.slave_address
         header.cmdid = cmdid
 
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.monotonic()
+
         retries = 0
         while retries < self.max_retries:
+            if retries and metrics is not None:
+                metrics.count_retry(netfn, cmdid)
             try:
                 self._send_raw(header, payload)
                 rx_data = self._receive_raw(header)
                 break
             except IpmiTimeoutError:
-                pass
+                if metrics is not None:
+                    metrics.count_timeout(netfn, cmdid)
             except IOError:
                 pass
 
@@ -199,6 +210,12 @@ class Aardvark(object):
         else:
             raise IpmiTimeoutError()
 
+        if metrics is not None:
+            # the IPMB message is the header, the payload and the checksum
+            metrics.observe(netfn, cmdid, time.monotonic() - start,
+                            (len(payload) + 7) * (retries + 1), len(rx_data),
+                            rx_data[5] if len(rx_data) > 6 else None)
+
         return py3_array_tobytes(rx_data)[5:-1]
 
     def send_and_receive_raw(self, target: Target, lun: int, netfn: int,
@@ -0,0 +1,350 @@
+# Copyright (c) 2018  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from array import array
+
+from .. import Target
+from ..session import Session
+from ..msgs import create_request_by_name, encode_message, constants, Message
+from ..messaging import ChannelAuthenticationCapabilities
+from ..errors import DecodingError, RetryError
+from ..logger import log
+from ..interfaces.ipmb import decode_bridged_message, rx_filter
+from ..utils import check_completion_code, check_rsp_completion_code
+from .rmcp import (Rmcp, RmcpMsg, AsfPing, AsfPong, IpmiMsg,
+                   LAN_MAX_DATA_LENGTH, MAX_IN_FLIGHT, RMCP_CLASS_ASF,
+                   RMCP_CLASS_IPMI, _observe)
+
+
+class _RmcpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, interface: AsyncRmcp) -> None:
+        self._interface = interface
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self._interface._datagram_received(data)
+
+    def error_received(self, exc: Exception) -> None:
+        log().debug('RMCP error received: %s', exc)
+
+
+class AsyncRmcp(object):
+    """Native RMCP interface driven by an asyncio event loop.
+
+    All requests share one datagram endpoint per session. Up to
+    `max_in_flight` concurrent `send_and_receive` calls are in flight at the
+    same time and the responses are matched to the requests by `rx_filter`.
+    """
+
+    NAME = 'aiormcp'
+
+    _session: Session | None = None
+    # see pyipmi.metrics
+    metrics = None
+    # see pyipmi.hpm
+    max_request_data_length = LAN_MAX_DATA_LENGTH
+
+    _inc_sequence_number = Rmcp._inc_sequence_number
+    _encode_request = Rmcp._encode_request
+    _create_response = Rmcp._create_response
+
+    def __init__(self, slave_address: int = 0x81,
+                 host_target_address: int = 0x20,
+                 keep_alive_interval: int = 1, max_retries: int = 0,
+                 timeout: float = 2.0, quirks_cfg: dict = dict(),
+                 max_in_flight: int = MAX_IN_FLIGHT,
+                 lazy_decoding: bool = False) -> None:
+        """See `pyipmi.interfaces.rmcp.Rmcp` for the parameters."""
+        self.host = None
+        self.port = None
+        self.seq_number = 0xff
+        self.slave_address = slave_address
+        self.host_target = Target(host_target_address)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.next_sequence_number = 0
+        self.keep_alive_interval = keep_alive_interval
+        self.quirks_cfg = quirks_cfg
+        self.ignore_sdu_length = quirks_cfg.get('rmcp_ignore_sdu_length', False)
+        self.ignore_rq_seq = quirks_cfg.get('rmcp_ignore_rq_seq', False)
+        self._transport = None
+        self._keep_alive_task = None
+        self._keep_alive_failures = 0
+        self._pong = None
+        # (header, future) for each request on the wire
+        self._pending = []
+        # the sequence number has only 6 bits, see Rmcp._send_and_receive_many
+        if not 1 <= max_in_flight <= MAX_IN_FLIGHT:
+            raise RuntimeError('max_in_flight %d not in allowed range [1-%d]'
+                               % (max_in_flight, MAX_IN_FLIGHT))
+        self.max_in_flight = max_in_flight
+        self.lazy_decoding = lazy_decoding
+        # created on first use inside the running event loop
+        self._in_flight = None
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def set_timeout(self, timeout: float) -> None:
+        self.timeout = timeout
+
+    async def _connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        (self._transport, _) = await loop.create_datagram_endpoint(
+                lambda: _RmcpProtocol(self),
+                remote_addr=(self.host, self.port))
+
+    def _send_rmcp_msg(self, sdu: bytes | None, class_of_msg: int) -> None:
+        rmcp = RmcpMsg(class_of_msg)
+        pdu = rmcp.pack(sdu, self.seq_number)
+        self._transport.sendto(pdu)
+        if self.seq_number != 255:
+            self.seq_number = (self.seq_number + 1) % 254
+
+    def _send_ipmi_msg(self, data: bytes) -> None:
+        ipmi = IpmiMsg(self._session)
+        tx_data = ipmi.pack(data)
+        self._send_rmcp_msg(tx_data, RMCP_CLASS_IPMI)
+
+    def _datagram_received(self, pdu: bytes) -> None:
+        try:
+            rmcp = RmcpMsg()
+            sdu = rmcp.unpack(pdu)
+            if rmcp.class_of_msg == RMCP_CLASS_ASF:
+                pong = AsfPong()
+                pong.unpack(sdu)
+                if self._pong is not None and not self._pong.done():
+                    self._pong.set_result(pong)
+                return
+            if rmcp.class_of_msg != RMCP_CLASS_IPMI:
+                raise DecodingError('invalid class field in RMCP message')
+            msg = IpmiMsg(ignore_sdu_length=self.ignore_sdu_length)
+            rx_data = msg.unpack(sdu)
+            if array('B', rx_data)[5] == constants.CMDID_SEND_MESSAGE:
+                rx_data = decode_bridged_message(rx_data)
+                if not rx_data:
+                    # the forwarded reply is expected in a later packet
+                    return
+        except Exception as e:
+            log().debug('RMCP RX: dropped invalid packet (%s)', e)
+            return
+
+        for (header, future) in self._pending:
+            if future.done():
+                continue
+            if rx_filter(header, rx_data, rq_seq=not self.ignore_rq_seq):
+                future.set_result(rx_data)
+                return
+
+        # e.g. a duplicate response to a resent request
+        log().debug('IPMI RX: dropped unexpected response')
+
+    async def ping(self) -> None:
+        if self._transport is None:
+            await self._connect()
+        self._pong = asyncio.get_running_loop().create_future()
+        try:
+            for retry in range(self.max_retries + 1):
+                self._send_rmcp_msg(AsfPing().pack(), RMCP_CLASS_ASF)
+                try:
+                    await asyncio.wait_for(asyncio.shield(self._pong),
+                                           self.timeout)
+                    return
+                except asyncio.TimeoutError:
+                    continue
+        finally:
+            self._pong = None
+
+        raise RetryError("Max retry while waiting for pong from rmcp host "
+                         f"{self.host}")
+
+    async def _send_and_receive(self, target: Target, lun: int, netfn: int,
+                                cmdid: int, payload: bytes) -> bytes:
+        """Send and receive data using the asyncio RMCP interface.
+
+        Returns the received data as bytestring.
+        """
+        if self._transport is None:
+            await self._connect()
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        async with self._in_flight:
+            return await self._send_and_receive_one(target, lun, netfn,
+                                                    cmdid, payload)
+
+    async def _send_and_receive_one(self, target: Target, lun: int,
+                                    netfn: int, cmdid: int,
+                                    payload: bytes) -> bytes:
+        (header, tx_data) = self._encode_request(target, lun, netfn, cmdid,
+                                                 payload)
+        future = asyncio.get_running_loop().create_future()
+        entry = (header, future)
+        self._pending.append(entry)
+        metrics = self.metrics
+        start = time.monotonic()
+
+        try:
+            for retry in range(self.max_retries + 1):
+                if retry and metrics is not None:
+                    metrics.count_retry(netfn, cmdid)
+                self._send_ipmi_msg(tx_data)
+                try:
+                    rx_data = await asyncio.wait_for(asyncio.shield(future),
+                                                     self.timeout)
+                    if metrics is not None:
+                        _observe(metrics, netfn, cmdid, start,
+                                 len(tx_data) * (retry + 1), rx_data)
+                    return rx_data[6:-1]
+                except asyncio.TimeoutError:
+                    if metrics is not None:
+                        metrics.count_timeout(netfn, cmdid)
+                    continue
+        finally:
+            self._pending.remove(entry)
+            future.cancel()
+
+        raise RetryError("Max retry while sending and/or receiving ipmi "
+                         f"message for rmcp host {self.host}")
+
+    async def send_and_receive_raw(self, target: Target, lun: int, netfn: int,
+                                   raw_bytes: bytes) -> bytes:
+        """Interface function to send and receive raw message.
+
+        Returns the IPMI message response bytestring.
+        """
+        return await self._send_and_receive(target=target,
+                                            lun=lun,
+                                            netfn=netfn,
+                                            cmdid=array('B', raw_bytes)[0],
+                                            payload=raw_bytes[1:])
+
+    async def send_and_receive(self, req: Message) -> Message:
+        """Interface function to send and receive an IPMI message.
+
+        Returns the IPMI message response.
+        """
+        rx_data = await self._send_and_receive(target=req.target,
+                                               lun=req.lun,
+                                               netfn=req.netfn,
+                                               cmdid=req.cmdid,
+                                               payload=encode_message(req))
+        return self._create_response(req, rx_data)
+
+    async def _send_request(self, req: Message) -> Message:
+        req.target = self.host_target
+        return await self.send_and_receive(req)
+
+    async def establish_session(self, session: Session) -> None:
+        self._session = None
+        self._keep_alive_failures = 0
+        self.host = session._rmcp_host
+        self.port = session._rmcp_port
+
+        # 0 - Ping
+        await self.ping()
+
+        # 1 - Get Channel Authentication Capabilities
+        log().debug('Get Channel Authentication Capabilities')
+        req = create_request_by_name('GetChannelAuthenticationCapabilities')
+        req.channel.number = 0xe
+        req.privilege_level.requested = session.priv_level
+        rsp = await self._send_request(req)
+        check_completion_code(rsp.completion_code)
+        caps = ChannelAuthenticationCapabilities(rsp)
+
+        # 2 - Get Session Challenge
+        log().debug('Get Session Challenge')
+        session.auth_type = caps.get_max_auth_type()
+        req = create_request_by_name('GetSessionChallenge')
+        req.authentication.type = session.auth_type
+        if session._auth_username:
+            req.user_name = session._auth_username.ljust(16, '\x00')
+        rsp = await self._send_request(req)
+        check_rsp_completion_code(rsp)
+        session.sid = rsp.temporary_session_id
+
+        self._session = session
+
+        # 3 - Activate Session
+        log().debug('Activate Session')
+        req = create_request_by_name('ActivateSession')
+        req.authentication.type = session.auth_type
+        req.privilege_level.maximum_requested = session.priv_level
+        req.challenge_string = rsp.challenge_string
+        req.session_id = session.sid
+        req.initial_outbound_sequence_number = random.randrange(1, 0xffffffff)
+        rsp = await self._send_request(req)
+        check_rsp_completion_code(rsp)
+        session.sid = rsp.session_id
+        session.sequence_number = rsp.initial_inbound_sequence_number
+        session.activated = True
+
+        # 4 - Set Session Privilege Level
+        log().debug('Set Session Privilege Level')
+        req = create_request_by_name('SetSessionPrivilegeLevel')
+        req.privilege_level.requested = session.priv_level
+        rsp = await self._send_request(req)
+        check_rsp_completion_code(rsp)
+
+        log().debug('Session opened')
+
+        if self.keep_alive_interval:
+            self._keep_alive_task = asyncio.ensure_future(self._keep_alive())
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.keep_alive_interval)
+            try:
+                rsp = await self._send_request(
+                        create_request_by_name('GetDeviceId'))
+                check_completion_code(rsp.completion_code)
+            except Exception as e:
+                self._keep_alive_failures += 1
+                log().debug('keep alive failed: %s', e)
+            else:
+                self._keep_alive_failures = 0
+
+    def is_session_alive(self) -> bool:
+        """Return if the session is activated and the last keep alive
+        succeeded."""
+        return (self._session is not None and self._session.activated
+                and self._keep_alive_failures == 0)
+
+    async def close_session(self) -> None:
+        if self._keep_alive_task is not None:
+            self._keep_alive_task.cancel()
+            self._keep_alive_task = None
+
+        if self._session is None or self._session.activated is False:
+            log().debug('Session already closed')
+            return
+
+        log().debug('Close Session %s' % self._session)
+        req = create_request_by_name('CloseSession')
+        req.session_id = self._session.sid
+        rsp = await self._send_request(req)
+        check_completion_code(rsp.completion_code)
+        self._session.activated = False
@@ -27,6 +27,15 @@ from ..utils import check_completion_code
 from ..utils import py3_array_tobytes, py3_array_frombytes
 
 
+# an IPMB message has at most 32 bytes, 7 of them are the header, the
+# command and the checksums
+IPMB_MAX_MSG_LENGTH = 32
+IPMB_MSG_OVERHEAD = 7
+IPMB_MAX_DATA_LENGTH = IPMB_MAX_MSG_LENGTH - IPMB_MSG_OVERHEAD
+# the channel of a send message request
+SEND_MESSAGE_OVERHEAD = 1 + IPMB_MSG_OVERHEAD
+
+
 def checksum(data: Iterable[int]) -> int:
     """Calculate the checksum."""
     csum = 0
@@ -209,6 +218,23 @@ def encode_bridged_message(routing: list[Routing], header: IpmbHeaderReq,
     return tx_data
 
 
+def max_bridged_data_length(max_data_length: int,
+                            routing: list[Routing] | None) -> int:
+    """Return the maximal request data length to a (multi-)bridged target.
+
+    max_data_length: the maximal request data length of the interface
+    routing: the routing of the target, see `encode_bridged_message`
+
+    Each bridge embeds the message into a send message request, which is
+    sent on IPMB to the next bridge.
+    """
+    bridges = len(routing) - 1 if routing else 0
+    if bridges <= 0:
+        return max_data_length
+    return min(max_data_length - bridges * SEND_MESSAGE_OVERHEAD,
+               IPMB_MAX_DATA_LENGTH - (bridges - 1) * SEND_MESSAGE_OVERHEAD)
+
+
 def decode_bridged_message(rx_data: bytes) -> bytes:
     """Decode a (multi-)bridged command.
 
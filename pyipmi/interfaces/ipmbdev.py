@@ -8,8 +8,9 @@ from array import array
 from .. import Target
 from ..msgs import create_message, encode_message, decode_message, Message
 from ..errors import IpmiTimeoutError
-from ..logger import log
-from ..interfaces.ipmb import IpmbHeaderReq, checksum, rx_filter, encode_ipmb_msg
+from ..logger import log, HexDump
+from ..interfaces.ipmb import (IpmbHeaderReq, checksum, rx_filter,
+                               encode_ipmb_msg, IPMB_MAX_DATA_LENGTH)
 from ..session import Session
 
 
@@ -17,6 +18,10 @@ class IpmbDev(object):
     """This interface uses ipmb-dev-int linux driver."""
 
     NAME = 'ipmbdev'
+    # see pyipmi.metrics
+    metrics = None
+    # see pyipmi.hpm
+    max_request_data_length = IPMB_MAX_DATA_LENGTH
 
     def __init__(self, slave_address: int = 0x20,
                  port: str = '/dev/ipmb-0') -> None:
@@ -68,8 +73,7 @@ class IpmbDev(object):
         raw_bytes = encode_ipmb_msg(header, raw_bytes)
         i2c_addr = header.rs_sa >> 1
 
-        log().debug('I2C TX to %02Xh [%s]', i2c_addr,
-                    ' '.join(['%02x' % b for b in raw_bytes]))
+        log().debug('I2C TX to %02Xh [%s]', i2c_addr, HexDump(raw_bytes))
         os.write(self._dev, bytes([len(raw_bytes)]) + raw_bytes)
 
     def _receive_raw(self, header: IpmbHeaderReq) -> array:
@@ -94,7 +98,7 @@ class IpmbDev(object):
 
             rx_data = array('B', rx_data)
             log().debug('I2C RX from %02Xh [%s]', rx_data[3],
-                        ' '.join(['%02x' % c for c in rx_data]))
+                        HexDump(rx_data))
 
             rsp_received = rx_filter(header, rx_data)
             rx_data = rx_data[1:]
@@ -125,14 +129,21 @@ class IpmbDev(object):
         header.rq_sa = self.slave_address
         header.cmdid = cmdid
 
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.monotonic()
+
         retries = 0
         while retries < self.max_retries:
+            if retries and metrics is not None:
+                metrics.count_retry(netfn, cmdid)
             try:
                 self._send_raw(header, payload)
                 rx_data = self._receive_raw(header)
                 break
             except IpmiTimeoutError:
-                pass
+                if metrics is not None:
+                    metrics.count_timeout(netfn, cmdid)
             except IOError:
                 pass
 
@@ -142,6 +153,12 @@ class IpmbDev(object):
         else:
             raise IpmiTimeoutError()
 
+        if metrics is not None:
+            # the IPMB message is the header, the payload and the checksum
+            metrics.observe(netfn, cmdid, time.monotonic() - start,
+                            (len(payload) + 7) * (retries + 1), len(rx_data),
+                            rx_data[5] if len(rx_data) > 6 else None)
+
         return rx_data[5:-1]
 
     def send_and_receive_raw(self, target: Target, lun: int, netfn: int,
@@ -17,9 +17,15 @@
 
 from __future__ import annotations
 
+import os
 import re
+import select
+import shutil
+import tempfile
+import threading
+import time
 
-from subprocess import Popen, PIPE
+from subprocess import Popen, PIPE, STDOUT
 from array import array
 
 from .. import Target
@@ -30,10 +36,158 @@ from ..errors import (
     IpmiLongPasswordError,
     AuthenticationError,
 )
-from ..logger import log
+from ..logger import log, HexDump
 from ..msgs import encode_message, decode_message, create_message, Message
 from ..msgs.constants import CC_OK
 from ..utils import py3dec_unic_bytes_fix, ByteBuffer, py3_array_tobytes
+from ..interfaces.ipmb import IPMB_MAX_DATA_LENGTH
+from ..interfaces.rmcp import LAN_MAX_DATA_LENGTH
+
+
+def _unbuffered(cmd: str) -> str:
+    """Return the command with an unbuffered stdout if possible.
+
+    ipmitool does not flush stdout on a pipe, so the output of a command
+    could stay in its buffer or get behind the error messages on stderr.
+    """
+    stdbuf = shutil.which('stdbuf')
+    if stdbuf:
+        return '%s -o0 %s' % (stdbuf, cmd)
+    return cmd
+
+
+def _build_script(commands: list[str],
+                  first: int = 1) -> tuple[str, list[bytes]]:
+    """Return the script running the commands and their end markers.
+
+    Each command is followed by an `echo` of a unique marker.
+    """
+    script = ''
+    markers = []
+    for (index, command) in enumerate(commands, first):
+        marker = '__pyipmi_%d__' % index
+        markers.append(marker.encode())
+        script += '%s\necho %s\n' % (command, marker)
+    return (script, markers)
+
+
+def _split_output(output: bytes, markers: list[bytes]) -> list[bytes]:
+    """Split the output of a script at the markers.
+
+    If not all markers are found, the output after the last one found is
+    returned as the output of the next command.
+    """
+    outputs = []
+    for marker in markers:
+        index = output.find(marker)
+        if index < 0:
+            outputs.append(output)
+            break
+        outputs.append(output[:index])
+        output = output[index + len(marker):]
+        output = output.split(b'\n', 1)[1] if b'\n' in output else b''
+    return outputs
+
+
+class _IpmitoolShell(object):
+    """A long running `ipmitool ... shell` process.
+
+    The commands are written to its stdin. Each one is followed by an
+    `echo` of a unique marker, the output of the command is everything up
+    to the marker.
+    """
+
+    PROMPT = 'ipmitool> '
+
+    def __init__(self, cmd: str, timeout: float) -> None:
+        cmd = _unbuffered(cmd)
+        log().debug('Starting ipmitool "%s"', cmd)
+
+        self.timeout = timeout
+        self._child = Popen(cmd, shell=True, stdin=PIPE, stdout=PIPE,
+                            stderr=STDOUT)
+        self._buffer = b''
+        self._counter = 0
+        self.lock = threading.Lock()
+
+    def is_alive(self) -> bool:
+        return self._child.poll() is None
+
+    def execute(self, commands: list[str]) -> list[bytes] | None:
+        """Run the commands and return the output of each one.
+
+        Returns None if ipmitool exited, the output collected so far is
+        then in `self.output`.
+        """
+        (script, markers) = _build_script(commands, self._counter + 1)
+        self._counter += len(commands)
+
+        try:
+            self._child.stdin.write(script.encode())
+            self._child.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self.output = self._read_remaining()
+            return None
+
+        outputs = []
+        for marker in markers:
+            output = self._read_until(marker)
+            if output is None:
+                return None
+            outputs.append(output)
+        return outputs
+
+    def _read_until(self, marker: bytes) -> bytes | None:
+        fd = self._child.stdout.fileno()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            index = self._buffer.find(marker)
+            if index >= 0:
+                output = self._buffer[:index]
+                self._buffer = self._buffer[index + len(marker):]
+                # drop the rest of the marker line
+                self._buffer = self._buffer.split(b'\n', 1)[-1] \
+                    if b'\n' in self._buffer else b''
+                return output.replace(self.PROMPT.encode(), b'')
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise IpmiTimeoutError()
+            (readable, _, _) = select.select([fd], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                self.output = self._buffer
+                self._buffer = b''
+                self._child.wait()
+                return None
+            self._buffer += chunk
+
+    def _read_remaining(self) -> bytes:
+        output = self._buffer + self._child.stdout.read()
+        self._buffer = b''
+        self._child.wait()
+        return output
+
+    def close(self) -> None:
+        if self.is_alive():
+            try:
+                self._child.stdin.write(b'exit\n')
+                self._child.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                self._child.wait(1)
+            except Exception:
+                self._child.kill()
+                self._child.wait()
+        for f in (self._child.stdin, self._child.stdout):
+            try:
+                f.close()
+            except (BrokenPipeError, OSError):
+                pass
 
 
 class Ipmitool(object):
@@ -44,13 +198,29 @@ class Ipmitool(object):
     It uses the session information to assemble the correct ipmitool
     parameters. Therefore, a session has to be established before any request
     can be sent.
+
+    `send_and_receive_many` runs a list of requests with one ipmitool
+    `exec` script.
+
+    With `persistent=True` one `ipmitool ... shell` process per target is
+    kept running and the raw commands are streamed to it, instead of
+    starting ipmitool (and for lan/lanplus establishing a session) for
+    every command.
     """
 
     NAME = 'ipmitool'
     IPMITOOL_PATH = 'ipmitool'
+    # maximal time to wait for the output of a command in persistent mode
+    SHELL_TIMEOUT = 60.0
+    # maximal number of commands written to the shell at once, the output
+    # of more could fill the pipe while ipmitool waits to write it
+    SHELL_BATCH_SIZE = 32
     supported_interfaces = ['lan', 'lanplus', 'serial-terminal', 'open']
+    # see pyipmi.metrics
+    metrics = None
 
-    def __init__(self, interface_type: str = 'lan', cipher: int | None = None) -> None:
+    def __init__(self, interface_type: str = 'lan', cipher: int | None = None,
+                 persistent: bool = False) -> None:
         if interface_type in self.supported_interfaces:
             self._interface_type = interface_type
         else:
@@ -77,18 +247,35 @@ class Ipmitool(object):
         self.re_raw_request = re.compile(
                 r".*RAW REQUEST\s*\((\d+)\s*bytes?\)")
         self._session = None
+        self._persistent = persistent
+        # see pyipmi.hpm
+        if interface_type in ('lan', 'lanplus'):
+            self.max_request_data_length = LAN_MAX_DATA_LENGTH
+        else:
+            self.max_request_data_length = IPMB_MAX_DATA_LENGTH
+        self._shells = {}
+        self._shells_lock = threading.Lock()
 
     def open(self) -> None:
         pass
 
     def close(self) -> None:
-        pass
+        self._close_shells()
 
     def establish_session(self, session: Session) -> None:
+        self._close_shells()
         self._session = session
 
     def close_session(self) -> None:
-        pass
+        self._close_shells()
+
+    def _close_shells(self) -> None:
+        with self._shells_lock:
+            shells = list(self._shells.values())
+            self._shells = {}
+        for shell in shells:
+            with shell.lock:
+                shell.close()
 
     def rmcp_ping(self) -> None:
 
@@ -200,8 +387,44 @@ class Ipmitool(object):
 
         return cc, rsp
 
-    def send_and_receive_raw(self, target: Target, lun: int, netfn: int,
-                             raw_bytes: bytes) -> bytes:
+    def _run_shell(self, target: Target, lun: int,
+                   commands: list[str]) -> list[bytes]:
+        """Run the commands in the ipmitool shell of the target."""
+        cmd = self._build_ipmitool_shell_cmd(target, lun)
+        with self._shells_lock:
+            shell = self._shells.get(cmd)
+            if shell is None or not shell.is_alive():
+                shell = _IpmitoolShell(cmd, self.SHELL_TIMEOUT)
+                self._shells[cmd] = shell
+
+        with shell.lock:
+            try:
+                outputs = shell.execute(commands)
+            except IpmiTimeoutError:
+                self._remove_shell(cmd, shell)
+                raise
+        log().debug('ipmitool shell output was:\n%s', outputs)
+
+        if outputs is None:
+            self._remove_shell(cmd, shell)
+            # report the reason, e.g. a session that could not be
+            # established
+            self._parse_output(shell.output)
+            raise IpmiConnectionError('ipmitool shell exited: {}'.format(
+                py3dec_unic_bytes_fix(shell.output).strip()))
+        return outputs
+
+    def _remove_shell(self, cmd: str, shell: _IpmitoolShell) -> None:
+        with self._shells_lock:
+            if self._shells.get(cmd) is shell:
+                del self._shells[cmd]
+
+    def _run_raw(self, target: Target, lun: int, netfn: int,
+                 raw_bytes: bytes) -> tuple[bytes, int]:
+        if self._persistent:
+            command = self._build_ipmitool_raw_command(netfn, raw_bytes)
+            return (self._run_shell(target, lun, [command])[0], 0)
+
         if self._interface_type in ['lan', 'lanplus']:
             cmd = self._build_ipmitool_cmd(target, lun, netfn, raw_bytes)
         elif self._interface_type in ['open']:
@@ -212,9 +435,55 @@ class Ipmitool(object):
         else:
             raise RuntimeError('interface type %s not supported' %
                                self._interface_type)
-
-        output, rc = self._run_ipmitool(cmd)
-        cc, rsp = self._parse_output(output)
+        return self._run_ipmitool(cmd)
+
+    def _run_exec(self, target: Target, lun: int,
+                  commands: list[str]) -> list[bytes]:
+        """Run the commands with one `ipmitool ... exec` call."""
+        outputs = []
+        while len(outputs) < len(commands):
+            # ipmitool might stop at a failing command, the remaining ones
+            # are run with the next call
+            (script, markers) = _build_script(commands[len(outputs):])
+            (fd, filename) = tempfile.mkstemp(suffix='.ipmitool')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(script)
+                cmd = self._build_ipmitool_exec_cmd(target, lun, filename)
+                output, _ = self._run_ipmitool(_unbuffered(cmd))
+            finally:
+                os.remove(filename)
+
+            split = _split_output(output, markers)
+            if len(split) == 1 and len(markers) > 1:
+                # not even the first command completed, report e.g. a
+                # session that could not be established
+                self._parse_output(split[0])
+            outputs.extend(split)
+        return outputs
+
+    def _run_commands(self, target: Target, lun: int,
+                      commands: list[str]) -> list[bytes]:
+        if not self._persistent:
+            return self._run_exec(target, lun, commands)
+
+        outputs = []
+        for index in range(0, len(commands), self.SHELL_BATCH_SIZE):
+            outputs.extend(self._run_shell(
+                target, lun, commands[index:index + self.SHELL_BATCH_SIZE]))
+        return outputs
+
+    def _count_timeout(self, netfn: int, raw_bytes: bytes) -> None:
+        if self.metrics is not None:
+            self.metrics.count_timeout(netfn, array('B', raw_bytes)[0])
+
+    def _response_data(self, netfn: int, raw_bytes: bytes, output: bytes,
+                       rc: int, elapsed: float | None = None) -> bytes:
+        try:
+            cc, rsp = self._parse_output(output)
+        except IpmiTimeoutError:
+            self._count_timeout(netfn, raw_bytes)
+            raise
 
         data = array('B')
 
@@ -228,33 +497,113 @@ class Ipmitool(object):
             if rsp:
                 data.extend(rsp)
 
-        log().debug('IPMI RX: {:s}'.format(
-            ''.join('%02x ' % b for b in array('B', data))))
+        log().debug('IPMI RX: %s', HexDump(data))
+        metrics = self.metrics
+        if metrics is not None and elapsed is not None:
+            metrics.observe(netfn, array('B', raw_bytes)[0], elapsed,
+                            len(raw_bytes), len(data), data[0])
 
         return py3_array_tobytes(data)
 
+    def send_and_receive_raw(self, target: Target, lun: int, netfn: int,
+                             raw_bytes: bytes) -> bytes:
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.monotonic()
+        try:
+            output, rc = self._run_raw(target, lun, netfn, raw_bytes)
+        except IpmiTimeoutError:
+            self._count_timeout(netfn, raw_bytes)
+            raise
+
+        elapsed = None
+        if metrics is not None:
+            elapsed = time.monotonic() - start
+        return self._response_data(netfn, raw_bytes, output, rc, elapsed)
+
+    def send_and_receive_raw_many(self, requests: list[tuple]) -> list[bytes]:
+        """Send multiple raw commands as one batch.
+
+        requests: list of (target, lun, netfn, raw_bytes) tuples
+
+        The commands of the same target and lun are run by one ipmitool
+        exec script, or streamed to the shell in persistent mode. Returns
+        the raw responses in request order.
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.monotonic()
+
+        groups = {}
+        for (index, (target, lun, _, _)) in enumerate(requests):
+            key = (self._build_ipmitool_target(target), lun)
+            groups.setdefault(key, (target, lun, []))[2].append(index)
+
+        outputs = [b''] * len(requests)
+        for (target, lun, indices) in groups.values():
+            commands = [self._build_ipmitool_raw_command(*requests[i][2:])
+                        for i in indices]
+            try:
+                group_outputs = self._run_commands(target, lun, commands)
+            except IpmiTimeoutError:
+                for i in indices:
+                    self._count_timeout(*requests[i][2:])
+                raise
+            for (i, output) in zip(indices, group_outputs):
+                outputs[i] = output
+
+        elapsed = None
+        if metrics is not None and requests:
+            # the time of the batch is shared by its requests
+            elapsed = (time.monotonic() - start) / len(requests)
+        return [self._response_data(netfn, raw_bytes, output, 0, elapsed)
+                for ((_, _, netfn, raw_bytes), output)
+                in zip(requests, outputs)]
+
     def send_and_receive(self, req: Message) -> Message:
         log().debug('IPMI Request [%s]', req)
 
+        rsp_data = self.send_and_receive_raw(req.target, req.lun, req.netfn,
+                                             self._encode_request(req))
+
+        return self._decode_response(req, rsp_data)
+
+    def send_and_receive_many(self, reqs: list[Message]) -> list[Message]:
+        """Interface function to send and receive multiple IPMI messages.
+
+        The requests are sent as one batch, see `send_and_receive_raw_many`.
+
+        Returns the list of IPMI message responses in request order.
+        """
+        requests = [(req.target, req.lun, req.netfn, self._encode_request(req))
+                    for req in reqs]
+        return [self._decode_response(req, rsp_data) for (req, rsp_data)
+                in zip(reqs, self.send_and_receive_raw_many(requests))]
+
+    @staticmethod
+    def _encode_request(req: Message) -> bytes:
         req_data = ByteBuffer((req.cmdid,))
         req_data.push_string(encode_message(req))
+        return py3_array_tobytes(req_data)
 
-        rsp_data = self.send_and_receive_raw(req.target, req.lun, req.netfn,
-                                             py3_array_tobytes(req_data))
-
+    @staticmethod
+    def _decode_response(req: Message, rsp_data: bytes) -> Message:
         rsp = create_message(req.netfn + 1, req.cmdid, req.group_extension)
         decode_message(rsp, rsp_data)
         log().debug('IPMI Response [%s])', rsp)
-
         return rsp
 
     @staticmethod
     def _build_ipmitool_raw_data(lun: int, netfn: int, raw: bytes) -> str:
-        cmd = ' -l {:d} raw '.format(lun)
-        cmd += ' '.join(['0x%02x' % (d)
-                         for d in [netfn] + array('B', raw).tolist()])
+        cmd = ' -l {:d} '.format(lun)
+        cmd += Ipmitool._build_ipmitool_raw_command(netfn, raw)
         return cmd
 
+    @staticmethod
+    def _build_ipmitool_raw_command(netfn: int, raw: bytes) -> str:
+        return 'raw ' + ' '.join(['0x%02x' % (d)
+                                  for d in [netfn] + array('B', raw).tolist()])
+
     @staticmethod
     def _build_ipmitool_target(target: Target) -> str:
         cmd = ''
@@ -291,30 +640,40 @@ class Ipmitool(object):
 
         return (' -L %s' % LEVELS[level])
 
-    def _build_ipmitool_cmd(self, target: Target, lun: int, netfn: int,
-                            raw_bytes: bytes) -> str:
+    def _build_ipmitool_base_cmd(self) -> str:
+        """Return the ipmitool call with the interface and session options."""
         if not hasattr(self, '_session'):
             raise RuntimeError('Session needs to be set')
 
         cmd = self.IPMITOOL_PATH
         cmd += (' -I %s' % self._interface_type)
-        cmd += (' -H %s' % self._session.rmcp_host)
-        cmd += (' -p %s' % self._session.rmcp_port)
-        cmd += (' -v')
 
-        cmd += self._build_ipmitool_priv_level(self._session.priv_level)
+        if self._interface_type in ['lan', 'lanplus']:
+            cmd += (' -H %s' % self._session.rmcp_host)
+            cmd += (' -p %s' % self._session.rmcp_port)
+            cmd += (' -v')
+
+            cmd += self._build_ipmitool_priv_level(self._session.priv_level)
+
+            if self._cipher:
+                cmd += (' -C %s' % self._cipher)
+            if self._session.auth_type == Session.AUTH_TYPE_NONE:
+                cmd += ' -P ""'
+            elif self._session.auth_type == Session.AUTH_TYPE_PASSWORD:
+                cmd += (' -U "%s"' % self._session.auth_username)
+                cmd += (' -P "%s"' % self._session.auth_password)
+            else:
+                raise RuntimeError('Session type %d not supported' %
+                                   self._session.auth_type)
+        elif self._interface_type in ['serial-terminal']:
+            cmd += (' -D %s:%s' % (self._session.serial_port,
+                                   self._session.serial_baudrate))
 
-        if self._cipher:
-            cmd += (' -C %s' % self._cipher)
-        if self._session.auth_type == Session.AUTH_TYPE_NONE:
-            cmd += ' -P ""'
-        elif self._session.auth_type == Session.AUTH_TYPE_PASSWORD:
-            cmd += (' -U "%s"' % self._session.auth_username)
-            cmd += (' -P "%s"' % self._session.auth_password)
-        else:
-            raise RuntimeError('Session type %d not supported' %
-                               self._session.auth_type)
+        return cmd
 
+    def _build_ipmitool_cmd(self, target: Target, lun: int, netfn: int,
+                            raw_bytes: bytes) -> str:
+        cmd = self._build_ipmitool_base_cmd()
         cmd += self._build_ipmitool_target(target)
         cmd += self._build_ipmitool_raw_data(lun, netfn, raw_bytes)
         cmd += (' 2>&1')
@@ -323,17 +682,7 @@ class Ipmitool(object):
 
     def _build_serial_ipmitool_cmd(self, target: Target, lun: int, netfn: int,
                                    raw_bytes: bytes) -> str:
-        if not hasattr(self, '_session'):
-            raise RuntimeError('Session needs to be set')
-
-        cmd = '{path!s:s} -I {interface!s:s} -D {port!s:s}:{baud!s:s}'\
-            .format(
-                path=self.IPMITOOL_PATH,
-                interface=self._interface_type,
-                port=self._session.serial_port,
-                baud=self._session.serial_baudrate
-            )
-
+        cmd = self._build_ipmitool_base_cmd()
         cmd += self._build_ipmitool_target(target)
         cmd += self._build_ipmitool_raw_data(lun, netfn, raw_bytes)
 
@@ -341,18 +690,24 @@ class Ipmitool(object):
 
     def _build_open_ipmitool_cmd(self, target: Target, lun: int, netfn: int,
                                  raw_bytes: bytes) -> str:
-        if not hasattr(self, '_session'):
-            raise RuntimeError('Session needs to be set')
-
-        cmd = self.IPMITOOL_PATH
-        cmd += (' -I %s' % self._interface_type)
+        return self._build_ipmitool_cmd(target, lun, netfn, raw_bytes)
 
+    def _build_ipmitool_exec_cmd(self, target: Target, lun: int,
+                                 filename: str) -> str:
+        cmd = self._build_ipmitool_base_cmd()
         cmd += self._build_ipmitool_target(target)
-        cmd += self._build_ipmitool_raw_data(lun, netfn, raw_bytes)
+        cmd += ' -l {:d} exec {}'.format(lun, filename)
         cmd += (' 2>&1')
 
         return cmd
 
+    def _build_ipmitool_shell_cmd(self, target: Target, lun: int) -> str:
+        cmd = self._build_ipmitool_base_cmd()
+        cmd += self._build_ipmitool_target(target)
+        cmd += ' -l {:d} shell'.format(lun)
+
+        return cmd
+
     @staticmethod
     def _run_ipmitool(cmd: str) -> tuple[bytes, int]:
         """Legacy call of ipmitool (will be removed in future)."""
@@ -21,17 +21,19 @@ import struct
 import hashlib
 import random
 import threading
+import time
 from array import array
-from queue import Queue
+from collections import deque
 from typing import Any, Callable
 
 from .. import Target
 from ..session import Session
-from ..msgs import (create_message, create_request_by_name,
-                    encode_message, decode_message, constants, Message)
+from ..msgs import (create_message, create_lazy_message,
+                    create_request_by_name, encode_message, decode_message,
+                    constants, Message)
 from ..messaging import ChannelAuthenticationCapabilities
 from ..errors import DecodingError, NotSupportedError, RetryError
-from ..logger import log
+from ..logger import log, HexDump
 from ..interfaces.ipmb import (IpmbHeaderReq, encode_ipmb_msg,
                                encode_bridged_message, decode_bridged_message,
                                rx_filter)
@@ -46,6 +48,18 @@ RMCP_CLASS_ASF = 0x06
 RMCP_CLASS_IPMI = 0x07
 RMCP_CLASS_OEM = 0x08
 
+# maximal request data length of an IPMI message on LAN, the 45 bytes long
+# messages ipmitool assumes minus the header, the command and the checksums
+LAN_MAX_DATA_LENGTH = 38
+
+# the rq_seq field is 6 bits wide, keep enough sequence numbers unused to
+# not confuse a late response with a new request
+MAX_IN_FLIGHT = 32
+
+# resend a pipelined request this often while the node is busy, like
+# `Ipmi.send_message` does for a single request
+BUSY_RETRIES = 2
+
 
 def call_repeatedly(interval: float, func: Callable[..., Any],
                     *args: Any) -> Callable[[], None]:
@@ -192,6 +206,7 @@ class AsfPong(AsfMsg):
     DATA_FORMAT = '!IIBB6x'
 
     def __init__(self) -> None:
+        AsfMsg.__init__(self)
         self.asf_type = self.ASF_TYPE_PRESENCE_PONG
         self.oem_iana_enterprise_number = 4542
         self.oem_defined = 0
@@ -199,12 +214,12 @@ class AsfPong(AsfMsg):
         self.supported_interactions = 0
 
     def pack(self) -> bytes:
-        pdu = struct.pack(self.DATA_FORMAT,
-                          self.oem_iana_enterprise_number,
-                          self.oem_defined,
-                          self.supported_entities,
-                          self.supported_interactions)
-        return pdu
+        self.data = struct.pack(self.DATA_FORMAT,
+                                self.oem_iana_enterprise_number,
+                                self.oem_defined,
+                                self.supported_entities,
+                                self.supported_interactions)
+        return AsfMsg.pack(self)
 
     def unpack(self, sdu: bytes) -> None:
         AsfMsg.unpack(self, sdu)
@@ -360,17 +375,53 @@ class IpmiMsg(object):
         pass
 
 
+def _observe(metrics: Any, netfn: int, cmdid: int, start: float,
+             tx_bytes: int, rx_data: bytes) -> None:
+    """Record a transaction, `rx_data` is the received IPMB message."""
+    metrics.observe(netfn, cmdid, time.monotonic() - start, tx_bytes,
+                    len(rx_data), rx_data[6] if len(rx_data) > 7 else None)
+
+
+class _PendingRequest(object):
+    """A request of `Rmcp._send_and_receive_many` and its transmissions."""
+
+    def __init__(self, index: int, request: tuple) -> None:
+        self.index = index
+        self.request = request
+        self.header = None
+        self.tx_data = None
+        self.tx_bytes = 0
+        self.retry = 0
+        self.busy_retry = 0
+        self.start = time.monotonic()
+
+
 class Rmcp(object):
     NAME = 'rmcp'
 
     _session: Session | None = None
+    # see pyipmi.metrics
+    metrics = None
+    # see pyipmi.hpm
+    max_request_data_length = LAN_MAX_DATA_LENGTH
 
     def __init__(self, slave_address: int = 0x81,
                  host_target_address: int = 0x20,
                  keep_alive_interval: int = 1, max_retries: int = 0,
-                 quirks_cfg: dict = dict()) -> None:
+                 quirks_cfg: dict = dict(), max_in_flight: int = 1,
+                 lazy_decoding: bool = False) -> None:
         """Native RMCP interface constructor
 
+        Parameter `max_in_flight`: the number of requests that
+        `send_and_receive_many` keeps outstanding on the session at the same
+        time. The responses are matched to the requests by their sequence
+        number. The default of 1 sends the requests one after another.
+
+        Parameter `lazy_decoding`: if `True`, only the completion code of a
+        response is decoded right away, the other fields are decoded on the
+        first access of one of them. A decoding error is raised at that
+        point as `AttributeError` instead of by `send_and_receive`.
+
         Parameter `quirks_cfg`: a dict of additional configuration parameters
         for the RMCP object. Supported keys/values are :
 
@@ -407,11 +458,19 @@ class Rmcp(object):
         self.next_sequence_number = 0
         self.keep_alive_interval = keep_alive_interval
         self._stop_keep_alive = None
-        self._q = Queue()
+        self._keep_alive_failures = 0
+        # responses which did not match a pending request, see
+        # `_receive_response`
+        self._q = deque(maxlen=MAX_IN_FLIGHT)
         self.transaction_lock = threading.Lock()
         self.quirks_cfg = quirks_cfg
         self.ignore_sdu_length = quirks_cfg.get('rmcp_ignore_sdu_length', False)
         self.ignore_rq_seq = quirks_cfg.get('rmcp_ignore_rq_seq', False)
+        if not 1 <= max_in_flight <= MAX_IN_FLIGHT:
+            raise RuntimeError('max_in_flight %d not in allowed range [1-%d]'
+                               % (max_in_flight, MAX_IN_FLIGHT))
+        self.max_in_flight = max_in_flight
+        self.lazy_decoding = lazy_decoding
 
     def open(self) -> None:
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -437,8 +496,7 @@ class Rmcp(object):
         self._sock.settimeout(timeout)
 
     def _send_ipmi_msg(self, data: bytes) -> None:
-        log().debug('IPMI TX: {:s}'.format(
-            ' '.join('%02x' % b for b in array('B', data))))
+        log().debug('IPMI TX: %s', HexDump(data))
         ipmi = IpmiMsg(self._session)
         tx_data = ipmi.pack(data)
         self._send_rmcp_msg(tx_data, RMCP_CLASS_IPMI)
@@ -449,8 +507,7 @@ class Rmcp(object):
             raise DecodingError('invalid class field in ASF message')
         msg = IpmiMsg(ignore_sdu_length=ignore_sdu_length)
         data = msg.unpack(pdu)
-        log().debug('IPMI RX: {:s}'.format(
-            ' '.join('%02x' % b for b in array('B', data))))
+        log().debug('IPMI RX: %s', HexDump(data))
         return data
 
     def _send_asf_msg(self, msg: AsfMsg) -> None:
@@ -522,8 +579,24 @@ class Rmcp(object):
         rsp = self.send_and_receive(req)
         check_completion_code(rsp.completion_code)
 
+    def _keep_alive(self) -> None:
+        try:
+            self._get_device_id()
+        except Exception as e:
+            self._keep_alive_failures += 1
+            log().debug('keep alive failed: %s', e)
+        else:
+            self._keep_alive_failures = 0
+
+    def is_session_alive(self) -> bool:
+        """Return if the session is activated and the last keep alive
+        succeeded."""
+        return (self._session is not None and self._session.activated
+                and self._keep_alive_failures == 0)
+
     def establish_session(self, session: Session) -> None:
         self._session = None
+        self._keep_alive_failures = 0
         self.host = session._rmcp_host
         self.port = session._rmcp_port
 
@@ -559,7 +632,7 @@ class Rmcp(object):
 
         if self.keep_alive_interval:
             self._stop_keep_alive = call_repeatedly(
-                    self.keep_alive_interval, self._get_device_id)
+                    self.keep_alive_interval, self._keep_alive)
 
     def close_session(self) -> None:
         if self._stop_keep_alive:
@@ -577,22 +650,14 @@ class Rmcp(object):
         check_completion_code(rsp.completion_code)
         self._session.activated = False
 
-#        self._q.join()
-
     def _inc_sequence_number(self) -> None:
         self.next_sequence_number = (self.next_sequence_number + 1) % 64
 
-    def _send_and_receive(self, target: Target, lun: int, netfn: int,
-                          cmdid: int, payload: bytes) -> bytes:
-        """Send and receive data using RMCP interface.
+    def _encode_request(self, target: Target, lun: int, netfn: int,
+                        cmdid: int, payload: bytes) -> tuple[IpmbHeaderReq, bytes]:
+        """Build the IPMB request with the next sequence number.
 
-        target:
-        lun:
-        netfn:
-        cmdid:
-        raw_bytes: IPMI message payload as bytestring
-
-        Returns the received data as array.
+        Returns the request header and the (bridged) message as bytestring.
         """
         self._inc_sequence_number()
 
@@ -612,50 +677,139 @@ class Rmcp(object):
         else:
             tx_data = encode_ipmb_msg(header, payload)
 
-        with self.transaction_lock:
-            retry = 0
-            while retry <= self.max_retries:
-                try:
-                    self._send_ipmi_msg(tx_data)
-
-                    received = False
-                    received_retry = 0
-                    while received is False and received_retry <= self.max_retries:
-                        if not self._q.empty():
-                            rx_data = self._q.get()
-                        else:
-                            rx_data = self._receive_ipmi_msg(self.ignore_sdu_length)
-
-                        if array('B', rx_data)[5] == constants.CMDID_SEND_MESSAGE:
-                            rx_data = decode_bridged_message(rx_data)
-                            if not rx_data:
-                                # the forwarded reply is expected in the next packet
-                                # so we do not increment the retry counter as
-                                # it's not really a retry
-                                continue
-
-                        received = rx_filter(header, rx_data,
-                                             rq_seq=not self.ignore_rq_seq)
-
-                        if not received:
-                            self._q.put(rx_data)
-
-                        received_retry += 1
-
-                    if not received:
-                        raise RetryError("Max retry while checking received"
-                                         "data against request header for rmcp"
-                                         f"host {self.host}")
-                    break
+        return (header, tx_data)
 
-                except socket.timeout:
-                    retry += 1
+    def _send_and_receive(self, target: Target, lun: int, netfn: int,
+                          cmdid: int, payload: bytes) -> bytes:
+        """Send and receive data using RMCP interface.
+
+        target:
+        lun:
+        netfn:
+        cmdid:
+        raw_bytes: IPMI message payload as bytestring
+
+        Returns the received data as array.
+        """
+        # a busy node is retried by `Ipmi.send_message`
+        return self._send_and_receive_many(
+            [(target, lun, netfn, cmdid, payload)], busy_retries=0)[0]
+
+    def _send_request(self, entry: _PendingRequest) -> None:
+        """Send the request of `entry` with the next sequence number."""
+        (entry.header, entry.tx_data) = self._encode_request(*entry.request)
+        # a stashed response with the same sequence number belongs to an
+        # earlier request and must not be taken for the new one
+        for rx_data in list(self._q):
+            if array('B', rx_data)[4] >> 2 == entry.header.rq_seq:
+                self._q.remove(rx_data)
+        entry.tx_bytes += len(entry.tx_data)
+        self._send_ipmi_msg(entry.tx_data)
+
+    def _receive_response(self, pending: list[_PendingRequest]
+                          ) -> tuple[_PendingRequest | None, bytes]:
+        """Receive the next response for one of the `pending` requests.
+
+        Stashed responses are checked before the socket is read. A response
+        which does not match any pending request is stashed and returned
+        together with `None`.
+        """
+        for rx_data in self._q:
+            for entry in pending:
+                if rx_filter(entry.header, rx_data,
+                             rq_seq=not self.ignore_rq_seq):
+                    self._q.remove(rx_data)
+                    return (entry, rx_data)
+
+        while True:
+            rx_data = self._receive_ipmi_msg(self.ignore_sdu_length)
+            if array('B', rx_data)[5] != constants.CMDID_SEND_MESSAGE:
+                break
+            rx_data = decode_bridged_message(rx_data)
+            if rx_data:
+                break
+            # the forwarded reply is expected in a later packet
+
+        for entry in pending:
+            if rx_filter(entry.header, rx_data,
+                         rq_seq=not self.ignore_rq_seq):
+                return (entry, rx_data)
+
+        # e.g. a late response to a request which was resent
+        log().debug('IPMI RX: stashed unexpected response')
+        self._q.append(rx_data)
+        return (None, rx_data)
+
+    def _send_and_receive_many(self, requests: list[tuple],
+                               busy_retries: int = BUSY_RETRIES
+                               ) -> list[bytes]:
+        """Send and receive data for multiple requests using RMCP interface.
+
+        Up to `max_in_flight` requests are outstanding at the same time. The
+        received responses are matched against the pending requests by
+        `rx_filter`, i.e. by the sequence number, netfn and command id.
+        Requests which time out are resent with a new sequence number and a
+        request answered with "node busy" is resent up to `busy_retries`
+        times.
+
+        requests: list of (target, lun, netfn, cmdid, payload) tuples
+
+        Returns the received data for each request in request order.
+        """
+        results = [None] * len(requests)
+        todo = deque(_PendingRequest(index, request)
+                     for (index, request) in enumerate(requests))
+        pending = []
+        metrics = self.metrics
 
-        if retry > self.max_retries:
-            raise RetryError("Max retry while sending and/or receiving ipmi"
-                             f"message for rmcp host {self.host}")
+        with self.transaction_lock:
+            while todo or pending:
+                while todo and len(pending) < self.max_in_flight:
+                    entry = todo.popleft()
+                    self._send_request(entry)
+                    pending.append(entry)
 
-        return rx_data[6:-1]
+                try:
+                    (entry, rx_data) = self._receive_response(pending)
+                except socket.timeout:
+                    # resend everything that is still outstanding
+                    for entry in pending:
+                        entry.retry += 1
+                        if metrics is not None:
+                            metrics.count_timeout(entry.header.netfn,
+                                                  entry.header.cmdid)
+                        if entry.retry > self.max_retries:
+                            error = RetryError("Max retry while sending "
+                                               "and/or receiving ipmi message "
+                                               f"for rmcp host {self.host}")
+                            # see `send_and_receive_many`
+                            error.responses = results
+                            raise error
+                        if metrics is not None:
+                            metrics.count_retry(entry.header.netfn,
+                                                entry.header.cmdid)
+                        self._send_request(entry)
+                    continue
+
+                if entry is None:
+                    continue
+                pending.remove(entry)
+
+                if (array('B', rx_data)[6] == constants.CC_NODE_BUSY
+                        and entry.busy_retry < busy_retries):
+                    entry.busy_retry += 1
+                    if metrics is not None:
+                        metrics.count_retry(entry.header.netfn,
+                                            entry.header.cmdid)
+                    todo.appendleft(entry)
+                    continue
+
+                results[entry.index] = rx_data[6:-1]
+                if metrics is not None:
+                    _observe(metrics, entry.header.netfn, entry.header.cmdid,
+                             entry.start, entry.tx_bytes, rx_data)
+
+        return results
 
     def send_and_receive_raw(self, target: Target, lun: int, netfn: int,
                              raw_bytes: bytes) -> bytes:
@@ -687,6 +841,34 @@ class Rmcp(object):
                                          netfn=req.netfn,
                                          cmdid=req.cmdid,
                                          payload=encode_message(req))
+        return self._create_response(req, rx_data)
+
+    def send_and_receive_many(self, reqs: list[Message]) -> list[Message]:
+        """Interface function to send and receive multiple IPMI messages.
+
+        The requests are pipelined on the session, see `max_in_flight`.
+
+        reqs: list of IPMI message requests
+
+        Returns the list of IPMI message responses in request order.
+        """
+        requests = [(req.target, req.lun, req.netfn, req.cmdid,
+                     encode_message(req)) for req in reqs]
+        try:
+            results = self._send_and_receive_many(requests)
+        except RetryError as e:
+            # the responses received before, `None` for the others
+            e.responses = [None if rx_data is None
+                           else self._create_response(req, rx_data)
+                           for (req, rx_data) in zip(reqs, e.responses)]
+            raise
+        return [self._create_response(req, rx_data)
+                for (req, rx_data) in zip(reqs, results)]
+
+    def _create_response(self, req: Message, rx_data: bytes) -> Message:
+        if self.lazy_decoding:
+            return create_lazy_message(req.netfn + 1, req.cmdid,
+                                       req.group_extension, rx_data)
         rsp = create_message(req.netfn + 1, req.cmdid, req.group_extension)
         decode_message(rsp, rx_data)
         return rsp
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from . import bmc
+from . import chassis
+from . import dcmi
+from . import event
+from . import fru
+from . import hpm
+from . import lan
+from . import messaging
+from . import picmg
+from . import sdr
+from . import sel
+from . import sensor
+from . import msgs
+
+from . import NullRequester, Target
+from .errors import IpmiTimeoutError, CompletionCodeError, RetryError
+from .metrics import Metrics
+from .msgs import Message
+from .msgs.registry import create_request_by_name
+from .session import Session
+from .utils import check_rsp_completion_code
+
+
+class Ipmi(bmc.Bmc, chassis.Chassis, dcmi.Dcmi, fru.Fru, picmg.Picmg, hpm.Hpm,
+           sdr.Sdr, sensor.Sensor, event.Event, sel.Sel, lan.Lan,
+           messaging.Messaging):
+
+    # see pyipmi.metrics
+    metrics = None
+
+    def __init__(self, interface: Any = None, target: Target | None = None,
+                 session: Session = Session(),
+                 requester: Any = NullRequester()) -> None:
+        self._interface = interface
+
+        # we need a session, set if not passed
+        if session is None:
+            session = Session()
+        self._session = session
+        # session needs an interface
+        self._session.interface = interface
+
+        self._target = target
+        self.requester = requester
+
+        for base in Ipmi.__bases__:
+            base.__init__(self)
+
+    def __enter__(self) -> Ipmi:
+        self.open()
+        return self
+
+    def __exit__(self, exception_type: Any, exception_value: Any,
+                 traceback: Any) -> bool:
+        self.close()
+        return False
+
+    def open(self) -> None:
+        self.interface.open()
+        if self.session is not None:
+            self.session.establish()
+
+    def close(self) -> None:
+        if self.session is not None:
+            self.session.close()
+        self.interface.close()
+
+    def is_ipmc_accessible(self) -> bool:
+        return self.interface.is_ipmc_accessible(self.target)
+
+    def wait_until_ipmb_is_accessible(self, timeout: float,
+                                      interval: float = 0.25) -> None:
+        start_time = time.time()
+        while time.time() < start_time + (timeout):
+            try:
+                self.is_ipmc_accessible()
+            except IpmiTimeoutError:
+                time.sleep(interval)
+
+        self.is_ipmc_accessible()
+
+    def send_message(self, req: Message, retry: int = 3) -> Message:
+        req.target = self.target
+        req.requester = self.requester
+        rsp = None
+
+        while retry > 0:
+            retry -= 1
+            try:
+                rsp = self.interface.send_and_receive(req)
+                break
+            except CompletionCodeError as e:
+                if e.cc == msgs.constants.CC_NODE_BUSY:
+                    if self.metrics is not None and retry > 0:
+                        self.metrics.count_retry(req.netfn, req.cmdid)
+                    continue
+        else:
+            raise RetryError()
+
+        return rsp
+
+    def enable_metrics(self, metrics: Any = None) -> Any:
+        """Record the metrics of the transactions of this connection.
+
+        `metrics` defaults to a new `pyipmi.metrics.Metrics` object, which is
+        set on the connection and the interface and returned.
+        """
+        if metrics is None:
+            metrics = Metrics()
+        self.metrics = metrics
+        self.interface.metrics = metrics
+        return metrics
+
+    def disable_metrics(self) -> None:
+        self.metrics = None
+        self.interface.metrics = None
+
+    def send_messages(self, reqs: list[Message]) -> list[Message]:
+        """Send multiple requests and return the responses in request order.
+
+        If the interface supports it, the requests are pipelined, otherwise
+        they are sent one after another.
+
+        If the requests time out, the raised `IpmiTimeoutError` or
+        `RetryError` may have the `responses` received before, with `None`
+        for the requests without response.
+        """
+        for req in reqs:
+            req.target = self.target
+            req.requester = self.requester
+
+        if hasattr(self.interface, 'send_and_receive_many'):
+            return self.interface.send_and_receive_many(reqs)
+
+        rsps = []
+        try:
+            for req in reqs:
+                rsps.append(self.send_message(req))
+        except (IpmiTimeoutError, RetryError) as e:
+            e.responses = rsps + [None] * (len(reqs) - len(rsps))
+            raise
+        return rsps
+
+    def send_message_with_name(self, name: str, *args: Any,
+                               **kwargs: Any) -> Message:
+        req = create_request_by_name(name)
+
+        for key, value in kwargs.items():
+            setattr(req, key, value)
+
+        rsp = self.send_message(req)
+        check_rsp_completion_code(rsp)
+        return rsp
+
+    def raw_command(self, lun: int, netfn: int, raw_bytes: bytes) -> bytes:
+        """Send the raw command data and return the raw response.
+
+        lun: the logical unit number
+        netfn: the network function
+        raw_bytes: the raw message as bytestring
+
+        Returns the response as bytestring.
+        """
+        return self.interface.send_and_receive_raw(self.target, lun, netfn,
+                                                   raw_bytes)
+
+    def _get_interface(self) -> Any:
+        try:
+            return self._interface
+        except AttributeError:
+            raise RuntimeError('No interface has been set')
+
+    def _get_session(self) -> Session:
+        try:
+            return self._session
+        except AttributeError:
+            raise RuntimeError('No IPMI session has been set')
+
+    def _get_target(self) -> Target:
+        try:
+            return self._target
+        except AttributeError:
+            raise RuntimeError('No IPMI target has been set')
+
+    def _set_interface(self, interface: Any) -> None:
+        self._interface = interface
+
+    def _set_session(self, session: Session) -> None:
+        self._session = session
+
+    def _set_target(self, target: Target) -> None:
+        self._target = target
+
+    target = property(_get_target, _set_target)
+    interface = property(_get_interface, _set_interface)
+    session = property(_get_session, _set_session)
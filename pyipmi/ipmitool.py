@@ -330,7 +330,15 @@ def cmd_hpm_install(ipmi: pyipmi.Ipmi, args: list[str]) -> None:
     if len(args) < 2:
         print('missing argument')
         return
-    ipmi.install_component_from_file(args[0], int(args[1]))
+    window = int(args[2]) if len(args) > 2 else 1
+
+    def progress(status: pyipmi.hpm.UploadProgress) -> None:
+        sys.stderr.write('\r%s' % status)
+        if status.bytes_sent == status.total_bytes:
+            sys.stderr.write('\n')
+
+    ipmi.install_component_from_file(args[0], int(args[1]), window,
+                                     progress)
 
 
 def cmd_chassis_status(ipmi: pyipmi.Ipmi, args: list[str]) -> None:
@@ -747,8 +755,9 @@ COMMAND_HELP = (
                     'Request the target upgrade capabilities'),
         CommandHelp('hpm check', 'HPM.1 file check',
                     'Check the specified HPM.1 file'),
-        CommandHelp('hpm install', '<file> <component id>',
-                    'Install the specified HPM.1 file to the controller'),
+        CommandHelp('hpm install', '<file> <component id> [window]',
+                    'Install the specified HPM.1 file to the controller, '
+                    'sending up to [window] blocks at once'),
 
         CommandHelp('chassis', None, 'Get chassis status and set power state'),
         CommandHelp('chassis status', '', 'Get chassis status'),
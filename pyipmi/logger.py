@@ -14,7 +14,10 @@
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
 
+from __future__ import annotations
+
 import logging
+from typing import Any
 
 
 def log() -> logging.Logger:
@@ -29,6 +32,22 @@ def set_log_level(level: int) -> None:
     log().setLevel(level)
 
 
+class HexDump(object):
+    """Hex dump of data that is only formatted when it is logged.
+
+        log().debug('IPMI TX: %s', HexDump(data))
+    """
+
+    __slots__ = ('data', 'separator')
+
+    def __init__(self, data: Any, separator: str = ' ') -> None:
+        self.data = data
+        self.separator = separator
+
+    def __str__(self) -> str:
+        return self.separator.join('%02x' % b for b in bytes(self.data))
+
+
 class NullHandler(logging.Handler):
     def emit(self, record: logging.LogRecord) -> None:
         pass
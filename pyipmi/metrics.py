@@ -0,0 +1,218 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Per command metrics of the IPMI transactions.
+
+The interfaces and `Ipmi.send_message` report to the object in their
+`metrics` attribute, which is None by default, i.e. nothing is recorded
+and nothing is computed. `Ipmi.enable_metrics()` sets a `Metrics` object
+on the connection and its interface. Any object with the same `observe`,
+`count_retry` and `count_timeout` methods can be used instead.
+
+    metrics = ipmi.enable_metrics()
+    ...
+    print(metrics.to_prometheus())
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Any
+
+# upper bounds of the latency histogram buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram(object):
+    """A histogram with fixed buckets.
+
+    `counts[i]` is the number of observations <= `buckets[i]` and
+    > `buckets[i - 1]`, the last entry counts the ones above all buckets.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return the (upper bound, cumulative count) of each bucket."""
+        result = []
+        total = 0
+        for (bound, count) in zip(self.buckets + (float('inf'),),
+                                  self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'buckets': dict((_format_bound(bound), count)
+                            for (bound, count) in self.cumulative()),
+            'count': self.count,
+            'sum': self.sum,
+        }
+
+
+class CommandMetrics(object):
+    """The metrics of one (netfn, cmdid) pair."""
+
+    __slots__ = ('latency', 'retries', 'timeouts', 'completion_codes',
+                 'tx_bytes', 'rx_bytes')
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.latency = Histogram(buckets)
+        self.retries = 0
+        self.timeouts = 0
+        self.completion_codes = {}
+        self.tx_bytes = 0
+        self.rx_bytes = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'latency': self.latency.to_dict(),
+            'retries': self.retries,
+            'timeouts': self.timeouts,
+            'completion_codes': dict(self.completion_codes),
+            'tx_bytes': self.tx_bytes,
+            'rx_bytes': self.rx_bytes,
+        }
+
+
+class Metrics(object):
+    """Thread safe collection of the metrics per (netfn, cmdid).
+
+    The netfn is the one of the request.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._commands = {}
+
+    def _get(self, netfn: int, cmdid: int) -> CommandMetrics:
+        key = (netfn & 0xfe, cmdid)
+        try:
+            return self._commands[key]
+        except KeyError:
+            return self._commands.setdefault(key,
+                                             CommandMetrics(self.buckets))
+
+    def observe(self, netfn: int, cmdid: int, seconds: float,
+                tx_bytes: int = 0, rx_bytes: int = 0,
+                completion_code: int | None = None) -> None:
+        """Record a completed transaction.
+
+        `tx_bytes` and `rx_bytes` are the sizes of the IPMI messages sent,
+        including resent ones, and received.
+        """
+        with self._lock:
+            command = self._get(netfn, cmdid)
+            command.latency.observe(seconds)
+            command.tx_bytes += tx_bytes
+            command.rx_bytes += rx_bytes
+            if completion_code is not None:
+                command.completion_codes[completion_code] = \
+                    command.completion_codes.get(completion_code, 0) + 1
+
+    def count_retry(self, netfn: int, cmdid: int, count: int = 1) -> None:
+        """Record a request that is sent again."""
+        with self._lock:
+            self._get(netfn, cmdid).retries += count
+
+    def count_timeout(self, netfn: int, cmdid: int, count: int = 1) -> None:
+        """Record a request without a response in time."""
+        with self._lock:
+            self._get(netfn, cmdid).timeouts += count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._commands = {}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the metrics as dict.
+
+        The keys are '<netfn>:<cmdid>' in hex, e.g. '0x06:0x01'.
+        """
+        with self._lock:
+            return dict(('0x%02x:0x%02x' % key, command.to_dict())
+                        for (key, command) in sorted(self._commands.items()))
+
+    def to_prometheus(self, prefix: str = 'pyipmi') -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def add(name: str, kind: str, help_text: str) -> None:
+            lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+            lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+
+        with self._lock:
+            commands = sorted(self._commands.items())
+
+            add('request_duration_seconds', 'histogram',
+                'Duration of the IPMI transactions.')
+            for ((netfn, cmdid), command) in commands:
+                labels = 'netfn="0x%02x",cmd="0x%02x"' % (netfn, cmdid)
+                histogram = command.latency
+                for (bound, count) in histogram.cumulative():
+                    lines.append('%s_request_duration_seconds_bucket'
+                                 '{%s,le="%s"} %d'
+                                 % (prefix, labels, _format_bound(bound),
+                                    count))
+                lines.append('%s_request_duration_seconds_sum{%s} %r'
+                             % (prefix, labels, histogram.sum))
+                lines.append('%s_request_duration_seconds_count{%s} %d'
+                             % (prefix, labels, histogram.count))
+
+            for (name, attr, help_text) in (
+                    ('retries_total', 'retries', 'Requests sent again.'),
+                    ('timeouts_total', 'timeouts',
+                     'Requests without a response in time.'),
+                    ('tx_bytes_total', 'tx_bytes',
+                     'Size of the sent IPMI messages.'),
+                    ('rx_bytes_total', 'rx_bytes',
+                     'Size of the received IPMI messages.')):
+                add(name, 'counter', help_text)
+                for ((netfn, cmdid), command) in commands:
+                    lines.append('%s_%s{netfn="0x%02x",cmd="0x%02x"} %d'
+                                 % (prefix, name, netfn, cmdid,
+                                    getattr(command, attr)))
+
+            add('responses_total', 'counter',
+                'Responses by completion code.')
+            for ((netfn, cmdid), command) in commands:
+                for (cc, count) in sorted(command.completion_codes.items()):
+                    lines.append('%s_responses_total{netfn="0x%02x",'
+                                 'cmd="0x%02x",cc="0x%02x"} %d'
+                                 % (prefix, netfn, cmdid, cc, count))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_bound(bound: float) -> str:
+    if bound == float('inf'):
+        return '+Inf'
+    return repr(bound)
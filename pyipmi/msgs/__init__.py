@@ -15,10 +15,15 @@ from __future__ import absolute_import
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
 
+import importlib
+from typing import Any
+
+from .index import MODULES
 from .registry import register_message_class  # noqa:F401
 from .registry import create_request_by_name  # noqa:F401
 from .registry import create_response_by_name  # noqa:F401
 from .registry import create_message  # noqa:F401
+from .registry import create_lazy_message  # noqa:F401
 from .registry import create_response_message  # noqa:F401
 
 from .message import Message  # noqa:F401
@@ -39,16 +44,12 @@ from .message import encode_message  # noqa:F401
 from .message import decode_message  # noqa:F401
 from .message import pack_message  # noqa:F401
 
-from . import bmc  # noqa:F401
-from . import chassis  # noqa:F401
-from . import dcmi  # noqa:F401
-from . import device_messaging  # noqa:F401
-from . import fru  # noqa:F401
-from . import hpm  # noqa:F401
-from . import picmg  # noqa:F401
-from . import sdr  # noqa:F401
-from . import sel  # noqa:F401
-from . import sensor  # noqa:F401
-from . import event  # noqa:F401
-from . import lan  # noqa:F401
-from . import vita  # noqa:F401
+# The message modules are imported on first access, the registry imports
+# them on the first lookup of one of their messages.
+_MESSAGE_MODULES = frozenset(MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _MESSAGE_MODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,232 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Compiled encoder and decoder of the message classes.
+
+The leading fields of a message with a fixed layout are packed and
+unpacked with one `struct.Struct`. The remaining fields and all cases the
+compiled code does not handle in exactly the same way (e.g. too short data
+or invalid values) go through the field descriptors, so the result is the
+same as with the generic `Message._encode` and `Message._decode`.
+"""
+
+from __future__ import annotations
+
+import struct
+from array import array
+from typing import Any, Callable
+
+from .message import (BaseField, Bitfield, ByteArray, CompletionCode,
+                      LazyField, Message, String, UnsignedInt)
+from ..errors import CompletionCodeError, DecodingError
+from ..utils import ByteBuffer, ByteReader
+
+_INT_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+
+def _is_plain(field: Any, cls: type, method: str) -> bool:
+    """Return True if the field uses `method` of `cls` unchanged."""
+    return (isinstance(field, cls)
+            and getattr(type(field), method) is getattr(cls, method))
+
+
+def _int_decoder(name: str) -> Callable[[Message, Any], None]:
+    def decode(obj: Message, value: int) -> None:
+        setattr(obj, name, value)
+    return decode
+
+
+def _int_encoder(name: str, length: int) -> Callable[[Message], int]:
+    mask = (1 << (8 * length)) - 1
+
+    def encode(obj: Message) -> int:
+        return getattr(obj, name) & mask
+    return encode
+
+
+def _byte_array_decoder(name: str) -> Callable[[Message, bytes], None]:
+    def decode(obj: Message, value: bytes) -> None:
+        setattr(obj, name, array('B', value))
+    return decode
+
+
+def _byte_array_encoder(name: str, length: int) -> Callable[[Message], bytes]:
+    def encode(obj: Message) -> bytes:
+        value = getattr(obj, name)
+        if len(value) != length:
+            raise ValueError()
+        return bytes(value)
+    return encode
+
+
+def _bitfield_decoder(name: str,
+                      bits: tuple[Bitfield.Bit, ...]) -> Callable[[Message, int], None]:
+    layout = [(bit.name, bit.offset, (1 << bit._width) - 1) for bit in bits]
+
+    def decode(obj: Message, value: int) -> None:
+        wrapper = getattr(obj, name)
+        for (bit_name, offset, mask) in layout:
+            setattr(wrapper, bit_name, (value >> offset) & mask)
+    return decode
+
+
+def _bitfield_encoder(name: str,
+                      bits: tuple[Bitfield.Bit, ...]) -> Callable[[Message], int]:
+    layout = [(bit.name, bit.offset, (1 << bit._width) - 1, bit.default)
+              for bit in bits]
+
+    def encode(obj: Message) -> int:
+        wrapper = getattr(obj, name)
+        value = 0
+        for (bit_name, offset, mask, default) in layout:
+            bit_value = getattr(wrapper, bit_name)
+            if bit_value is None:
+                bit_value = default
+            value |= (bit_value & mask) << offset
+        return value
+    return encode
+
+
+class MessageCodec(object):
+    """The compiled encoder and decoder of one message class."""
+
+    def __init__(self, cls: type[Message]) -> None:
+        fields = cls.__fields__
+        self.fields = fields
+        self.field_names = frozenset(field.name for field in fields)
+
+        self.completion_code = None
+        start = 0
+        if fields and _is_plain(fields[0], CompletionCode, 'decode'):
+            self.completion_code = fields[0].name
+            start = 1
+
+        (self._decode_struct, self._decoders, self._decode_rest) = \
+            self._compile(fields, start, for_decode=True)
+        (self._encode_struct, self._encoders, self._encode_rest) = \
+            self._compile(fields, 0, for_decode=False)
+
+    @staticmethod
+    def _compile(fields: tuple[BaseField, ...], start: int,
+                 for_decode: bool) -> tuple[struct.Struct, list, tuple]:
+        method = 'decode' if for_decode else 'encode'
+        fmt = '<'
+        coders = []
+        index = start
+        for field in fields[start:]:
+            if (_is_plain(field, UnsignedInt, method)
+                    and field.length in _INT_FORMATS):
+                fmt += _INT_FORMATS[field.length]
+                if for_decode:
+                    coders.append(_int_decoder(field.name))
+                else:
+                    coders.append(_int_encoder(field.name, field.length))
+            elif _is_plain(field, Bitfield, method) and field.length in _INT_FORMATS:
+                fmt += _INT_FORMATS[field.length]
+                if for_decode:
+                    coders.append(_bitfield_decoder(field.name, field._bits))
+                else:
+                    coders.append(_bitfield_encoder(field.name, field._bits))
+            elif type(field) is ByteArray and field.length:
+                fmt += '%ds' % field.length
+                if for_decode:
+                    coders.append(_byte_array_decoder(field.name))
+                else:
+                    coders.append(_byte_array_encoder(field.name,
+                                                      field.length))
+            elif (for_decode and _is_plain(field, String, method)
+                    and field.length):
+                # strings are encoded with their actual length
+                fmt += '%ds' % field.length
+                coders.append(_int_decoder(field.name))
+            else:
+                break
+            index += 1
+        return (struct.Struct(fmt), coders, fields[index:])
+
+    def decode(self, msg: Message, data: Any) -> None:
+        if not isinstance(data, bytes):
+            data = array('B', data).tobytes()
+
+        offset = 0
+        if self.completion_code is not None:
+            if len(data) == 0:
+                return self._decode_generic(msg, data)
+            cc = data[0]
+            setattr(msg, self.completion_code, cc)
+            if cc != 0:
+                # stop decoding on completion code != 0
+                return
+            offset = 1
+
+        decode_struct = self._decode_struct
+        if len(data) - offset < decode_struct.size:
+            return self._decode_generic(msg, data)
+
+        values = decode_struct.unpack_from(data, offset)
+        for (decoder, value) in zip(self._decoders, values):
+            decoder(msg, value)
+        offset += decode_struct.size
+
+        rest = ByteReader(data)
+        rest.skip(offset)
+        for field in self._decode_rest:
+            try:
+                field.decode(msg, rest)
+            except CompletionCodeError:
+                # stop decoding on completion code != 0
+                return
+        if len(rest) > 0:
+            raise DecodingError('Data has extra bytes')
+
+    @staticmethod
+    def _decode_generic(msg: Message, data: bytes) -> None:
+        Message._decode_fields(msg, data)
+
+    def encode(self, msg: Message) -> bytes:
+        try:
+            prefix = self._encode_struct.pack(
+                *[encoder(msg) for encoder in self._encoders])
+        except (TypeError, ValueError, AttributeError, struct.error):
+            # let the field descriptors raise the appropriate error
+            return Message._encode_fields(msg)
+
+        rest = ByteBuffer()
+        for field in self._encode_rest:
+            field.encode(msg, rest)
+        return prefix + rest.tobytes()
+
+
+def compile_message_class(cls: type[Message]) -> MessageCodec | None:
+    """Compile the message class.
+
+    Returns None if the class has no or invalid field descriptions, those
+    are left to the generic code.
+    """
+    fields = getattr(cls, '__fields__', None)
+    if not fields or not isinstance(fields, (tuple, list)):
+        return None
+    names = [field.name for field in fields]
+    if len(set(names)) != len(names):
+        return None
+    for name in names:
+        if name in Message.RESERVED_FIELD_NAMES:
+            return None
+        # the lazy fields of a compiled base class may be reused
+        if (hasattr(cls, name)
+                and not isinstance(getattr(cls, name), LazyField)):
+            return None
+    return MessageCodec(cls)
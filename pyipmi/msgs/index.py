@@ -0,0 +1,392 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Index of the message classes of the default registry.
+
+The registry uses the index to import a message module on the first
+lookup of one of its messages. The part below the marker is generated,
+after adding or changing a message run
+
+    python -m pyipmi.msgs.index > pyipmi/msgs/index.py
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+
+# the message modules, in registration order
+MODULES = (
+    'bmc',
+    'chassis',
+    'dcmi',
+    'device_messaging',
+    'fru',
+    'hpm',
+    'picmg',
+    'sdr',
+    'sel',
+    'sensor',
+    'event',
+    'lan',
+    'vita',
+)
+
+_MARKER = '# --- generated, do not edit below ---\n'
+
+
+def _generate() -> str:
+    from .registry import DEFAULT_REGISTRY
+
+    with open(__file__) as f:
+        head = f.read().split(_MARKER)[0]
+
+    lines = [head, _MARKER, '\n',
+             '# module: ((name, netfn, cmdid, group_extension), ...)\n',
+             'MESSAGES = {\n']
+    for module in MODULES:
+        mod = importlib.import_module('.' + module, __package__)
+        lines.append("    '%s': (\n" % module)
+        for (name, cls) in DEFAULT_REGISTRY.registry.items():
+            if not isinstance(name, str) or cls.__module__ != mod.__name__:
+                continue
+            group_extension = cls.__group_extension__
+            if group_extension is not None:
+                group_extension = '0x%02x' % group_extension
+            lines.append("        ('%s', 0x%02x, 0x%02x, %s),\n"
+                         % (name, cls.__netfn__, cls.__cmdid__,
+                            group_extension))
+        lines.append('    ),\n')
+    lines.append('}\n')
+    return ''.join(lines)
+
+
+if __name__ == '__main__':
+    sys.stdout.write(_generate())
+
+# --- generated, do not edit below ---
+
+# module: ((name, netfn, cmdid, group_extension), ...)
+MESSAGES = {
+    'bmc': (
+        ('GetDeviceIdReq', 0x06, 0x01, None),
+        ('GetDeviceIdRsp', 0x07, 0x01, None),
+        ('ColdResetReq', 0x06, 0x02, None),
+        ('ColdResetRsp', 0x07, 0x02, None),
+        ('WarmResetReq', 0x06, 0x03, None),
+        ('WarmResetRsp', 0x07, 0x03, None),
+        ('ManufacturingTestOnReq', 0x06, 0x05, None),
+        ('ManufacturingTestOnRsp', 0x07, 0x05, None),
+        ('GetSelftestResultsReq', 0x06, 0x04, None),
+        ('GetSelftestResultsRsp', 0x07, 0x04, None),
+        ('SetAcpiPowerStateReq', 0x06, 0x06, None),
+        ('SetAcpiPowerStateRsp', 0x07, 0x06, None),
+        ('GetAcpiPowerStateReq', 0x06, 0x07, None),
+        ('GetAcpiPowerStateRsp', 0x07, 0x07, None),
+        ('GetDeviceGuidReq', 0x06, 0x08, None),
+        ('GetDeviceGuidRsp', 0x07, 0x08, None),
+        ('ResetWatchdogTimerReq', 0x06, 0x22, None),
+        ('ResetWatchdogTimerRsp', 0x07, 0x22, None),
+        ('SetWatchdogTimerReq', 0x06, 0x24, None),
+        ('SetWatchdogTimerRsp', 0x07, 0x24, None),
+        ('GetWatchdogTimerReq', 0x06, 0x25, None),
+        ('GetWatchdogTimerRsp', 0x07, 0x25, None),
+    ),
+    'chassis': (
+        ('GetChassisCapabilitiesReq', 0x00, 0x00, None),
+        ('GetChassisCapabilitiesRsp', 0x01, 0x00, None),
+        ('GetChassisStatusReq', 0x00, 0x01, None),
+        ('GetChassisStatusRsp', 0x01, 0x01, None),
+        ('ChassisControlReq', 0x00, 0x02, None),
+        ('ChassisControlRsp', 0x01, 0x02, None),
+        ('GetPohCounterReq', 0x00, 0x0f, None),
+        ('GetPohCounterRsp', 0x01, 0x0f, None),
+        ('GetSystemBootOptionsReq', 0x00, 0x09, None),
+        ('GetSystemBootOptionsRsp', 0x01, 0x09, None),
+        ('SetSystemBootOptionsReq', 0x00, 0x08, None),
+        ('SetSystemBootOptionsRsp', 0x01, 0x08, None),
+    ),
+    'dcmi': (
+        ('GetDcmiCapabilitiesReq', 0x2c, 0x01, 0xdc),
+        ('GetDcmiCapabilitiesRsp', 0x2d, 0x01, 0xdc),
+        ('GetPowerReadingReq', 0x2c, 0x02, 0xdc),
+        ('GetPowerReadingRsp', 0x2d, 0x02, 0xdc),
+        ('GetPowerLimitReq', 0x2c, 0x03, 0xdc),
+        ('GetPowerLimitRsp', 0x2d, 0x03, 0xdc),
+        ('SetPowerLimitReq', 0x2c, 0x04, 0xdc),
+        ('SetPowerLimitRsp', 0x2d, 0x04, 0xdc),
+        ('GetActivateDeactivatePowerLimitReq', 0x2c, 0x05, 0xdc),
+        ('GetActivateDeactivatePowerLimitRsp', 0x2d, 0x05, 0xdc),
+        ('GetAssetTagReq', 0x2c, 0x06, 0xdc),
+        ('GetAssetTagRsp', 0x2d, 0x06, 0xdc),
+        ('GetDcmiSensorInfoReq', 0x2c, 0x07, 0xdc),
+        ('GetDcmiSensorInfoRsp', 0x2d, 0x07, 0xdc),
+        ('SetAssetTagReq', 0x2c, 0x08, 0xdc),
+        ('SetAssetTagRsp', 0x2d, 0x08, 0xdc),
+        ('GetManagementControllerIdStringReq', 0x2c, 0x09, 0xdc),
+        ('GetManagementControllerIdStringRsp', 0x2d, 0x09, 0xdc),
+        ('SetManagementControllerIdStringReq', 0x2c, 0x0a, 0xdc),
+        ('SetManagementControllerIdStringRsp', 0x2d, 0x0a, 0xdc),
+    ),
+    'device_messaging': (
+        ('SetBmcGlobalEnablesReq', 0x06, 0x2e, None),
+        ('SetBmcGlobalEnablesRsp', 0x07, 0x2e, None),
+        ('GetBmcGlobalEnablesReq', 0x06, 0x2f, None),
+        ('GetBmcGlobalEnablesRsp', 0x07, 0x2f, None),
+        ('ClearMessageFlagsReq', 0x06, 0x30, None),
+        ('ClearMessageFlagsRsp', 0x07, 0x30, None),
+        ('GetMessageFlagsReq', 0x06, 0x31, None),
+        ('GetMessageFlagsRsp', 0x07, 0x31, None),
+        ('EnableMessageChannelReceiveReq', 0x06, 0x32, None),
+        ('EnableMessageChannelReceiveRsp', 0x07, 0x32, None),
+        ('GetMessageReq', 0x06, 0x33, None),
+        ('GetMessageRsp', 0x07, 0x33, None),
+        ('SendMessageReq', 0x06, 0x34, None),
+        ('SendMessageRsp', 0x07, 0x34, None),
+        ('ReadEventMessageBufferReq', 0x06, 0x35, None),
+        ('ReadEventMessageBufferRsp', 0x07, 0x35, None),
+        ('MasterWriteReadReq', 0x06, 0x52, None),
+        ('MasterWriteReadRsp', 0x07, 0x52, None),
+        ('GetChannelAuthenticationCapabilitiesReq', 0x06, 0x38, None),
+        ('GetChannelAuthenticationCapabilitiesRsp', 0x07, 0x38, None),
+        ('GetSessionChallengeReq', 0x06, 0x39, None),
+        ('GetSessionChallengeRsp', 0x07, 0x39, None),
+        ('ActivateSessionReq', 0x06, 0x3a, None),
+        ('ActivateSessionRsp', 0x07, 0x3a, None),
+        ('SetSessionPrivilegeLevelReq', 0x06, 0x3b, None),
+        ('SetSessionPrivilegeLevelRsp', 0x07, 0x3b, None),
+        ('CloseSessionReq', 0x06, 0x3c, None),
+        ('CloseSessionRsp', 0x07, 0x3c, None),
+        ('SetUserNameReq', 0x06, 0x45, None),
+        ('SetUserNameRsp', 0x07, 0x45, None),
+        ('GetUserNameReq', 0x06, 0x46, None),
+        ('GetUserNameRsp', 0x07, 0x46, None),
+        ('SetUserPasswordReq', 0x06, 0x47, None),
+        ('SetUserPasswordRsp', 0x07, 0x47, None),
+        ('GetUserAccessReq', 0x06, 0x44, None),
+        ('GetUserAccessRsp', 0x07, 0x44, None),
+        ('SetUserAccessReq', 0x06, 0x43, None),
+        ('SetUserAccessRsp', 0x07, 0x43, None),
+    ),
+    'fru': (
+        ('GetFruInventoryAreaInfoReq', 0x0a, 0x10, None),
+        ('GetFruInventoryAreaInfoRsp', 0x0b, 0x10, None),
+        ('ReadFruDataReq', 0x0a, 0x11, None),
+        ('ReadFruDataRsp', 0x0b, 0x11, None),
+        ('WriteFruDataReq', 0x0a, 0x12, None),
+        ('WriteFruDataRsp', 0x0b, 0x12, None),
+    ),
+    'hpm': (
+        ('GetTargetUpgradeCapabilitiesReq', 0x2c, 0x2e, 0x00),
+        ('GetTargetUpgradeCapabilitiesRsp', 0x2d, 0x2e, 0x00),
+        ('GetComponentPropertiesReq', 0x2c, 0x2f, 0x00),
+        ('GetComponentPropertiesRsp', 0x2d, 0x2f, 0x00),
+        ('AbortFirmwareUpgradeReq', 0x2c, 0x30, 0x00),
+        ('AbortFirmwareUpgradeRsp', 0x2d, 0x30, 0x00),
+        ('InitiateUpgradeActionReq', 0x2c, 0x31, 0x00),
+        ('InitiateUpgradeActionRsp', 0x2d, 0x31, 0x00),
+        ('UploadFirmwareBlockReq', 0x2c, 0x32, 0x00),
+        ('UploadFirmwareBlockRsp', 0x2d, 0x32, 0x00),
+        ('FinishFirmwareUploadReq', 0x2c, 0x33, 0x00),
+        ('FinishFirmwareUploadRsp', 0x2d, 0x33, 0x00),
+        ('GetUpgradeStatusReq', 0x2c, 0x34, 0x00),
+        ('GetUpgradeStatusRsp', 0x2d, 0x34, 0x00),
+        ('ActivateFirmwareReq', 0x2c, 0x35, 0x00),
+        ('ActivateFirmwareRsp', 0x2d, 0x35, 0x00),
+        ('QuerySelftestResultsReq', 0x2c, 0x36, 0x00),
+        ('QuerySelftestResultsRsp', 0x2d, 0x36, 0x00),
+        ('QueryRollbackStatusReq', 0x2c, 0x37, 0x00),
+        ('QueryRollbackStatusRsp', 0x2d, 0x37, 0x00),
+        ('InitiateManualRollbackReq', 0x2c, 0x38, 0x00),
+        ('InitiateManualRollbackRsp', 0x2d, 0x38, 0x00),
+        ('GetLanAttachCapabilitiesReq', 0x2c, 0x3e, 0x00),
+        ('GetLanAttachCapabilitiesRsp', 0x2d, 0x3e, 0x00),
+    ),
+    'picmg': (
+        ('GetPicmgPropertiesReq', 0x2c, 0x00, 0x00),
+        ('GetPicmgPropertiesRsp', 0x2d, 0x00, 0x00),
+        ('GetAddressInfoReq', 0x2c, 0x01, 0x00),
+        ('GetAddressInfoRsp', 0x2d, 0x01, 0x00),
+        ('GetShelfAddressInfoReq', 0x2c, 0x02, 0x00),
+        ('GetShelfAddressInfoRsp', 0x2d, 0x02, 0x00),
+        ('FruControlReq', 0x2c, 0x04, 0x00),
+        ('FruControlRsp', 0x2d, 0x04, 0x00),
+        ('GetFruControlCapabilitiesReq', 0x2c, 0x1e, 0x00),
+        ('GetFruControlCapabilitiesRsp', 0x2d, 0x1e, 0x00),
+        ('SetFruActivationPolicyReq', 0x2c, 0x0a, 0x00),
+        ('SetFruActivationPolicyRsp', 0x2d, 0x0a, 0x00),
+        ('GetFruActivationPolicyReq', 0x2c, 0x0b, 0x00),
+        ('GetFruActivationPolicyRsp', 0x2d, 0x0b, 0x00),
+        ('SetFruActivationReq', 0x2c, 0x0c, 0x00),
+        ('SetFruActivationRsp', 0x2d, 0x0c, 0x00),
+        ('GetDeviceLocatorRecordIdReq', 0x2c, 0x0d, 0x00),
+        ('GetDeviceLocatorRecordIdRsp', 0x2d, 0x0d, 0x00),
+        ('GetFruLedPropertiesReq', 0x2c, 0x05, 0x00),
+        ('GetFruLedPropertiesRsp', 0x2d, 0x05, 0x00),
+        ('GetFruLedColorCapabilitiesReq', 0x2c, 0x06, 0x00),
+        ('GetFruLedColorCapabilitiesRsp', 0x2d, 0x06, 0x00),
+        ('GetPowerLevelReq', 0x2c, 0x12, 0x00),
+        ('GetPowerLevelRsp', 0x2d, 0x12, 0x00),
+        ('GetFanSpeedPropertiesReq', 0x2c, 0x14, 0x00),
+        ('GetFanSpeedPropertiesRsp', 0x2d, 0x14, 0x00),
+        ('SetFanLevelReq', 0x2c, 0x15, 0x00),
+        ('SetFanLevelRsp', 0x2d, 0x15, 0x00),
+        ('GetFanLevelReq', 0x2c, 0x16, 0x00),
+        ('GetFanLevelRsp', 0x2d, 0x16, 0x00),
+        ('SetFruLedStateReq', 0x2c, 0x07, 0x00),
+        ('SetFruLedStateRsp', 0x2d, 0x07, 0x00),
+        ('GetFruLedStateReq', 0x2c, 0x08, 0x00),
+        ('GetFruLedStateRsp', 0x2d, 0x08, 0x00),
+        ('SetPortStateReq', 0x2c, 0x0e, 0x00),
+        ('SetPortStateRsp', 0x2d, 0x0e, 0x00),
+        ('GetPortStateReq', 0x2c, 0x0f, 0x00),
+        ('GetPortStateRsp', 0x2d, 0x0f, 0x00),
+        ('SetSignalingClassReq', 0x2c, 0x3b, 0x00),
+        ('SetSignalingClassRsp', 0x2d, 0x3b, 0x00),
+        ('GetSignalingClassReq', 0x2c, 0x3c, 0x00),
+        ('GetSignalingClassRsp', 0x2d, 0x3c, 0x00),
+        ('GetLocationInformationReq', 0x2c, 0x23, 0x00),
+        ('GetLocationInformationRsp', 0x2d, 0x23, 0x00),
+        ('SendPowerChannelControlReq', 0x2c, 0x24, 0x00),
+        ('SendPowerChannelControlRsp', 0x2d, 0x24, 0x00),
+        ('GetPowerChannelStatusReq', 0x2c, 0x25, 0x00),
+        ('GetPowerChannelStatusRsp', 0x2d, 0x25, 0x00),
+        ('SendPmHeartbeatReq', 0x2c, 0x28, 0x00),
+        ('SendPmHeartbeatRsp', 0x2d, 0x28, 0x00),
+        ('GetTelcoAlarmCapabilityReq', 0x2c, 0x29, 0x00),
+        ('GetTelcoAlarmCapabilityRsp', 0x2d, 0x29, 0x00),
+    ),
+    'sdr': (
+        ('GetSdrRepositoryInfoReq', 0x0a, 0x20, None),
+        ('GetSdrRepositoryInfoRsp', 0x0b, 0x20, None),
+        ('GetSdrRepositoryAllocationInfoReq', 0x0a, 0x21, None),
+        ('GetSdrRepositoryAllocationInfoRsp', 0x0b, 0x21, None),
+        ('ReserveSdrRepositoryReq', 0x0a, 0x22, None),
+        ('ReserveSdrRepositoryRsp', 0x0b, 0x22, None),
+        ('GetSdrReq', 0x0a, 0x23, None),
+        ('GetSdrRsp', 0x0b, 0x23, None),
+        ('AddSdrReq', 0x0a, 0x24, None),
+        ('AddSdrRsp', 0x0b, 0x24, None),
+        ('PartialAddSdrReq', 0x0a, 0x25, None),
+        ('PartialAddSdrRsp', 0x0b, 0x25, None),
+        ('DeleteSdrReq', 0x0a, 0x26, None),
+        ('DeleteSdrRsp', 0x0b, 0x26, None),
+        ('ClearSdrRepositoryReq', 0x0a, 0x27, None),
+        ('ClearSdrRepositoryRsp', 0x0b, 0x27, None),
+        ('RunInitializationAgentReq', 0x0a, 0x2c, None),
+        ('RunInitializationAgentRsp', 0x0b, 0x2c, None),
+    ),
+    'sel': (
+        ('GetSelInfoReq', 0x0a, 0x40, None),
+        ('GetSelInfoRsp', 0x0b, 0x40, None),
+        ('GetSelAllocationInfoReq', 0x0a, 0x41, None),
+        ('GetSelAllocationInfoRsp', 0x0b, 0x41, None),
+        ('ReserveSelReq', 0x0a, 0x42, None),
+        ('ReserveSelRsp', 0x0b, 0x42, None),
+        ('GetSelEntryReq', 0x0a, 0x43, None),
+        ('GetSelEntryRsp', 0x0b, 0x43, None),
+        ('AddSelEntryReq', 0x0a, 0x44, None),
+        ('AddSelEntryRsp', 0x0b, 0x44, None),
+        ('DeleteSelEntryReq', 0x0a, 0x46, None),
+        ('DeleteSelEntryRsp', 0x0b, 0x46, None),
+        ('ClearSelReq', 0x0a, 0x47, None),
+        ('ClearSelRsp', 0x0b, 0x47, None),
+        ('GetSelTimeReq', 0x0a, 0x48, None),
+        ('GetSelTimeRsp', 0x0b, 0x48, None),
+        ('SetSelTimeReq', 0x0a, 0x49, None),
+        ('SetSelTimeRsp', 0x0b, 0x49, None),
+    ),
+    'sensor': (
+        ('GetDeviceSdrInfoReq', 0x04, 0x20, None),
+        ('GetDeviceSdrInfoRsp', 0x05, 0x20, None),
+        ('GetDeviceSdrReq', 0x04, 0x21, None),
+        ('GetDeviceSdrRsp', 0x05, 0x21, None),
+        ('ReserveDeviceSdrRepositoryReq', 0x04, 0x22, None),
+        ('ReserveDeviceSdrRepositoryRsp', 0x05, 0x22, None),
+        ('GetSensorThresholdsReq', 0x04, 0x27, None),
+        ('GetSensorThresholdsRsp', 0x05, 0x27, None),
+        ('SetSensorHysteresisReq', 0x04, 0x24, None),
+        ('SetSensorHysteresisRsp', 0x05, 0x24, None),
+        ('GetSensorHysteresisReq', 0x04, 0x25, None),
+        ('GetSensorHysteresisRsp', 0x05, 0x25, None),
+        ('SetSensorThresholdsReq', 0x04, 0x26, None),
+        ('SetSensorThresholdsRsp', 0x05, 0x26, None),
+        ('SetSensorEventEnableReq', 0x04, 0x28, None),
+        ('SetSensorEventEnableRsp', 0x05, 0x28, None),
+        ('GetSensorEventEnableReq', 0x04, 0x29, None),
+        ('GetSensorEventEnableRsp', 0x05, 0x29, None),
+        ('RearmSensorEventsReq', 0x04, 0x2a, None),
+        ('RearmSensorEventsRsp', 0x05, 0x2a, None),
+        ('GetSensorReadingReq', 0x04, 0x2d, None),
+        ('GetSensorReadingRsp', 0x05, 0x2d, None),
+        ('PlatformEventReq', 0x04, 0x02, None),
+        ('PlatformEventRsp', 0x05, 0x02, None),
+    ),
+    'event': (
+        ('SetEventReceiverReq', 0x04, 0x00, None),
+        ('SetEventReceiverRsp', 0x05, 0x00, None),
+        ('GetEventReceiverReq', 0x04, 0x01, None),
+        ('GetEventReceiverRsp', 0x05, 0x01, None),
+    ),
+    'lan': (
+        ('SetLanConfigurationParametersReq', 0x0c, 0x01, None),
+        ('SetLanConfigurationParametersRsp', 0x0d, 0x01, None),
+        ('GetLanConfigurationParametersReq', 0x0c, 0x02, None),
+        ('GetLanConfigurationParametersRsp', 0x0d, 0x02, None),
+    ),
+    'vita': (
+        ('VitaGetVsoCapabilitiesReq', 0x2c, 0x00, 0x03),
+        ('VitaGetVsoCapabilitiesRsp', 0x2d, 0x00, 0x03),
+        ('VitaGetChassisAddressTableInfoReq', 0x2c, 0x01, 0x03),
+        ('VitaGetChassisAddressTableInfoRsp', 0x2d, 0x01, 0x03),
+        ('VitaGetFruAddressInfoReq', 0x2c, 0x40, 0x03),
+        ('VitaGetFruAddressInfoRsp', 0x2d, 0x40, 0x03),
+        ('VitaGetChassisIdentifierReq', 0x2c, 0x02, 0x03),
+        ('VitaGetChassisIdentifierRsp', 0x2d, 0x02, 0x03),
+        ('VitaSetChassisIdentifierReq', 0x2c, 0x03, 0x03),
+        ('VitaSetChassisIdentifierRsp', 0x2d, 0x03, 0x03),
+        ('VitaFruControlReq', 0x2c, 0x04, 0x03),
+        ('VitaFruControlRsp', 0x2d, 0x04, 0x03),
+        ('VitaGetFruLedPropertiesReq', 0x2c, 0x05, 0x03),
+        ('VitaGetFruLedPropertiesRsp', 0x2d, 0x05, 0x03),
+        ('VitaGetFruLedCapabilitiesReq', 0x2c, 0x06, 0x03),
+        ('VitaGetFruLedCapabilitiesRsp', 0x2d, 0x06, 0x03),
+        ('VitaSetFruLedStateReq', 0x2c, 0x07, 0x03),
+        ('VitaSetFruLedStateRsp', 0x2d, 0x07, 0x03),
+        ('VitaGetFruLedStateReq', 0x2c, 0x08, 0x03),
+        ('VitaGetFruLedStateRsp', 0x2d, 0x08, 0x03),
+        ('VitaSetIpmbStateReq', 0x2c, 0x09, 0x03),
+        ('VitaSetIpmbStateRsp', 0x2d, 0x09, 0x03),
+        ('VitaSetFruStatePolicyReq', 0x2c, 0x0a, 0x03),
+        ('VitaSetFruStatePolicyRsp', 0x2d, 0x0a, 0x03),
+        ('VitaGetFruStatePolicyReq', 0x2c, 0x0b, 0x03),
+        ('VitaGetFruStatePolicyRsp', 0x2d, 0x0b, 0x03),
+        ('VitaSetFruActivationReq', 0x2c, 0x0c, 0x03),
+        ('VitaSetFruActivationRsp', 0x2d, 0x0c, 0x03),
+        ('VitaGetDeviceLocatorRecordReq', 0x2c, 0x0d, 0x03),
+        ('VitaGetDeviceLocatorRecordRsp', 0x2d, 0x0d, 0x03),
+        ('VitaFruControlCapabilitiesReq', 0x2c, 0x1e, 0x03),
+        ('VitaFruControlCapabilitiesRsp', 0x2d, 0x1e, 0x03),
+        ('VitaGetMandatorySensorNumbersReq', 0x2c, 0x44, 0x03),
+        ('VitaGetMandatorySensorNumbersRsp', 0x2d, 0x44, 0x03),
+        ('VitaGetFruHashReq', 0x2c, 0x45, 0x03),
+        ('VitaGetFruHashRsp', 0x2d, 0x45, 0x03),
+        ('VitaGetPayloadModeCapabilitiesReq', 0x2c, 0x46, 0x03),
+        ('VitaGetPayloadModeCapabilitiesRsp', 0x2d, 0x46, 0x03),
+        ('VitaSetPayloadModeReq', 0x2c, 0x47, 0x03),
+        ('VitaSetPayloadModeRsp', 0x2d, 0x47, 0x03),
+    ),
+}
@@ -20,7 +20,7 @@ from array import array
 from typing import Any, Callable
 
 from . import constants
-from ..utils import ByteBuffer
+from ..utils import ByteBuffer, ByteReader
 from ..errors import (CompletionCodeError, EncodingError, DecodingError,
                       DescriptionError)
 
@@ -66,10 +66,8 @@ class ByteArray(BaseField):
             data.push_unsigned_int(a[i], 1)
 
     def decode(self, obj: Message, data: ByteBuffer) -> None:
-        bytes = []
-        for i in range(self._length(obj)):
-            bytes.append(data.pop_unsigned_int(1))
-        setattr(obj, self.name, array('B', bytes))
+        value = data.pop_slice(self._length(obj)).tobytes()
+        setattr(obj, self.name, array('B', value))
 
     def create(self) -> array:
         if self.default is not None:
@@ -200,8 +198,7 @@ class RemainingBytes(BaseField):
         data.extend(a)
 
     def decode(self, obj: Message, data: ByteBuffer) -> None:
-        setattr(obj, self.name, array('B', data[:]))
-        del data.array[:]
+        setattr(obj, self.name, array('B', data.pop_string(len(data))))
 
     def create(self) -> array:
         return array('B')
@@ -292,12 +289,7 @@ class Bitfield(BaseField):
             data.push_unsigned_int((value >> (8*i)) & 0xff, 1)
 
     def decode(self, obj: Message, data: ByteBuffer) -> None:
-        value = 0
-        for i in range(self.length):
-            try:
-                value |= data.pop_unsigned_int(1) << (8*i)
-            except IndexError:
-                raise DecodingError('Data too short for message')
+        value = data.pop_unsigned_int(self.length)
         wrapper = getattr(obj, self.name)
         wrapper._value = value
 
@@ -316,6 +308,28 @@ class EventMessageRevision(UnsignedInt):
         UnsignedInt.__init__(self, 'event_message_rev', 1, value)
 
 
+class LazyField(object):
+    """Class attribute for a field of a compiled message class.
+
+    The field values are kept as instance attributes, which take precedence
+    over this descriptor. It is only used for a lazily created message
+    without the field value, where it decodes the message data on the first
+    access, see `Message._create_lazy`.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Message | None, objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        if '_lazy_data' not in obj.__dict__:
+            raise AttributeError("'%s' object has no attribute '%s'" %
+                                 (type(obj).__name__, self.name))
+        obj._decode_lazy()
+        return obj.__dict__[self.name]
+
+
 class Message(object):
     RESERVED_FIELD_NAMES = ['cmdid', 'netfn', 'lun', 'group_extension']
 
@@ -347,6 +361,45 @@ class Message(object):
             for (name, value) in kwargs.items():
                 self._set_field(name, value)
 
+    @classmethod
+    def _create_lazy(cls, data: bytes) -> Message:
+        """Create a message which decodes `data` on first field access.
+
+        Only the completion code is set right away. All other fields are
+        decoded together by their `LazyField` when one of them is accessed
+        for the first time. Classes without a compiled codec are decoded
+        immediately.
+        """
+        codec = cls.__dict__.get('_codec')
+        if codec is None:
+            return cls(data)
+
+        msg = cls.__new__(cls)
+        msg.lun = cls.__default_lun__
+        if 'data' not in codec.field_names:
+            msg.data = ''
+        msg._lazy_data = data
+        if codec.completion_code is not None and len(data) > 0:
+            setattr(msg, codec.completion_code, data[0])
+        return msg
+
+    def _decode_lazy(self) -> None:
+        """Decode the data of a lazily created message.
+
+        Fields assigned before are kept. If the data cannot be decoded, the
+        message is left unchanged and the error is raised as
+        `AttributeError`, so `hasattr` and `getattr` with a default work.
+        """
+        decoded = type(self)()
+        try:
+            decoded._decode(self.__dict__['_lazy_data'])
+        except DecodingError as e:
+            raise AttributeError("'%s' object cannot decode its data: %s"
+                                 % (type(self).__name__, e)) from e
+        del self.__dict__['_lazy_data']
+        for (name, value) in decoded.__dict__.items():
+            self.__dict__.setdefault(name, value)
+
     def _set_field(self, name: str, value: Any) -> None:
         raise NotImplementedError()
         # TODO walk along the properties..
@@ -355,6 +408,12 @@ class Message(object):
         return '{} [netfn={}, cmd={}, grp={}]'.format(type(self).__name__, self.netfn, self.cmdid, self.group_extension)
 
     def _create_fields(self) -> None:
+        if type(self).__dict__.get('_codec') is not None:
+            # the field names are checked when compiling the class
+            for field in self.__fields__:
+                setattr(self, field.name, field.create())
+            return
+
         for field in self.__fields__:
             if field.name in self.RESERVED_FIELD_NAMES:
                 raise DescriptionError('Field name "%s" is reserved' %
@@ -366,16 +425,16 @@ class Message(object):
 
     def _pack(self) -> array:
         """Pack the message and return an array."""
-        data = ByteBuffer()
-        if not hasattr(self, '__fields__'):
-            return data.array
-
-        for field in self.__fields__:
-            field.encode(self, data)
-        return data.array
+        return array('B', self._encode())
 
     def _encode(self) -> bytes:
         """Encode the message and return a bytestring."""
+        codec = type(self).__dict__.get('_codec')
+        if codec is not None:
+            return codec.encode(self)
+        return self._encode_fields()
+
+    def _encode_fields(self) -> bytes:
         data = ByteBuffer()
         if not hasattr(self, '__fields__'):
             return data.tostring()
@@ -386,10 +445,16 @@ class Message(object):
 
     def _decode(self, data: bytes) -> None:
         """Decode the bytestring message."""
+        codec = type(self).__dict__.get('_codec')
+        if codec is not None:
+            return codec.decode(self, data)
+        return self._decode_fields(data)
+
+    def _decode_fields(self, data: bytes) -> None:
         if not hasattr(self, '__fields__'):
             return
 
-        data = ByteBuffer(data)
+        data = ByteReader(data)
         cc = None
         for field in self.__fields__:
             try:
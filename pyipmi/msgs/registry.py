@@ -16,16 +16,33 @@
 
 from __future__ import annotations
 
+import importlib
 from functools import partial
 from typing import Any
 
 from ..errors import DescriptionError
-from .message import Message
+from .codec import compile_message_class
+from .index import MESSAGES
+from .message import LazyField, Message
 
 
 class MessageRegistry(object):
-    def __init__(self) -> None:
+    def __init__(self, index: dict[str, tuple] | None = None,
+                 package: str | None = None) -> None:
+        """Initializer for the MessageRegistry class.
+
+        `index` maps a module name to the (name, netfn, cmdid,
+        group_extension) tuples of the messages it registers. A module
+        is imported, relative to `package`, on the first lookup of one of
+        its messages.
+        """
         self.registry = dict()
+        self._package = package
+        self._modules = dict()
+        for (module, messages) in (index or {}).items():
+            for (name, netfn, cmdid, group_extension) in messages:
+                self._modules[name] = module
+                self._modules[(netfn, cmdid, group_extension)] = module
 
     def register_class(self, cls: type[Message]) -> type[Message]:
         # some sanity checks
@@ -55,6 +72,12 @@ class MessageRegistry(object):
                                    % (msg_id[0], msg_id[1], msg_id[2],
                                       self.registry[msg_id]))
 
+        # compile the encoder and decoder
+        cls._codec = compile_message_class(cls)
+        if cls._codec is not None:
+            for name in cls._codec.field_names:
+                setattr(cls, name, LazyField(name))
+
         # register name
         self.registry[cls.__name__] = cls
         # register (netfn, cmdid, group_extension) tuple
@@ -63,26 +86,53 @@ class MessageRegistry(object):
         # register
         return cls
 
+    def lookup(self, key: str | tuple) -> type[Message]:
+        """Return the message class by name or (netfn, cmdid,
+        group_extension) tuple.
+
+        Raises KeyError if there is no such message.
+        """
+        try:
+            return self.registry[key]
+        except KeyError:
+            module = self._modules.get(key)
+            if module is None:
+                raise
+        importlib.import_module('.' + module, self._package)
+        return self.registry[key]
+
+    def load_all(self) -> None:
+        """Import all indexed message modules."""
+        for module in dict.fromkeys(self._modules.values()):
+            importlib.import_module('.' + module, self._package)
+
     def create(self, netfn: int, cmdid: int, group_extension: int | None,
                *args: Any, **kwargs: Any) -> Message:
-        return self.registry[(netfn, cmdid, group_extension)](*args, **kwargs)
+        return self.lookup((netfn, cmdid, group_extension))(*args, **kwargs)
+
+    def create_lazy(self, netfn: int, cmdid: int, group_extension: int | None,
+                    data: bytes) -> Message:
+        """Create the message from `data`, decoded on first field access."""
+        cls = self.lookup((netfn, cmdid, group_extension))
+        return cls._create_lazy(data)
 
     def create_response(self, req: Message) -> Message:
         return self.create(req.netfn + 1, req.cmdid, req.group_extension)
 
     def create_request_by_name(self, name: str, *args: Any,
                                **kwargs: Any) -> Message:
-        return self.registry[name + "Req"](*args, **kwargs)
+        return self.lookup(name + "Req")(*args, **kwargs)
 
     def create_response_by_name(self, name: str, *args: Any,
                                 **kwargs: Any) -> Message:
-        return self.registry[name + "Rsp"](*args, **kwargs)
+        return self.lookup(name + "Rsp")(*args, **kwargs)
 
 
-DEFAULT_REGISTRY = MessageRegistry()
+DEFAULT_REGISTRY = MessageRegistry(MESSAGES, __package__)
 register_message_class = partial(MessageRegistry.register_class,
                                  DEFAULT_REGISTRY)
 create_message = partial(MessageRegistry.create, DEFAULT_REGISTRY)
+create_lazy_message = partial(MessageRegistry.create_lazy, DEFAULT_REGISTRY)
 create_response_message = partial(MessageRegistry.create_response,
                                   DEFAULT_REGISTRY)
 create_request_by_name = partial(MessageRegistry.create_request_by_name,
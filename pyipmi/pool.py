@@ -0,0 +1,299 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Reuse of established sessions.
+
+Establishing a RMCP session takes five round trips. A `SessionPool` keeps
+the sessions open after use and hands them out again for the same
+(host, port, username, privilege level).
+
+Example:
+
+    pool = pyipmi.pool.SessionPool(max_sessions_per_host=2)
+    with pool.connection('10.0.0.1', username='admin',
+                         password='admin') as ipmi:
+        ipmi.get_device_id()
+    ...
+    pool.close()
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from typing import Any, Callable, Generator
+
+from . import Ipmi, Target, create_connection
+from .errors import IpmiTimeoutError
+from .interfaces import create_interface
+from .interfaces.rmcp import call_repeatedly
+from .logger import log
+
+
+class _PooledSession(object):
+    __slots__ = ('ipmi', 'key', 'password', 'last_used')
+
+    def __init__(self, ipmi: Ipmi, key: tuple, password: str | None) -> None:
+        self.ipmi = ipmi
+        self.key = key
+        self.password = password
+        self.last_used = time.monotonic()
+
+
+class SessionPool(object):
+    """Thread safe pool of established sessions.
+
+    At most `max_sessions_per_host` sessions are open to one BMC (host and
+    port), regardless of the user. `acquire` waits for a session to be
+    released if the limit is reached. Sessions unused for `idle_timeout`
+    seconds are closed.
+
+    The sessions are kept alive with the keep alive of the interface, every
+    `keep_alive_interval` seconds. A session whose keep alive failed is
+    not handed out again.
+
+    `interface_factory` returns the interface for a new session, the
+    default is a native RMCP interface.
+    """
+
+    def __init__(self, max_sessions_per_host: int = 2,
+                 idle_timeout: float | None = 60.0,
+                 keep_alive_interval: int = 10,
+                 interface_factory: Callable[[], Any] | None = None) -> None:
+        if max_sessions_per_host < 1:
+            raise RuntimeError('max_sessions_per_host must be at least 1')
+        self.max_sessions_per_host = max_sessions_per_host
+        self.idle_timeout = idle_timeout
+        self.keep_alive_interval = keep_alive_interval
+        self.interface_factory = interface_factory
+        self._cond = threading.Condition()
+        # idle sessions per key, the most recently used one last
+        self._idle = {}
+        # open or opening sessions per (host, port)
+        self._count = {}
+        self._in_use = {}
+        self._closed = False
+        self._stop_reaper = None
+        if idle_timeout:
+            self._stop_reaper = call_repeatedly(
+                max(idle_timeout / 2, 0.1), self.evict_idle)
+
+    def __enter__(self) -> SessionPool:
+        return self
+
+    def __exit__(self, exception_type: Any, exception_value: Any,
+                 traceback: Any) -> bool:
+        self.close()
+        return False
+
+    def _create_interface(self) -> Any:
+        if self.interface_factory is not None:
+            return self.interface_factory()
+        return create_interface('rmcp',
+                                keep_alive_interval=self.keep_alive_interval)
+
+    def _connect(self, host: str, port: int, username: str | None,
+                 password: str | None, priv_level: str) -> Ipmi:
+        ipmi = create_connection(self._create_interface())
+        ipmi.session.set_session_type_rmcp(host, port=port)
+        if username is not None:
+            ipmi.session.set_auth_type_user(username, password)
+        ipmi.session.set_priv_level(priv_level)
+        ipmi.open()
+        return ipmi
+
+    @staticmethod
+    def _is_alive(ipmi: Ipmi) -> bool:
+        is_alive = getattr(ipmi.interface, 'is_session_alive', None)
+        return is_alive is None or is_alive()
+
+    def _close_session(self, entry: _PooledSession) -> None:
+        try:
+            entry.ipmi.close()
+        except Exception as e:
+            log().debug('closing session to %s:%s failed: %s',
+                        entry.key[0], entry.key[1], e)
+
+    def _release_slot(self, key: tuple) -> None:
+        # called with the lock held
+        bmc = key[:2]
+        self._count[bmc] -= 1
+        if not self._count[bmc]:
+            del self._count[bmc]
+        self._cond.notify_all()
+
+    def _take_idle(self, key: tuple, password: str | None
+                   ) -> tuple[_PooledSession | None, list[_PooledSession]]:
+        """Return an idle session of the key and the ones to close."""
+        # called with the lock held
+        stale = []
+        entries = self._idle.get(key, [])
+        while entries:
+            entry = entries.pop()
+            if entry.password == password and self._is_alive(entry.ipmi):
+                return (entry, stale)
+            stale.append(entry)
+            self._release_slot(key)
+        return (None, stale)
+
+    def _evict_other(self, key: tuple) -> _PooledSession | None:
+        """Free a slot of the BMC by an idle session of another user."""
+        # called with the lock held
+        candidates = [other for (other_key, entries) in self._idle.items()
+                      if other_key[:2] == key[:2] and other_key != key
+                      for other in entries]
+        if not candidates:
+            return None
+        entry = min(candidates, key=lambda e: e.last_used)
+        self._idle[entry.key].remove(entry)
+        self._release_slot(entry.key)
+        return entry
+
+    def acquire(self, host: str, port: int = 623,
+                username: str | None = None, password: str | None = None,
+                priv_level: str = 'administrator',
+                timeout: float | None = None,
+                target: Target | None = None) -> Ipmi:
+        """Return an established connection to the BMC.
+
+        An idle session of the same host, port, username and privilege
+        level is reused, otherwise a new one is established. Raises
+        `IpmiTimeoutError` if no session is available within `timeout`
+        seconds. The connection has to be given back with `release`.
+        """
+        key = (host, port, username, priv_level.lower())
+        bmc = key[:2]
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        entry = None
+        to_close = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError('session pool is closed')
+                (entry, stale) = self._take_idle(key, password)
+                to_close.extend(stale)
+                if entry is not None:
+                    break
+                if self._count.get(bmc, 0) < self.max_sessions_per_host:
+                    # reserve the slot, the session is established below
+                    self._count[bmc] = self._count.get(bmc, 0) + 1
+                    break
+                other = self._evict_other(key)
+                if other is not None:
+                    to_close.append(other)
+                    continue
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise IpmiTimeoutError(
+                            'no session to %s:%d available' % bmc)
+                self._cond.wait(remaining)
+
+        for stale in to_close:
+            self._close_session(stale)
+
+        if entry is None:
+            try:
+                ipmi = self._connect(host, port, username, password,
+                                     priv_level)
+            except BaseException:
+                with self._cond:
+                    self._release_slot(key)
+                raise
+            entry = _PooledSession(ipmi, key, password)
+            log().debug('new session to %s:%d', host, port)
+
+        entry.ipmi.target = target if target is not None else Target(0x20)
+        with self._cond:
+            self._in_use[id(entry.ipmi)] = entry
+        return entry.ipmi
+
+    def release(self, ipmi: Ipmi, discard: bool = False) -> None:
+        """Give back a connection of `acquire`.
+
+        With `discard` or if the pool is closed, the session is closed
+        instead of being kept for reuse.
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(ipmi))
+            entry.last_used = time.monotonic()
+            if discard or self._closed:
+                self._release_slot(entry.key)
+            else:
+                self._idle.setdefault(entry.key, []).append(entry)
+                self._cond.notify_all()
+                return
+        self._close_session(entry)
+
+    @contextlib.contextmanager
+    def connection(self, *args: Any, **kwargs: Any
+                   ) -> Generator[Ipmi, None, None]:
+        """Context manager of `acquire` and `release`.
+
+        The session is discarded if the block raises an exception.
+        """
+        ipmi = self.acquire(*args, **kwargs)
+        try:
+            yield ipmi
+        except BaseException:
+            self.release(ipmi, discard=True)
+            raise
+        self.release(ipmi)
+
+    def evict_idle(self) -> None:
+        """Close the sessions idle for more than `idle_timeout` seconds or
+        with a failed keep alive."""
+        now = time.monotonic()
+        to_close = []
+        with self._cond:
+            for (key, entries) in list(self._idle.items()):
+                for entry in list(entries):
+                    if ((self.idle_timeout is not None
+                         and now - entry.last_used > self.idle_timeout)
+                            or not self._is_alive(entry.ipmi)):
+                        entries.remove(entry)
+                        self._release_slot(key)
+                        to_close.append(entry)
+                if not entries:
+                    del self._idle[key]
+        for entry in to_close:
+            self._close_session(entry)
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                'idle': sum(len(entries) for entries in self._idle.values()),
+                'in_use': len(self._in_use),
+                'open': sum(self._count.values()),
+            }
+
+    def close(self) -> None:
+        """Close all idle sessions, the ones in use are closed on release."""
+        if self._stop_reaper:
+            self._stop_reaper()
+            self._stop_reaper = None
+        with self._cond:
+            self._closed = True
+            to_close = [entry for entries in self._idle.values()
+                        for entry in entries]
+            for entry in to_close:
+                self._release_slot(entry.key)
+            self._idle = {}
+        for entry in to_close:
+            self._close_session(entry)
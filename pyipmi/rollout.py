@@ -0,0 +1,482 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Install a HPM.1 upgrade image on many targets at once.
+
+The image is parsed once and shared by all targets. Each target runs
+through the stages of `Hpm.install_component_from_image` as a state
+machine, which can be saved with `to_dict` and resumed later.
+
+Example:
+
+    image = pyipmi.hpm.UpgradeImage('firmware.hpm')
+    hosts = [pyipmi.fleet.Host('10.0.0.%d' % i, username='admin',
+                               password='admin') for i in range(1, 255)]
+    rollout = pyipmi.rollout.Rollout(image, hosts, component=1,
+                                     max_parallel=32)
+    report = rollout.run()
+    print(report)
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from . import Ipmi
+from .errors import CompletionCodeError, HpmError, IpmiTimeoutError
+from .fleet import Host, connect_rmcp
+from .hpm import (CC_LONG_DURATION_CMD_IN_PROGRESS, UpgradeImage,
+                  UpgradeActionRecordUploadForUpgrade, UploadProgress)
+from .logger import log
+from .msgs import constants
+
+STAGE_PENDING = 'pending'
+STAGE_PREPARE = 'prepare'
+STAGE_ACTION = 'action'
+STAGE_UPLOAD = 'upload'
+STAGE_FINISH = 'finish'
+STAGE_ACTIVATE = 'activate'
+STAGE_WAIT = 'wait'
+STAGE_DONE = 'done'
+STAGE_FAILED = 'failed'
+
+STAGES = (STAGE_PENDING, STAGE_PREPARE, STAGE_ACTION, STAGE_UPLOAD,
+          STAGE_FINISH, STAGE_ACTIVATE, STAGE_WAIT, STAGE_DONE, STAGE_FAILED)
+
+# the firmware is uploaded from these stages on, i.e. a resumed rollout
+# continues there instead of starting over
+_RESUMABLE_STAGES = (STAGE_ACTIVATE, STAGE_WAIT, STAGE_DONE)
+
+
+class RolloutTarget(object):
+    """The state of the rollout on one target.
+
+    `stage` is one of `STAGES`, `action` the index of the current upgrade
+    action of the component. A failed target has the stage it failed in in
+    `failed_stage` and the exception in `error`.
+    """
+
+    def __init__(self, host: Host) -> None:
+        self.host = host
+        self.stage = STAGE_PENDING
+        self.action = 0
+        self.failed_stage = None
+        self.error = None
+        self.elapsed = 0.0
+        self.progress = None
+        self._ipmi = None
+        # (command, deadline, next stage, next action) of a long duration
+        # command in progress
+        self._poll = None
+        self._deadline = None
+        self._start = None
+        self._base_elapsed = 0.0
+
+    @property
+    def key(self) -> str:
+        return '%s/0x%02x' % (self.host, self.host.target_address)
+
+    @property
+    def finished(self) -> bool:
+        return self.stage in (STAGE_DONE, STAGE_FAILED)
+
+    def __str__(self) -> str:
+        if self.stage == STAGE_FAILED:
+            return '%s: failed in %s after %.1f s: %s' % (
+                self.key, self.failed_stage, self.elapsed, self.error)
+        return '%s: %s after %.1f s' % (self.key, self.stage, self.elapsed)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'stage': self.stage,
+            'action': self.action,
+            'failed_stage': self.failed_stage,
+            'error': None if self.error is None else str(self.error),
+            'elapsed': self.elapsed,
+        }
+
+    def restore(self, d: dict[str, Any]) -> None:
+        """Continue from a state of `to_dict`.
+
+        Targets with the firmware uploaded continue with the activation,
+        all others, including failed ones, start over.
+        """
+        self.elapsed = d.get('elapsed', 0.0)
+        if d.get('stage') in _RESUMABLE_STAGES:
+            self.stage = d['stage']
+            self.action = d.get('action', 0)
+
+
+class RolloutReport(object):
+    """The summary of a rollout, see `Rollout.run`."""
+
+    def __init__(self, targets: list[RolloutTarget], elapsed: float) -> None:
+        self.targets = targets
+        self.elapsed = elapsed
+
+    @property
+    def done(self) -> list[RolloutTarget]:
+        return [t for t in self.targets if t.stage == STAGE_DONE]
+
+    @property
+    def failed(self) -> list[RolloutTarget]:
+        return [t for t in self.targets if t.stage == STAGE_FAILED]
+
+    @property
+    def ok(self) -> bool:
+        return len(self.done) == len(self.targets)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'elapsed': self.elapsed,
+            'done': len(self.done),
+            'failed': len(self.failed),
+            'targets': dict((t.key, t.to_dict()) for t in self.targets),
+        }
+
+    def __str__(self) -> str:
+        lines = ['%d of %d targets done, %d failed in %.1f s'
+                 % (len(self.done), len(self.targets), len(self.failed),
+                    self.elapsed)]
+        lines.extend(' %s' % t for t in self.failed)
+        return '\n'.join(lines)
+
+
+class Rollout(object):
+    """Install a component of an upgrade image on many targets.
+
+    At most `max_parallel` targets are upgraded at the same time by
+    `max_workers` threads (by default one per target). A thread only runs
+    one step of a target at a time, i.e. targets waiting for a long duration
+    command or for the new firmware to come up do not keep a thread busy.
+
+    `image` is an `UpgradeImage` or a file name. `hosts` are
+    `pyipmi.fleet.Host` objects, `connect` returns the opened connection to
+    one, by default a native RMCP session.
+
+    `command_timeout` is the time a long duration command may take,
+    `activation_timeout` the time the target may be inaccessible after the
+    activation, by default the inaccessibility timeout of the image.
+    `interval` is the time between two polls of the target and
+    `settle_time` the time after the activation before the first one.
+
+    `window` and `progress` are passed to `Hpm.upload_binary`, `progress`
+    with the target as first argument. `on_change` is called with the
+    target after each change of its stage, e.g. to save the state of the
+    rollout with `to_dict`. The callbacks are called from the worker
+    threads.
+
+    A rollout is resumed by passing the `to_dict` of the interrupted one as
+    `state`.
+    """
+
+    def __init__(self, image: UpgradeImage | str, hosts: list[Host],
+                 component: int, max_parallel: int = 16,
+                 max_workers: int | None = None,
+                 connect: Callable[[Host], Ipmi] = connect_rmcp,
+                 command_timeout: float = 60.0,
+                 activation_timeout: float | None = None,
+                 interval: float = 1.0, settle_time: float = 5.0,
+                 window: int = 1,
+                 progress: Callable[[RolloutTarget, UploadProgress], None]
+                 | None = None,
+                 on_change: Callable[[RolloutTarget], None] | None = None,
+                 state: dict[str, Any] | None = None) -> None:
+        if isinstance(image, str):
+            image = UpgradeImage(image)
+        if component not in image.header.components:
+            raise HpmError('component=%d not in image' % component)
+        if max_parallel < 1:
+            raise RuntimeError('max_parallel must be at least 1')
+
+        self.image = image
+        self.component = component
+        # the upgrade actions of the component, shared by all targets
+        self.actions = [action for action in image.actions
+                        if action.components & (1 << component)]
+        self.max_parallel = max_parallel
+        self.max_workers = max_workers or max_parallel
+        self.connect = connect
+        self.command_timeout = command_timeout
+        if activation_timeout is None:
+            activation_timeout = image.header.inaccessibility_timeout or 60
+        self.activation_timeout = activation_timeout
+        self.interval = interval
+        self.settle_time = settle_time
+        self.window = window
+        self.progress = progress
+        self.on_change = on_change
+
+        self.targets = [RolloutTarget(host) for host in hosts]
+        if state is not None:
+            if state.get('component', component) != component:
+                raise HpmError('state is of component %s'
+                               % state.get('component'))
+            saved = state.get('targets', {})
+            for target in self.targets:
+                if target.key in saved:
+                    target.restore(saved[target.key])
+
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                'component': self.component,
+                'targets': dict((t.key, t.to_dict()) for t in self.targets),
+            }
+
+    def stop(self) -> None:
+        """Stop the rollout after the steps currently running."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def run(self) -> RolloutReport:
+        """Run the rollout and return the report once all targets are
+        finished or the rollout is stopped."""
+        start = time.monotonic()
+        pending = deque(t for t in self.targets if not t.finished)
+        # (time of the next step, counter, target) of the started targets
+        ready = []
+        counter = itertools.count()
+        active = [0]
+
+        def next_target() -> RolloutTarget | None:
+            # called with the lock held
+            while True:
+                if self._stopped:
+                    return None
+                while pending and active[0] < self.max_parallel:
+                    heapq.heappush(ready, (0, next(counter),
+                                           pending.popleft()))
+                    active[0] += 1
+                if not ready:
+                    if not active[0]:
+                        return None
+                    # wait for the targets the other threads are running
+                    self._cond.wait()
+                    continue
+                delay = ready[0][0] - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                return heapq.heappop(ready)[2]
+
+        def worker() -> None:
+            while True:
+                with self._cond:
+                    target = next_target()
+                if target is None:
+                    break
+                delay = 0
+                try:
+                    delay = self._step(target)
+                except BaseException as e:
+                    # the thread dies, do not leave the target to the others
+                    if not target.finished:
+                        (target.failed_stage, target.error) = (target.stage, e)
+                        target.stage = STAGE_FAILED
+                    raise
+                finally:
+                    with self._cond:
+                        if target.finished:
+                            active[0] -= 1
+                        else:
+                            heapq.heappush(ready, (time.monotonic() + delay,
+                                                   next(counter), target))
+                        self._cond.notify_all()
+
+        workers = [threading.Thread(target=worker, daemon=True)
+                   for _ in range(min(self.max_workers, len(pending)))]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+
+        for target in self.targets:
+            self._disconnect(target)
+        return RolloutReport(self.targets, time.monotonic() - start)
+
+    def _ipmi(self, target: RolloutTarget) -> Ipmi:
+        if target._ipmi is None:
+            target._ipmi = self.connect(target.host)
+        return target._ipmi
+
+    def _disconnect(self, target: RolloutTarget) -> None:
+        (ipmi, target._ipmi) = (target._ipmi, None)
+        if ipmi is None:
+            return
+        try:
+            ipmi.close()
+        except Exception as e:
+            log().debug('closing %s failed: %s', target.key, e)
+
+    def _set_stage(self, target: RolloutTarget, stage: str,
+                   action: int | None = None) -> None:
+        target.stage = stage
+        if action is not None:
+            target.action = action
+        if target._start is not None:
+            target.elapsed = target._base_elapsed \
+                + time.monotonic() - target._start
+        log().debug('%s: %s %d', target.key, stage, target.action)
+        if self.on_change is not None:
+            try:
+                self.on_change(target)
+            except Exception as e:
+                log().warning('%s: on_change failed: %s', target.key, e)
+
+    def _wait_for(self, target: RolloutTarget, cmdid: int, stage: str,
+                  action: int | None = None) -> float:
+        """Poll the long duration command before going on with `stage`."""
+        target._poll = (cmdid, time.monotonic() + self.command_timeout,
+                        stage, action)
+        return self.interval
+
+    def _step(self, target: RolloutTarget) -> float:
+        """Run one step of the target and return the delay to the next."""
+        if target._start is None:
+            target._start = time.monotonic()
+            target._base_elapsed = target.elapsed
+        stage = target.stage
+        try:
+            if target._poll is not None:
+                return self._poll_command(target)
+            return getattr(self, '_step_' + stage)(target)
+        except Exception as e:
+            log().debug('%s failed in %s: %s', target.key, stage, e)
+            target.failed_stage = stage
+            target.error = e
+            target._poll = None
+            self._disconnect(target)
+            self._set_stage(target, STAGE_FAILED)
+            return 0
+
+    def _poll_command(self, target: RolloutTarget) -> float:
+        (cmdid, deadline, stage, action) = target._poll
+        try:
+            status = self._ipmi(target).get_upgrade_status()
+            cc = status.last_completion_code
+        except (IpmiTimeoutError, IOError):
+            cc = CC_LONG_DURATION_CMD_IN_PROGRESS
+        if cc == CC_LONG_DURATION_CMD_IN_PROGRESS:
+            if time.monotonic() > deadline:
+                raise IpmiTimeoutError('command 0x%02x not completed' % cmdid)
+            return self.interval
+        target._poll = None
+        if cc != constants.CC_OK:
+            raise HpmError('command 0x%02x CC=0x%02x' % (cmdid, cc))
+        self._set_stage(target, stage, action)
+        return 0
+
+    def _step_pending(self, target: RolloutTarget) -> float:
+        self._set_stage(target, STAGE_PREPARE)
+        return 0
+
+    def _step_prepare(self, target: RolloutTarget) -> float:
+        ipmi = self._ipmi(target)
+        ipmi.abort_firmware_upgrade()
+        ipmi.preparation_stage(self.image)
+        self._set_stage(target, STAGE_ACTION, 0)
+        return 0
+
+    def _step_action(self, target: RolloutTarget) -> float:
+        if target.action >= len(self.actions):
+            self._set_stage(target, STAGE_ACTIVATE)
+            return 0
+
+        action = self.actions[target.action]
+        if isinstance(action, UpgradeActionRecordUploadForUpgrade):
+            (stage, next_action) = (STAGE_UPLOAD, target.action)
+        else:
+            (stage, next_action) = (STAGE_ACTION, target.action + 1)
+        try:
+            self._ipmi(target).initiate_upgrade_action(
+                1 << self.component, action.action_type)
+        except CompletionCodeError as e:
+            if e.cc != CC_LONG_DURATION_CMD_IN_PROGRESS:
+                raise HpmError('initiate_upgrade_action CC=0x%02x' % e.cc)
+            return self._wait_for(
+                target, constants.CMDID_HPM_INITIATE_UPGRADE_ACTION, stage,
+                next_action)
+        self._set_stage(target, stage, next_action)
+        return 0
+
+    def _step_upload(self, target: RolloutTarget) -> float:
+        action = self.actions[target.action]
+
+        def progress(status: UploadProgress) -> None:
+            target.progress = status
+            if self.progress is not None:
+                self.progress(target, status)
+
+        self._ipmi(target).upload_binary(action.firmware_image_data,
+                                         window=self.window,
+                                         progress=progress)
+        self._set_stage(target, STAGE_FINISH)
+        return 0
+
+    def _step_finish(self, target: RolloutTarget) -> float:
+        action = self.actions[target.action]
+        try:
+            self._ipmi(target).finish_firmware_upload(
+                self.component, action.firmware_length)
+        except CompletionCodeError as e:
+            if e.cc != CC_LONG_DURATION_CMD_IN_PROGRESS:
+                raise HpmError('finish_firmware_upload CC=0x%02x' % e.cc)
+            return self._wait_for(
+                target, constants.CMDID_HPM_FINISH_FIRMWARE_UPLOAD,
+                STAGE_ACTION, target.action + 1)
+        self._set_stage(target, STAGE_ACTION, target.action + 1)
+        return 0
+
+    def _step_activate(self, target: RolloutTarget) -> float:
+        try:
+            self._ipmi(target).activate_firmware()
+        except CompletionCodeError as e:
+            if e.cc != CC_LONG_DURATION_CMD_IN_PROGRESS:
+                raise HpmError('activate_firmware CC=0x%02x' % e.cc)
+        except IpmiTimeoutError:
+            # controller is in reset and flashed new firmware
+            pass
+        # the connection does not survive the reset of the controller
+        self._disconnect(target)
+        target._deadline = time.monotonic() + self.activation_timeout
+        self._set_stage(target, STAGE_WAIT)
+        return self.settle_time
+
+    def _step_wait(self, target: RolloutTarget) -> float:
+        if target._deadline is None:
+            # resumed
+            target._deadline = time.monotonic() + self.activation_timeout
+        try:
+            self._ipmi(target).get_device_id()
+        except Exception as e:
+            if time.monotonic() > target._deadline:
+                raise IpmiTimeoutError('target not accessible after the '
+                                       'activation: %s' % e)
+            self._disconnect(target)
+            return self.interval
+        self._disconnect(target)
+        self._set_stage(target, STAGE_DONE)
+        return 0
@@ -20,19 +20,24 @@ from __future__ import division
 
 import math
 from array import array
-from typing import Callable, Generator
+from typing import Any, Callable, Generator
 
 from . import errors
 
 from .errors import DecodingError
 from .fields import SdrTypeLengthString
-from .utils import check_completion_code, ByteBuffer
+from .utils import check_completion_code, ByteReader
 from .msgs import create_request_by_name, Message
 
 from .helper import get_sdr_data_helper, clear_repository_helper
-from .helper import get_sdr_chunk_helper
+from .helper import get_sdr_chunk_helper, SdrReadLength
 from .state import State
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 SDR_TYPE_FULL_SENSOR_RECORD = 0x01
 SDR_TYPE_COMPACT_SENSOR_RECORD = 0x02
 SDR_TYPE_EVENT_ONLY_SENSOR_RECORD = 0x03
@@ -59,10 +64,63 @@ L_CUBE = 9
 L_SQRT = 10
 L_CUBERT = 11
 
+LINEARIZATION = {
+    L_LN: math.log,
+    L_LOG: lambda x: math.log(x, 10),
+    L_LOG2: lambda x: math.log(x, 2),
+    L_E: math.exp,
+    L_EXP10: lambda x: math.pow(10, x),
+    L_EXP2: lambda x: math.pow(2, x),
+    L_1_X: lambda x: 1.0 / x,
+    L_SQR: lambda x: math.pow(x, 2),
+    L_CUBE: lambda x: math.pow(x, 3),
+    L_SQRT: math.sqrt,
+    L_CUBERT: lambda x: math.pow(x, 1.0/3),
+    L_LINEAR: lambda x: x,
+}
+
 
 class Sdr(object):
     def __init__(self) -> None:
-        pass
+        # optional `pyipmi.sdrcache.SdrCache` for the SDR lists
+        self.sdr_cache = None
+        self._sdr_read_length = SdrReadLength()
+        # the device GUID string of each target, None if not available
+        self._sdr_cache_guids = {}
+
+    def _sdr_cache_guid(self) -> str | None:
+        target = getattr(self, 'target', None)
+        target_key = None
+        if target is not None:
+            target_key = (target.ipmb_address,
+                          tuple((r.rq_sa, r.rs_sa, r.channel)
+                                for r in target.routing or ()))
+        if target_key in self._sdr_cache_guids:
+            return self._sdr_cache_guids[target_key]
+
+        try:
+            guid = self.get_device_guid()
+            device_guid = guid.device_guid
+            # the GUID is not set on all BMCs
+            if all(b == 0 for b in device_guid) \
+                    or all(b == 0xff for b in device_guid):
+                guid_string = None
+            else:
+                guid_string = guid.device_guid_string
+        except errors.CompletionCodeError:
+            guid_string = None
+        self._sdr_cache_guids[target_key] = guid_string
+        return guid_string
+
+    def _sdr_cache_key(self, name: str) -> str | None:
+        """Return the cache key of the SDR list or None if not cacheable.
+
+        The device GUID is only read once per target of the connection.
+        """
+        guid_string = self._sdr_cache_guid()
+        if guid_string is None:
+            return None
+        return '%s-%s' % (guid_string, name)
 
     def get_sdr_repository_info(self) -> SdrRepositoryInfo:
         return SdrRepositoryInfo(
@@ -93,7 +151,7 @@ class Sdr(object):
                            reservation_id: int | None = None) -> SdrCommon:
         (next_id, record_data) = get_sdr_data_helper(
                 self.reserve_sdr_repository, self._get_sdr_chunk,
-                record_id, reservation_id)
+                record_id, reservation_id, self._sdr_read_length)
         return SdrCommon.from_data(record_data, next_id)
 
     def sdr_repository_entries(self) -> Generator[SdrCommon, None, None]:
@@ -114,8 +172,27 @@ class Sdr(object):
 
     def get_repository_sdr_list(self,
                                 reservation_id: int | None = None) -> list[SdrCommon]:
-        """Return the complete SDR list."""
-        return list(self.sdr_repository_entries())
+        """Return the complete SDR list.
+
+        If `sdr_cache` is set, the list is only read from the repository if
+        it changed since it has been cached. The cached records are shared
+        by all callers and must not be modified.
+        """
+        if self.sdr_cache is None:
+            return list(self.sdr_repository_entries())
+
+        key = self._sdr_cache_key('repository')
+        if key is None:
+            return list(self.sdr_repository_entries())
+
+        info = self.get_sdr_repository_info()
+        stamp = (info.record_count, info.most_recent_addition,
+                 info.most_recent_erase)
+        records = self.sdr_cache.get(key, stamp)
+        if records is None:
+            records = list(self.sdr_repository_entries())
+            self.sdr_cache.put(key, stamp, records)
+        return records
 
     def partial_add_sdr(self, reservation_id: int, record_id: int,
                         offset: int, progress: int, data: bytes) -> int:
@@ -169,6 +246,7 @@ class SdrRepositoryInfo(State):
         self.record_count = rsp.record_count
         self.free_space = rsp.free_space
         self.most_recent_addition = rsp.most_recent_addition
+        self.most_recent_erase = rsp.most_recent_erase
         self.support_get_allocation_info = rsp.support.get_allocation_info
         self.support_reserve = rsp.support.reserve
         self.support_partial_add = rsp.support.partial_add
@@ -214,7 +292,7 @@ class SdrCommon(object):
         return s
 
     def _common_header(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[:])
+        buffer = ByteReader(data)
         try:
             self.id = buffer.pop_unsigned_int(2)
             self.version = buffer.pop_unsigned_int(1)
@@ -223,16 +301,16 @@ class SdrCommon(object):
         except IndexError:
             raise DecodingError('Invalid SDR length (%d)' % len(data))
 
-    def _common_record_key(self, buffer: ByteBuffer) -> None:
+    def _common_record_key(self, buffer: ByteReader) -> None:
         self.owner_id = buffer.pop_unsigned_int(1)
         self.owner_lun = buffer.pop_unsigned_int(1) & 0x3
         self.number = buffer.pop_unsigned_int(1)
 
-    def _entity(self, buffer: ByteBuffer) -> None:
+    def _entity(self, buffer: ByteReader) -> None:
         self.entity_id = buffer.pop_unsigned_int(1)
         self.entity_instance = buffer.pop_unsigned_int(1)
 
-    def _device_id_string(self, buffer: ByteBuffer) -> None:
+    def _device_id_string(self, buffer: ByteReader) -> None:
         self.device_id_string_type = (buffer[0] & 0xc0) >> 4
         self.device_id_string_length = buffer[0] & 0x3f
         field = SdrTypeLengthString(data=buffer[0:1+self.device_id_string_length])
@@ -273,6 +351,9 @@ class SdrFullSensorRecord(SdrCommon):
     DATA_FMT_2S_COMPLEMENT = 2
     DATA_FMT_NONE = 3
 
+    _conversion_table = None
+    _conversion_table_key = None
+
     def __init__(self, data: bytes | None = None,
                  next_id: int | None = None) -> None:
         super(SdrFullSensorRecord, self).__init__(data, next_id)
@@ -299,6 +380,41 @@ class SdrFullSensorRecord(SdrCommon):
 
         return self.lin((self.m * raw + (self.b * 10**self.k1)) * 10**self.k2)
 
+    def conversion_table(self) -> Any:
+        """Return the converted values of all 256 raw readings.
+
+        The table is a `numpy.ndarray` if numpy is available, otherwise an
+        `array('d')`. Raw readings without a valid value are NaN. The table
+        is built on first use and rebuilt if the conversion factors change.
+        """
+        key = (self.analog_data_format, self.m, self.b, self.k1, self.k2,
+               self.linearization)
+        if self._conversion_table is None or self._conversion_table_key != key:
+            values = []
+            for raw in range(256):
+                try:
+                    values.append(self.convert_sensor_raw_to_value(raw))
+                except (ValueError, ZeroDivisionError, OverflowError):
+                    values.append(math.nan)
+            if numpy is not None:
+                table = numpy.array(values, dtype=numpy.float64)
+            else:
+                table = array('d', values)
+            self._conversion_table = table
+            self._conversion_table_key = key
+        return self._conversion_table
+
+    def convert_many(self, raws: Any) -> Any:
+        """Convert a sequence of raw readings using the conversion table.
+
+        Returns a `numpy.ndarray` if numpy is available, otherwise an
+        `array('d')`. Invalid values are NaN.
+        """
+        table = self.conversion_table()
+        if numpy is not None:
+            return table[numpy.asarray(raws, dtype=numpy.intp)]
+        return array('d', [table[raw] for raw in raws])
+
     def convert_sensor_value_to_raw(self, value: float) -> int:
         linearization = self.linearization & 0x7f
 
@@ -326,20 +442,7 @@ class SdrFullSensorRecord(SdrCommon):
     @property
     def lin(self) -> Callable[[float], float]:
         try:
-            return {
-                L_LN: math.log,
-                L_LOG: lambda x: math.log(x, 10),
-                L_LOG2: lambda x: math.log(x, 2),
-                L_E: math.exp,
-                L_EXP10: lambda x: math.pow(10, x),
-                L_EXP2: lambda x: math.pow(2, x),
-                L_1_X: lambda x: 1.0 / x,
-                L_SQR: lambda x: math.pow(x, 2),
-                L_CUBE: lambda x: math.pow(x, 3),
-                L_SQRT: math.sqrt,
-                L_CUBERT: lambda x: math.pow(x, 1.0/3),
-                L_LINEAR: lambda x: x,
-            }[self.linearization & 0x7f]
+            return LINEARIZATION[self.linearization & 0x7f]
         except KeyError:
             raise errors.DecodingError('unknown linearization %d' %
                                        (self.linearization & 0x7f))
@@ -398,7 +501,8 @@ class SdrFullSensorRecord(SdrCommon):
             pass
 
     def _from_data(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[5:])
+        buffer = ByteReader(data)
+        buffer.skip(5)
         # record key bytes
         self._common_record_key(buffer.pop_slice(3))
         # record body bytes
@@ -512,7 +616,8 @@ class SdrCompactSensorRecord(SdrCommon):
         return s
 
     def _from_data(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[5:])
+        buffer = ByteReader(data)
+        buffer.skip(5)
 
         # record key bytes
         self._common_record_key(buffer.pop_slice(3))
@@ -550,7 +655,8 @@ class SdrEventOnlySensorRecord(SdrCommon):
         return 'Not supported yet.'
 
     def _from_data(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[5:])
+        buffer = ByteReader(data)
+        buffer.skip(5)
 
         # record key bytes
         self._common_record_key(buffer.pop_slice(3))
@@ -581,7 +687,8 @@ class SdrFruDeviceLocator(SdrCommon):
         return s
 
     def _from_data(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[5:])
+        buffer = ByteReader(data)
+        buffer.skip(5)
         self.device_access_address = buffer.pop_unsigned_int(1) >> 1
         self.fru_device_id = buffer.pop_unsigned_int(1)
         self.logical_physical = buffer.pop_unsigned_int(1)
@@ -610,7 +717,8 @@ class SdrManagementControllerDeviceLocator(SdrCommon):
         return s
 
     def _from_data(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[5:])
+        buffer = ByteReader(data)
+        buffer.skip(5)
         self.device_slave_address = buffer.pop_unsigned_int(1) >> 1
         self.channel_number = buffer.pop_unsigned_int(1) & 0xf
         self.power_state_notification = buffer.pop_unsigned_int(1)
@@ -632,7 +740,8 @@ class SdrManagementControllerConfirmationRecord(SdrCommon):
                 data, next_id)
 
     def _from_data(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[5:])
+        buffer = ByteReader(data)
+        buffer.skip(5)
         self.device_slave_address = buffer.pop_unsigned_int(1) >> 1
         self.device_id = buffer.pop_unsigned_int(1)
         self.channel_number = buffer.pop_unsigned_int(1)
@@ -656,7 +765,8 @@ class SdrOEMSensorRecord(SdrCommon):
         return 'Not supported yet.'
 
     def _from_data(self, data: bytes) -> None:
-        buffer = ByteBuffer(data[5:])
+        buffer = ByteReader(data)
+        buffer.skip(5)
 
         # record key bytes
         self._common_record_key(buffer.pop_slice(3))
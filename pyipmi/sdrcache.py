@@ -0,0 +1,143 @@
+# Copyright (c) 2014  Kontron Europe GmbH
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+
+"""Cache of SDR lists.
+
+The lists are keyed by the device GUID of the BMC and are only valid as
+long as the repository change stamp (record count, most recent addition and
+most recent erase timestamp) does not change.
+
+Example:
+
+    ipmi.sdr_cache = pyipmi.sdrcache.SdrCache('~/.cache/pyipmi/sdr')
+    # walks the repository once, afterwards served from the cache
+    sdrs = ipmi.get_repository_sdr_list()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+
+from .compact import compact
+from .logger import log
+from .sdr import SdrCommon
+
+
+class SdrCache(object):
+    """SDR list cache with LRU eviction in memory and optional disk storage.
+
+    `directory` is where the lists are stored on disk, if None the cache is
+    in memory only. `max_entries` is the number of lists kept in memory.
+    If `compact` is True, the records are kept as read-only compact records,
+    see `pyipmi.compact`.
+    """
+
+    def __init__(self, directory: str | None = None,
+                 max_entries: int = 128, compact: bool = False) -> None:
+        if directory is not None:
+            directory = os.path.expanduser(directory)
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_entries = max_entries
+        self.compact = compact
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _filename(self, key: str) -> str:
+        return os.path.join(self.directory, '%s.json' % key)
+
+    def _load(self, key: str) -> tuple[list, list[SdrCommon]] | None:
+        try:
+            with open(self._filename(key), 'r') as f:
+                content = json.load(f)
+            records = [SdrCommon.from_data(array('B', bytes.fromhex(r['data'])),
+                                           r['next_id'])
+                       for r in content['records']]
+            return (content['stamp'], self._compact(records))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            log().warning('ignoring invalid SDR cache file for %s: %s',
+                          key, e)
+            return None
+
+    def _store(self, key: str, stamp: list, records: list[SdrCommon]) -> None:
+        content = {
+            'stamp': stamp,
+            'records': [{'data': bytes(r.data[:]).hex(),
+                         'next_id': getattr(r, 'next_id', None)}
+                        for r in records],
+        }
+        (fd, tmp) = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(content, f)
+            os.replace(tmp, self._filename(key))
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def get(self, key: str, stamp: tuple) -> list[SdrCommon] | None:
+        """Return the cached SDR list or None if missing or outdated.
+
+        The list is a new one, but the records are shared with all other
+        callers and are to be treated as read-only.
+        """
+        stamp = list(stamp)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.directory is not None:
+            entry = self._load(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None or entry[0] != stamp:
+            return None
+        return list(entry[1])
+
+    def put(self, key: str, stamp: tuple, records: list[SdrCommon]) -> None:
+        """Store the SDR list for the repository change stamp."""
+        stamp = list(stamp)
+        records = self._compact(records)
+        self._remember(key, (stamp, records))
+        if self.directory is not None:
+            self._store(key, stamp, records)
+
+    def _compact(self, records: list[SdrCommon]) -> list[SdrCommon]:
+        if not self.compact:
+            return list(records)
+        return [compact(record) for record in records]
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.directory, name))
@@ -17,20 +17,31 @@
 
 from __future__ import annotations
 
+import time
 from array import array
-from typing import Generator
+from collections import deque
+from typing import Any, Generator
 
-from .errors import CompletionCodeError, DecodingError
-from .utils import check_completion_code, ByteBuffer
+from .errors import CompletionCodeError, DecodingError, RetryError
+from .utils import check_completion_code, ByteBuffer, ByteReader
 from .msgs import create_request_by_name, Message
 from .msgs import constants
 from .event import EVENT_ASSERTION, EVENT_DEASSERTION
 
-from .helper import clear_repository_helper
+from .helper import (clear_repository_helper, iter_reads, message_with_name,
+                     run_reads, ReadLength)
 from .state import State
 
+START_SEL_RECORD_ID = 0
+END_SEL_RECORD_ID = 0xffff
+SEL_RECORD_LENGTH = 16
+ENTIRE_RECORD = 0xff
+
 
 class Sel(object):
+    def __init__(self) -> None:
+        self._sel_read_length = ReadLength(SEL_RECORD_LENGTH)
+
     def get_sel_entries_count(self) -> int:
         info = SelInfo(self.send_message_with_name('GetSelInfo'))
         return info.entries
@@ -77,43 +88,18 @@ class Sel(object):
 
     def get_sel_entry(self, record_id: int,
                       reservation: int = 0) -> tuple[SelEntry, int]:
-        ENTIRE_RECORD = 0xff
-        req = create_request_by_name('GetSelEntry')
-        req.reservation_id = reservation
-        req.record_id = record_id
-        req.offset = 0
-        self.max_req_len = ENTIRE_RECORD
-
-        record_data = ByteBuffer()
-
-        while True:
-            req.length = self.max_req_len
-            if (self.max_req_len != 0xff
-                    and (req.offset + req.length) > 16):
-                req.length = 16 - req.offset
-
-            rsp = self.send_message(req)
-            if rsp.completion_code == constants.CC_CANT_RET_NUM_REQ_BYTES:
-                if self.max_req_len == 0xff:
-                    self.max_req_len = 16
-                else:
-                    self.max_req_len -= 1
-                continue
-            else:
-                check_completion_code(rsp.completion_code)
-
-            record_data.extend(rsp.record_data)
-            req.offset = len(record_data)
+        """Return the SEL entry and the next record ID.
 
-            if len(record_data) >= 16:
-                break
-
-        return (SelEntry(record_data), rsp.next_record_id)
+        The entire entry is read with one request if the BMC supports it,
+        otherwise with partial reads. The largest working read length is
+        kept for all following entries of the connection.
+        """
+        return run_reads(self.send_message,
+                         sel_entry_reads(record_id, reservation,
+                                         self._sel_read_length))
 
     def sel_entries(self) -> Generator[SelEntry, None, None]:
         """Generator which returns all SEL entries."""
-        START_SEL_RECORD_ID = 0
-        END_SEL_RECORD_ID = 0xffff
         if self.get_sel_entries_count() == 0:
             return
 
@@ -130,6 +116,247 @@ class Sel(object):
         """Return all SEL entries as a list."""
         return list(self.sel_entries())
 
+    def get_sel_tail(self, count: int) -> list[SelEntry]:
+        """Return the last `count` SEL entries, oldest first.
+
+        The SEL is read backwards from the last entry, see
+        `sel_tail_reads`.
+        """
+        return run_reads(self.send_message,
+                         sel_tail_reads(count, self._sel_read_length))
+
+    def get_sel_cursor_at_end(self) -> SelCursor:
+        """Return a cursor positioned after the last SEL entry."""
+        return run_reads(self.send_message,
+                         sel_cursor_at_end_reads(self._sel_read_length))
+
+    def new_sel_entries(self, cursor: SelCursor) -> Generator[SelEntry, None, None]:
+        """Generator which returns the SEL entries added after `cursor`.
+
+        If the SEL did not change since the last call, only the SEL info is
+        read. The cursor is advanced with every returned entry. If the SEL
+        has been cleared, all entries are returned, see
+        `new_sel_entry_reads`.
+        """
+        return iter_reads(self.send_message,
+                          new_sel_entry_reads(cursor, self._sel_read_length))
+
+    def follow_sel(self, cursor: SelCursor | None = None,
+                   interval: float = 1.0) -> Generator[SelEntry, None, None]:
+        """Generator which returns new SEL entries as they are added.
+
+        If `cursor` is None, only entries added from now on are returned.
+        Pass `SelCursor()` to start with the existing entries or a stored
+        cursor to resume. The SEL info is polled every `interval` seconds.
+        """
+        if cursor is None:
+            cursor = self.get_sel_cursor_at_end()
+        return self._follow_sel(cursor, interval)
+
+    def _follow_sel(self, cursor: SelCursor,
+                    interval: float) -> Generator[SelEntry, None, None]:
+        while True:
+            for sel_entry in self.new_sel_entries(cursor):
+                yield sel_entry
+            time.sleep(interval)
+
+
+def sel_entry_reads(record_id: int, reservation: int,
+                    read_length: ReadLength) -> Generator:
+    """Plan the reads of one SEL entry.
+
+    A generator that yields the requests to send, the caller sends the
+    responses back. The generator returns the (SelEntry, next record ID).
+    This is shared by `Sel` and `pyipmi.aio.AsyncIpmi`, see
+    `pyipmi.helper.run_reads`.
+
+    The entire entry is read with one request if the BMC supports it,
+    otherwise with partial reads of the length negotiated in `read_length`.
+    """
+    req = create_request_by_name('GetSelEntry')
+    req.reservation_id = reservation
+    req.record_id = record_id
+
+    record_data = ByteBuffer()
+
+    if read_length.entire_record:
+        req.offset = 0
+        req.length = ENTIRE_RECORD
+        rsp = yield req
+        if rsp.completion_code == constants.CC_CANT_RET_NUM_REQ_BYTES:
+            read_length.entire_record = False
+        else:
+            check_completion_code(rsp.completion_code)
+            record_data.extend(rsp.record_data)
+
+    while len(record_data) < SEL_RECORD_LENGTH:
+        req.offset = len(record_data)
+        req.length = min(read_length.length,
+                         SEL_RECORD_LENGTH - req.offset)
+        if req.length <= 0:
+            raise RetryError()
+
+        rsp = yield req
+        if rsp.completion_code == constants.CC_CANT_RET_NUM_REQ_BYTES:
+            read_length.failed(req.length)
+            continue
+        check_completion_code(rsp.completion_code)
+
+        read_length.succeeded(req.length)
+        record_data.extend(rsp.record_data)
+
+    return (SelEntry(record_data), rsp.next_record_id)
+
+
+def sel_tail_reads(count: int, read_length: ReadLength) -> Generator:
+    """Plan the reads of the last `count` SEL entries, see `sel_entry_reads`.
+    The generator returns the entries, oldest first.
+
+    Most BMCs assign the record IDs in ascending order, so the entries are
+    read from the last one backwards by record ID. If more than `count`
+    record IDs are missing on the way, the SEL is read from the start.
+    """
+    info = SelInfo((yield from message_with_name('GetSelInfo')))
+    count = min(count, info.entries)
+    if count <= 0:
+        return []
+
+    rsp = yield from message_with_name('ReserveSel')
+    reservation_id = rsp.reservation_id
+
+    (sel_entry, _) = yield from sel_entry_reads(END_SEL_RECORD_ID,
+                                                reservation_id, read_length)
+    entries = [sel_entry]
+    record_id = sel_entry.record_id
+    misses = 0
+    while len(entries) < count and misses <= count \
+            and record_id > START_SEL_RECORD_ID + 1:
+        record_id -= 1
+        try:
+            (sel_entry, _) = yield from sel_entry_reads(
+                    record_id, reservation_id, read_length)
+        except CompletionCodeError as e:
+            if e.cc != constants.CC_REQ_DATA_NOT_PRESENT:
+                raise
+            misses += 1
+            continue
+        entries.append(sel_entry)
+
+    if len(entries) < count:
+        entries = deque(maxlen=count)
+        record_id = START_SEL_RECORD_ID
+        while record_id != END_SEL_RECORD_ID:
+            (sel_entry, record_id) = yield from sel_entry_reads(
+                    record_id, reservation_id, read_length)
+            entries.append(sel_entry)
+        return list(entries)
+
+    entries.reverse()
+    return entries
+
+
+def sel_cursor_at_end_reads(read_length: ReadLength) -> Generator:
+    """Plan the reads for a cursor after the last SEL entry, see
+    `sel_entry_reads`. The generator returns the `SelCursor`.
+    """
+    info = SelInfo((yield from message_with_name('GetSelInfo')))
+    cursor = SelCursor(most_recent_addition=info.most_recent_addition,
+                       most_recent_erase=info.most_recent_erase)
+    if info.entries > 0:
+        (sel_entry, _) = yield from sel_entry_reads(END_SEL_RECORD_ID, 0,
+                                                    read_length)
+        cursor.record_id = sel_entry.record_id
+    return cursor
+
+
+def new_sel_entry_reads(cursor: SelCursor,
+                        read_length: ReadLength) -> Generator:
+    """Plan the reads of the SEL entries added after `cursor`.
+
+    Like `sel_entry_reads`, but the new `SelEntry` objects are yielded
+    between the requests, see `pyipmi.helper.iter_reads`. The cursor is
+    advanced with every yielded entry.
+
+    The erase timestamp also changes if single entries are deleted, so
+    the SEL is only considered cleared if it is empty or if the last
+    returned entry and all entries before it are gone.
+    """
+    info = SelInfo((yield from message_with_name('GetSelInfo')))
+    if not cursor.changed(info):
+        return
+
+    if info.entries > 0:
+        rsp = yield from message_with_name('ReserveSel')
+        reservation_id = rsp.reservation_id
+        record_id = START_SEL_RECORD_ID
+        skip_until = None
+
+        if cursor.record_id is not None:
+            try:
+                (_, record_id) = yield from sel_entry_reads(
+                        cursor.record_id, reservation_id, read_length)
+            except CompletionCodeError as e:
+                if e.cc != constants.CC_REQ_DATA_NOT_PRESENT:
+                    raise
+                # the last seen entry has been deleted, skip the entries
+                # up to it
+                record_id = START_SEL_RECORD_ID
+                skip_until = cursor.record_id
+
+        while record_id != END_SEL_RECORD_ID:
+            (sel_entry, record_id) = yield from sel_entry_reads(
+                    record_id, reservation_id, read_length)
+            if skip_until is not None and sel_entry.record_id <= skip_until:
+                continue
+            # past the last seen entry
+            skip_until = None
+            cursor.record_id = sel_entry.record_id
+            yield sel_entry
+    else:
+        cursor.record_id = None
+
+    cursor.most_recent_addition = info.most_recent_addition
+    cursor.most_recent_erase = info.most_recent_erase
+
+
+class SelCursor(object):
+    """The position of a SEL reader, see `Sel.follow_sel`.
+
+    The cursor holds the ID of the last returned entry and the SEL
+    timestamps of the last poll. Use `to_dict` and `from_dict` to store it,
+    e.g. as JSON.
+    """
+
+    def __init__(self, record_id: int | None = None,
+                 most_recent_addition: int | None = None,
+                 most_recent_erase: int | None = None) -> None:
+        self.record_id = record_id
+        self.most_recent_addition = most_recent_addition
+        self.most_recent_erase = most_recent_erase
+
+    def __str__(self) -> str:
+        return 'SelCursor(record_id=%s, most_recent_addition=%s, ' \
+               'most_recent_erase=%s)' % (self.record_id,
+                                          self.most_recent_addition,
+                                          self.most_recent_erase)
+
+    def changed(self, info: SelInfo) -> bool:
+        """Return True if the SEL changed since the last poll."""
+        return (info.most_recent_addition != self.most_recent_addition
+                or info.most_recent_erase != self.most_recent_erase)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'record_id': self.record_id,
+            'most_recent_addition': self.most_recent_addition,
+            'most_recent_erase': self.most_recent_erase,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> SelCursor:
+        return cls(d.get('record_id'), d.get('most_recent_addition'),
+                   d.get('most_recent_erase'))
+
 
 class SelInfo(State):
 
@@ -190,8 +417,7 @@ class SelEntry(State):
 
         self.data = data
 
-        # pop will change data, therefore copy it
-        buffer = ByteBuffer(data)
+        buffer = ByteReader(data)
 
         self.record_id = buffer.pop_unsigned_int(2)
         self.type = buffer.pop_unsigned_int(1)
@@ -17,13 +17,15 @@
 from __future__ import absolute_import
 from __future__ import annotations
 
+import math
+import time
 from array import array
-from typing import Generator
+from typing import Any, Generator
 
 from .utils import check_completion_code
-from .msgs import create_request_by_name
+from .msgs import create_request_by_name, Message
 
-from .helper import get_sdr_data_helper, get_sdr_chunk_helper
+from .helper import get_sdr_data_helper, get_sdr_chunk_helper, SdrReadLength
 
 from . import sdr
 
@@ -109,7 +111,24 @@ SENSOR_TYPE_VITA_PAYLOAD_MODE = 0xf7
 SENSOR_TYPE_VITA_IPMC_RESET_TYPE = 0xf8
 
 
+def sensor_reading_from_response(rsp: Message) -> tuple[int | None, int | None]:
+    """Return the `raw reading` and `assertion states` of a response."""
+    reading = rsp.sensor_reading
+    if rsp.config.initial_update_in_progress:
+        reading = None
+
+    states = None
+    if rsp.states1 is not None:
+        states = rsp.states1
+        if rsp.states2 is not None:
+            states |= (rsp.states2 << 8)
+    return (reading, states)
+
+
 class Sensor(object):
+    def __init__(self) -> None:
+        self._device_sdr_read_length = SdrReadLength()
+
     def reserve_device_sdr_repository(self) -> int:
         rsp = self.send_message_with_name('ReserveDeviceSdrRepository')
         return rsp.reservation_id
@@ -138,7 +157,8 @@ class Sensor(object):
         (next_id, record_data) = \
             get_sdr_data_helper(self.reserve_device_sdr_repository,
                                 self._get_device_sdr_chunk,
-                                record_id, reservation_id)
+                                record_id, reservation_id,
+                                self._device_sdr_read_length)
 
         return sdr.SdrCommon.from_data(record_data, next_id)
 
@@ -159,8 +179,26 @@ class Sensor(object):
             record_id = record.next_id
 
     def get_device_sdr_list(self, reservation_id: int | None = None) -> list[sdr.SdrCommon]:
-        """Return the complete SDR list."""
-        return list(self.device_sdr_entries())
+        """Return the complete SDR list.
+
+        If `sdr_cache` is set, the list is only read from the device if the
+        sensor population changed since it has been cached. The cached
+        records are shared by all callers and must not be modified.
+        """
+        if self.sdr_cache is None:
+            return list(self.device_sdr_entries())
+
+        key = self._sdr_cache_key('device')
+        if key is None:
+            return list(self.device_sdr_entries())
+
+        rsp = self.send_message_with_name('GetDeviceSdrInfo')
+        stamp = (rsp.number_of_sensors, rsp.sensor_population_change)
+        records = self.sdr_cache.get(key, stamp)
+        if records is None:
+            records = list(self.device_sdr_entries())
+            self.sdr_cache.put(key, stamp, records)
+        return records
 
     def rearm_sensor_events(self, sensor_number: int) -> None:
         """Rearm sensor events for the given sensor number."""
@@ -178,17 +216,7 @@ class Sensor(object):
         rsp = self.send_message_with_name('GetSensorReading',
                                           sensor_number=sensor_number,
                                           lun=lun)
-
-        reading = rsp.sensor_reading
-        if rsp.config.initial_update_in_progress:
-            reading = None
-
-        states = None
-        if rsp.states1 is not None:
-            states = rsp.states1
-            if rsp.states2 is not None:
-                states |= (rsp.states2 << 8)
-        return (reading, states)
+        return sensor_reading_from_response(rsp)
 
     def set_sensor_thresholds(self, sensor_number: int, lun: int = 0,
                               unr: int | None = None, ucr: int | None = None,
@@ -243,3 +271,108 @@ class Sensor(object):
         req.event_data = [0] if event_data is None else event_data
         rsp = self.send_message(req)
         check_completion_code(rsp.completion_code)
+
+    def get_sensor_snapshot(self, sdrs: list[sdr.SdrCommon] | None = None) -> SensorReadings:
+        """Read all sensors of the SDR list at once.
+
+        If `sdrs` is None, the SDR repository list is used.
+        """
+        if sdrs is None:
+            sdrs = self.get_repository_sdr_list()
+        return SensorSnapshot(sdrs).read(self)
+
+
+class SensorReadings(object):
+    """The columnar result of a `SensorSnapshot`.
+
+    Each attribute is a list with one entry per sensor. `raw`, `values`
+    and `states` are None for sensors which could not be read, `values`
+    is also None for sensors without analog reading.
+    """
+
+    def __init__(self, numbers: list[int], luns: list[int],
+                 names: list[str], raw: list[int | None],
+                 values: list[float | None], states: list[int | None],
+                 timestamp: float) -> None:
+        self.numbers = numbers
+        self.luns = luns
+        self.names = names
+        self.raw = raw
+        self.values = values
+        self.states = states
+        self.timestamp = timestamp
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def as_dict(self) -> dict[str, tuple[float | None, int | None]]:
+        """Return the `(value, states)` tuple for each sensor name."""
+        return dict(zip(self.names, zip(self.values, self.states)))
+
+
+class SensorSnapshot(object):
+    """Read all sensors of an SDR list with one batch of requests.
+
+    The requests and the conversion tables are prepared once, so a
+    snapshot object can be read repeatedly, e.g. for telemetry:
+
+        snapshot = SensorSnapshot(ipmi.get_repository_sdr_list())
+        while True:
+            readings = snapshot.read(ipmi)
+
+    The requests are sent with `Ipmi.send_messages` and are pipelined if
+    the interface supports it.
+    """
+
+    def __init__(self, sdrs: list[sdr.SdrCommon]) -> None:
+        self.numbers = []
+        self.luns = []
+        self.names = []
+        self._tables = []
+
+        for s in sdrs:
+            if s.type == sdr.SDR_TYPE_FULL_SENSOR_RECORD:
+                table = None
+                if s.analog_data_format != s.DATA_FMT_NONE:
+                    table = s.conversion_table()
+            elif s.type == sdr.SDR_TYPE_COMPACT_SENSOR_RECORD:
+                table = None
+            else:
+                continue
+            self.numbers.append(s.number)
+            self.luns.append(s.owner_lun)
+            self.names.append(s.device_id_string)
+            self._tables.append(table)
+
+        self._reqs = []
+        for (number, lun) in zip(self.numbers, self.luns):
+            req = create_request_by_name('GetSensorReading')
+            req.sensor_number = number
+            req.lun = lun
+            self._reqs.append(req)
+
+    def read(self, ipmi: Any) -> SensorReadings:
+        """Read all sensors and return the `SensorReadings`."""
+        timestamp = time.time()
+        rsps = ipmi.send_messages(self._reqs)
+
+        raw = []
+        values = []
+        states = []
+        for (rsp, table) in zip(rsps, self._tables):
+            if rsp.completion_code != 0:
+                (reading, state) = (None, None)
+            else:
+                (reading, state) = sensor_reading_from_response(rsp)
+            raw.append(reading)
+            states.append(state)
+            value = None
+            if table is not None and reading is not None:
+                value = float(table[reading])
+                if math.isnan(value):
+                    value = None
+            values.append(value)
+
+        return SensorReadings(list(self.numbers), list(self.luns),
+                              list(self.names), raw, values, states,
+                              timestamp)
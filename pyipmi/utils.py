@@ -89,12 +89,10 @@ class ByteBuffer(object):
             self.array.append((value >> (8*i) & 0xff))
 
     def pop_unsigned_int(self, length: int) -> int:
-        value = 0
-        for i in range(length):
-            try:
-                value |= self.array.pop(0) << (8*i)
-            except IndexError:
-                raise DecodingError('Data too short for message')
+        if len(self.array) < length:
+            raise DecodingError('Data too short for message')
+        value = int.from_bytes(self.array[0:length].tobytes(), 'little')
+        del self.array[0:length]
         return value
 
     def push_string(self, value: str | bytes) -> None:
@@ -141,6 +139,90 @@ class ByteBuffer(object):
         return self.array[idx]
 
 
+class ByteReader(object):
+    """Read-only byte buffer with a read cursor.
+
+    The pop methods have the same semantics as the ones of `ByteBuffer`,
+    but the data is not copied or shifted. They advance a cursor over a
+    memoryview of the data instead, slices share the data of the reader.
+
+    While a reader exists, a resizable source (`array` or `bytearray`)
+    can not be resized.
+    """
+
+    __slots__ = ('_view', '_offset', '_end')
+
+    def __init__(self, data: Any = b'') -> None:
+        if isinstance(data, ByteReader):
+            view = data._view[data._offset:data._end]
+        else:
+            if isinstance(data, ByteBuffer):
+                data = data.array
+            try:
+                view = memoryview(data)
+            except TypeError:
+                view = memoryview(bytes(data))
+            if view.format != 'B' or view.ndim != 1:
+                view = memoryview(view.tobytes())
+        self._view = view
+        self._offset = 0
+        self._end = len(view)
+
+    def pop_unsigned_int(self, length: int) -> int:
+        offset = self._offset
+        end = offset + length
+        if end > self._end:
+            raise DecodingError('Data too short for message')
+        self._offset = end
+        if length == 1:
+            return self._view[offset]
+        return int.from_bytes(self._view[offset:end], 'little')
+
+    def pop_string(self, length: int) -> bytes:
+        offset = self._offset
+        end = min(offset + max(length, 0), self._end)
+        self._offset = end
+        return self._view[offset:end].tobytes()
+
+    def pop_slice(self, length: int) -> ByteReader:
+        offset = self._offset
+        end = offset + max(length, 0)
+        if end > self._end:
+            raise DecodingError('Data too short for message')
+        c = ByteReader.__new__(ByteReader)
+        c._view = self._view
+        c._offset = offset
+        c._end = end
+        self._offset = end
+        return c
+
+    def skip(self, length: int) -> None:
+        """Advance the cursor by `length` bytes."""
+        if self._offset + length > self._end:
+            raise DecodingError('Data too short for message')
+        self._offset += length
+
+    @property
+    def array(self) -> array:
+        """Copy of the remaining data."""
+        return array('B', self.tobytes())
+
+    def tobytes(self) -> bytes:
+        return self._view[self._offset:self._end].tobytes()
+
+    def tostring(self) -> bytes:
+        return self.tobytes()
+
+    def __len__(self) -> int:
+        return self._end - self._offset
+
+    def __getitem__(self, idx: int | slice) -> int | array:
+        view = self._view[self._offset:self._end]
+        if isinstance(idx, slice):
+            return array('B', view[idx].tobytes())
+        return view[idx]
+
+
 BCD_MAP = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', ' ', '-', '.']
 
 
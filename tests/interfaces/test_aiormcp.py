@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+from pyipmi import Target
+from pyipmi.errors import CompletionCodeError, RetryError
+from pyipmi.interfaces.aiormcp import AsyncRmcp
+from pyipmi.interfaces.ipmb import (IpmbHeaderReq, IpmbHeaderRsp,
+                                    encode_ipmb_msg)
+from pyipmi.interfaces.rmcp import (IpmiMsg, RmcpMsg, MAX_IN_FLIGHT,
+                                    RMCP_CLASS_IPMI)
+from pyipmi.msgs.registry import create_request_by_name
+
+
+class LoopbackTransport:
+    """Answers every GetSensorReading with the sensor number as reading."""
+
+    def __init__(self, interface, answer=True):
+        self.interface = interface
+        self.answer = answer
+        self.sent = []
+
+    def sendto(self, pdu):
+        self.sent.append(pdu)
+        if not self.answer:
+            return
+        sdu = RmcpMsg().unpack(pdu)
+        tx_data = IpmiMsg().unpack(sdu)
+        req_header = IpmbHeaderReq(data=tx_data)
+        rsp_header = IpmbHeaderRsp()
+        rsp_header.from_req_header(req_header)
+        rsp_header.netfn = rsp_header.netfn | 1
+        sensor_number = tx_data[6]
+        rx_data = encode_ipmb_msg(rsp_header, bytes([0, sensor_number, 0, 0]))
+        rsp_pdu = RmcpMsg(RMCP_CLASS_IPMI).pack(IpmiMsg().pack(rx_data), 0xff)
+        asyncio.get_running_loop().call_soon(
+            self.interface._datagram_received, rsp_pdu)
+
+    def close(self):
+        pass
+
+
+def _sensor_reading_req(number):
+    req = create_request_by_name('GetSensorReading')
+    req.target = Target(0x20)
+    req.sensor_number = number
+    return req
+
+
+def test_send_and_receive_concurrent():
+    async def run():
+        rmcp = AsyncRmcp()
+        rmcp._transport = LoopbackTransport(rmcp)
+        rsps = await asyncio.gather(
+            *[rmcp.send_and_receive(_sensor_reading_req(i)) for i in range(10)])
+        return rmcp, rsps
+
+    rmcp, rsps = asyncio.run(run())
+    assert [rsp.sensor_reading for rsp in rsps] == list(range(10))
+    assert len(rmcp._transport.sent) == 10
+    assert rmcp._pending == []
+
+
+def test_send_and_receive_retry():
+    async def run():
+        rmcp = AsyncRmcp(max_retries=1, timeout=0.01)
+        rmcp._transport = LoopbackTransport(rmcp, answer=False)
+        try:
+            await rmcp.send_and_receive(_sensor_reading_req(1))
+        finally:
+            assert len(rmcp._transport.sent) == 2
+            assert rmcp._pending == []
+
+    with pytest.raises(RetryError):
+        asyncio.run(run())
+
+
+def test_invalid_packet_is_dropped():
+    rmcp = AsyncRmcp()
+    rmcp._datagram_received(b'\x00\x01\x02')
+
+
+def test_send_and_receive_bounds_in_flight():
+    async def run():
+        rmcp = AsyncRmcp()
+        rmcp._transport = LoopbackTransport(rmcp)
+        in_flight = []
+        sendto = rmcp._transport.sendto
+
+        def count_sendto(pdu):
+            in_flight.append(len(rmcp._pending))
+            sendto(pdu)
+
+        rmcp._transport.sendto = count_sendto
+        rsps = await asyncio.gather(
+            *[rmcp.send_and_receive(_sensor_reading_req(i))
+              for i in range(100)])
+        return rmcp, rsps, in_flight
+
+    rmcp, rsps, in_flight = asyncio.run(run())
+    # more than 64 requests would reuse a sequence number while in flight
+    assert [rsp.sensor_reading for rsp in rsps] == list(range(100))
+    assert max(in_flight) == MAX_IN_FLIGHT
+    assert rmcp._pending == []
+
+
+def test_max_in_flight_out_of_range():
+    with pytest.raises(RuntimeError):
+        AsyncRmcp(max_in_flight=MAX_IN_FLIGHT + 1)
+
+
+def test_keep_alive_survives_errors():
+    async def run():
+        rmcp = AsyncRmcp(keep_alive_interval=0.001)
+        calls = []
+
+        async def send_request(req):
+            calls.append(req)
+            raise CompletionCodeError(0xc1)
+
+        rmcp._send_request = send_request
+        task = asyncio.ensure_future(rmcp._keep_alive())
+        while len(calls) < 3:
+            await asyncio.sleep(0.001)
+        assert not task.done()
+        task.cancel()
+        return rmcp
+
+    rmcp = asyncio.run(run())
+    assert rmcp._keep_alive_failures >= 3
+    assert not rmcp.is_session_alive()
+
+
+def test_send_and_receive_lazy_decoding():
+    async def run():
+        rmcp = AsyncRmcp(lazy_decoding=True)
+        rmcp._transport = LoopbackTransport(rmcp)
+        return await rmcp.send_and_receive(_sensor_reading_req(7))
+
+    rsp = asyncio.run(run())
+    assert '_lazy_data' in rsp.__dict__
+    assert rsp.completion_code == 0
+    assert rsp.sensor_reading == 7
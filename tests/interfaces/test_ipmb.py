@@ -7,7 +7,7 @@ from pyipmi import Target
 from pyipmi.interfaces.ipmb import (checksum, IpmbHeaderReq, IpmbHeaderRsp,
                                     encode_send_message, encode_bridged_message,
                                     encode_ipmb_msg, decode_bridged_message,
-                                    rx_filter)
+                                    max_bridged_data_length, rx_filter)
 
 
 def test_checksum():
@@ -108,6 +108,28 @@ def test_encode_bridged_message():
         b'\x20\x18\xc8\x81\x88\x34\x47\x72\x18\x76\x20\x44\xaa\xaa\xbb\x8d\x7c'
 
 
+def test_max_bridged_data_length():
+    assert max_bridged_data_length(38, None) == 38
+    assert max_bridged_data_length(38, Target(0x20).routing) == 38
+
+    t = Target(0)
+    t.set_routing([(0x81, 0x20, 0), (0x20, 0x82, None)])
+    assert max_bridged_data_length(38, t.routing) == 25
+    assert max_bridged_data_length(30, t.routing) == 22
+
+    header = IpmbHeaderReq()
+    (header.netfn, header.rs_lun, header.rq_seq, header.rq_lun,
+     header.cmdid) = (6, 0, 0, 0, 1)
+    data = encode_bridged_message(t.routing, header, b'\x00' * 25, seq=0)
+    assert len(data) == 1 + 7 + 32
+
+    t.set_routing([(0x81, 0x20, 0), (0x20, 0x8e, 7), (0x20, 0x80, None)])
+    assert max_bridged_data_length(38, t.routing) == 17
+    data = encode_bridged_message(t.routing, header, b'\x00' * 17, seq=0)
+    # the send message request to the second bridge fills an IPMB message
+    assert len(data) == 1 + 7 + 32
+
+
 def test_decode_bridged_message():
     # 81 1c 63 20 14 34 00 20 1c c4 82 14 34 00 20 14 cc 74 14 22 00 ed ff 6a 36
     data = b'\x81\x1c\x63\x20\x14\x34\x00\x20\x1c\xc4\x82\x14\x34\x00\x20\x14\xcc\x74\x14\x22\x00\xed\xff\x6a\x36'
@@ -1,12 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import sys
+
 from unittest.mock import MagicMock
 
 import pytest
 
 from pyipmi.errors import IpmiTimeoutError, IpmiConnectionError, IpmiLongPasswordError, AuthenticationError
 from pyipmi.interfaces import Ipmitool
+from pyipmi.msgs import create_request_by_name
 from pyipmi import Session, Target
 from pyipmi.utils import py3_array_tobytes
 
@@ -285,3 +288,198 @@ class TestIpmitool:
         with pytest.raises(AuthenticationError):
             cc, rsp = self._interface._parse_output(test_str)
             assert rsp is None
+
+
+FAKE_IPMITOOL = r'''
+import sys
+
+if '-H' in sys.argv and sys.argv[sys.argv.index('-H') + 1] == 'down':
+    print('Error: Unable to establish IPMI v2 / RMCP+ session')
+    sys.exit(1)
+
+target = sys.argv[sys.argv.index('-t') + 1] if '-t' in sys.argv else '0x00'
+
+
+def run(line):
+    args = line.split()
+    if args[0] == 'echo':
+        print(' '.join(args[1:]))
+    elif args[0] == 'raw' and args[1:] == ['0x06', '0x01']:
+        print('RAW REQUEST (2 bytes)')
+        print(' 06 01')
+        print(' 10 80 01 02 51 bd 98 3a 00 a8 06 00 03 00 ' + target[2:])
+    elif args[0] == 'raw' and args[1:] == ['0x06', '0x02']:
+        sys.stderr.write('Unable to send RAW command (channel=0x0 netfn=0x6 '
+                         'lun=0x0 cmd=0x2 rsp=0xc1): Invalid command\n')
+        return False
+    elif args[0] == 'raw':
+        sys.stderr.write('Unable to send RAW command (channel=0x0 netfn=0x6 '
+                         'lun=0x0 cmd=0x3)\n')
+        return False
+    return True
+
+
+if 'raw' in sys.argv:
+    sys.exit(0 if run(' '.join(sys.argv[sys.argv.index('raw'):])) else 1)
+
+if 'exec' in sys.argv:
+    with open(sys.argv[sys.argv.index('exec') + 1]) as f:
+        for line in f:
+            # stop at the first failing command
+            if not run(line):
+                sys.exit(1)
+    sys.exit(0)
+
+while True:
+    sys.stdout.write('ipmitool> ')
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line or line.strip() == 'exit':
+        break
+    run(line)
+    sys.stdout.flush()
+'''
+
+
+def device_id(address):
+    return b'\x00\x10\x80\x01\x02\x51\xbd\x98\x3a\x00\xa8\x06\x00\x03\x00' \
+        + bytes([address])
+
+
+class TestIpmitoolBatch:
+
+    persistent = False
+
+    def setup_method(self):
+        self.session = Session()
+        self.session.set_session_type_rmcp('10.0.1.1')
+        self.session.set_auth_type_user('admin', 'secret')
+
+    def _interface(self, tmp_path):
+        script = tmp_path / 'ipmitool.py'
+        script.write_text(FAKE_IPMITOOL)
+        interface = Ipmitool(persistent=self.persistent)
+        interface.IPMITOOL_PATH = '"%s" "%s"' % (sys.executable, script)
+        interface.establish_session(self.session)
+        return interface
+
+    def test_build_ipmitool_exec_cmd(self):
+        interface = Ipmitool()
+        interface.establish_session(self.session)
+        cmd = interface._build_ipmitool_exec_cmd(Target(0x20), 0, 'x.txt')
+        assert cmd == ('ipmitool -I lan -H 10.0.1.1 -p 623 '
+                       '-v -L ADMINISTRATOR -U "admin" -P "secret" '
+                       '-t 0x20 -l 0 exec x.txt 2>&1')
+
+    def test_send_and_receive_raw(self, tmp_path):
+        interface = self._interface(tmp_path)
+        try:
+            data = interface.send_and_receive_raw(Target(0x20), 0, 0x6,
+                                                  b'\x02')
+            assert data == b'\xc1'
+            data = interface.send_and_receive_raw(Target(0x20), 0, 0x6,
+                                                  b'\x01')
+            assert data == device_id(0x20)
+        finally:
+            interface.close()
+
+    def test_send_and_receive_raw_timeout(self, tmp_path):
+        interface = self._interface(tmp_path)
+        try:
+            with pytest.raises(IpmiTimeoutError):
+                interface.send_and_receive_raw(Target(0x20), 0, 0x6, b'\x03')
+        finally:
+            interface.close()
+
+    def test_connection_error(self, tmp_path):
+        interface = self._interface(tmp_path)
+        self.session.set_session_type_rmcp('down')
+        interface.establish_session(self.session)
+        with pytest.raises(IpmiConnectionError):
+            interface.send_and_receive_raw(Target(0x20), 0, 0x6, b'\x01')
+        with pytest.raises(IpmiConnectionError):
+            interface.send_and_receive_raw_many(
+                [(Target(0x20), 0, 0x6, b'\x01')] * 2)
+        assert interface._shells == {}
+
+    def test_send_and_receive_raw_many(self, tmp_path):
+        interface = self._interface(tmp_path)
+        interface.SHELL_BATCH_SIZE = 2
+        requests = [(Target(0x20), 0, 0x6, b'\x01'),
+                    (Target(0x72), 0, 0x6, b'\x01'),
+                    (Target(0x20), 0, 0x6, b'\x02'),
+                    (Target(0x20), 0, 0x6, b'\x01'),
+                    (Target(0x20), 0, 0x6, b'\x01')]
+        try:
+            data = interface.send_and_receive_raw_many(requests)
+        finally:
+            interface.close()
+
+        assert data == [device_id(0x20), device_id(0x72), b'\xc1',
+                        device_id(0x20), device_id(0x20)]
+
+    def test_send_and_receive_many(self, tmp_path):
+        interface = self._interface(tmp_path)
+        reqs = []
+        for address in (0x20, 0x72, 0x20):
+            req = create_request_by_name('GetDeviceId')
+            req.target = Target(address)
+            reqs.append(req)
+        try:
+            rsps = interface.send_and_receive_many(reqs)
+        finally:
+            interface.close()
+
+        assert [rsp.completion_code for rsp in rsps] == [0, 0, 0]
+        assert [rsp.auxiliary[3] for rsp in rsps] == [0x20, 0x72, 0x20]
+
+    def test_send_and_receive_raw_many_timeout(self, tmp_path):
+        interface = self._interface(tmp_path)
+        try:
+            with pytest.raises(IpmiTimeoutError):
+                interface.send_and_receive_raw_many(
+                    [(Target(0x20), 0, 0x6, b'\x01'),
+                     (Target(0x20), 0, 0x6, b'\x03')])
+        finally:
+            interface.close()
+
+    def test_send_and_receive_raw_many_calls(self, tmp_path):
+        interface = self._interface(tmp_path)
+        run_ipmitool = MagicMock(wraps=interface._run_ipmitool)
+        interface._run_ipmitool = run_ipmitool
+
+        data = interface.send_and_receive_raw_many(
+            [(Target(0x20), 0, 0x6, b'\x01')] * 10)
+
+        assert data == [device_id(0x20)] * 10
+        assert run_ipmitool.call_count == (0 if self.persistent else 1)
+
+
+class TestIpmitoolPersistent(TestIpmitoolBatch):
+
+    persistent = True
+
+    def test_build_ipmitool_shell_cmd(self):
+        interface = Ipmitool(persistent=True)
+        interface.establish_session(self.session)
+        cmd = interface._build_ipmitool_shell_cmd(Target(0x20), 0)
+        assert cmd == ('ipmitool -I lan -H 10.0.1.1 -p 623 '
+                       '-v -L ADMINISTRATOR -U "admin" -P "secret" '
+                       '-t 0x20 -l 0 shell')
+
+    def test_shell_per_target(self, tmp_path):
+        interface = self._interface(tmp_path)
+        try:
+            for _ in range(3):
+                data = interface.send_and_receive_raw(Target(0x20), 0, 0x6,
+                                                      b'\x01')
+                assert data == device_id(0x20)
+            assert len(interface._shells) == 1
+
+            data = interface.send_and_receive_raw(Target(0x72), 0, 0x6,
+                                                  b'\x01')
+            assert data == device_id(0x72)
+            assert len(interface._shells) == 2
+        finally:
+            interface.close()
+        assert interface._shells == {}
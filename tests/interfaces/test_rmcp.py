@@ -2,12 +2,21 @@
 # -*- coding: utf-8 -*-
 
 import array
+import socket
+from unittest.mock import MagicMock
+
 import pytest
 
+from pyipmi import Target
 from pyipmi.session import Session
-from pyipmi.interfaces.rmcp import (AsfMsg, AsfPing, AsfPong, IpmiMsg, RmcpMsg)
+from pyipmi.interfaces.ipmb import (IpmbHeaderReq, IpmbHeaderRsp,
+                                    encode_ipmb_msg)
+from pyipmi.interfaces.rmcp import (AsfMsg, AsfPing, AsfPong, IpmiMsg, RmcpMsg,
+                                    Rmcp)
+from pyipmi.msgs.registry import create_request_by_name
 from pyipmi.utils import py3_array_tobytes
-from pyipmi.errors import DecodingError
+from pyipmi.errors import DecodingError, IpmiTimeoutError, RetryError
+from pyipmi.metrics import Metrics
 
 
 class TestRmcpMsg:
@@ -60,6 +69,16 @@ class TestAsfPong():
         m = AsfPong()
         m.unpack(pdu)
 
+    def test_pack(self):
+        m = AsfPong()
+        m.tag = 0x10
+        pdu = m.pack()
+        assert pdu == b'\x00\x00\x11\xbe\x40\x10\x00\x10\x00\x00\x11\xbe\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+        m = AsfPong()
+        m.unpack(pdu)
+        assert m.tag == 0x10
+
 
 class TestIpmiMsg:
     def test_ipmimsg_pack(self):
@@ -181,3 +200,273 @@ class TestRmcp:
 
     def test_send_and_receive(self):
         pass
+
+    @staticmethod
+    def _response_for(tx_data, payload=b'\x00'):
+        rsp_header = IpmbHeaderRsp()
+        rsp_header.from_req_header(IpmbHeaderReq(data=tx_data))
+        rsp_header.netfn = rsp_header.netfn | 1
+        return encode_ipmb_msg(rsp_header, payload)
+
+    def test_send_and_receive_many_out_of_order(self):
+        rmcp = Rmcp(max_in_flight=4)
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+
+        def receive(ignore_sdu_length):
+            # answer the last sent request first
+            tx_data = sent.pop()
+            number = IpmbHeaderReq(data=tx_data).rq_seq
+            return self._response_for(tx_data, bytes([0, number, 0, 0]))
+        rmcp._receive_ipmi_msg = MagicMock(side_effect=receive)
+
+        reqs = []
+        for i in range(6):
+            req = create_request_by_name('GetSensorReading')
+            req.target = Target(0x20)
+            req.sensor_number = i
+            reqs.append(req)
+
+        rsps = rmcp.send_and_receive_many(reqs)
+
+        assert len(rsps) == 6
+        assert [rsp.sensor_reading for rsp in rsps] == [1, 2, 3, 4, 5, 6]
+        assert rmcp._send_ipmi_msg.call_count == 6
+
+    def test_send_and_receive_many_resend_on_timeout(self):
+        rmcp = Rmcp(max_in_flight=2, max_retries=1)
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+        timeouts = [socket.timeout()]
+
+        def receive(ignore_sdu_length):
+            if timeouts:
+                raise timeouts.pop()
+            return self._response_for(sent[-1], b'\x00\x12\x00\x00')
+        rmcp._receive_ipmi_msg = MagicMock(side_effect=receive)
+
+        req = create_request_by_name('GetSensorReading')
+        req.target = Target(0x20)
+
+        rsps = rmcp.send_and_receive_many([req])
+        assert rsps[0].sensor_reading == 0x12
+        assert rmcp._send_ipmi_msg.call_count == 2
+        # the resent request must not be confused with the first one
+        assert (IpmbHeaderReq(data=sent[0]).rq_seq
+                != IpmbHeaderReq(data=sent[1]).rq_seq)
+
+    def test_send_and_receive_lazy_decoding(self):
+        rmcp = Rmcp(lazy_decoding=True)
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+        rmcp._receive_ipmi_msg = MagicMock(
+            side_effect=lambda ignore_sdu_length:
+                self._response_for(sent[-1], b'\x00\x12\x00\x00'))
+
+        req = create_request_by_name('GetSensorReading')
+        req.target = Target(0x20)
+
+        rsp = rmcp.send_and_receive(req)
+        assert rsp.completion_code == 0
+        assert 'sensor_reading' not in rsp.__dict__
+        assert rsp.sensor_reading == 0x12
+
+    def test_send_and_receive_many_max_retries(self):
+        rmcp = Rmcp(max_in_flight=2, max_retries=0)
+        rmcp._send_ipmi_msg = MagicMock()
+        rmcp._receive_ipmi_msg = MagicMock(side_effect=socket.timeout())
+
+        req = create_request_by_name('GetDeviceId')
+        req.target = Target(0x20)
+
+        with pytest.raises(RetryError) as e:
+            rmcp.send_and_receive_many([req])
+        assert e.value.responses == [None]
+
+    def test_send_and_receive_metrics(self):
+        rmcp = Rmcp(max_retries=1)
+        rmcp.metrics = Metrics()
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+        timeouts = [socket.timeout()]
+
+        def receive(ignore_sdu_length):
+            if timeouts:
+                raise timeouts.pop()
+            return self._response_for(sent[-1], b'\x00\x12\x00\x00')
+        rmcp._receive_ipmi_msg = MagicMock(side_effect=receive)
+
+        req = create_request_by_name('GetSensorReading')
+        req.target = Target(0x20)
+        rmcp.send_and_receive(req)
+
+        command = rmcp.metrics.to_dict()['0x04:0x2d']
+        assert command['latency']['count'] == 1
+        assert command['timeouts'] == 1
+        assert command['retries'] == 1
+        assert command['completion_codes'] == {0: 1}
+        assert command['tx_bytes'] == 2 * len(sent[0])
+        assert command['rx_bytes'] == 11
+
+    def test_send_and_receive_many_metrics(self):
+        rmcp = Rmcp(max_in_flight=4)
+        rmcp.metrics = Metrics()
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+        rmcp._receive_ipmi_msg = MagicMock(
+            side_effect=lambda ignore_sdu_length:
+                self._response_for(sent.pop(), b'\xc3'))
+
+        reqs = []
+        for i in range(3):
+            req = create_request_by_name('GetSensorReading')
+            req.target = Target(0x20)
+            req.sensor_number = i
+            reqs.append(req)
+        rmcp.send_and_receive_many(reqs)
+
+        command = rmcp.metrics.to_dict()['0x04:0x2d']
+        assert command['latency']['count'] == 3
+        assert command['completion_codes'] == {0xc3: 3}
+        assert command['timeouts'] == 0
+
+    def test_late_response_not_taken_for_new_request(self):
+        rmcp = Rmcp(max_retries=1)
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+        responses = [socket.timeout()]
+
+        def receive(ignore_sdu_length):
+            if not responses:
+                # the late response to the first transmission and the
+                # response to the resent request
+                responses.append(self._response_for(sent[1],
+                                                    b'\x00\x22\x00\x00'))
+                responses.append(self._response_for(sent[0],
+                                                    b'\x00\x11\x00\x00'))
+            response = responses.pop()
+            if isinstance(response, Exception):
+                raise response
+            return response
+        rmcp._receive_ipmi_msg = MagicMock(side_effect=receive)
+
+        req = create_request_by_name('GetSensorReading')
+        req.target = Target(0x20)
+        assert rmcp.send_and_receive_many([req])[0].sensor_reading == 0x22
+        assert len(rmcp._q) == 1
+
+        # a single request reusing the sequence number of the late response
+        rmcp.next_sequence_number = IpmbHeaderReq(data=sent[0]).rq_seq - 1
+        del sent[:]
+        rmcp._receive_ipmi_msg = MagicMock(
+            side_effect=lambda ignore_sdu_length:
+                self._response_for(sent[-1], b'\x00\x33\x00\x00'))
+        assert rmcp.send_and_receive(req).sensor_reading == 0x33
+        assert len(rmcp._q) == 0
+
+    def test_stashed_response_shared_with_many(self):
+        rmcp = Rmcp(quirks_cfg={'rmcp_ignore_rq_seq': True})
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+
+        other = Rmcp()
+        other.next_sequence_number = 40
+        (_, tx_data) = other._encode_request(Target(0x20), 0, 0x04, 0x2d,
+                                             b'\x01')
+        responses = [self._response_for(tx_data, b'\x00\x12\x00\x00')]
+
+        def receive(ignore_sdu_length):
+            if responses:
+                return responses.pop()
+            return self._response_for(sent[-1], b'\x00\x55\x00')
+        rmcp._receive_ipmi_msg = MagicMock(side_effect=receive)
+
+        # the sensor reading is stashed by the single request ...
+        req = create_request_by_name('GetSelftestResults')
+        req.target = Target(0x20)
+        assert rmcp.send_and_receive(req).completion_code == 0
+        assert len(rmcp._q) == 1
+
+        # ... and taken by the pipelined request without reading the socket
+        rmcp._receive_ipmi_msg.reset_mock()
+        req = create_request_by_name('GetSensorReading')
+        req.target = Target(0x20)
+        assert rmcp.send_and_receive_many([req])[0].sensor_reading == 0x12
+        assert not rmcp._receive_ipmi_msg.called
+        assert len(rmcp._q) == 0
+
+    def test_send_and_receive_many_node_busy(self):
+        rmcp = Rmcp(max_in_flight=2)
+        rmcp.metrics = Metrics()
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+
+        def receive(ignore_sdu_length):
+            tx_data = sent.pop()
+            if IpmbHeaderReq(data=tx_data).cmdid == 0x2d:
+                return self._response_for(tx_data, b'\xc0')
+            return self._response_for(tx_data, b'\x00\x55\x00')
+        rmcp._receive_ipmi_msg = MagicMock(side_effect=receive)
+
+        busy = create_request_by_name('GetSensorReading')
+        busy.target = Target(0x20)
+        req = create_request_by_name('GetSelftestResults')
+        req.target = Target(0x20)
+
+        rsps = rmcp.send_and_receive_many([busy, req])
+        assert rsps[0].completion_code == 0xc0
+        assert rsps[1].completion_code == 0
+        # the busy request is sent three times
+        assert rmcp._send_ipmi_msg.call_count == 4
+        command = rmcp.metrics.to_dict()['0x04:0x2d']
+        assert command['retries'] == 2
+        assert command['latency']['count'] == 1
+
+    def test_send_and_receive_many_node_busy_then_ok(self):
+        rmcp = Rmcp()
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+        payloads = [b'\x00\x12\x00\x00', b'\xc0']
+        rmcp._receive_ipmi_msg = MagicMock(
+            side_effect=lambda ignore_sdu_length:
+                self._response_for(sent[-1], payloads.pop()))
+
+        req = create_request_by_name('GetSensorReading')
+        req.target = Target(0x20)
+        assert rmcp.send_and_receive_many([req])[0].sensor_reading == 0x12
+        assert rmcp._send_ipmi_msg.call_count == 2
+
+    def test_send_and_receive_node_busy_not_retried(self):
+        # a single request is retried by `Ipmi.send_message`
+        rmcp = Rmcp()
+        sent = []
+        rmcp._send_ipmi_msg = MagicMock(side_effect=sent.append)
+        rmcp._receive_ipmi_msg = MagicMock(
+            side_effect=lambda ignore_sdu_length:
+                self._response_for(sent[-1], b'\xc0'))
+
+        req = create_request_by_name('GetSensorReading')
+        req.target = Target(0x20)
+        assert rmcp.send_and_receive(req).completion_code == 0xc0
+        assert rmcp._send_ipmi_msg.call_count == 1
+
+    def test_max_in_flight_range(self):
+        with pytest.raises(RuntimeError):
+            Rmcp(max_in_flight=0)
+        with pytest.raises(RuntimeError):
+            Rmcp(max_in_flight=64)
+
+
+def test_keep_alive_state():
+    rmcp = Rmcp()
+    assert not rmcp.is_session_alive()
+
+    rmcp._session = Session()
+    rmcp._session.activated = True
+    rmcp._get_device_id = MagicMock(side_effect=IpmiTimeoutError())
+    rmcp._keep_alive()
+    assert not rmcp.is_session_alive()
+
+    rmcp._get_device_id = MagicMock()
+    rmcp._keep_alive()
+    assert rmcp.is_session_alive()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from pyipmi.errors import DecodingError
+from pyipmi.msgs.message import Bitfield, Message
+from pyipmi.msgs.registry import DEFAULT_REGISTRY
+
+
+def _message_classes():
+    DEFAULT_REGISTRY.load_all()
+    classes = []
+    for (key, cls) in DEFAULT_REGISTRY.registry.items():
+        if not isinstance(key, str) or cls.__dict__.get('_codec') is None:
+            continue
+        classes.append(cls)
+    return sorted(classes, key=lambda cls: cls.__name__)
+
+
+MESSAGE_CLASSES = _message_classes()
+
+
+def _state(msg):
+    state = {}
+    for field in msg.__fields__:
+        value = getattr(msg, field.name)
+        if isinstance(value, Bitfield.BitWrapper):
+            value = tuple(getattr(value, bit.name) for bit in value._bits)
+        elif value is not None and not isinstance(value, (int, bytes, str)):
+            value = list(value)
+        state[field.name] = value
+    return state
+
+
+def _outcome(fn):
+    try:
+        return ('ok', fn())
+    except Exception as e:
+        return ('error', type(e), str(e))
+
+
+def test_compiled_classes():
+    assert len(MESSAGE_CLASSES) > 100
+
+
+@pytest.mark.parametrize('cls', MESSAGE_CLASSES, ids=lambda c: c.__name__)
+def test_encode_compatible(cls):
+    msg = cls()
+    assert _outcome(msg._encode) == _outcome(msg._encode_fields)
+
+
+@pytest.mark.parametrize('cls', MESSAGE_CLASSES, ids=lambda c: c.__name__)
+def test_decode_compatible(cls):
+    rnd = random.Random(cls.__name__)
+    for length in range(0, 48):
+        for cc in (0, 0xc1):
+            data = bytes([cc] + [rnd.randrange(256) for _ in range(length)])
+            data = data[:length]
+
+            compiled = cls()
+            generic = cls()
+            outcome = _outcome(lambda: compiled._decode(data))
+            assert outcome == _outcome(lambda: generic._decode_fields(data))
+            assert _state(compiled) == _state(generic)
+
+            if outcome[0] == 'ok':
+                # decoded messages encode the same
+                assert _outcome(compiled._encode) == \
+                    _outcome(generic._encode_fields)
+
+
+def test_decode_non_bytes():
+    cls = DEFAULT_REGISTRY.registry['GetSensorReadingRsp']
+    msg = cls()
+    msg._decode([0, 0x12, 0xc0, 0x01])
+    assert msg.sensor_reading == 0x12
+    assert msg.states1 == 0x01
+
+
+def test_unregistered_subclass_uses_generic_code():
+    cls = DEFAULT_REGISTRY.registry['GetSensorReadingRsp']
+
+    class SubclassRsp(cls):
+        __fields__ = cls.__fields__[:2]
+
+    msg = SubclassRsp()
+    msg._decode(b'\x00\x12')
+    assert msg.sensor_reading == 0x12
+    assert isinstance(msg, Message)
+
+
+@pytest.mark.parametrize('cls', MESSAGE_CLASSES, ids=lambda c: c.__name__)
+def test_lazy_decode_compatible(cls):
+    rnd = random.Random(cls.__name__)
+    for length in range(0, 24):
+        for cc in (0, 0xc1):
+            data = bytes([cc] + [rnd.randrange(256) for _ in range(length)])
+            data = data[:length]
+
+            eager = cls()
+            lazy = cls._create_lazy(data)
+            if _outcome(lambda: eager._decode(data))[0] == 'ok':
+                assert _state(lazy) == _state(eager)
+            elif len(cls.__fields__) > 1:
+                # the error is raised on the first access of a field
+                with pytest.raises(Exception):
+                    getattr(lazy, cls.__fields__[-1].name)
+
+
+def test_lazy_decode_only_completion_code():
+    cls = DEFAULT_REGISTRY.registry['GetSensorReadingRsp']
+    msg = cls._create_lazy(b'\x00\x12\xc0\x01')
+    assert msg.completion_code == 0
+    assert '_lazy_data' in msg.__dict__
+    assert 'sensor_reading' not in msg.__dict__
+
+    assert msg.sensor_reading == 0x12
+    assert msg.states1 == 0x01
+    assert '_lazy_data' not in msg.__dict__
+    with pytest.raises(AttributeError):
+        msg.no_such_field
+
+
+def test_lazy_decode_error_on_access():
+    cls = DEFAULT_REGISTRY.registry['GetSensorReadingRsp']
+    msg = cls._create_lazy(b'\x00\x12\xc0\x01\x00\x00')
+    assert msg.completion_code == 0
+    with pytest.raises(AttributeError) as e:
+        msg.sensor_reading
+    assert isinstance(e.value.__cause__, DecodingError)
+
+    # the message is left unchanged
+    assert not hasattr(msg, 'sensor_reading')
+    assert getattr(msg, 'states1', None) is None
+    assert '_lazy_data' in msg.__dict__
+
+
+def test_lazy_decode_hasattr():
+    cls = DEFAULT_REGISTRY.registry['GetSensorReadingRsp']
+    msg = cls._create_lazy(b'\x00\x12\xc0\x01')
+
+    # no decoding for names which are not fields
+    assert not hasattr(msg, 'no_such_field')
+    assert getattr(msg, 'no_such_field', None) is None
+    assert '_lazy_data' in msg.__dict__
+
+    assert hasattr(msg, 'sensor_reading')
+    assert '_lazy_data' not in msg.__dict__
+
+
+def test_lazy_decode_set_before_get():
+    cls = DEFAULT_REGISTRY.registry['GetSensorReadingRsp']
+    msg = cls._create_lazy(b'\x00\x12\xc0\x01')
+    msg.sensor_reading = 0x34
+    msg.lun = 2
+
+    assert msg.states1 == 0x01
+    assert msg.sensor_reading == 0x34
+    assert msg.lun == 2
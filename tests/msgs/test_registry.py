@@ -1,6 +1,13 @@
 
+import subprocess
+import sys
+
+import pytest
+
 import pyipmi.msgs
 from pyipmi.msgs import create_message, create_response_message, create_response_by_name, create_request_by_name
+from pyipmi.msgs.index import MESSAGES
+from pyipmi.msgs.registry import DEFAULT_REGISTRY
 
 
 def test_create_message():
@@ -24,3 +31,42 @@ def test_create_request_by_name():
 def test_create_response_by_name():
     rsp = create_response_by_name('GetDeviceId')
     assert type(rsp) is pyipmi.msgs.bmc.GetDeviceIdRsp
+
+
+def test_lookup_unknown_message():
+    with pytest.raises(KeyError):
+        create_request_by_name('NoSuchMessage')
+    with pytest.raises(KeyError):
+        create_message(0x3e, 0xff, None)
+
+
+def test_index_matches_registry():
+    DEFAULT_REGISTRY.load_all()
+    registered = set()
+    for (name, cls) in DEFAULT_REGISTRY.registry.items():
+        if isinstance(name, str):
+            registered.add((cls.__module__.split('.')[-1], name, cls.__netfn__,
+                            cls.__cmdid__, cls.__group_extension__))
+
+    indexed = set()
+    for (module, messages) in MESSAGES.items():
+        for message in messages:
+            indexed.add((module,) + message)
+
+    assert indexed == registered
+
+
+def test_messages_loaded_on_first_lookup():
+    code = '\n'.join([
+        'import sys',
+        'import pyipmi',
+        'from pyipmi.msgs import create_request_by_name',
+        'assert "pyipmi.msgs.vita" not in sys.modules',
+        'assert "pyipmi.sdr" not in sys.modules',
+        'req = create_request_by_name("VitaGetVsoCapabilities")',
+        'assert "pyipmi.msgs.vita" in sys.modules',
+        'assert type(req) is pyipmi.msgs.vita.VitaGetVsoCapabilitiesReq',
+        'assert pyipmi.Ipmi.get_repository_sdr is not None',
+        'assert "pyipmi.sdr" in sys.modules',
+    ])
+    subprocess.check_call([sys.executable, '-c', code])
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+
+from pyipmi import Target
+from pyipmi.aio import AsyncIpmi
+from pyipmi.msgs.constants import (CC_CANT_RET_NUM_REQ_BYTES,
+                                   CC_REQ_DATA_FIELD_EXCEED,
+                                   CC_REQ_DATA_NOT_PRESENT)
+from pyipmi.msgs.registry import create_response_message
+from pyipmi.sel import SelCursor, SelEntry
+
+this_file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+class FakeAsyncInterface:
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_and_receive(self, req):
+        self.requests.append(req)
+        rsp = create_response_message(req)
+        self.handler(req, rsp)
+        return rsp
+
+
+def _connection(handler):
+    return AsyncIpmi(interface=FakeAsyncInterface(handler), target=Target(0x20))
+
+
+def test_get_sensor_reading():
+    def handler(req, rsp):
+        rsp.sensor_reading = req.sensor_number * 2
+        rsp.states1 = 0x01
+
+    async def run():
+        async with _connection(handler) as ipmi:
+            return await ipmi.get_sensor_reading(21)
+
+    assert asyncio.run(run()) == (42, 1)
+
+
+def test_sdr_repository_entries():
+    sdr = [0x01, 0x00, 0x51, 0x12, 0x0b, 0x20, 0x00, 0x00, 0x00,
+           0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
+    records = {1: sdr, 2: [0x02] + sdr[1:]}
+
+    def handler(req, rsp):
+        if req.cmdid == 0x23:
+            # record ID 0 is the first record
+            record_id = req.record_id or 1
+            data = records[record_id]
+            rsp.record_data = data[req.offset:req.offset + req.bytes_to_read]
+            rsp.next_record_id = 2 if record_id == 1 else 0xffff
+
+    async def run():
+        ipmi = _connection(handler)
+        return [s async for s in ipmi.sdr_repository_entries()]
+
+    entries = asyncio.run(run())
+    assert [e.id for e in entries] == [1, 2]
+    assert entries[1].next_id == 0xffff
+
+
+def test_get_repository_sdr_negotiates_length():
+    records = {i: [i, 0, 0x51, 0x12, 40] + list(range(40))
+               for i in range(1, 5)}
+    lengths = []
+
+    def handler(req, rsp):
+        if req.cmdid == 0x23:
+            lengths.append(req.bytes_to_read)
+            if req.bytes_to_read > 24:
+                rsp.completion_code = CC_CANT_RET_NUM_REQ_BYTES
+                return
+            data = records[req.record_id]
+            rsp.record_data = data[req.offset:req.offset + req.bytes_to_read]
+            rsp.next_record_id = 0xffff
+
+    async def run(ipmi):
+        return [await ipmi.get_repository_sdr(i) for i in records]
+
+    ipmi = _connection(handler)
+    for _ in range(3):
+        lengths[:] = []
+        entries = asyncio.run(run(ipmi))
+        assert [e.id for e in entries] == [1, 2, 3, 4]
+
+    # the negotiated length is kept for the connection, the header is read
+    # together with the body
+    assert len(lengths) == 2 * 4
+    assert max(lengths) <= 24
+
+
+def test_sel_entries():
+    def handler(req, rsp):
+        if req.cmdid == 0x40:
+            rsp.entries = 2
+        elif req.cmdid == 0x43:
+            rsp.record_data = [req.record_id + 1, 0, SelEntry.TYPE_SYSTEM_EVENT,
+                               0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            rsp.next_record_id = 1 if req.record_id == 0 else 0xffff
+
+    async def run():
+        ipmi = _connection(handler)
+        return [e async for e in ipmi.sel_entries()]
+
+    entries = asyncio.run(run())
+    assert [e.record_id for e in entries] == [1, 2]
+
+
+def test_get_sel_entry_partial_reads():
+    lengths = []
+
+    def handler(req, rsp):
+        if req.cmdid == 0x43:
+            lengths.append(req.length)
+            if req.length > 8:
+                rsp.completion_code = CC_CANT_RET_NUM_REQ_BYTES
+                return
+            data = [1, 0, SelEntry.TYPE_SYSTEM_EVENT] + [0] * 13
+            rsp.record_data = data[req.offset:req.offset + req.length]
+            rsp.next_record_id = 0xffff
+
+    async def run(ipmi):
+        return await ipmi.get_sel_entry(1)
+
+    ipmi = _connection(handler)
+    for _ in range(3):
+        lengths[:] = []
+        (entry, next_id) = asyncio.run(run(ipmi))
+        assert entry.record_id == 1
+        assert next_id == 0xffff
+
+    # the negotiated length is kept for the connection
+    assert lengths == [8, 8]
+
+
+def test_new_sel_entries():
+    record_ids = [1, 2]
+
+    def handler(req, rsp):
+        if req.cmdid == 0x40:
+            rsp.entries = len(record_ids)
+            rsp.most_recent_addition = len(record_ids)
+        elif req.cmdid == 0x43:
+            index = 0 if req.record_id == 0 else record_ids.index(req.record_id)
+            rsp.record_data = [record_ids[index], 0, SelEntry.TYPE_SYSTEM_EVENT,
+                               0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            rsp.next_record_id = 0xffff
+            if index + 1 < len(record_ids):
+                rsp.next_record_id = record_ids[index + 1]
+
+    async def run(cursor):
+        ipmi = _connection(handler)
+        return [e.record_id async for e in ipmi.new_sel_entries(cursor)]
+
+    cursor = SelCursor()
+    assert asyncio.run(run(cursor)) == [1, 2]
+    assert asyncio.run(run(cursor)) == []
+    record_ids.append(3)
+    assert asyncio.run(run(cursor)) == [3]
+
+
+def test_new_sel_entries_after_delete():
+    sel = {'ids': [1, 2, 3], 'addition': 3, 'erase': 0}
+
+    def handler(req, rsp):
+        ids = sel['ids']
+        if req.cmdid == 0x40:
+            rsp.entries = len(ids)
+            rsp.most_recent_addition = sel['addition']
+            rsp.most_recent_erase = sel['erase']
+        elif req.cmdid == 0x43:
+            if req.record_id == 0:
+                index = 0
+            elif req.record_id in ids:
+                index = ids.index(req.record_id)
+            else:
+                rsp.completion_code = CC_REQ_DATA_NOT_PRESENT
+                return
+            rsp.record_data = [ids[index], 0, SelEntry.TYPE_SYSTEM_EVENT,
+                               0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            rsp.next_record_id = 0xffff
+            if index + 1 < len(ids):
+                rsp.next_record_id = ids[index + 1]
+
+    async def run(cursor):
+        ipmi = _connection(handler)
+        return [e.record_id async for e in ipmi.new_sel_entries(cursor)]
+
+    cursor = SelCursor()
+    assert asyncio.run(run(cursor)) == [1, 2, 3]
+
+    # deleting an entry updates the erase timestamp
+    sel['ids'] = [1, 3, 4]
+    sel['addition'] += 1
+    sel['erase'] += 1
+    assert asyncio.run(run(cursor)) == [4]
+
+    sel['ids'] = [1, 3, 5]
+    sel['addition'] += 1
+    sel['erase'] += 1
+    assert asyncio.run(run(cursor)) == [5]
+
+
+def test_get_fru_inventory():
+    with open(os.path.join(this_file_path, 'fru_bin/kontron_am4010.bin'),
+              'rb') as f:
+        fru_data = f.read()
+
+    def handler(req, rsp):
+        if req.cmdid == 0x10:
+            rsp.area_size = len(fru_data)
+        elif req.cmdid == 0x11:
+            rsp.data = fru_data[req.offset:req.offset + req.count]
+            rsp.count = len(rsp.data)
+
+    async def run():
+        ipmi = _connection(handler)
+        return await ipmi.get_fru_inventory()
+
+    fru = asyncio.run(run())
+    assert fru.board_info_area is not None
+    assert fru.product_info_area is not None
+
+
+def test_read_fru_data_negotiates_length():
+    fru_data = bytes(range(100))
+    counts = []
+
+    def handler(req, rsp):
+        if req.cmdid == 0x11:
+            counts.append(req.count)
+            if req.count > 40:
+                rsp.completion_code = CC_REQ_DATA_FIELD_EXCEED
+                return
+            rsp.data = fru_data[req.offset:req.offset + req.count]
+            rsp.count = len(rsp.data)
+
+    async def run(ipmi):
+        return await ipmi.read_fru_data(0, len(fru_data))
+
+    ipmi = _connection(handler)
+    for _ in range(3):
+        counts[:] = []
+        assert asyncio.run(run(ipmi)) == fru_data
+
+    # the negotiated length is kept for the connection
+    assert counts == [40, 40, 20]
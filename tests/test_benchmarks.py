@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+from benchmarks import runner
+
+
+def test_benchmarks_run():
+    results = runner.run(runner.discover(), rounds=1, min_time=0)
+    names = [result.name for result in results]
+    for group in ('codec', 'emulation', 'parsers', 'transport'):
+        assert any(name.startswith(group + '.') for name in names)
+
+    data = json.loads(json.dumps(runner.to_dict(results)))
+    assert data['version'] == runner.FORMAT_VERSION
+    bench = data['benchmarks'][0]
+    assert bench['rounds'] == 1
+    assert bench['iterations'] == 1
+    assert bench['min'] <= bench['median'] <= bench['max']
+
+
+def test_benchmarks_keyword():
+    results = runner.run(runner.discover(), keyword='codec.encode',
+                         rounds=1, min_time=0)
+    assert results
+    assert all(r.name.startswith('codec.encode[') for r in results)
+
+
+def test_compare():
+    def results(**times):
+        return {'benchmarks': [{'name': name, 'min': value}
+                               for (name, value) in times.items()]}
+
+    rows = runner.compare(results(a=1.0, b=1.0, c=1.0),
+                          results(a=1.1, b=1.3, d=5.0), max_regression=0.2)
+    assert rows == [('a', 1.0, 1.1, False), ('b', 1.0, 1.3, True)]
+
+
+def test_main_json(tmpdir):
+    filename = str(tmpdir.join('results.json'))
+    assert runner.main(['--quick', '-k', 'rx_filter', '--json',
+                        filename]) == 0
+    with open(filename) as f:
+        baseline = json.load(f)
+    assert [b['name'] for b in baseline['benchmarks']] == \
+        ['transport.rx_filter']
+
+    baseline['benchmarks'][0]['min'] = 1e-12
+    with open(filename, 'w') as f:
+        json.dump(baseline, f)
+    assert runner.main(['--quick', '-k', 'rx_filter', '--compare',
+                        filename]) == 1
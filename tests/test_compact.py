@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+from array import array
+
+import pytest
+
+from pyipmi.bmc import DeviceGuid, DeviceId, Watchdog
+from pyipmi.chassis import ChassisStatus
+from pyipmi.compact import (_COMPACT_CLASSES, compact, CompactDeviceId,
+                            CompactFruInventory, CompactSdrRecord,
+                            CompactSdrFullSensorRecord, CompactSelEntry)
+from pyipmi.errors import CompletionCodeError, DecodingError
+from pyipmi.fru import (get_fru_inventory_from_file, InventoryChassisInfoArea,
+                        InventoryMultiRecordArea)
+from pyipmi.msgs import create_response_by_name, encode_message
+from pyipmi.sdr import (SdrCommon, SdrRepositoryAllocationInfo,
+                        SdrRepositoryInfo)
+from pyipmi.sdrcache import SdrCache
+from pyipmi.sel import SelEntry, SelInfo
+
+SDR_DATA = bytes([
+    0x17, 0x00, 0x51, 0x01, 0x35, 0x17, 0x00, 0x51,
+    0x01, 0x35, 0x17, 0x00, 0x51, 0x01, 0x35, 0x32,
+    0x85, 0x32, 0x1b, 0x1b, 0x00, 0x04, 0x00, 0x00,
+    0x3b, 0x01, 0x00, 0x01, 0x00, 0xd0, 0x07, 0xcc,
+    0xf4, 0xa6, 0xff, 0x00, 0x00, 0xfe, 0xf5, 0x00,
+    0x8e, 0xa5, 0x04, 0x04, 0x00, 0x00, 0x00, 0xca,
+    0x41, 0x32, 0x3a, 0x56, 0x63, 0x63, 0x20, 0x31,
+    0x32, 0x56])
+
+# compact sensor, event only, FRU device locator, management controller
+# device locator and confirmation, OEM and unknown records
+OTHER_SDR_DATA = [
+    bytes([0xd3, 0x00, 0x51, 0x02, 0x28, 0x82, 0x00, 0xd3,
+           0xc1, 0x64, 0x03, 0x40, 0x21, 0x6f, 0x00, 0x00,
+           0x00, 0x00, 0x03, 0x00, 0xc0, 0x00, 0x00, 0x01,
+           0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xcd,
+           0x41, 0x34, 0x3a, 0x50, 0x72, 0x65, 0x73, 0x20,
+           0x53, 0x46, 0x50, 0x2d, 0x31]),
+    bytes([0x05, 0x00, 0x51, 0x03, 0x0f, 0x82, 0x00, 0x10,
+           0xc1, 0x64, 0x03, 0x6f, 0x00, 0x00, 0x00, 0x00,
+           0xc3, 0x41, 0x42, 0x43]),
+    bytes([0x02, 0x00, 0x51, 0x11, 0x17, 0x82, 0x03, 0x80,
+           0x00, 0x00, 0x10, 0x02, 0xc2, 0x61, 0x00, 0xcc,
+           0x4b, 0x6f, 0x6e, 0x74, 0x72, 0x6f, 0x6e, 0x20,
+           0x4d, 0x43, 0x4d, 0x43]),
+    bytes([0x00, 0x01, 0x51, 0x12, 0x19, 0x00, 0x01, 0x51,
+           0x12, 0x1b, 0x00, 0x01, 0x51, 0x12, 0x1b, 0xc9,
+           0x41, 0x32, 0x3a, 0x41, 0x4d, 0x34, 0x32, 0x32,
+           0x30]),
+    bytes([0x45, 0x00, 0x51, 0x13, 0x1b, 0x20, 0x00, 0x01,
+           0x02, 0x01, 0x51, 0x4a, 0xc1, 0x62, 0x06, 0x80,
+           0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+           0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]),
+    bytes([0x06, 0x00, 0x51, 0xc0, 0x03, 0x20, 0x00, 0x01]),
+    bytes([0x01, 0x00, 0x51, 0x0a, 0x00]),
+]
+
+CHASSIS_INFO_AREA_DATA = bytes([0x01, 0x02, 0x17, 0xc2, 0x41, 0x42, 0xc0, 0xc1,
+                                0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+                                0x20])
+
+# an OEM record, which is not decoded
+MULTIRECORD_AREA_DATA = bytes([0x01, 0x82, 0x02, 0xba, 0xc1, 0x12, 0x34])
+
+# (response name, state class)
+STATES = [
+    ('GetDeviceId', DeviceId),
+    ('GetDeviceGuid', DeviceGuid),
+    ('GetWatchdogTimer', Watchdog),
+    ('GetChassisStatus', ChassisStatus),
+    ('GetSelInfo', SelInfo),
+    ('GetSdrRepositoryInfo', SdrRepositoryInfo),
+    ('GetSdrRepositoryAllocationInfo', SdrRepositoryAllocationInfo),
+]
+
+SEL_DATA = bytes([0x01, 0x00, 0x02, 0x01, 0x02, 0x03, 0x04, 0x20,
+                  0x00, 0x04, 0x01, 0x6f, 0x81, 0x02, 0x03, 0x04])
+
+
+class TestCompactSdr(object):
+    def test_same_attributes(self):
+        sdr = SdrCommon.from_data(array('B', SDR_DATA), 0x10)
+        record = compact(sdr)
+
+        assert isinstance(record, CompactSdrFullSensorRecord)
+        assert not hasattr(record, '__dict__')
+        assert str(record) == str(sdr)
+        for (name, value) in vars(sdr).items():
+            if isinstance(value, list):
+                value = tuple(value)
+            elif isinstance(value, array):
+                value = bytes(value)
+            assert getattr(record, name) == value
+        assert record.convert_sensor_raw_to_value(100) == \
+            sdr.convert_sensor_raw_to_value(100)
+        assert record.conversion_table()[100] == 5.9
+
+    def test_read_only_containers(self):
+        record = CompactSdrRecord.from_bytes(SDR_DATA)
+        assert record.threshold['ucr'] == 254
+        assert dict(record.threshold) == {'unr': 0, 'ucr': 254, 'unc': 245,
+                                          'lnr': 0, 'lcr': 142, 'lnc': 165}
+        with pytest.raises(TypeError):
+            record.threshold['ucr'] = 0
+        with pytest.raises(KeyError):
+            record.threshold['xxx']
+
+        other = CompactSdrRecord.from_bytes(SDR_DATA)
+        assert other.capabilities is record.capabilities
+
+    def test_bytes_round_trip(self):
+        record = CompactSdrRecord.from_bytes(SDR_DATA, 0x10)
+        assert record.to_bytes() == SDR_DATA
+
+        d = record.to_dict()
+        assert d['data'] == SDR_DATA
+        assert d['next_id'] == 0x10
+        assert d['device_id_string'] == 'A2:Vcc 12V'
+        assert d['threshold']['lcr'] == 142
+        assert '_conversion_table' not in d
+
+        again = CompactSdrRecord.from_bytes(d['data'], d['next_id'])
+        assert again.to_dict() == d
+
+    def test_pickle(self):
+        record = CompactSdrRecord.from_bytes(SDR_DATA, 0x10)
+        assert pickle.loads(pickle.dumps(record)).to_dict() == \
+            record.to_dict()
+
+    def test_sdr_cache(self):
+        cache = SdrCache(compact=True)
+        cache.put('guid', (1,), [SdrCommon.from_data(array('B', SDR_DATA))])
+        records = cache.get('guid', (1,))
+        assert isinstance(records[0], CompactSdrFullSensorRecord)
+
+
+class TestCompactSelEntry(object):
+    def test_same_attributes(self):
+        entry = SelEntry(array('B', SEL_DATA))
+        record = compact(entry)
+
+        assert str(record) == str(entry)
+        assert record.to_dict() == dict(vars(entry), data=SEL_DATA)
+
+    def test_bytes_round_trip(self):
+        record = CompactSelEntry.from_bytes(SEL_DATA)
+        assert record.record_id == 1
+        assert record.timestamp == 0x04030201
+        assert record.event_data == [2, 3, 4]
+        assert CompactSelEntry.from_bytes(record.to_bytes()).to_dict() == \
+            record.to_dict()
+
+    def test_invalid_data(self):
+        with pytest.raises(DecodingError):
+            CompactSelEntry.from_bytes(SEL_DATA[:15])
+
+
+class TestCompactFruInventory(object):
+    def test_same_attributes(self):
+        path = os.path.join(os.path.dirname(__file__),
+                            'fru_bin/kontron_am4010.bin')
+        fru = get_fru_inventory_from_file(path)
+        record = compact(fru)
+
+        area = record.board_info_area
+        assert area.product_name.string == fru.board_info_area.product_name.string
+        assert area.mfg_date == fru.board_info_area.mfg_date
+        assert len(area.data) == fru.board_info_area.length
+        assert record.to_bytes() == bytes(fru.raw)
+
+        again = CompactFruInventory.from_bytes(record.to_bytes())
+        assert again.to_dict() == record.to_dict()
+
+
+class TestCompactState(object):
+    def test_same_attributes(self):
+        rsp = create_response_by_name('GetDeviceId')
+        rsp.device_id = 0x12
+        rsp.firmware_revision.major = 1
+        rsp.firmware_revision.minor = 0x23
+        rsp.additional_support.sensor = 1
+        rsp.additional_support.sel = 1
+        data = encode_message(rsp)
+        device_id = DeviceId(rsp)
+        record = CompactDeviceId.from_bytes(data)
+
+        assert not hasattr(record, '__dict__')
+        assert str(record) == str(device_id)
+        assert record.supports_function('SEL')
+        assert not record.supports_function('chassis')
+        assert str(record.fw_revision) == '1.23'
+        assert record.to_bytes() == data
+        assert record.to_dict() == dict(compact(device_id).to_dict(),
+                                        data=data)
+        assert CompactDeviceId.from_bytes(data).to_dict() == \
+            record.to_dict()
+
+    def test_completion_code(self):
+        with pytest.raises(CompletionCodeError):
+            CompactDeviceId.from_bytes(b'\xc1')
+
+
+def _sample_records():
+    for data in [SDR_DATA] + OTHER_SDR_DATA:
+        yield SdrCommon.from_data(array('B', data), 0x10)
+    yield SelEntry(array('B', SEL_DATA))
+    path = os.path.join(os.path.dirname(__file__), 'fru_bin')
+    for name in sorted(os.listdir(path)):
+        yield get_fru_inventory_from_file(os.path.join(path, name))
+    yield InventoryChassisInfoArea(array('B', CHASSIS_INFO_AREA_DATA))
+    yield InventoryMultiRecordArea(array('B', MULTIRECORD_AREA_DATA))
+    for (name, cls) in STATES:
+        yield cls(create_response_by_name(name))
+
+
+def _nested_records(value):
+    if isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _nested_records(v)
+    elif hasattr(value, '__dict__'):
+        yield value
+        for v in vars(value).values():
+            yield from _nested_records(v)
+
+
+def test_compact_classes_carry_all_attributes():
+    covered = set()
+    for record in _nested_records(list(_sample_records())):
+        cls = _COMPACT_CLASSES[type(record)]
+        covered.add(cls)
+        missing = [name for name in vars(record) if not hasattr(cls, name)]
+        assert missing == [], cls.__name__
+        assert compact(record).to_dict().keys() <= set(cls._attributes)
+    # every compact class is checked by a sample record
+    assert covered == set(_COMPACT_CLASSES.values())
+
+
+def test_unsupported_record():
+    with pytest.raises(TypeError):
+        compact(object())
@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import socket
+import threading
+import time
+
+import pyipmi
+import pyipmi.interfaces
+from pyipmi import emulation
+from pyipmi.emulation import (ConnectionContext, EmulatedBmc,
+                              EmulatorProtocol, SensorWaveform,
+                              load_farm_config, serve_farm)
+from pyipmi.interfaces.rmcp import (AsfMsg, AsfPing, RmcpMsg, RMCP_CLASS_ASF,
+                                    RMCP_CLASS_IPMI)
+
+PING = RmcpMsg(RMCP_CLASS_ASF).pack(AsfPing().pack(), 0xff)
+
+SDR_DATA = bytes([
+    0x17, 0x00, 0x51, 0x01, 0x35, 0x17, 0x00, 0x51,
+    0x01, 0x35, 0x17, 0x00, 0x51, 0x01, 0x35, 0x32,
+    0x85, 0x32, 0x1b, 0x1b, 0x00, 0x04, 0x00, 0x00,
+    0x3b, 0x01, 0x00, 0x01, 0x00, 0xd0, 0x07, 0xcc,
+    0xf4, 0xa6, 0xff, 0x00, 0x00, 0xfe, 0xf5, 0x00,
+    0x8e, 0xa5, 0x04, 0x04, 0x00, 0x00, 0x00, 0xca,
+    0x41, 0x32, 0x3a, 0x56, 0x63, 0x63, 0x20, 0x31,
+    0x32, 0x56])
+
+
+def _sdr_dump(path, record_ids=(1, 2, 3)):
+    with open(path, 'wb') as f:
+        for record_id in record_ids:
+            f.write(bytes([record_id, 0]) + SDR_DATA[2:])
+    return str(path)
+
+
+def _free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((emulation.UDP_IP, 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _connect(host, port):
+    interface = pyipmi.interfaces.create_interface('rmcp',
+                                                   keep_alive_interval=0)
+    ipmi = pyipmi.create_connection(interface)
+    ipmi.session.set_session_type_rmcp(host, port)
+    ipmi.session.set_auth_type_user('admin', 'admin')
+    ipmi.target = pyipmi.Target(ipmb_address=0x20)
+    ipmi.open()
+    return ipmi
+
+
+class Transport(object):
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((data, addr))
+
+
+def _protocol(**kwargs):
+    protocol = EmulatorProtocol(None, **kwargs)
+    protocol.connection_made(Transport())
+    return protocol
+
+
+def test_ping():
+    protocol = _protocol()
+    protocol.datagram_received(PING, ('127.0.0.1', 1000))
+
+    ((pdu, addr),) = protocol.transport.sent
+    assert addr == ('127.0.0.1', 1000)
+    msg = RmcpMsg()
+    sdu = msg.unpack(pdu)
+    assert msg.class_of_msg == RMCP_CLASS_ASF
+    assert AsfMsg.from_data(sdu).asf_type == AsfMsg.ASF_TYPE_PRESENCE_PONG
+
+
+def test_invalid_message_is_dropped():
+    protocol = _protocol()
+    protocol.datagram_received(b'\x06\x00\xff\x07\x00', ('127.0.0.1', 1000))
+    protocol.datagram_received(RmcpMsg(RMCP_CLASS_IPMI).pack(b'\x00', 0xff),
+                               ('127.0.0.1', 1000))
+    assert protocol.transport.sent == []
+
+
+def test_max_connections():
+    protocol = _protocol(max_connections=3)
+    for port in range(5):
+        protocol.datagram_received(PING, ('127.0.0.1', port))
+    protocol.datagram_received(PING, ('127.0.0.1', 2))
+    protocol.datagram_received(PING, ('127.0.0.1', 5))
+
+    assert list(protocol.connections) == [('127.0.0.1', 4),
+                                          ('127.0.0.1', 2),
+                                          ('127.0.0.1', 5)]
+
+
+def test_expire():
+    protocol = _protocol(connection_timeout=10)
+    for port in range(3):
+        protocol.datagram_received(PING, ('127.0.0.1', port))
+    protocol.connections[('127.0.0.1', 0)].last_seen -= 20
+    protocol.connections[('127.0.0.1', 1)].last_seen -= 5
+
+    assert protocol.expire() == 1
+    assert list(protocol.connections) == [('127.0.0.1', 1),
+                                          ('127.0.0.1', 2)]
+
+
+def test_closed_connection_is_removed():
+    protocol = _protocol()
+    protocol.datagram_received(PING, ('127.0.0.1', 1000))
+    protocol.connections[('127.0.0.1', 1000)].state = \
+        ConnectionContext.STATE_CLOSED
+    protocol.datagram_received(PING, ('127.0.0.1', 1000))
+    assert protocol.connections == {}
+
+
+def test_concurrent_sessions():
+    port = _free_port()
+
+    thread = threading.Thread(target=emulation.main,
+                              args=(['-p', str(port)],), daemon=True)
+    thread.start()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.05)
+    for _ in range(100):
+        sock.sendto(PING, (emulation.UDP_IP, port))
+        try:
+            sock.recvfrom(1024)
+            break
+        except socket.timeout:
+            pass
+    sock.close()
+
+    errors = []
+
+    def client():
+        try:
+            ipmi = _connect(emulation.UDP_IP, port)
+            for _ in range(5):
+                ipmi.get_device_id()
+            ipmi.close()
+        except Exception as e:
+            errors.append(e)
+
+    clients = [threading.Thread(target=client) for _ in range(16)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+
+    assert errors == []
+
+
+def test_loss():
+    protocol = EmulatorProtocol(None, bmc=EmulatedBmc(loss=1.0))
+    protocol.connection_made(Transport())
+    protocol.datagram_received(PING, ('127.0.0.1', 1000))
+
+    assert protocol.transport.sent == []
+    assert (protocol.received, protocol.sent, protocol.dropped) == (1, 0, 1)
+
+
+def test_delay():
+    assert EmulatedBmc(latency=0.5).delay() == 0.5
+    for _ in range(100):
+        assert 0.4 <= EmulatedBmc(latency=0.5, jitter=0.1).delay() <= 0.6
+    assert EmulatedBmc(latency=0.01, jitter=0.1).delay() >= 0
+
+
+def test_sdr_list(tmp_path):
+    bmc = EmulatedBmc({'sdr': _sdr_dump(tmp_path / 'sdr.bin')})
+    assert list(bmc.sdr_list) == [1, 2, 3]
+    assert [bmc.next_sdr_id(i) for i in (1, 2, 3)] == [2, 3, 0xffff]
+
+
+def test_load_farm_config(tmp_path):
+    sdr = _sdr_dump(tmp_path / 'sdr.bin')
+    bmcs = load_farm_config({
+        'template': {'sdr': sdr, 'latency': 0.01, 'fru': {0: 'a.bin'}},
+        'count': 3,
+        'port': 20000,
+        'instances': {1: {'loss': 0.5, 'fru': {1: 'b.bin'},
+                          'device_id': {'device_id': 7}}},
+    })
+
+    assert [(host, port) for (host, port, _) in bmcs] == \
+        [('127.0.0.1', 20000), ('127.0.0.1', 20001), ('127.0.0.1', 20002)]
+    assert [bmc.name for (_, _, bmc) in bmcs] == ['bmc0', 'bmc1', 'bmc2']
+    (first, second, third) = [bmc for (_, _, bmc) in bmcs]
+    assert first.sdr_list is second.sdr_list
+    assert len(first.sdr_list) == 3
+    assert (first.latency, first.loss) == (0.01, 0.0)
+    assert (second.latency, second.loss) == (0.01, 0.5)
+    assert second.config['fru'] == {0: 'a.bin', 1: 'b.bin'}
+    assert third.config['fru'] == {0: 'a.bin'}
+
+
+def test_load_farm_config_host_per_bmc():
+    bmcs = load_farm_config({'count': 2, 'host': '127.0.1.{number}',
+                             'port': 623, 'port_step': 0})
+    assert [(host, port) for (host, port, _) in bmcs] == \
+        [('127.0.1.1', 623), ('127.0.1.2', 623)]
+
+
+def test_farm(tmp_path):
+    sdr = _sdr_dump(tmp_path / 'sdr.bin')
+    port = _free_port()
+    bmcs = load_farm_config({
+        'template': {'sdr': sdr},
+        'count': 2,
+        'port': port,
+        'port_step': 0,
+        'host': '127.0.0.{number}',
+        'instances': {
+            0: {'device_id': {'device_id': 1}},
+            1: {'device_id': {'device_id': 2}, 'latency': 0.05},
+        },
+    })
+
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    task = loop.create_task(serve_farm(bmcs, started=lambda _: started.set()))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    try:
+        assert started.wait(5)
+
+        ipmi = _connect('127.0.0.1', port)
+        assert ipmi.get_device_id().device_id == 1
+        assert len(list(ipmi.sdr_repository_entries())) == 3
+        ipmi.close()
+
+        ipmi = _connect('127.0.0.2', port)
+        start = time.monotonic()
+        assert ipmi.get_device_id().device_id == 2
+        assert time.monotonic() - start >= 0.05
+        ipmi.close()
+    finally:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        loop.close()
+
+
+def test_waveform():
+    square = SensorWaveform('square', minimum=10, maximum=20, period=10)
+    assert [square.raw(t) for t in (0, 4, 5, 9, 10)] == [10, 10, 20, 20, 10]
+
+    ramp = SensorWaveform('ramp', minimum=0, maximum=100, period=10)
+    assert [ramp.raw(t) for t in (0, 2.5, 5)] == [0, 25, 50]
+
+    sine = SensorWaveform('sine', minimum=0, maximum=200, period=4)
+    assert [sine.raw(t) for t in (0, 1, 2, 3)] == [0, 100, 200, 100]
+
+    constant = SensorWaveform('constant', value=300)
+    assert constant.raw(0) == 255
+
+    noisy = SensorWaveform('constant', value=100, noise=5)
+    assert all(95 <= noisy.raw(0) <= 105 for _ in range(100))
+
+
+def test_sensor_reading(tmp_path):
+    bmc = EmulatedBmc({
+        'sdr': _sdr_dump(tmp_path / 'sdr.bin', record_ids=(1,)),
+        'sensors': {
+            'default': {'waveform': 'constant'},
+            0x51: {'value': 250},
+            0x60: {'states': 0x0104},
+        },
+    })
+
+    # thresholds: lcr 142, lnc 165, unc 245, ucr 254, lnr/unr not readable
+    assert bmc.sensor_reading(0x51) == (250, 0x08)
+    bmc.sensors[0x51][1].value = 140
+    assert bmc.sensor_reading(0x51) == (140, 0x03)
+    bmc.sensors[0x51][1].value = 200
+    assert bmc.sensor_reading(0x51) == (200, 0)
+    # a sensor without a SDR
+    assert bmc.sensor_reading(0x60) == (0, 0x0104)
+
+    context = ConnectionContext(None, None, None, bmc=bmc)
+    req = pyipmi.msgs.create_request_by_name('GetSensorReading')
+    req.sensor_number = 0x51
+    rsp = emulation.handle_ipmi_request_msg(context, req)
+    assert (rsp.completion_code, rsp.sensor_reading, rsp.states1) == \
+        (0, 200, 0)
+
+    req.sensor_number = 0x10
+    rsp = emulation.handle_ipmi_request_msg(context, req)
+    assert rsp.completion_code == pyipmi.msgs.constants.CC_REQ_DATA_NOT_PRESENT
+
+
+def test_sensor_reading_default_range(tmp_path):
+    bmc = EmulatedBmc({'sdr': _sdr_dump(tmp_path / 'sdr.bin')})
+    for t in range(60):
+        (raw, _) = bmc.sensor_reading(0x51, bmc.start + t)
+        # normal minimum and maximum of the SDR
+        assert 166 <= raw <= 244
+
+
+def test_sel():
+    bmc = EmulatedBmc({'sel': {'initial': 3, 'max_entries': 4},
+                       'seed': 1})
+    assert list(bmc.sel) == [1, 2, 3]
+    assert bmc.sel_entry(0) == (bmc.sel[1], 2)
+    assert bmc.sel_entry(0xffff) == (bmc.sel[3], 0xffff)
+
+    record_id = bmc.add_sel_entry(0x01, 0x51, 0x01, (0x07, 0xff, 0xff),
+                                  deassertion=True, timestamp=0x1234)
+    assert record_id == 4
+    entry = pyipmi.sel.SelEntry(bmc.sel[4])
+    assert (entry.record_id, entry.timestamp, entry.sensor_type,
+            entry.sensor_number, entry.event_direction, entry.event_type,
+            entry.event_data) == (4, 0x1234, 0x01, 0x51, 1, 0x01,
+                                  [0x07, 0xff, 0xff])
+    assert bmc.sel_most_recent_addition == 0x1234
+
+    bmc.add_generated_sel_entry()
+    # the oldest entry is dropped
+    assert list(bmc.sel) == [2, 3, 4, 5]
+    try:
+        bmc.sel_entry(1)
+        assert False
+    except KeyError:
+        pass
+
+
+def test_sel_rate():
+    bmc = EmulatedBmc({'sel': {'rate': 2, 'max_entries': 10}})
+    bmc.update_sel(bmc.start + 1.6)
+    assert len(bmc.sel) == 3
+    bmc.update_sel(bmc.start + 1.9)
+    assert len(bmc.sel) == 3
+    # only the entries the SEL can hold are generated
+    bmc.update_sel(bmc.start + 3600)
+    assert list(bmc.sel) == list(range(4, 14))
+
+
+def test_sel_handlers():
+    bmc = EmulatedBmc({'sel': {'initial': 2}})
+    context = ConnectionContext(None, None, None, bmc=bmc)
+
+    req = pyipmi.msgs.create_request_by_name('GetSelInfo')
+    rsp = emulation.handle_ipmi_request_msg(context, req)
+    assert (rsp.entries, rsp.operation_support.reserve_sel) == (2, 1)
+
+    req = pyipmi.msgs.create_request_by_name('ReserveSel')
+    reservation_id = emulation.handle_ipmi_request_msg(
+        context, req).reservation_id
+
+    req = pyipmi.msgs.create_request_by_name('GetSelEntry')
+    (req.record_id, req.offset, req.length) = (0, 0, 0xff)
+    rsp = emulation.handle_ipmi_request_msg(context, req)
+    assert (rsp.next_record_id, bytes(rsp.record_data)) == (2, bmc.sel[1])
+
+    (req.record_id, req.offset, req.length) = (2, 4, 8)
+    rsp = emulation.handle_ipmi_request_msg(context, req)
+    assert rsp.completion_code == pyipmi.msgs.constants.CC_RES_CANCELED
+
+    req.reservation_id = reservation_id
+    rsp = emulation.handle_ipmi_request_msg(context, req)
+    assert (rsp.next_record_id, bytes(rsp.record_data)) == \
+        (0xffff, bmc.sel[2][4:12])
+
+    req.record_id = 3
+    rsp = emulation.handle_ipmi_request_msg(context, req)
+    assert rsp.completion_code == pyipmi.msgs.constants.CC_REQ_DATA_NOT_PRESENT
+
+
+def test_sensor_and_sel(tmp_path):
+    port = _free_port()
+    bmcs = load_farm_config({
+        'template': {
+            'sdr': _sdr_dump(tmp_path / 'sdr.bin', record_ids=(1,)),
+            'sensors': {0x51: {'waveform': 'constant', 'value': 180}},
+            'sel': {'initial': 20},
+        },
+        'count': 1,
+        'port': port,
+    })
+
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    task = loop.create_task(serve_farm(bmcs, started=lambda _: started.set()))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    try:
+        assert started.wait(5)
+
+        ipmi = _connect('127.0.0.1', port)
+        assert ipmi.get_sensor_reading(0x51) == (180, 0)
+        entries = ipmi.get_sel_entries()
+        assert [entry.record_id for entry in entries] == list(range(1, 21))
+        assert all(entry.sensor_number == 0x51 for entry in entries)
+        ipmi.close()
+    finally:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        loop.close()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from pyipmi.errors import IpmiTimeoutError, IpmiConnectionError
+from pyipmi.fleet import Host, poll, sel_tail
+
+
+def _connect(host):
+    if host.host == 'unreachable':
+        raise IpmiConnectionError('unreachable')
+    ipmi = MagicMock()
+    ipmi.host = host.host
+    return ipmi
+
+
+def test_poll_streams_all_results():
+    hosts = [Host('10.0.0.%d' % i) for i in range(20)]
+    ops = [('name', lambda ipmi: ipmi.host), ('answer', lambda ipmi: 42)]
+
+    results = list(poll(hosts, ops, max_workers=4, connect=_connect))
+
+    assert len(results) == 40
+    assert all(r.ok for r in results)
+    assert sorted(r.value for r in results if r.operation == 'name') == \
+        sorted(h.host for h in hosts)
+
+
+def test_poll_connection_error():
+    hosts = [Host('unreachable'), Host('10.0.0.1')]
+    ops = [('answer', lambda ipmi: 42)]
+
+    results = {r.host.host: r for r in poll(hosts, ops, connect=_connect)}
+
+    assert isinstance(results['unreachable'].error, IpmiConnectionError)
+    assert results['10.0.0.1'].value == 42
+
+
+def test_poll_operation_error_does_not_stop_host():
+    def fail(ipmi):
+        raise RuntimeError('failed')
+
+    ops = [('fail', fail), ('answer', lambda ipmi: 42)]
+    results = list(poll([Host('10.0.0.1')], ops, connect=_connect))
+
+    assert not results[0].ok
+    assert results[1].value == 42
+
+
+def test_poll_deadline_exceeded():
+    host = Host('10.0.0.1', deadline=time.monotonic() - 1)
+    results = list(poll([host], [('answer', lambda ipmi: 42)],
+                        connect=_connect))
+
+    assert isinstance(results[0].error, IpmiTimeoutError)
+
+
+def test_poll_min_interval():
+    host = Host('10.0.0.1', min_interval=0.05)
+    ops = [('a', lambda ipmi: time.monotonic()),
+           ('b', lambda ipmi: time.monotonic())]
+
+    results = list(poll([host], ops, connect=_connect))
+
+    assert results[1].value - results[0].value >= 0.05
+
+
+def test_poll_close_stops_workers():
+    started = []
+    closed = []
+
+    def connect(host):
+        ipmi = _connect(host)
+        ipmi.close.side_effect = lambda: closed.append(host.host)
+        return ipmi
+
+    def slow(ipmi):
+        started.append(ipmi.host)
+        time.sleep(0.01)
+        return ipmi.host
+
+    hosts = [Host('10.0.0.%d' % i) for i in range(20)]
+    threads = threading.active_count()
+    results = poll(hosts, [('a', slow), ('b', slow)], max_workers=4,
+                   connect=connect)
+    next(results)
+    results.close()
+
+    # the workers have finished and closed their connections
+    assert threading.active_count() == threads
+    assert len(started) < 40
+    assert sorted(closed) == sorted(set(started))
+    count = len(started)
+    time.sleep(0.05)
+    assert len(started) == count
+
+
+def test_poll_sdr_cache():
+    cache = object()
+    results = list(poll([Host('10.0.0.1')],
+                        [('cache', lambda ipmi: ipmi.sdr_cache)],
+                        connect=_connect, sdr_cache=cache))
+    assert results[0].value is cache
+
+
+def test_sel_tail():
+    ipmi = MagicMock()
+    ipmi.get_sel_tail.return_value = ['entry']
+    assert sel_tail(ipmi, 5) == ['entry']
+    ipmi.get_sel_tail.assert_called_once_with(5)
@@ -3,7 +3,12 @@
 import os
 import pytest
 
-from pyipmi.errors import (DecodingError)
+from pyipmi import interfaces, create_connection
+from pyipmi.errors import DecodingError
+from pyipmi.msgs.constants import (CC_CANT_RET_NUM_REQ_BYTES,
+                                   CMDID_GET_FRU_INVENTORY_AREA_INFO,
+                                   CMDID_READ_FRU_DATA)
+from pyipmi.msgs.registry import create_response_message
 
 from pyipmi.fru import (FruData, FruInventory,
                         FruPicmgPowerModuleCapabilityRecord,
@@ -106,3 +111,78 @@ def test_FruInventory_ignore_checksum_error():
 
     assert inv.board_info_area.manufacturer.string == 'ASRockRack'
     assert inv.product_info_area.manufacturer.string == 'ASRockRack'
+
+
+class FakeFruDevice(object):
+    def __init__(self, filename, max_length, max_count=None):
+        with open(os.path.join(this_file_path, filename), 'rb') as f:
+            self.data = f.read()
+        self.max_length = max_length
+        # some BMCs silently return less than the requested count
+        self.max_count = max_count or max_length
+        self.reads = []
+
+    def send_message(self, req):
+        rsp = create_response_message(req)
+        if req.cmdid == CMDID_GET_FRU_INVENTORY_AREA_INFO:
+            rsp.area_size = len(self.data)
+        elif req.cmdid == CMDID_READ_FRU_DATA:
+            if req.count > self.max_length:
+                rsp.completion_code = CC_CANT_RET_NUM_REQ_BYTES
+                return rsp
+            self.reads.append((req.offset, req.count))
+            rsp.data = self.data[req.offset:
+                                 req.offset + min(req.count, self.max_count)]
+            rsp.count = len(rsp.data)
+        return rsp
+
+
+class TestFruReader:
+
+    def setup_method(self):
+        self.device = FakeFruDevice('fru_bin/vadatech_utc017.bin', 32)
+        self.ipmi = create_connection(interfaces.create_interface('mock'))
+        self.ipmi.send_message = self.device.send_message
+
+    def test_get_fru_inventory(self):
+        fru = self.ipmi.get_fru_inventory()
+
+        expected = get_fru_inventory_from_file(
+                os.path.join(this_file_path, 'fru_bin/vadatech_utc017.bin'))
+        assert fru.board_info_area.serial_number.string == \
+            expected.board_info_area.serial_number.string
+        assert fru.product_info_area.name.string == \
+            expected.product_info_area.name.string
+        record = fru.multirecord_area.records[0]
+        assert record.maximum_current_output == 42.0
+
+        # each byte is read only once
+        offsets = [offset for (offset, _) in self.device.reads]
+        assert len(offsets) == len(set(offsets))
+        assert all(count <= 32 for (_, count) in self.device.reads)
+
+    def test_read_length_remembered(self):
+        self.ipmi.read_fru_data(offset=0, count=64)
+        self.device.reads = []
+        self.ipmi.read_fru_data(offset=0, count=64)
+        assert self.device.reads == [(0, 32), (32, 32)]
+
+    def test_read_length_short_response(self):
+        self.device.max_count = 16
+        data = self.ipmi.read_fru_data(offset=0, count=64)
+        assert data == self.device.data[:64]
+        assert self.ipmi._fru_read_length.good == 16
+
+        # the requests converge to the returned count
+        for _ in range(4):
+            self.ipmi.read_fru_data(offset=0, count=64)
+        self.device.reads = []
+        self.ipmi.read_fru_data(offset=0, count=64)
+        assert self.device.reads == [(0, 16), (16, 16), (32, 16), (48, 16)]
+
+    def test_get_fru_board_area(self):
+        area = self.ipmi.get_fru_board_area()
+        expected = get_fru_inventory_from_file(
+                os.path.join(this_file_path, 'fru_bin/vadatech_utc017.bin'))
+        assert area.manufacturer.string == \
+            expected.board_info_area.manufacturer.string
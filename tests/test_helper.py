@@ -3,7 +3,16 @@
 
 from unittest.mock import MagicMock, call
 
-from pyipmi.helper import clear_repository_helper
+import pytest
+
+from pyipmi.errors import CompletionCodeError
+from pyipmi.helper import (clear_repository_helper, get_sdr_data_helper,
+                           iter_reads, message_with_name, run_reads,
+                           SdrReadLength)
+from pyipmi.msgs.constants import (CC_CANT_RET_NUM_REQ_BYTES,
+                                   CC_PARAM_OUT_OF_RANGE,
+                                   CC_REQ_DATA_FIELD_EXCEED)
+from pyipmi.msgs.registry import create_response_message
 from pyipmi.msgs.constants import (REPOSITORY_ERASURE_COMPLETED,
                                    REPOSITORY_ERASURE_IN_PROGRESS,
                                    REPOSITORY_INITIATE_ERASE,
@@ -30,3 +39,94 @@ def test_clear_repository_helper():
     ]
     clear_fn.assert_has_calls(clear_calls)
     assert clear_fn.call_count == 3
+
+
+class FakeSdrDevice(object):
+    def __init__(self, records, max_length, entire_record=False,
+                 over_read=True, over_read_cc=CC_CANT_RET_NUM_REQ_BYTES):
+        self.records = records
+        self.max_length = max_length
+        self.entire_record = entire_record
+        self.over_read = over_read
+        self.over_read_cc = over_read_cc
+        self.lengths = []
+
+    def get(self, reservation_id, record_id, offset, length):
+        self.lengths.append(length)
+        data = self.records[record_id]
+        if length == 0xff and self.entire_record:
+            return (0xffff, data)
+        if length > self.max_length:
+            raise CompletionCodeError(CC_CANT_RET_NUM_REQ_BYTES)
+        if offset + length > len(data) and not self.over_read:
+            raise CompletionCodeError(self.over_read_cc)
+        return (0xffff, data[offset:offset + length])
+
+
+def _sdr_record(record_id, length):
+    return bytes([record_id, 0, 0x51, 1, length]) + bytes(range(length))
+
+
+def test_get_sdr_data_helper_entire_record():
+    device = FakeSdrDevice({1: _sdr_record(1, 60)}, 16, entire_record=True)
+    (next_id, data) = get_sdr_data_helper(None, device.get, 1, 0)
+    assert next_id == 0xffff
+    assert bytes(data[:]) == _sdr_record(1, 60)
+    assert device.lengths == [0xff]
+
+
+def test_get_sdr_data_helper_negotiates_length():
+    records = {i: _sdr_record(i, 60) for i in range(1, 5)}
+    device = FakeSdrDevice(records, 24)
+    read_length = SdrReadLength()
+
+    for record_id in (1, 2, 3):
+        (_, data) = get_sdr_data_helper(None, device.get, record_id, 0,
+                                        read_length)
+        assert bytes(data[:]) == records[record_id]
+    assert read_length.length == 24
+
+    # the header is read with the body using the remembered length
+    device.lengths = []
+    (_, data) = get_sdr_data_helper(None, device.get, 4, 0, read_length)
+    assert bytes(data[:]) == records[4]
+    assert device.lengths == [24, 24, 17]
+
+
+@pytest.mark.parametrize('cc', [CC_CANT_RET_NUM_REQ_BYTES,
+                                CC_REQ_DATA_FIELD_EXCEED,
+                                CC_PARAM_OUT_OF_RANGE])
+def test_get_sdr_data_helper_no_over_read(cc):
+    records = {1: _sdr_record(1, 60), 2: _sdr_record(2, 10),
+               3: _sdr_record(3, 10)}
+    device = FakeSdrDevice(records, 24, over_read=False, over_read_cc=cc)
+    read_length = SdrReadLength()
+
+    for record_id in (1, 2, 3):
+        (_, data) = get_sdr_data_helper(None, device.get, record_id, 0,
+                                        read_length)
+        assert bytes(data[:]) == records[record_id]
+
+    assert read_length.with_header is False
+    assert device.lengths[-2:] == [5, 10]
+
+
+def test_run_and_iter_reads():
+    def info_reads():
+        rsp = yield from message_with_name('GetSelInfo')
+        return rsp.entries
+
+    def entry_reads():
+        yield (yield from info_reads())
+        yield (yield from info_reads())
+
+    def send(req):
+        rsp = create_response_message(req)
+        rsp.entries = len(sent)
+        sent.append(req.cmdid)
+        return rsp
+
+    sent = []
+    assert run_reads(send, info_reads()) == 0
+    assert list(iter_reads(send, entry_reads())) == [1, 2]
+    assert sent == [0x40] * 3
@@ -3,6 +3,10 @@
 
 import os
 
+import pytest
+
+import pyipmi
+from pyipmi.errors import HpmError, IpmiTimeoutError, RetryError
 from pyipmi.hpm import (ComponentProperty, ComponentPropertyDescriptionString,
                         ComponentPropertyGeneral,
                         ComponentPropertyCurrentVersion,
@@ -14,7 +18,9 @@ from pyipmi.hpm import (ComponentProperty, ComponentPropertyDescriptionString,
                         UpgradeActionRecordUploadForCompare, UpgradeImage,
                         PROPERTY_GENERAL_PROPERTIES, PROPERTY_CURRENT_VERSION,
                         PROPERTY_DESCRIPTION_STRING, PROPERTY_ROLLBACK_VERSION,
-                        PROPERTY_DEFERRED_VERSION)
+                        PROPERTY_DEFERRED_VERSION,
+                        CC_LONG_DURATION_CMD_IN_PROGRESS)
+from pyipmi.msgs import constants, create_response_by_name
 
 
 class TestComponentProperty:
@@ -92,3 +98,182 @@ def test_upgrade_image():
     image = UpgradeImage(hpm_file)
     assert isinstance(image.actions[0], UpgradeActionRecordPrepare)
     assert isinstance(image.actions[1], UpgradeActionRecordUploadForUpgrade)
+
+
+class UploadTarget(object):
+    """Interface with a target receiving firmware blocks."""
+
+    max_request_data_length = 38
+
+    def __init__(self, max_block=None, busy=(), in_progress=(), drop=()):
+        self.max_block = max_block
+        # the blocks rejected when pipelined, or in progress
+        self.busy = set(busy)
+        self.in_progress = set(in_progress)
+        # the blocks whose request is lost once
+        self.drop = set(drop)
+        self.data = bytearray()
+        self.blocks = []
+        self.windows = []
+
+    def _receive(self, req, pipelined):
+        rsp = create_response_by_name('UploadFirmwareBlock')
+        data = bytes(req.data)
+        if self.max_block is not None and len(data) > self.max_block:
+            rsp.completion_code = constants.CC_REQ_DATA_FIELD_EXCEED
+            return rsp
+        if pipelined and len(self.blocks) in self.busy:
+            self.busy.discard(len(self.blocks))
+            rsp.completion_code = constants.CC_NODE_BUSY
+            return rsp
+        if req.number != len(self.blocks) & 0xff:
+            # the blocks after a rejected one
+            rsp.completion_code = constants.CC_PARAM_OUT_OF_RANGE
+            return rsp
+        if len(self.blocks) in self.in_progress:
+            rsp.completion_code = CC_LONG_DURATION_CMD_IN_PROGRESS
+        self.blocks.append((req.number, len(data)))
+        self.data.extend(data)
+        return rsp
+
+    def send_and_receive(self, req):
+        self.windows.append(1)
+        return self._receive(req, False)
+
+    def send_and_receive_many(self, reqs):
+        self.windows.append(len(reqs))
+        rsps = []
+        lost = False
+        for req in reqs:
+            if len(self.blocks) in self.drop and not lost:
+                self.drop.discard(len(self.blocks))
+                lost = True
+                rsps.append(None)
+                continue
+            rsp = self._receive(req, True)
+            rsps.append(rsp)
+        if lost:
+            error = RetryError()
+            error.responses = rsps
+            raise error
+        return rsps
+
+
+class SingleUploadTarget(UploadTarget):
+    """Upload target of an interface without pipelining."""
+
+    def __getattribute__(self, name):
+        if name == 'send_and_receive_many':
+            raise AttributeError(name)
+        return object.__getattribute__(self, name)
+
+    def send_and_receive(self, req):
+        if len(self.blocks) in self.drop:
+            self.drop.discard(len(self.blocks))
+            raise IpmiTimeoutError()
+        return UploadTarget.send_and_receive(self, req)
+
+
+def _upload(interface, binary, target=None, **kwargs):
+    ipmi = pyipmi.create_connection(interface)
+    ipmi.target = target or pyipmi.Target(0x20)
+    ipmi.wait_for_long_duration_command = lambda *args: None
+    ipmi.upload_binary(binary, **kwargs)
+    return ipmi
+
+
+BINARY = bytes(range(256)) * 4
+
+
+class TestUploadBinary:
+    def test_block_size(self):
+        ipmi = pyipmi.create_connection(UploadTarget())
+        ipmi.target = pyipmi.Target(0x20)
+        assert ipmi._determine_max_block_size() == 36
+
+        ipmi.target = pyipmi.Target(0x82, routing=[(0x81, 0x20, 0),
+                                                   (0x20, 0x82, None)])
+        assert ipmi._determine_max_block_size() == 23
+
+        # IPMB if the interface does not tell
+        ipmi = pyipmi.create_connection(pyipmi.interfaces.create_interface(
+            'mock'))
+        ipmi.target = pyipmi.Target(0x20)
+        assert ipmi._determine_max_block_size() == 23
+
+    def test_upload(self):
+        target = UploadTarget()
+        progress = []
+        _upload(target, BINARY, progress=lambda p: progress.append(
+            (p.bytes_sent, p.blocks_sent)))
+
+        assert bytes(target.data) == BINARY
+        assert [number for (number, _) in target.blocks] == \
+            [i & 0xff for i in range(29)]
+        assert target.blocks[0][1] == 36
+        assert progress[-1] == (1024, 29)
+        assert len(progress) == 29
+
+    def test_rejected_block_length(self):
+        target = UploadTarget(max_block=20)
+        _upload(target, BINARY)
+
+        assert bytes(target.data) == BINARY
+        assert max(length for (_, length) in target.blocks) == 20
+        # the rejected blocks are sent again with the same number
+        assert [number for (number, _) in target.blocks] == \
+            list(range(len(target.blocks)))
+
+    def test_window(self):
+        target = UploadTarget()
+        status = []
+        _upload(target, BINARY, window=8, progress=status.append)
+
+        assert bytes(target.data) == BINARY
+        assert target.windows == [8, 8, 8, 5]
+        assert len(status) == 4
+        assert status[-1].percent == 100.0
+        assert status[-1].blocks_sent == 29
+
+    def test_window_not_tolerated(self):
+        target = UploadTarget(busy=[3])
+        _upload(target, BINARY, window=8)
+
+        assert bytes(target.data) == BINARY
+        assert target.windows[:2] == [8, 1]
+        assert set(target.windows[1:]) == {1}
+
+    @pytest.mark.parametrize('target_class',
+                             [UploadTarget, SingleUploadTarget])
+    def test_lost_block_in_window(self, target_class):
+        target = target_class(drop=[10])
+        _upload(target, BINARY, window=8)
+
+        assert bytes(target.data) == BINARY
+        # the blocks confirmed before the lost one are not sent again
+        assert [number for (number, _) in target.blocks] == list(range(29))
+
+    def test_long_duration(self):
+        target = UploadTarget(in_progress=[2, 5])
+        waits = []
+        ipmi = pyipmi.create_connection(target)
+        ipmi.target = pyipmi.Target(0x20)
+        ipmi.wait_for_long_duration_command = \
+            lambda *args: waits.append(len(target.blocks))
+        ipmi.upload_binary(BINARY, window=4)
+
+        assert bytes(target.data) == BINARY
+        # after the window with the block
+        assert waits == [4, 8]
+
+    def test_error(self):
+        class Failing(UploadTarget):
+            def send_and_receive(self, req):
+                rsp = create_response_by_name('UploadFirmwareBlock')
+                rsp.completion_code = constants.CC_INV_CMD
+                return rsp
+
+        with pytest.raises(HpmError):
+            _upload(Failing(), BINARY)
+        with pytest.raises(HpmError):
+            _upload(UploadTarget(), BINARY, block_size=0)
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
+import pyipmi
 from pyipmi import (Ipmi, interfaces, create_connection, NullRequester, Routing,
                     Session, Target)
 from pyipmi.errors import CompletionCodeError, RetryError
@@ -189,3 +190,53 @@ def test_ipmi_send_message_with_name_and_kwargs():
     assert isinstance(req, GetSensorReadingReq)
     assert req.sensor_number == 5
     assert req.lun == 2
+
+
+def test_ipmi_send_messages():
+    reqs = [GetDeviceIdReq(), GetDeviceIdReq()]
+    rsps = [GetDeviceIdRsp(), GetDeviceIdRsp()]
+
+    interface = interfaces.create_interface('mock')
+    interface.send_and_receive = MagicMock(side_effect=rsps)
+    ipmi = create_connection(interface)
+    ipmi.target = None
+    assert ipmi.send_messages(reqs) == rsps
+    assert interface.send_and_receive.call_count == 2
+
+
+def test_ipmi_send_messages_pipelined():
+    reqs = [GetDeviceIdReq(), GetDeviceIdReq()]
+    rsps = [GetDeviceIdRsp(), GetDeviceIdRsp()]
+
+    interface = interfaces.create_interface('mock')
+    interface.send_and_receive_many = MagicMock(return_value=rsps)
+    ipmi = create_connection(interface)
+    ipmi.target = Target(0x20)
+    assert ipmi.send_messages(reqs) == rsps
+    interface.send_and_receive_many.assert_called_once_with(reqs)
+    assert reqs[0].target is ipmi.target
+
+
+# names which a plain 'import pyipmi' provided before the subsystems were
+# imported lazily
+BASELINE_NAMES = (
+    'bmc', 'chassis', 'constants', 'dcmi', 'event', 'fields', 'fru',
+    'helper', 'hpm', 'lan', 'messaging', 'msgs', 'picmg', 'sdr', 'sel',
+    'sensor', 'state', 'Ipmi', 'Session', 'Target', 'Routing', 'Requester',
+    'NullRequester', 'create_connection', 'is_string', 'CompletionCodeError',
+    'IpmiTimeoutError', 'RetryError', 'Message', 'create_request_by_name',
+    'check_rsp_completion_code',
+)
+
+
+@pytest.mark.parametrize('name', BASELINE_NAMES)
+def test_top_level_names(name):
+    assert hasattr(pyipmi, name)
+    assert name in dir(pyipmi)
+
+
+def test_top_level_errors():
+    from pyipmi.errors import CompletionCodeError
+    assert pyipmi.CompletionCodeError is CompletionCodeError
+    with pytest.raises(AttributeError):
+        pyipmi.does_not_exist
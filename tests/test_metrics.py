@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+
+from unittest.mock import MagicMock
+
+import pyipmi
+from pyipmi.logger import HexDump
+from pyipmi.metrics import Histogram, Metrics
+from pyipmi.msgs import constants
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float('inf'), 4)]
+    assert histogram.to_dict() == {
+        'buckets': {'0.1': 2, '1.0': 3, '+Inf': 4},
+        'count': 4,
+        'sum': 2.65,
+    }
+
+
+def test_metrics_to_dict():
+    metrics = Metrics(buckets=(0.01, 0.1))
+    metrics.observe(0x06, 0x01, 0.005, 7, 23, 0)
+    metrics.observe(0x07, 0x01, 0.05, 7, 8, 0xc3)
+    metrics.count_retry(0x06, 0x01)
+    metrics.count_timeout(0x06, 0x01, 2)
+
+    assert metrics.to_dict() == {
+        '0x06:0x01': {
+            'latency': {'buckets': {'0.01': 1, '0.1': 2, '+Inf': 2},
+                        'count': 2, 'sum': 0.055},
+            'retries': 1,
+            'timeouts': 2,
+            'completion_codes': {0: 1, 0xc3: 1},
+            'tx_bytes': 14,
+            'rx_bytes': 31,
+        }
+    }
+
+    metrics.reset()
+    assert metrics.to_dict() == {}
+
+
+def test_metrics_to_prometheus():
+    metrics = Metrics(buckets=(0.01,))
+    metrics.observe(0x04, 0x2d, 0.002, 8, 11, 0)
+    metrics.count_timeout(0x04, 0x2d)
+
+    lines = metrics.to_prometheus().splitlines()
+    assert '# TYPE pyipmi_request_duration_seconds histogram' in lines
+    assert 'pyipmi_request_duration_seconds_bucket' \
+        '{netfn="0x04",cmd="0x2d",le="0.01"} 1' in lines
+    assert 'pyipmi_request_duration_seconds_bucket' \
+        '{netfn="0x04",cmd="0x2d",le="+Inf"} 1' in lines
+    assert 'pyipmi_request_duration_seconds_count' \
+        '{netfn="0x04",cmd="0x2d"} 1' in lines
+    assert 'pyipmi_timeouts_total{netfn="0x04",cmd="0x2d"} 1' in lines
+    assert 'pyipmi_tx_bytes_total{netfn="0x04",cmd="0x2d"} 8' in lines
+    assert 'pyipmi_responses_total' \
+        '{netfn="0x04",cmd="0x2d",cc="0x00"} 1' in lines
+
+
+def test_metrics_thread_safe():
+    metrics = Metrics()
+
+    def observe():
+        for _ in range(1000):
+            metrics.observe(0x06, 0x01, 0.001, 1, 1, 0)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.to_dict()['0x06:0x01']['latency']['count'] == 4000
+
+
+def test_enable_metrics():
+    interface = MagicMock()
+    ipmi = pyipmi.create_connection(interface)
+    assert ipmi.metrics is None
+
+    metrics = ipmi.enable_metrics()
+    assert isinstance(metrics, Metrics)
+    assert interface.metrics is metrics
+
+    ipmi.disable_metrics()
+    assert ipmi.metrics is None
+    assert interface.metrics is None
+
+
+def test_send_message_counts_retries():
+    interface = MagicMock()
+    interface.send_and_receive.side_effect = [
+        pyipmi.errors.CompletionCodeError(constants.CC_NODE_BUSY),
+        MagicMock()]
+    ipmi = pyipmi.create_connection(interface)
+    metrics = ipmi.enable_metrics()
+
+    req = pyipmi.msgs.create_request_by_name('GetDeviceId')
+    ipmi.target = pyipmi.Target(0x20)
+    ipmi.send_message(req)
+
+    assert metrics.to_dict()['0x06:0x01']['retries'] == 1
+
+
+def test_hexdump_is_lazy(caplog):
+    class Data(object):
+        converted = 0
+
+        def __bytes__(self):
+            self.converted += 1
+            return b'\x01'
+
+    data = Data()
+    with caplog.at_level(logging.INFO, logger='pyipmi'):
+        pyipmi.logger.log().debug('IPMI TX: %s', HexDump(data))
+    assert data.converted == 0
+
+    assert str(HexDump(b'\x01\xab')) == '01 ab'
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from pyipmi import Target
+from pyipmi.errors import IpmiConnectionError, IpmiTimeoutError
+from pyipmi.fleet import Host, poll
+from pyipmi.pool import SessionPool
+
+
+class InterfaceFactory(object):
+    def __init__(self):
+        self.interfaces = []
+
+    def __call__(self):
+        interface = MagicMock()
+        interface.is_session_alive.return_value = True
+        self.interfaces.append(interface)
+        return interface
+
+
+def _pool(**kwargs):
+    factory = InterfaceFactory()
+    kwargs.setdefault('idle_timeout', None)
+    return (SessionPool(interface_factory=factory, **kwargs), factory)
+
+
+def test_reuse_session():
+    (pool, factory) = _pool()
+
+    ipmi = pool.acquire('10.0.0.1', username='admin', password='secret')
+    assert ipmi.session.rmcp_host == '10.0.0.1'
+    assert ipmi.session.auth_username == 'admin'
+    assert ipmi.target.ipmb_address == 0x20
+    pool.release(ipmi)
+
+    again = pool.acquire('10.0.0.1', username='admin', password='secret',
+                         target=Target(0x82))
+    assert again is ipmi
+    assert again.target.ipmb_address == 0x82
+    pool.release(again)
+
+    assert len(factory.interfaces) == 1
+    factory.interfaces[0].establish_session.assert_called_once()
+    assert pool.stats() == {'idle': 1, 'in_use': 0, 'open': 1}
+
+
+def test_key():
+    (pool, factory) = _pool(max_sessions_per_host=4)
+
+    for (host, port, username, priv_level) in (
+            ('10.0.0.1', 623, 'admin', 'administrator'),
+            ('10.0.0.2', 623, 'admin', 'administrator'),
+            ('10.0.0.1', 624, 'admin', 'administrator'),
+            ('10.0.0.1', 623, 'user', 'administrator'),
+            ('10.0.0.1', 623, 'admin', 'user')):
+        pool.release(pool.acquire(host, port, username, 'secret',
+                                  priv_level))
+
+    assert len(factory.interfaces) == 5
+
+
+def test_password_mismatch_is_not_reused():
+    (pool, factory) = _pool()
+
+    ipmi = pool.acquire('10.0.0.1', username='admin', password='secret')
+    pool.release(ipmi)
+    other = pool.acquire('10.0.0.1', username='admin', password='wrong')
+
+    assert other is not ipmi
+    factory.interfaces[0].close_session.assert_called_once()
+    assert pool.stats()['open'] == 1
+
+
+def test_dead_session_is_not_reused():
+    (pool, factory) = _pool()
+
+    ipmi = pool.acquire('10.0.0.1')
+    pool.release(ipmi)
+    factory.interfaces[0].is_session_alive.return_value = False
+
+    assert pool.acquire('10.0.0.1') is not ipmi
+    factory.interfaces[0].close_session.assert_called_once()
+
+
+def test_max_sessions_per_host():
+    (pool, factory) = _pool(max_sessions_per_host=1)
+
+    ipmi = pool.acquire('10.0.0.1')
+    with pytest.raises(IpmiTimeoutError):
+        pool.acquire('10.0.0.1', timeout=0.01)
+
+    # other BMCs are not affected
+    pool.release(pool.acquire('10.0.0.2', timeout=0.01))
+
+    timer = threading.Timer(0.05, pool.release, (ipmi,))
+    timer.start()
+    assert pool.acquire('10.0.0.1', timeout=5) is ipmi
+    timer.join()
+
+
+def test_idle_session_of_other_user_is_evicted():
+    (pool, factory) = _pool(max_sessions_per_host=1)
+
+    pool.release(pool.acquire('10.0.0.1', username='admin'))
+    ipmi = pool.acquire('10.0.0.1', username='user', timeout=0)
+
+    assert ipmi.session.auth_username == 'user'
+    factory.interfaces[0].close_session.assert_called_once()
+    assert pool.stats()['open'] == 1
+
+
+def test_connect_error_frees_slot():
+    factory = InterfaceFactory()
+    pool = SessionPool(max_sessions_per_host=1, idle_timeout=None,
+                       interface_factory=factory)
+    failing = MagicMock()
+    failing.establish_session.side_effect = IpmiConnectionError('down')
+    pool.interface_factory = lambda: failing
+
+    with pytest.raises(IpmiConnectionError):
+        pool.acquire('10.0.0.1')
+
+    pool.interface_factory = factory
+    pool.release(pool.acquire('10.0.0.1', timeout=0))
+
+
+def test_evict_idle():
+    (pool, factory) = _pool(max_sessions_per_host=2)
+    pool.idle_timeout = 0.01
+
+    first = pool.acquire('10.0.0.1')
+    second = pool.acquire('10.0.0.1')
+    pool.release(first)
+    time.sleep(0.02)
+    pool.release(second)
+    pool.evict_idle()
+
+    factory.interfaces[0].close_session.assert_called_once()
+    factory.interfaces[1].close_session.assert_not_called()
+    assert pool.stats() == {'idle': 1, 'in_use': 0, 'open': 1}
+
+
+def test_connection_discards_on_error():
+    (pool, factory) = _pool()
+
+    with pytest.raises(RuntimeError):
+        with pool.connection('10.0.0.1'):
+            raise RuntimeError()
+
+    factory.interfaces[0].close_session.assert_called_once()
+    assert pool.stats() == {'idle': 0, 'in_use': 0, 'open': 0}
+
+
+def test_close():
+    (pool, factory) = _pool()
+
+    pool.release(pool.acquire('10.0.0.1'))
+    ipmi = pool.acquire('10.0.0.2')
+    pool.close()
+
+    factory.interfaces[0].close_session.assert_called_once()
+    factory.interfaces[1].close_session.assert_not_called()
+    pool.release(ipmi)
+    factory.interfaces[1].close_session.assert_called_once()
+    with pytest.raises(RuntimeError):
+        pool.acquire('10.0.0.1')
+
+
+def test_fleet_poll_with_pool():
+    (pool, factory) = _pool()
+    hosts = [Host('10.0.0.1', username='admin', password='secret')]
+
+    for _ in range(3):
+        results = list(poll(hosts, [('answer', lambda ipmi: 42)],
+                            pool=pool))
+        assert results[0].value == 42
+
+    assert len(factory.interfaces) == 1
+    assert pool.stats() == {'idle': 1, 'in_use': 0, 'open': 1}
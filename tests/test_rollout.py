@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+
+import pytest
+
+from pyipmi.errors import CompletionCodeError, HpmError, IpmiTimeoutError
+from pyipmi.fleet import Host
+from pyipmi.hpm import CC_LONG_DURATION_CMD_IN_PROGRESS, UpgradeImage
+from pyipmi.rollout import Rollout, STAGE_DONE, STAGE_FAILED
+
+IMAGE = UpgradeImage(os.path.join(os.path.dirname(__file__),
+                                  'hpm_bin/firmware.hpm'))
+
+
+class Status(object):
+    def __init__(self, cc):
+        self.last_completion_code = cc
+
+
+class FakeTarget(object):
+    """The HPM commands of a target, used as `Ipmi` connection."""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, long_duration=0, fail_upload=False, down=0):
+        self.calls = []
+        self.uploaded = None
+        # number of status polls with the command in progress
+        self.long_duration = long_duration
+        self.fail_upload = fail_upload
+        # number of failing polls after the activation
+        self.down = down
+
+    def abort_firmware_upgrade(self):
+        with self.lock:
+            FakeTarget.active += 1
+            FakeTarget.max_active = max(FakeTarget.max_active,
+                                        FakeTarget.active)
+        self.calls.append('abort')
+
+    def preparation_stage(self, image):
+        self.calls.append('prepare')
+
+    def initiate_upgrade_action(self, components, action):
+        self.calls.append('initiate %d' % action)
+        if self.long_duration:
+            raise CompletionCodeError(CC_LONG_DURATION_CMD_IN_PROGRESS)
+
+    def get_upgrade_status(self):
+        self.calls.append('status')
+        if self.long_duration:
+            self.long_duration -= 1
+            return Status(CC_LONG_DURATION_CMD_IN_PROGRESS)
+        return Status(0)
+
+    def upload_binary(self, binary, window=1, progress=None):
+        self.calls.append('upload')
+        if self.fail_upload:
+            raise IpmiTimeoutError()
+        self.uploaded = binary
+
+    def finish_firmware_upload(self, component, length):
+        self.calls.append('finish')
+
+    def activate_firmware(self):
+        self.calls.append('activate')
+
+    def get_device_id(self):
+        self.calls.append('device_id')
+        if self.down:
+            self.down -= 1
+            raise IpmiTimeoutError()
+        with self.lock:
+            FakeTarget.active -= 1
+
+    def close(self):
+        pass
+
+
+def _rollout(targets, **kwargs):
+    hosts = [Host(name) for name in targets]
+    kwargs.setdefault('interval', 0.001)
+    kwargs.setdefault('settle_time', 0)
+    return Rollout(IMAGE, hosts, 1, connect=lambda host: targets[host.host],
+                   **kwargs)
+
+
+INSTALL = ['abort', 'prepare', 'initiate 1', 'initiate 2', 'upload',
+           'finish', 'activate', 'device_id']
+
+
+def test_rollout():
+    targets = dict(('10.0.0.%d' % i, FakeTarget()) for i in range(20))
+    (FakeTarget.active, FakeTarget.max_active) = (0, 0)
+
+    report = _rollout(targets, max_parallel=4).run()
+
+    assert report.ok
+    assert len(report.done) == 20
+    for target in targets.values():
+        assert target.calls == INSTALL
+        # the image data is shared
+        assert target.uploaded is IMAGE.actions[1].firmware_image_data
+    assert FakeTarget.max_active <= 4
+
+
+def test_polling_does_not_block_other_targets():
+    targets = {'slow': FakeTarget(long_duration=20), 'fast': FakeTarget()}
+    finished = []
+
+    def on_change(target):
+        if target.stage == STAGE_DONE:
+            finished.append(target.host.host)
+
+    report = _rollout(targets, max_parallel=2, max_workers=1,
+                      interval=0.01, on_change=on_change).run()
+
+    assert report.ok
+    assert finished == ['fast', 'slow']
+    assert targets['slow'].calls.count('status') == 21
+
+
+def test_wait_for_target_to_come_up():
+    targets = {'a': FakeTarget(down=3)}
+    report = _rollout(targets).run()
+
+    assert report.ok
+    assert targets['a'].calls[-4:] == ['device_id'] * 4
+
+    targets = {'a': FakeTarget(down=1000)}
+    report = _rollout(targets, activation_timeout=0.05).run()
+
+    (target,) = report.failed
+    assert target.failed_stage == 'wait'
+    assert isinstance(target.error, IpmiTimeoutError)
+
+
+def test_command_timeout():
+    targets = {'a': FakeTarget(long_duration=1000)}
+    report = _rollout(targets, command_timeout=0.05).run()
+
+    (target,) = report.failed
+    assert target.failed_stage == 'action'
+    assert 'not completed' in str(report)
+
+
+def test_resume():
+    targets = {'a': FakeTarget(), 'b': FakeTarget(fail_upload=True)}
+    rollout = _rollout(targets)
+    report = rollout.run()
+
+    assert [t.host.host for t in report.done] == ['a']
+    (failed,) = report.failed
+    assert (failed.stage, failed.failed_stage) == (STAGE_FAILED, 'upload')
+
+    state = json.loads(json.dumps(rollout.to_dict()))
+    assert state['targets']['b:623/0x20']['stage'] == STAGE_FAILED
+
+    targets['a'].calls = []
+    targets['b'].fail_upload = False
+    targets['b'].calls = []
+    report = _rollout(targets, state=state).run()
+
+    assert report.ok
+    assert targets['a'].calls == []
+    assert targets['b'].calls == INSTALL
+
+
+def test_resume_activation():
+    targets = {'a': FakeTarget()}
+    state = {'component': 1,
+             'targets': {'a:623/0x20': {'stage': 'activate', 'action': 2}}}
+    report = _rollout(targets, state=state).run()
+
+    assert report.ok
+    assert targets['a'].calls == ['activate', 'device_id']
+
+    with pytest.raises(HpmError):
+        _rollout(targets, state={'component': 2})
+
+
+def test_component_not_in_image():
+    with pytest.raises(HpmError):
+        Rollout(IMAGE, [Host('a')], 3)
+
+
+def test_stop():
+    targets = {'a': FakeTarget(long_duration=1000)}
+    rollout = _rollout(targets, interval=0.01)
+    timer = threading.Timer(0.05, rollout.stop)
+    timer.start()
+    report = rollout.run()
+
+    assert report.done == [] and report.failed == []
+    # polling the initiate upgrade action command
+    assert rollout.to_dict()['targets']['a:623/0x20']['stage'] == 'action'
+
+
+def test_on_change_error():
+    targets = {'a': FakeTarget(), 'b': FakeTarget(fail_upload=True)}
+
+    def on_change(target):
+        raise IOError('disk full')
+
+    rollout = _rollout(targets, max_workers=1, on_change=on_change)
+    thread = threading.Thread(target=rollout.run, daemon=True)
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert [t.stage for t in rollout.targets] == [STAGE_DONE, STAGE_FAILED]
+
+
+@pytest.mark.filterwarnings(
+    'ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_worker_error_does_not_hang():
+    targets = {'a': FakeTarget(), 'b': FakeTarget()}
+    rollout = _rollout(targets, max_workers=2)
+
+    def step(target):
+        raise SystemExit()
+
+    rollout._step = step
+    thread = threading.Thread(target=rollout.run, daemon=True)
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert [t.stage for t in rollout.targets] == [STAGE_FAILED] * 2
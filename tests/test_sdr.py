@@ -1,10 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import math
+from array import array
+
 import pytest
 
+import pyipmi.sdr
 from pyipmi.errors import DecodingError
-from pyipmi.sdr import (SdrCommon, SdrFullSensorRecord, SdrCompactSensorRecord,
+from pyipmi.sdr import (L_LINEAR, L_LN, L_1_X, L_SQR, L_SQRT, L_CUBERT,
+                        SdrCommon, SdrFullSensorRecord, SdrCompactSensorRecord,
                         SdrEventOnlySensorRecord, SdrFruDeviceLocator,
                         SdrManagementControllerDeviceLocator,
                         SdrManagementControllerConfirmationRecord,
@@ -320,3 +325,51 @@ def test_unknown_record_type():
     data = [0x01, 0x0, 0x51, 0x0a, 0x0]
     sdr = SdrCommon.from_data(data, 0xffff)
     assert isinstance(sdr, SdrUnknownSensorRecord)
+
+
+class TestSdrFullSensorRecordConversionTable():
+    def _record(self, fmt, m=1, b=0, k1=0, k2=0, linearization=0):
+        sdr = SdrFullSensorRecord()
+        sdr.analog_data_format = fmt
+        sdr.m = m
+        sdr.b = b
+        sdr.k1 = k1
+        sdr.k2 = k2
+        sdr.linearization = linearization
+        return sdr
+
+    @pytest.mark.parametrize('fmt', [SdrFullSensorRecord.DATA_FMT_UNSIGNED,
+                                     SdrFullSensorRecord.DATA_FMT_1S_COMPLEMENT,
+                                     SdrFullSensorRecord.DATA_FMT_2S_COMPLEMENT])
+    @pytest.mark.parametrize('linearization', [L_LINEAR, L_LN, L_1_X, L_SQR,
+                                               L_SQRT, L_CUBERT])
+    def test_table_matches_conversion(self, fmt, linearization):
+        sdr = self._record(fmt, m=3, b=-2, k1=1, k2=-2,
+                           linearization=linearization)
+        table = sdr.conversion_table()
+        assert len(table) == 256
+        for raw in range(256):
+            try:
+                value = sdr.convert_sensor_raw_to_value(raw)
+            except (ValueError, ZeroDivisionError):
+                assert math.isnan(table[raw])
+            else:
+                assert table[raw] == value
+
+    def test_table_rebuilt_on_change(self):
+        sdr = self._record(SdrFullSensorRecord.DATA_FMT_UNSIGNED)
+        assert sdr.conversion_table()[10] == 10
+        assert sdr.conversion_table() is sdr.conversion_table()
+        sdr.m = 2
+        assert sdr.conversion_table()[10] == 20
+
+    def test_convert_many(self):
+        sdr = self._record(SdrFullSensorRecord.DATA_FMT_2S_COMPLEMENT, m=2)
+        assert list(sdr.convert_many([1, 0x80, 0xff])) == [2, -256, -2]
+
+    def test_convert_many_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(pyipmi.sdr, 'numpy', None)
+        sdr = self._record(SdrFullSensorRecord.DATA_FMT_UNSIGNED, m=10)
+        values = sdr.convert_many(bytes([0, 1, 255]))
+        assert isinstance(values, array)
+        assert list(values) == [0, 10, 2550]
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from unittest.mock import MagicMock
+
+import pytest
+
+from pyipmi import interfaces, create_connection, Target
+from pyipmi.bmc import DeviceGuid
+from pyipmi.errors import CompletionCodeError
+from pyipmi.sdr import SdrCommon, SdrRepositoryInfo
+from pyipmi.sdrcache import SdrCache
+
+SDR_DATA = bytes([
+    0x17, 0x00, 0x51, 0x01, 0x35, 0x17, 0x00, 0x51,
+    0x01, 0x35, 0x17, 0x00, 0x51, 0x01, 0x35, 0x32,
+    0x85, 0x32, 0x1b, 0x1b, 0x00, 0x04, 0x00, 0x00,
+    0x3b, 0x01, 0x00, 0x01, 0x00, 0xd0, 0x07, 0xcc,
+    0xf4, 0xa6, 0xff, 0x00, 0x00, 0xfe, 0xf5, 0x00,
+    0x8e, 0xa5, 0x04, 0x04, 0x00, 0x00, 0x00, 0xca,
+    0x41, 0x32, 0x3a, 0x56, 0x63, 0x63, 0x20, 0x31,
+    0x32, 0x56])
+
+
+def _records():
+    return [SdrCommon.from_data(array('B', SDR_DATA), 0xffff)]
+
+
+def _guid(guid):
+    g = DeviceGuid()
+    g._from_response(MagicMock(device_guid=array('B', guid)))
+    return g
+
+
+def _repository_info(count, addition, erase):
+    info = SdrRepositoryInfo(None)
+    info.record_count = count
+    info.most_recent_addition = addition
+    info.most_recent_erase = erase
+    return info
+
+
+class TestSdrCache(object):
+    def test_memory_hit(self):
+        cache = SdrCache()
+        records = _records()
+        cache.put('guid', (1, 2, 3), records)
+        assert cache.get('guid', (1, 2, 3)) == records
+
+    def test_missing(self):
+        cache = SdrCache()
+        assert cache.get('guid', (1, 2, 3)) is None
+
+    def test_outdated_stamp(self):
+        cache = SdrCache()
+        cache.put('guid', (1, 2, 3), _records())
+        assert cache.get('guid', (1, 5, 3)) is None
+
+    def test_lru_eviction(self):
+        cache = SdrCache(max_entries=2)
+        cache.put('a', (1,), _records())
+        cache.put('b', (1,), _records())
+        cache.get('a', (1,))
+        cache.put('c', (1,), _records())
+        assert cache.get('a', (1,)) is not None
+        assert cache.get('b', (1,)) is None
+        assert cache.get('c', (1,)) is not None
+
+    def test_disk_round_trip(self, tmp_path):
+        SdrCache(str(tmp_path)).put('guid', (1, 2, 3), _records())
+
+        records = SdrCache(str(tmp_path)).get('guid', (1, 2, 3))
+        assert len(records) == 1
+        assert records[0].device_id_string == 'A2:Vcc 12V'
+        assert records[0].next_id == 0xffff
+        assert bytes(records[0].data) == SDR_DATA
+
+    def test_invalid_disk_file(self, tmp_path):
+        (tmp_path / 'guid.json').write_text('{ invalid')
+        assert SdrCache(str(tmp_path)).get('guid', (1,)) is None
+
+    @pytest.mark.parametrize('function', ['pyipmi.sdrcache.json.dump',
+                                          'pyipmi.sdrcache.os.replace'])
+    def test_failed_store_removes_temp_file(self, tmp_path, monkeypatch,
+                                            function):
+        monkeypatch.setattr(function, MagicMock(side_effect=OSError))
+        with pytest.raises(OSError):
+            SdrCache(str(tmp_path)).put('guid', (1,), _records())
+        assert list(tmp_path.iterdir()) == []
+
+    def test_clear(self, tmp_path):
+        cache = SdrCache(str(tmp_path))
+        cache.put('guid', (1,), _records())
+        cache.clear()
+        assert cache.get('guid', (1,)) is None
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestIpmiSdrCache(object):
+    def setup_method(self):
+        self.ipmi = create_connection(interfaces.create_interface('mock'))
+        self.ipmi.sdr_cache = SdrCache()
+        self.ipmi.get_device_guid = MagicMock(
+                return_value=_guid(range(16)))
+        self.ipmi.get_sdr_repository_info = MagicMock(
+                return_value=_repository_info(1, 100, 50))
+        self.ipmi.sdr_repository_entries = MagicMock(
+                side_effect=lambda: iter(_records()))
+
+    def test_cached_repository_list(self):
+        sdrs = self.ipmi.get_repository_sdr_list()
+        assert len(sdrs) == 1
+        sdrs = self.ipmi.get_repository_sdr_list()
+        assert len(sdrs) == 1
+        assert self.ipmi.sdr_repository_entries.call_count == 1
+
+    def test_guid_read_once(self):
+        for _ in range(3):
+            self.ipmi.get_repository_sdr_list()
+        assert self.ipmi.get_device_guid.call_count == 1
+        assert self.ipmi.get_sdr_repository_info.call_count == 3
+
+        # the GUID is read again for another target
+        self.ipmi.target = Target(0x72, [(0x81, 0x20, 0), (0x20, 0x72, None)])
+        self.ipmi.get_repository_sdr_list()
+        assert self.ipmi.get_device_guid.call_count == 2
+
+    def test_repository_changed(self):
+        self.ipmi.get_repository_sdr_list()
+        self.ipmi.get_sdr_repository_info.return_value = \
+            _repository_info(1, 200, 50)
+        self.ipmi.get_repository_sdr_list()
+        assert self.ipmi.sdr_repository_entries.call_count == 2
+
+    def test_no_guid(self):
+        self.ipmi.get_device_guid.side_effect = CompletionCodeError(0xc1)
+        self.ipmi.get_repository_sdr_list()
+        self.ipmi.get_repository_sdr_list()
+        assert self.ipmi.sdr_repository_entries.call_count == 2
+        assert self.ipmi.get_device_guid.call_count == 1
+
+    def test_unset_guid(self):
+        self.ipmi.get_device_guid.return_value = _guid([0] * 16)
+        self.ipmi.get_repository_sdr_list()
+        self.ipmi.get_repository_sdr_list()
+        assert self.ipmi.sdr_repository_entries.call_count == 2
+
+    def test_cached_device_list(self):
+        rsp = MagicMock(number_of_sensors=1, sensor_population_change=10)
+        self.ipmi.send_message_with_name = MagicMock(return_value=rsp)
+        self.ipmi.device_sdr_entries = MagicMock(
+                side_effect=lambda: iter(_records()))
+
+        self.ipmi.get_device_sdr_list()
+        self.ipmi.get_device_sdr_list()
+        assert self.ipmi.device_sdr_entries.call_count == 1
+
+        rsp.sensor_population_change = 11
+        self.ipmi.get_device_sdr_list()
+        assert self.ipmi.device_sdr_entries.call_count == 2
@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import json
 from unittest.mock import MagicMock
 
 from pyipmi import interfaces, create_connection
-from pyipmi.msgs.registry import create_response_by_name
-from pyipmi.sel import SelEntry, SelInfo
+from pyipmi.msgs.registry import create_response_by_name, create_response_message
+from pyipmi.sel import SelCursor, SelEntry, SelInfo
 
 
 class TestSel:
@@ -36,6 +37,233 @@ class TestSel:
         assert len(entries) == 2
 
 
+class FakeSel(object):
+    def __init__(self):
+        self.record_ids = []
+        self.most_recent_addition = 0
+        self.most_recent_erase = 0
+        self.requests = []
+
+    def add(self, record_id):
+        self.record_ids.append(record_id)
+        self.most_recent_addition += 1
+
+    def clear(self):
+        self.record_ids = []
+        self.most_recent_erase += 1
+
+    def delete(self, record_id):
+        self.record_ids.remove(record_id)
+        self.most_recent_erase += 1
+
+    def send_message(self, req):
+        self.requests.append(req.cmdid)
+        rsp = create_response_message(req)
+        if req.cmdid == 0x40:
+            rsp.entries = len(self.record_ids)
+            rsp.most_recent_addition = self.most_recent_addition
+            rsp.most_recent_erase = self.most_recent_erase
+        elif req.cmdid == 0x42:
+            rsp.reservation_id = 1
+        elif req.cmdid == 0x43:
+            ids = self.record_ids
+            if req.record_id == 0:
+                index = 0
+            elif req.record_id == 0xffff:
+                index = len(ids) - 1
+            elif req.record_id in ids:
+                index = ids.index(req.record_id)
+            else:
+                rsp.completion_code = 0xcb
+                return rsp
+            record_id = ids[index]
+            rsp.record_data = [record_id & 0xff, record_id >> 8,
+                               SelEntry.TYPE_SYSTEM_EVENT,
+                               0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            rsp.next_record_id = 0xffff
+            if index + 1 < len(ids):
+                rsp.next_record_id = ids[index + 1]
+        return rsp
+
+
+class TestSelGetEntry:
+
+    def _ipmi(self, max_length):
+        self.lengths = []
+        data = [0, 0, SelEntry.TYPE_SYSTEM_EVENT] + list(range(13))
+
+        def send_message(req):
+            self.lengths.append(req.length)
+            rsp = create_response_message(req)
+            if req.length > max_length:
+                rsp.completion_code = 0xca
+                return rsp
+            rsp.record_data = data[req.offset:req.offset + req.length]
+            rsp.next_record_id = 0xffff
+            return rsp
+
+        interface = interfaces.create_interface('mock')
+        ipmi = create_connection(interface)
+        ipmi.send_message = send_message
+        return ipmi
+
+    def test_entire_record(self):
+        ipmi = self._ipmi(0xff)
+        for _ in range(3):
+            (entry, _) = ipmi.get_sel_entry(0)
+        assert entry.type == SelEntry.TYPE_SYSTEM_EVENT
+        assert self.lengths == [0xff, 0xff, 0xff]
+
+    def test_remembered_partial_length(self):
+        ipmi = self._ipmi(16)
+        for _ in range(5):
+            (entry, _) = ipmi.get_sel_entry(0)
+            assert entry.data.array.tolist()[3:] == list(range(13))
+
+        # converged to one request per entry
+        self.lengths = []
+        ipmi.get_sel_entry(0)
+        assert self.lengths == [16]
+
+    def test_small_partial_length(self):
+        ipmi = self._ipmi(5)
+        for _ in range(5):
+            ipmi.get_sel_entry(0)
+
+        self.lengths = []
+        ipmi.get_sel_entry(0)
+        assert self.lengths == [5, 5, 5, 1]
+
+
+class TestSelTail:
+
+    def setup_method(self):
+        self.sel = FakeSel()
+        interface = interfaces.create_interface('mock')
+        self.ipmi = create_connection(interface)
+        self.ipmi.send_message = self.sel.send_message
+
+    def _tail_ids(self, count):
+        return [e.record_id for e in self.ipmi.get_sel_tail(count)]
+
+    def test_read_backwards(self):
+        for record_id in range(1, 101):
+            self.sel.add(record_id)
+        assert self._tail_ids(3) == [98, 99, 100]
+        # the last entry and the two before it
+        assert self.sel.requests.count(0x43) == 3
+
+    def test_deleted_entries(self):
+        for record_id in range(1, 11):
+            self.sel.add(record_id)
+        self.sel.delete(9)
+        assert self._tail_ids(3) == [7, 8, 10]
+
+    def test_sparse_record_ids(self):
+        for record_id in range(10, 110, 10):
+            self.sel.add(record_id)
+        assert self._tail_ids(2) == [90, 100]
+
+    def test_less_entries(self):
+        self.sel.add(1)
+        self.sel.add(2)
+        assert self._tail_ids(10) == [1, 2]
+
+    def test_empty(self):
+        assert self._tail_ids(10) == []
+        assert self.sel.requests == [0x40]
+
+
+class TestSelFollow:
+
+    def setup_method(self):
+        self.sel = FakeSel()
+        interface = interfaces.create_interface('mock')
+        self.ipmi = create_connection(interface)
+        self.ipmi.send_message = self.sel.send_message
+
+    def _new_ids(self, cursor):
+        return [e.record_id for e in self.ipmi.new_sel_entries(cursor)]
+
+    def test_new_sel_entries(self):
+        self.sel.add(1)
+        self.sel.add(2)
+        cursor = SelCursor()
+        assert self._new_ids(cursor) == [1, 2]
+        assert cursor.record_id == 2
+
+        # unchanged SEL, only the SEL info is read
+        self.sel.requests = []
+        assert self._new_ids(cursor) == []
+        assert self.sel.requests == [0x40]
+
+        self.sel.add(3)
+        assert self._new_ids(cursor) == [3]
+
+    def test_new_sel_entries_after_clear(self):
+        self.sel.add(1)
+        cursor = SelCursor()
+        assert self._new_ids(cursor) == [1]
+        self.sel.clear()
+        assert self._new_ids(cursor) == []
+        assert cursor.record_id is None
+        self.sel.add(1)
+        assert self._new_ids(cursor) == [1]
+
+    def test_new_sel_entries_last_seen_deleted(self):
+        self.sel.add(1)
+        self.sel.add(2)
+        cursor = SelCursor()
+        assert self._new_ids(cursor) == [1, 2]
+        self.sel.record_ids.remove(2)
+        self.sel.add(3)
+        assert self._new_ids(cursor) == [3]
+
+    def test_new_sel_entries_after_delete(self):
+        for record_id in (1, 2, 3):
+            self.sel.add(record_id)
+        cursor = SelCursor()
+        assert self._new_ids(cursor) == [1, 2, 3]
+
+        # deleting an entry updates the erase timestamp
+        self.sel.delete(2)
+        self.sel.add(4)
+        assert self._new_ids(cursor) == [4]
+
+        self.sel.delete(4)
+        self.sel.add(5)
+        assert self._new_ids(cursor) == [5]
+
+        self.sel.delete(1)
+        assert self._new_ids(cursor) == []
+        assert cursor.record_id == 5
+
+    def test_new_sel_entries_cleared_and_refilled(self):
+        self.sel.add(1)
+        cursor = SelCursor()
+        assert self._new_ids(cursor) == [1]
+        self.sel.clear()
+        self.sel.add(2)
+        self.sel.add(3)
+        assert self._new_ids(cursor) == [2, 3]
+
+    def test_cursor_persistence(self):
+        self.sel.add(1)
+        cursor = SelCursor()
+        self._new_ids(cursor)
+
+        cursor = SelCursor.from_dict(json.loads(json.dumps(cursor.to_dict())))
+        self.sel.add(2)
+        assert self._new_ids(cursor) == [2]
+
+    def test_follow_sel(self):
+        self.sel.add(1)
+        follow = self.ipmi.follow_sel(interval=0)
+        self.sel.add(2)
+        self.sel.add(3)
+        assert [next(follow).record_id for _ in range(2)] == [2, 3]
+
+
 class TestSelInfo:
     rsp = create_response_by_name('GetSelInfo')
     rsp.version = 1
@@ -3,11 +3,14 @@
 
 from unittest.mock import MagicMock
 
+import pytest
+
 from pyipmi import interfaces, create_connection
 from pyipmi.msgs.sensor import (SetSensorThresholdsRsp, GetSensorThresholdsRsp,
                                 GetSensorReadingRsp, PlatformEventRsp)
+from pyipmi.sdr import SdrCommon
 from pyipmi.sensor import (EVENT_READING_TYPE_SENSOR_SPECIFIC,
-                           SENSOR_TYPE_MODULE_HOT_SWAP)
+                           SENSOR_TYPE_MODULE_HOT_SWAP, SensorSnapshot)
 
 
 class TestSensor:
@@ -143,3 +146,93 @@ class TestSensor:
         (reading, states) = self.ipmi.get_sensor_reading(0)
         assert reading == 0
         assert states == 0x5555
+
+
+FULL_SDR = [0x17, 0x00, 0x51, 0x01, 0x35, 0x17, 0x00, 0x51,
+            0x01, 0x35, 0x17, 0x00, 0x51, 0x01, 0x35, 0x32,
+            0x85, 0x32, 0x1b, 0x1b, 0x00, 0x04, 0x00, 0x00,
+            0x3b, 0x01, 0x00, 0x01, 0x00, 0xd0, 0x07, 0xcc,
+            0xf4, 0xa6, 0xff, 0x00, 0x00, 0xfe, 0xf5, 0x00,
+            0x8e, 0xa5, 0x04, 0x04, 0x00, 0x00, 0x00, 0xca,
+            0x41, 0x32, 0x3a, 0x56, 0x63, 0x63, 0x20, 0x31,
+            0x32, 0x56]
+
+COMPACT_SDR = [0xd3, 0x00, 0x51, 0x02, 0x28, 0x82, 0x00, 0xd3,
+               0xc1, 0x64, 0x03, 0x40, 0x21, 0x6f, 0x00, 0x00,
+               0x00, 0x00, 0x03, 0x00, 0xc0, 0x00, 0x00, 0x01,
+               0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xcd,
+               0x41, 0x34, 0x3a, 0x50, 0x72, 0x65, 0x73, 0x20,
+               0x53, 0x46, 0x50, 0x2d, 0x31]
+
+
+def _sensor_reading_rsp(completion_code, reading=0, states1=None):
+    rsp = GetSensorReadingRsp()
+    rsp.completion_code = completion_code
+    rsp.sensor_reading = reading
+    rsp.states1 = states1
+    rsp.states2 = None
+    return rsp
+
+
+class TestSensorSnapshot:
+
+    def setup_method(self):
+        self.sdrs = [SdrCommon.from_data(FULL_SDR),
+                     SdrCommon.from_data(COMPACT_SDR)]
+        interface = interfaces.create_interface('mock')
+        self.ipmi = create_connection(interface)
+        self.ipmi.send_messages = MagicMock()
+
+    def test_read(self):
+        self.ipmi.send_messages.return_value = [
+            _sensor_reading_rsp(0, 0xc8, 0x01),
+            _sensor_reading_rsp(0, 0, 0x02),
+        ]
+
+        readings = SensorSnapshot(self.sdrs).read(self.ipmi)
+
+        reqs = self.ipmi.send_messages.call_args[0][0]
+        assert [req.sensor_number for req in reqs] == [0x51, 0xd3]
+        assert len(readings) == 2
+        assert readings.numbers == [0x51, 0xd3]
+        assert readings.names == ['A2:Vcc 12V', 'A4:Pres SFP-1']
+        assert readings.raw == [0xc8, 0]
+        assert readings.states == [0x01, 0x02]
+        assert readings.values[0] == \
+            pytest.approx(self.sdrs[0].convert_sensor_raw_to_value(0xc8))
+        assert readings.values[1] is None
+
+    def test_read_reuses_requests(self):
+        self.ipmi.send_messages.return_value = [
+            _sensor_reading_rsp(0, 0xc8, 0x01),
+            _sensor_reading_rsp(0, 0, 0x02),
+        ]
+
+        snapshot = SensorSnapshot(self.sdrs)
+        snapshot.read(self.ipmi)
+        snapshot.read(self.ipmi)
+
+        (first, second) = self.ipmi.send_messages.call_args_list
+        assert [id(req) for req in first[0][0]] == \
+            [id(req) for req in second[0][0]]
+
+    def test_read_failed_sensor(self):
+        self.ipmi.send_messages.return_value = [
+            _sensor_reading_rsp(0xcb),
+            _sensor_reading_rsp(0, 0, 0x02),
+        ]
+
+        readings = SensorSnapshot(self.sdrs).read(self.ipmi)
+        assert readings.raw == [None, 0]
+        assert readings.values == [None, None]
+        assert readings.states == [None, 0x02]
+
+    def test_get_sensor_snapshot(self):
+        self.ipmi.send_messages.return_value = [
+            _sensor_reading_rsp(0, 0xc8, 0x01),
+        ]
+
+        readings = self.ipmi.get_sensor_snapshot(self.sdrs[:1])
+        assert readings.as_dict() == {
+            'A2:Vcc 12V': (readings.values[0], 0x01)
+        }
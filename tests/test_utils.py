@@ -6,8 +6,8 @@ import pytest
 from array import array
 
 import pyipmi.msgs.device_messaging
-from pyipmi.utils import (ByteBuffer, chunks, check_completion_code,
-                          check_rsp_completion_code)
+from pyipmi.utils import (ByteBuffer, ByteReader, chunks,
+                          check_completion_code, check_rsp_completion_code)
 from pyipmi.errors import DecodingError, CompletionCodeError
 from pyipmi.msgs import decode_message
 
@@ -114,6 +114,64 @@ def test_bytebuffer_pop_slice_error():
         buf.pop_slice(5)
 
 
+@pytest.mark.parametrize('data', [
+    b'\x01\x02\x03\x04',
+    bytearray(b'\x01\x02\x03\x04'),
+    array('B', [1, 2, 3, 4]),
+    [1, 2, 3, 4],
+    ByteBuffer([1, 2, 3, 4]),
+])
+def test_bytereader_init(data):
+    reader = ByteReader(data)
+    assert len(reader) == 4
+    assert reader.tobytes() == b'\x01\x02\x03\x04'
+
+
+def test_bytereader_pop_unsigned_int():
+    reader = ByteReader(b'\x01\x00\x02\x03\x04\x05\x06')
+    assert reader.pop_unsigned_int(1) == 1
+    assert reader.pop_unsigned_int(2) == 0x0200
+    assert reader.pop_unsigned_int(4) == 0x06050403
+    assert len(reader) == 0
+
+
+def test_bytereader_pop_unsigned_int_error():
+    reader = ByteReader(b'\x00\x00')
+    with pytest.raises(DecodingError):
+        reader.pop_unsigned_int(3)
+    assert len(reader) == 2
+
+
+def test_bytereader_pop_string():
+    reader = ByteReader(b'\x30\x31\x32\x33')
+    assert reader.pop_string(3) == b'012'
+    assert reader.pop_string(3) == b'3'
+    assert reader.pop_string(3) == b''
+
+
+def test_bytereader_pop_slice_shares_data():
+    data = bytearray(b'\x30\x31\x32\x33')
+    reader = ByteReader(data)
+    cut = reader.pop_slice(2)
+    data[0] = 0x39
+    assert cut.tobytes() == b'91'
+    assert reader.tobytes() == b'23'
+    assert cut.pop_unsigned_int(2) == 0x3139
+    with pytest.raises(DecodingError):
+        reader.pop_slice(3)
+
+
+def test_bytereader_getitem_is_relative_to_cursor():
+    reader = ByteReader(b'\x30\x31\x32\x33')
+    reader.skip(1)
+    assert reader[0] == 0x31
+    assert reader[-1] == 0x33
+    assert reader[0:2] == array('B', b'12')
+    assert reader.array == array('B', b'123')
+    with pytest.raises(DecodingError):
+        reader.skip(4)
+
+
 def test_chunks():
     data = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
     result = list()